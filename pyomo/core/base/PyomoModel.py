@@ -42,12 +42,13 @@ from pyomo.core.base.constraint import Constraint
 from pyomo.core.base.objective import Objective
 from pyomo.core.base.set_types import *
 from pyomo.core.base.suffix import active_import_suffix_generator
-from pyomo.core.base.symbol_map import SymbolMap
+from pyomo.core.base.symbol_map import SymbolMap, CompactSymbolMap
 from pyomo.core.base.indexed_component import IndexedComponent
 from pyomo.core.base.DataPortal import *
 from pyomo.core.base.plugin import *
 from pyomo.core.base.numvalue import *
 from pyomo.core.base.block import SimpleBlock
+from pyomo.core.base.construction_profiler import construct_component
 from pyomo.core.base.sets import Set
 from pyomo.core.base.component import register_component, Component, ComponentUID
 from pyomo.core.base.plugin import TransformationFactory
@@ -57,7 +58,7 @@ from pyomo.opt.base import ProblemFormat, guess_format
 from pyomo.opt.results import SolverResults, Solution, SolutionStatus, UndefinedData
 
 from six import itervalues, iteritems, StringIO, string_types
-from six.moves import xrange
+from six.moves import xrange, zip
 try:
     unicode
 except:
@@ -106,6 +107,29 @@ class PyomoConfig(Container):
             d[item[-1]] = PyomoConfig._option[item]
 
 
+class _NoValueType(object):
+    """
+    The type of the marker for the missing values in the columns of a
+    ModelSolution.  The marker is preserved when solutions are pickled
+    or copied.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_NoValue'
+
+_NoValue = _NoValueType()
+
+
+def _dead_ref():
+    """
+    The reference of the objects of unpickled solutions that are not
+    found in the model
+    """
+    return None
+
+
 class ModelSolution(object):
 
     def __init__(self):
@@ -115,7 +139,12 @@ class ModelSolution(object):
         self._metadata['gap'] = None
         self._entry = {}
         #
-        # entry[name]: id -> (object weakref, entry)
+        # entry[name]: key -> column of values
+        #
+        # The columns are lists that are ordered like the objects of
+        # the ModelSolutions that contains this solution (and shared
+        # by all of its solutions).  Missing values are _NoValue, and
+        # the columns may be shorter than the list of objects.
         #
         for name in ['objective', 'variable', 'constraint', 'problem']:
             self._entry[name] = {}
@@ -144,39 +173,137 @@ class ModelSolutions(object):
             self.symbol_map = {}
         self.solutions = []
         self.index = None
+        self.__dict__.pop('_cuids', None)
+        #
+        # _objects[name]: (list of object weakrefs, id -> position)
+        #
+        # The objects that have values in the solutions, in the order
+        # of the columns of the solutions.  The solutions do not keep
+        # the objects alive: the positions of the objects that are
+        # deleted are not reused, and they are skipped when solutions
+        # are selected.
+        #
+        self._objects = {}
+        for name in ['objective', 'variable', 'constraint', 'problem']:
+            self._objects[name] = ([], {})
+
+    def _position(self, name, obj):
+        """
+        Return the position of an object in the columns of the solutions
+        """
+        objs, index = self._objects[name]
+        pos = index.get(id(obj), None)
+        # (the id of a deleted object can be reused by another object)
+        if pos is None or objs[pos]() is not obj:
+            pos = index[id(obj)] = len(objs)
+            objs.append(weakref_ref(obj))
+        return pos
+
+    def _store(self, soln, name, obj, entry):
+        """
+        Store the values in an entry (a dictionary) for an object
+        """
+        pos = self._position(name, obj)
+        columns = soln._entry[name]
+        for key, val in iteritems(entry):
+            column = columns.get(key, None)
+            if column is None:
+                column = columns[key] = []
+            n = len(column)
+            if n == pos:
+                column.append(val)
+            else:
+                if n < pos:
+                    column.extend([_NoValue]*(pos-n+1))
+                column[pos] = val
+
+    def _lookup(self, soln, name, obj):
+        """
+        Return the entry (a dictionary) for an object, or None if the
+        solution has no values for the object
+        """
+        objs, index = self._objects[name]
+        pos = index.get(id(obj), None)
+        if pos is None or objs[pos]() is not obj:
+            return None
+        entry = {}
+        for key, column in iteritems(soln._entry[name]):
+            if pos < len(column) and column[pos] is not _NoValue:
+                entry[key] = column[pos]
+        return entry if entry else None
+
+    def _entries(self, soln, name):
+        """
+        Generate the (object, entry) tuples of a solution
+        """
+        objs = self._objects[name][0]
+        for pos in xrange(len(objs)):
+            obj = objs[pos]()
+            if obj is None:
+                continue
+            entry = {}
+            for key, column in iteritems(soln._entry[name]):
+                if pos < len(column) and column[pos] is not _NoValue:
+                    entry[key] = column[pos]
+            if entry:
+                yield obj, entry
 
     def __getstate__(self):
         state = {}
         state['index'] = self.index
         state['_instance'] = self._instance()
+        #
+        # The objects are stored by their ComponentUID (None for the
+        # objects that have been deleted)
+        #
+        state['objects'] = {}
+        for name, (objs, index) in iteritems(self._objects):
+            cuids = state['objects'][name] = []
+            for ref in objs:
+                obj = ref()
+                cuids.append(None if obj is None else ComponentUID(obj))
         solutions = []
         for soln in self.solutions:
             soln_ = {}
             soln_['metadata'] = soln._metadata
-            tmp = {}
-            for (name, data) in iteritems(soln._entry):
-                tmp[name] = {}
-                tmp[name].update( (ComponentUID(obj()), entry) for (obj, entry) in itervalues(data) )
-            soln_['entry'] = tmp
+            soln_['entry'] = soln._entry
             solutions.append(soln_)
         state['solutions'] = solutions
         return state
 
     def __setstate__(self, state):
+        #
+        # NOTE: the model may not be fully restored when this method is
+        # called, so the objects are found when they are first used
+        # (see __getattr__)
+        #
         self.clear()
         self.index = state['index']
         self._instance = weakref_ref(state['_instance'])
-        instance = self._instance()
+        del self._objects
+        self._cuids = state['objects']
         for soln in state['solutions']:
             soln_ = ModelSolution()
             soln_._metadata = soln['metadata']
-            for key,value in iteritems(soln['entry']):
-                d = soln_._entry[key]
-                for cuid, entry in iteritems(value):
-                    obj = cuid.find_component(instance)
-                    d[id(obj)] = (obj, entry)
+            soln_._entry = soln['entry']
             self.solutions.append(soln_)
 
+    def __getattr__(self, name):
+        if name != '_objects' or '_cuids' not in self.__dict__:
+            raise AttributeError(name)
+        instance = self._instance()
+        self._objects = {}
+        for key, cuids in iteritems(self.__dict__.pop('_cuids')):
+            objs, index = self._objects[key] = ([], {})
+            for cuid in cuids:
+                obj = None if cuid is None else cuid.find_component(instance)
+                if obj is None:
+                    objs.append(_dead_ref)
+                else:
+                    index[id(obj)] = len(objs)
+                    objs.append(weakref_ref(obj))
+        return self._objects
+
     def __len__(self):
         return len(self.solutions)
 
@@ -250,7 +377,7 @@ class ModelSolutions(object):
                               default_variable_value=default_variable_value)
         else:
             for i in range(len(results.solution)):
-                self.add_solution(results.solution(i),
+                self.add_solution(results.solution(i+1),
                                   smap_id,
                                   delete_symbol_map=False,
                                   cache=cache,
@@ -270,6 +397,87 @@ class ModelSolutions(object):
                 ignore_invalid_labels=ignore_invalid_labels,
                 ignore_fixed_vars=ignore_fixed_vars)
 
+    def load_from_sol(self,
+                      sol,
+                      smap_id,
+                      delete_symbol_map=True,
+                      ignore_fixed_vars=True):
+        """
+        Load the data in an AMPL *.sol file (an AmplSolution object)
+        into the model.
+
+        The primal values, duals and suffix values are mapped by their
+        position to the variables, constraints and objectives in the
+        symbol map of the NL file (without creating a SolverResults
+        object).  The solutions stored in the model are cleared.
+        """
+        instance = self._instance()
+        smap = self.symbol_map[smap_id]
+        if not isinstance(smap, CompactSymbolMap):
+            raise ValueError(
+                "Cannot load a sol file into model=%s: the symbol map "
+                "was not generated by the NL writer" % (instance.name,))
+        (termination_condition,
+         solver_status,
+         solution_status,
+         message) = sol.status()
+        if solver_status not in (pyomo.opt.SolverStatus.ok,
+                                 pyomo.opt.SolverStatus.warning):
+            raise ValueError("Cannot load a sol file with bad status: %s "
+                             "(solve_result_num=%s)"
+                             % (str(solver_status), sol.solve_result_num))
+        self.clear(clear_symbol_maps=False)
+        objects = {0: smap.getIndexedObjects('v'),
+                   1: smap.getIndexedObjects('c'),
+                   2: smap.getIndexedObjects('o')}
+        x = sol.x
+        y = sol.y
+        if hasattr(x, 'tolist'):
+            x = x.tolist()
+            y = y.tolist()
+        if len(x) and len(x) != len(objects[0]):
+            raise ValueError(
+                "The sol file contains %s variable values, but the NL "
+                "file of model=%s has %s variables"
+                % (len(x), instance.name, len(objects[0])))
+        if len(y) and len(y) != len(objects[1]):
+            raise ValueError(
+                "The sol file contains %s dual values, but the NL "
+                "file of model=%s has %s constraints"
+                % (len(y), instance.name, len(objects[1])))
+        instance._flag_vars_as_stale()
+        # (the symbol map does not keep the objects alive: the objects
+        # that were deleted from the model are None)
+        for vdata, val in zip(objects[0], x):
+            if vdata is None or (vdata.fixed and ignore_fixed_vars):
+                continue
+            vdata.value = val
+            vdata.stale = False
+        valid_import_suffixes = dict(active_import_suffix_generator(instance))
+        for suffix in itervalues(valid_import_suffixes):
+            suffix.clear_all_values()
+        if 'dual' in valid_import_suffixes:
+            valid_import_suffixes['dual'].update(
+                (cdata, val) for cdata, val in zip(objects[1], y)
+                if cdata is not None)
+        for kind, values in iteritems(sol.suffixes):
+            for name, (index, vals) in iteritems(values):
+                if name not in valid_import_suffixes:
+                    continue
+                suffix = valid_import_suffixes[name]
+                if hasattr(index, 'tolist'):
+                    index = index.tolist()
+                    vals = vals.tolist()
+                if kind == 3:
+                    for val in vals:
+                        suffix[instance] = val
+                else:
+                    objs = objects[kind]
+                    suffix.update((objs[i], val) for i, val in zip(index, vals)
+                                  if objs[i] is not None)
+        if delete_symbol_map:
+            self.delete_symbol_map(smap_id)
+
     def store_to(self, results, cuid=False):
         """
         Return a Solution() object that is populated with the values in the model.
@@ -290,33 +498,24 @@ class ModelSolutions(object):
                 labeler = CNameLabeler()
             sm = SymbolMap()
 
-            entry = soln_._entry['objective']
             for obj in instance.component_data_objects(Objective, active=True):
-                vals = entry.get(id(obj), None)
+                vals = self._lookup(soln_, 'objective', obj)
                 if vals is None:
                     vals = {}
-                else:
-                    vals = vals[1]
                 vals['Value'] = value(obj)
                 soln.objective[ sm.getSymbol(obj, labeler) ] = vals
-            entry = soln_._entry['variable']
             for obj in instance.component_data_objects(Var, active=True):
                 if obj.stale:
                     continue
-                vals = entry.get(id(obj), None)
+                vals = self._lookup(soln_, 'variable', obj)
                 if vals is None:
                     vals = {}
-                else:
-                    vals = vals[1]
                 vals['Value'] = value(obj)
                 soln.variable[ sm.getSymbol(obj, labeler) ] = vals
-            entry = soln_._entry['constraint']
             for obj in instance.component_data_objects(Constraint, active=True):
-                vals = entry.get(id(obj), None)
+                vals = self._lookup(soln_, 'constraint', obj)
                 if vals is None:
                     continue
-                else:
-                    vals = vals[1]
                 soln.constraint[ sm.getSymbol(obj, labeler) ] = vals
             results.solution.insert( soln )
 
@@ -358,7 +557,6 @@ class ModelSolutions(object):
                         cache[ComponentUID(obj)] = obj
 
                 for name in ['problem', 'objective', 'variable', 'constraint']:
-                    tmp = soln._entry[name]
                     for cuid, val in iteritems(getattr(solution, name)):
                         obj = cache.get(cuid, None)
                         if obj is None:
@@ -366,7 +564,7 @@ class ModelSolutions(object):
                                 continue
                             raise RuntimeError("CUID %s is missing from model %s"
                                                % (str(cuid), instance.name))
-                        tmp[id(obj)] = (weakref_ref(obj), val)
+                        self._store(soln, name, obj, val)
             else:
                 #
                 # Loading a solution with string keys
@@ -380,7 +578,6 @@ class ModelSolutions(object):
                         cache[obj.name] = obj
 
                 for name in ['problem', 'objective', 'variable', 'constraint']:
-                    tmp = soln._entry[name]
                     for symb, val in iteritems(getattr(solution, name)):
                         obj = cache.get(symb, None)
                         if obj is None:
@@ -388,31 +585,31 @@ class ModelSolutions(object):
                                 continue
                             raise RuntimeError("Symbol %s is missing from model %s"
                                                % (symb, instance.name))
-                        tmp[id(obj)] = (weakref_ref(obj), val)
+                        self._store(soln, name, obj, val)
         else:
             #
             # Map solution
             #
             smap = self.symbol_map[smap_id]
+            # Note: getObject() maps the symbols of a CompactSymbolMap
+            # directly to the positions of the objects
+            smap_getObject = smap.getObject
+            UnknownSymbol = SymbolMap.UnknownSymbol
             for name in ['problem', 'objective', 'variable', 'constraint']:
-                tmp = soln._entry[name]
                 for symb, val in iteritems(getattr(solution, name)):
-                    if symb in smap.bySymbol:
-                        obj = smap.bySymbol[symb]
-                    elif symb in smap.aliases:
-                        obj = smap.aliases[symb]
-                    elif ignore_missing_symbols:
-                        continue
-                    else:                                   #pragma:nocover
+                    obj = smap_getObject(symb)
+                    if obj is UnknownSymbol:
+                        if ignore_missing_symbols:
+                            continue
                         #
                         # This should never happen ...
                         #
-                        raise RuntimeError(
+                        raise RuntimeError(                 #pragma:nocover
                             "ERROR: Symbol %s is missing from "
                             "model %s when loading with a symbol map!"
                             % (symb, instance.name))
 
-                    tmp[id(obj())] = (obj, val)
+                    self._store(soln, name, obj, val)
             #
             # Wrap up
             #
@@ -422,16 +619,21 @@ class ModelSolutions(object):
         #
         # Collect fixed variables
         #
-        tmp = soln._entry['variable']
+        columns = soln._entry['variable']
         for vdata in instance.component_data_objects(Var):
             id_ = id(vdata)
             if vdata.fixed:
-                tmp[id_] = (weakref_ref(vdata), {'Value':value(vdata)})
+                pos = self._position('variable', vdata)
+                for column in itervalues(columns):
+                    if pos < len(column):
+                        column[pos] = _NoValue
+                self._store(soln, 'variable', vdata, {'Value':value(vdata)})
             elif (default_variable_value is not None) and \
                  (smap_id is not None) and \
                  (id_ in smap.byObject) and \
-                 (id_ not in tmp):
-                tmp[id_] = (weakref_ref(vdata), {'Value':default_variable_value})
+                 (self._lookup(soln, 'variable', vdata) is None):
+                self._store(soln, 'variable', vdata,
+                            {'Value':default_variable_value})
 
         self.solutions.append(soln)
         return len(self.solutions)-1
@@ -478,31 +680,32 @@ class ModelSolutions(object):
         for suffix in itervalues(valid_import_suffixes):
             suffix.clear_all_values()
         #
-        # Load problem (model) level suffixes. These would only come from ampl
-        # interfaced solution suffixes at this point in time.
+        # Load problem (model) level suffixes, which would only come from
+        # ampl interfaced solution suffixes at this point in time, and
+        # the objective and constraint data (suffixes).  The values are
+        # stored in columns that are ordered like the objects.
         #
-        for id_, (pobj,entry) in iteritems(soln._entry['problem']):
-            for _attr_key, attr_value in iteritems(entry):
+        for name in ('problem', 'objective', 'constraint'):
+            objs = [ref() for ref in self._objects[name][0]]
+            for _attr_key, column in iteritems(soln._entry[name]):
                 attr_key = _attr_key[0].lower() + _attr_key[1:]
                 if attr_key in valid_import_suffixes:
-                    valid_import_suffixes[attr_key][pobj] = attr_value
+                    suffix = valid_import_suffixes[attr_key]
+                    for obj, attr_value in zip(objs, column):
+                        if (attr_value is not _NoValue) and \
+                           (obj is not None):
+                            suffix[obj] = attr_value
         #
-        # Load objective data (suffixes)
+        # Load variable values
         #
-        for id_, (odata, entry) in iteritems(soln._entry['objective']):
-            odata = odata()
-            for _attr_key, attr_value in iteritems(entry):
-                attr_key = _attr_key[0].lower() + _attr_key[1:]
-                if attr_key in valid_import_suffixes:
-                    valid_import_suffixes[attr_key][odata] = attr_value
-        #
-        # Load variable data (suffixes and values)
-        #
-        for id_, (vdata, entry) in iteritems(soln._entry['variable']):
-            vdata = vdata()
-            val = entry['Value']
+        objs = [ref() for ref in self._objects['variable'][0]]
+        skip = set()
+        for vdata, val in zip(objs, soln._entry['variable'].get('Value', ())):
+            if (val is _NoValue) or (vdata is None):
+                continue
             if vdata.fixed is True:
                 if ignore_fixed_vars:
+                    skip.add(id(vdata))
                     continue
                 if not allow_consistent_values_for_fixed_vars:
                     msg = "Variable '%s' in model '%s' is currently fixed - new" \
@@ -521,22 +724,20 @@ class ModelSolutions(object):
 
             vdata.value = val
             vdata.stale = False
-
-            for _attr_key, attr_value in iteritems(entry):
-                attr_key = _attr_key[0].lower() + _attr_key[1:]
-                if attr_key == 'value':
-                    continue
-                elif attr_key in valid_import_suffixes:
-                    valid_import_suffixes[attr_key][vdata] = attr_value
         #
-        # Load constraint data (suffixes)
+        # Load variable suffixes
         #
-        for id_, (cdata, entry) in iteritems(soln._entry['constraint']):
-            cdata = cdata()
-            for _attr_key, attr_value in iteritems(entry):
-                attr_key = _attr_key[0].lower() + _attr_key[1:]
-                if attr_key in valid_import_suffixes:
-                    valid_import_suffixes[attr_key][cdata] = attr_value
+        for _attr_key, column in iteritems(soln._entry['variable']):
+            attr_key = _attr_key[0].lower() + _attr_key[1:]
+            if attr_key == 'value':
+                continue
+            elif attr_key in valid_import_suffixes:
+                suffix = valid_import_suffixes[attr_key]
+                for vdata, attr_value in zip(objs, column):
+                    if (attr_value is not _NoValue) and \
+                       (vdata is not None) and \
+                       (id(vdata) not in skip):
+                        suffix[vdata] = attr_value
 
 
 class Model(SimpleBlock):
@@ -917,7 +1118,7 @@ from solvers are immediately loaded into the original model instance.""")
                           declaration.__class__.__name__,
                           declaration.name, _blockName, str(data) )
         try:
-            declaration.construct(data)
+            construct_component(declaration, data)
         except:
             err = sys.exc_info()[1]
             logger.error(
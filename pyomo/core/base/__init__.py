@@ -38,6 +38,7 @@ from pyomo.core.base.set_types import *
 from pyomo.core.base.misc import *
 from pyomo.core.base.block import *
 from pyomo.core.base.PyomoModel import *
+from pyomo.core.base.construction_profiler import *
 #
 import pyomo.core.base._pyomo
 #
@@ -26,6 +26,8 @@ from pyomo.core.base.component import Component, ActiveComponentData, \
 from pyomo.core.base.sets import Set,  _SetDataBase
 from pyomo.core.base.var import Var
 from pyomo.core.base.misc import apply_indexed_rule
+from pyomo.core.base.clone import transfer_values
+from pyomo.core.base.construction_profiler import construct_component
 from pyomo.core.base.suffix import ComponentMap
 from pyomo.core.base.indexed_component import IndexedComponent, \
     ActiveIndexedComponent, UnindexedComponent_set
@@ -887,7 +889,7 @@ Components must now specify their rules explicitly using 'rule=' keywords.""" %
                               val.__class__.__name__, val.name,
                               _blockName, str(data) )
             try:
-                val.construct(data)
+                construct_component(val, data)
             except:
                 err = sys.exc_info()[1]
                 logger.error(
@@ -1017,7 +1019,10 @@ Components must now specify their rules explicitly using 'rule=' keywords.""" %
 
     def clone(self):
         """
-        TODO
+        Return a copy of this block, including all the components,
+        component data and expressions beneath it.  Components outside
+        this block (and the global sets, numeric constants, etc.) are
+        shared with the copy.
         """
         # FYI: we used to remove all _parent() weakrefs before
         # deepcopying and then restore them on the original and cloned
@@ -1038,6 +1043,14 @@ Components must now specify their rules explicitly using 'rule=' keywords.""" %
         new_block._parent = None
         return new_block
 
+    def copy_values_from(self, source):
+        """
+        Copy the values of the variables (and their fixed flags) and of
+        the mutable parameters of a block with the same structure
+        (e.g., a block that was cloned from this block) into this block.
+        """
+        transfer_values(source, self)
+
     def contains_component(self, ctype):
         """
         Return True if the component type is in _ctypes and ... TODO.
@@ -1593,7 +1606,7 @@ class Block(ActiveIndexedComponent):
                         _data = None
                     else:
                         _data = data.get(name, None)
-                    obj.construct(_data)
+                    construct_component(obj, _data)
 
         if self._rule is None:
             # Ensure the _data dirctionary is populated for singleton
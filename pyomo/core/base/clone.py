@@ -0,0 +1,221 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# The copy engine used to clone blocks, components and expressions.
+#
+# Cloning is implemented with the deepcopy protocol (so that the
+# __block_scope__ logic and the custom __getstate__/__setstate__
+# methods are respected), but the modeling objects are not copied with
+# the generic deepcopy machinery:
+#
+#   - The objects whose state is stored in slots (component data and
+#     expression nodes) are copied slot by slot, without building and
+#     restoring pickle states.
+#   - Immutable values (numbers, strings, etc.) are shared, and lists,
+#     tuples and dicts are copied inline, so deepcopy() is only called
+#     for the modeling objects themselves.
+#   - Weak references are copied as weak references to the copies of
+#     their targets (which is what __getstate__/__setstate__ do).
+#
+
+__all__ = ['transfer_values']
+
+import types
+from copy import deepcopy
+from weakref import ref as weakref_ref
+
+from six import iteritems, PY3
+
+_atomic_types = set([type(None), int, float, bool, complex, str,
+                     type, range, types.FunctionType,
+                     types.BuiltinFunctionType, type(Ellipsis),
+                     type(NotImplemented)])
+if not PY3:
+    _atomic_types.update((long, unicode, types.ClassType, xrange))
+
+# class -> tuple of the slot names (or None if the instances of the
+# class must be copied through __getstate__/__setstate__)
+_slot_names = {}
+
+
+def _get_slot_names(cls):
+    """
+    Return the names of the slots of a class, or None if its
+    instances have a __dict__ or a class in its hierarchy restores
+    its state with a specialized __setstate__ method.
+    """
+    from pyomo.core.base.component import ComponentData
+    from pyomo.core.base.numvalue import NumericValue
+    names = []
+    for _cls in cls.__mro__:
+        if _cls is object:
+            continue
+        if '__slots__' not in _cls.__dict__:
+            return None
+        if '__setstate__' in _cls.__dict__ and \
+           _cls not in (ComponentData, NumericValue):
+            return None
+        _slots = _cls.__dict__['__slots__']
+        if isinstance(_slots, str):
+            _slots = (_slots,)
+        for name in _slots:
+            if name == '__dict__':
+                return None
+            if name != '__weakref__' and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def _keep_alive(obj, memo):
+    # (see copy._keep_alive: the ids in the memo must remain valid)
+    try:
+        memo[id(memo)].append(obj)
+    except KeyError:
+        memo[id(memo)] = [obj]
+
+
+def copy_value(val, memo):
+    """Return a deep copy of a value"""
+    _type = type(val)
+    if _type in _atomic_types:
+        return val
+    ans = memo.get(id(val), memo)
+    if ans is not memo:
+        return ans
+    if _type is list:
+        ans = memo[id(val)] = []
+        _keep_alive(val, memo)
+        ans.extend([ x if type(x) in _atomic_types else copy_value(x, memo)
+                     for x in val ])
+        return ans
+    if _type is tuple:
+        items = [ x if type(x) in _atomic_types else copy_value(x, memo)
+                  for x in val ]
+        for x, y in zip(val, items):
+            if x is not y:
+                break
+        else:
+            # tuples of shared values are shared
+            return val
+        ans = memo.get(id(val), memo)
+        if ans is memo:
+            ans = memo[id(val)] = tuple(items)
+            _keep_alive(val, memo)
+        return ans
+    if _type is dict:
+        ans = memo[id(val)] = {}
+        _keep_alive(val, memo)
+        for key, x in iteritems(val):
+            if type(key) not in _atomic_types:
+                key = copy_value(key, memo)
+            if type(x) not in _atomic_types:
+                x = copy_value(x, memo)
+            ans[key] = x
+        return ans
+    if _type is weakref_ref:
+        target = val()
+        if target is None:
+            return None
+        return weakref_ref(copy_value(target, memo))
+    # (call __deepcopy__ directly, bypassing the deepcopy() dispatch)
+    copier = getattr(_type, '__deepcopy__', None)
+    if copier is None:
+        return deepcopy(val, memo)
+    ans = copier(val, memo)
+    if ans is not val:
+        memo[id(val)] = ans
+        _keep_alive(val, memo)
+    return ans
+
+
+def copy_state(state, memo):
+    """Return a deep copy of a __getstate__() dictionary"""
+    for key, val in iteritems(state):
+        if type(val) not in _atomic_types:
+            state[key] = copy_value(val, memo)
+    return state
+
+
+def copy_object(obj, memo):
+    """
+    Return a deep copy of a modeling object (this implements the
+    __deepcopy__ method of the modeling objects).
+    """
+    cls = obj.__class__
+    try:
+        names = _slot_names[cls]
+    except KeyError:
+        names = _slot_names[cls] = _get_slot_names(cls)
+    ans = memo[id(obj)] = cls.__new__(cls)
+    if names is None:
+        ans.__setstate__(copy_state(obj.__getstate__(), memo))
+        return ans
+    _setattr = object.__setattr__
+    for name in names:
+        try:
+            val = getattr(obj, name)
+        except AttributeError:
+            continue
+        if type(val) not in _atomic_types:
+            val = copy_value(val, memo)
+        _setattr(ans, name, val)
+    return ans
+
+
+def transfer_values(source, target):
+    """
+    Copy the values of the variables (and their fixed flags) and of
+    the mutable parameters of a block into a block with the same
+    structure (e.g., a clone of the source block).
+
+    This is a "value-only clone": the components are matched by name
+    and their data by index, and nothing else is copied.
+    """
+    from pyomo.core.base.block import Block
+    from pyomo.core.base.param import Param
+    from pyomo.core.base.var import Var
+    blocks = [(source, target)]
+    while blocks:
+        src_block, tgt_block = blocks.pop()
+        for name, src in iteritems(src_block.component_map(Var)):
+            tgt = tgt_block.component(name)
+            if tgt is None:
+                raise KeyError("Cannot transfer the values of component "
+                               "%s: the target block %s does not have a "
+                               "component named '%s'"
+                               % (src.name, tgt_block.name, name))
+            tgt_data = tgt._data
+            for idx, src_data in iteritems(src._data):
+                tgt_var = tgt_data[idx]
+                tgt_var.value = src_data.value
+                tgt_var.fixed = src_data.fixed
+        for name, src in iteritems(src_block.component_map(Param)):
+            if not src._mutable:
+                continue
+            tgt = tgt_block.component(name)
+            if tgt is None:
+                raise KeyError("Cannot transfer the values of component "
+                               "%s: the target block %s does not have a "
+                               "component named '%s'"
+                               % (src.name, tgt_block.name, name))
+            tgt_data = tgt._data
+            for idx, src_data in iteritems(src._data):
+                if idx in tgt_data:
+                    tgt_data[idx].value = src_data.value
+                else:
+                    tgt[idx] = src_data.value
+        for name, src in iteritems(src_block.component_map(Block)):
+            tgt = tgt_block.component(name)
+            if tgt is None:
+                raise KeyError("Cannot transfer the values of block "
+                               "%s: the target block %s does not have a "
+                               "component named '%s'"
+                               % (src.name, tgt_block.name, name))
+            for idx, src_data in iteritems(src._data):
+                blocks.append((src_data, tgt._data[idx]))
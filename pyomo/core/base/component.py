@@ -13,10 +13,10 @@ import logging
 import six
 from weakref import ref as weakref_ref
 import sys
-from copy import deepcopy
 
 import pyomo.util
 from pyomo.core.base.plugin import register_component
+from pyomo.core.base.clone import copy_object
 from pyomo.core.base.misc import tabular_writer
 
 from six import iteritems, string_types
@@ -128,7 +128,6 @@ class _ComponentBase(object):
                 ans = memo[id(self)] = self
                 return ans
 
-        ans = memo[id(self)] = self.__class__.__new__(self.__class__)
         # We can't do the "obvious", since this is a (partially)
         # slot-ized class and the __dict__ structure is
         # nonauthoritative:
@@ -139,17 +138,12 @@ class _ComponentBase(object):
         # Further, __slots__ is also nonauthoritative (this may be a
         # singleton component -- in which case it also has a __dict__).
         # Plus, as this may be a derived class with several layers of
-        # slots.  So, we will resort to partially "pickling" the object,
-        # deepcopying the state dict, and then restoring the copy into
-        # the new instance.
-        #
-        # [JDS 7/7/14] I worry about the efficiency of using both
-        # getstate/setstate *and* deepcopy, but we need deepcopy to
-        # update the _parent refs appropriately, and since this is a
-        # slot-ized class, we cannot overwrite the __deepcopy__
-        # attribute to prevent infinite recursion.
-        ans.__setstate__(deepcopy(self.__getstate__(), memo))
-        return ans
+        # slots.  So, the clone engine copies the slots directly when
+        # the object is a pure slot-ized class that needs no special
+        # __setstate__ processing, and otherwise falls back to
+        # partially "pickling" the object, copying the state dict, and
+        # then restoring the copy into the new instance.
+        return copy_object(self, memo)
 
     def cname(self, *args, **kwds):
         logger.warning(
@@ -651,17 +645,17 @@ class ComponentData(_ComponentBase):
         to the parent component index set. None is returned if
         this instance does not have a parent component, or if
         - for some unknown reason - this instance does not belong
-        to the parent component's index set. This method is not
-        intended to be a fast method;  it should be used rarely,
-        primarily in cases of label formulation.
+        to the parent component's index set. The index is found
+        with the reverse index of the parent component, which is
+        built by the first lookup.
         """
         self_component = self.parent_component()
         if self_component is None:
             return None
-        for idx, component_data in self_component.iteritems():
-            if component_data is self:
-                return idx
-        return None
+        try:
+            return self_component._index_of_data(self)
+        except KeyError:
+            return None
 
     def __str__(self):
         """Return a string with the component name and index"""
@@ -699,13 +693,13 @@ class ComponentData(_ComponentBase):
                 return name_buffer[id(self)]
         else:
             #
-            # No buffer, so we iterate through the component _data
-            # dictionary until we find this object.  This can be much
-            # more expensive than if a buffer is provided.
+            # No buffer, so we look up the index of this object in the
+            # reverse index of the component _data dictionary.
             #
-            for idx, obj in iteritems(c):
-                if obj is self:
-                    return base + _name_index_generator(idx)
+            try:
+                return base + _name_index_generator(c._index_of_data(self))
+            except KeyError:
+                pass
         #
         raise RuntimeError("Fatal error: cannot find the component data in "
                            "the owning component's _data dictionary.")
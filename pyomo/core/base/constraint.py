@@ -1092,6 +1092,9 @@ class IndexedConstraint(Constraint):
     #
     def add(self, index, expr):
         """Add a constraint with a given index."""
+        if index in self._data:
+            # the constraint is replaced
+            self._data_index = None
         cdata = self._check_skip_add(index, expr)
         if cdata is not None:
             self._data[index] = cdata
@@ -1100,6 +1103,7 @@ class IndexedConstraint(Constraint):
     # This should be supported by all indexed components
     def __delitem__(self, index):
         del self._data[index]
+        self._data_index = None
 
 class ConstraintList(IndexedConstraint):
     """
@@ -0,0 +1,331 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+__all__ = ['ConstructionProfiler']
+
+import json
+import os
+import sys
+import time
+
+from pyomo.core.base.misc import (apply_indexed_rule,
+                                  apply_parameterized_indexed_rule)
+
+try:
+    import resource
+    resource_available = True
+except ImportError:                         #pragma:nocover
+    resource_available = False
+
+# The profiler that is recording the component constructions (if any)
+_active_profiler = None
+
+
+def construct_component(component, data=None):
+    """
+    Construct a component, and record the construction if a
+    ConstructionProfiler is active.
+    """
+    if _active_profiler is None:
+        component.construct(data)
+    else:
+        _active_profiler.construct(component, data)
+
+
+def _rule_calls():
+    return apply_indexed_rule.call_counter \
+        + apply_parameterized_indexed_rule.call_counter
+
+
+def current_rss():
+    """
+    Return the resident set size of this process (in bytes), or None
+    if it is not available.  If the current RSS cannot be read (it is
+    read from /proc on Linux), the peak RSS is returned.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _page_size
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    if not resource_available:              #pragma:nocover
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # (ru_maxrss is in bytes on OS X, and in kilobytes elsewhere)
+    if sys.platform == 'darwin':            #pragma:nocover
+        return rss
+    return rss * 1024
+
+try:
+    _page_size = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):   #pragma:nocover
+    _page_size = 4096
+
+
+class ConstructionRecord(object):
+    """
+    The statistics recorded for the construction of a component.
+
+    Public class attributes:
+        name            The (fully qualified) name of the component
+        ctype           The name of the component type
+        block           The name of the block that owns the component
+        depth           The number of enclosing component constructions
+        time            The construction (wall clock) time
+        self_time       The construction time, excluding the time spent
+                            constructing other components (e.g., the
+                            components declared by a Block rule)
+        data_objects    The number of component data objects
+        rule_calls      The number of indexed rule calls
+        rss             The increase of the resident set size (bytes)
+
+    The time, rule_calls and rss statistics include the constructions
+    of the nested components.
+    """
+
+    __slots__ = ('name', 'ctype', 'block', 'depth', 'time', 'self_time',
+                 'data_objects', 'rule_calls', 'rss')
+
+    fields = __slots__
+
+    def __init__(self, **kwds):
+        for name in self.__slots__:
+            setattr(self, name, kwds.pop(name, None))
+        if kwds:
+            raise ValueError("Unexpected ConstructionRecord fields: %s"
+                             % (', '.join(sorted(kwds)),))
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __repr__(self):
+        return "ConstructionRecord(%s)" % (
+            ', '.join("%s=%r" % (name, getattr(self, name))
+                      for name in self.__slots__), )
+
+
+class ConstructionProfiler(object):
+    """
+    A lightweight profiler for model construction.
+
+    While the profiler is active (it is a context manager), it records
+    the wall clock time, the number of data objects, the number of
+    rule calls and the increase of the resident set size for each
+    component that is constructed, either by Model.create_instance()
+    or by adding components to a concrete model:
+
+        with ConstructionProfiler() as profiler:
+            instance = model.create_instance(data)
+        profiler.report(sort_by='time', limit=10)
+
+    The rule calls are the calls made through apply_indexed_rule()
+    (i.e., the rules of the indexed components; the rules of scalar
+    components are called directly), and the increase of the resident
+    set size is the increase of the peak resident set size on platforms
+    where the current resident set size is not available.
+
+    Constructor Arguments:
+        track_memory    If False, the resident set size is not recorded.
+    """
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.records = []
+        self.total_time = 0
+        self._stack = []
+        self._previous = None
+        self._start_time = None
+
+    def __enter__(self):
+        global _active_profiler
+        self._previous = _active_profiler
+        _active_profiler = self
+        self._start_time = time.time()
+        return self
+
+    def __exit__(self, et, ev, tb):
+        global _active_profiler
+        self.total_time += time.time() - self._start_time
+        _active_profiler = self._previous
+        self._previous = None
+
+    def construct(self, component, data=None):
+        """Construct a component, and record the construction"""
+        parent = component.parent_block()
+        record = ConstructionRecord(
+            ctype=component.type().__name__,
+            depth=len(self._stack) )
+        self.records.append(record)
+        # (the time spent constructing nested components)
+        self._stack.append([0])
+        rss = current_rss() if self.track_memory else None
+        rule_calls = _rule_calls()
+        start_time = time.time()
+        try:
+            component.construct(data)
+        finally:
+            record.time = time.time() - start_time
+            record.rule_calls = _rule_calls() - rule_calls
+            if rss is not None:
+                record.rss = current_rss() - rss
+            record.self_time = record.time - self._stack.pop()[0]
+            if self._stack:
+                self._stack[-1][0] += record.time
+            record.name = _name(component, parent)
+            record.block = None if parent is None else _name(parent)
+            if component.is_indexed():
+                record.data_objects = len(component._data)
+            else:
+                record.data_objects = 1
+
+    def block_summary(self):
+        """
+        Return a list with the totals of the components constructed on
+        each block, in construction order (as ConstructionRecord objects
+        with the block name, and the number of components in the
+        data_objects field).
+        """
+        blocks = {}
+        ans = []
+        for record in self.records:
+            if record.block in blocks:
+                total = blocks[record.block]
+            else:
+                total = blocks[record.block] = ConstructionRecord(
+                    name=record.block, ctype='Block', block=record.block,
+                    depth=record.depth, time=0, self_time=0, data_objects=0,
+                    rule_calls=0, rss=0 if self.track_memory else None )
+                ans.append(total)
+            total.time += record.time
+            total.self_time += record.self_time
+            total.data_objects += 1
+            total.rule_calls += record.rule_calls
+            if total.rss is not None and record.rss is not None:
+                total.rss += record.rss
+        return ans
+
+    def sorted_records(self, sort_by='time', reverse=True, limit=None,
+                       blocks=False):
+        """
+        Return the records (or the block_summary() totals) sorted by one
+        of the ConstructionRecord fields.
+        """
+        if sort_by not in ConstructionRecord.fields:
+            raise ValueError(
+                "Cannot sort the construction records by '%s': expected "
+                "one of %s" % (sort_by, ', '.join(ConstructionRecord.fields)))
+        records = self.block_summary() if blocks else self.records
+        # (sort in construction order when the keys are equal)
+        records = sorted(
+            enumerate(records),
+            key=lambda x: (_sort_key(getattr(x[1], sort_by)),
+                           -x[0] if reverse else x[0]),
+            reverse=reverse )
+        records = [x[1] for x in records]
+        if limit is not None:
+            records = records[:limit]
+        return records
+
+    def report(self, ostream=None, sort_by='time', reverse=True,
+               limit=None, blocks=False):
+        """
+        Write a table of the component constructions (or, if blocks is
+        True, of the totals for each block).
+        """
+        if ostream is None:
+            ostream = sys.stdout
+        records = self.sorted_records(sort_by, reverse, limit, blocks)
+        if blocks:
+            # (the number of left-justified name columns)
+            names = 1
+            header = ('Block', 'Components', 'Time', 'Self Time',
+                      'Rule Calls', 'RSS')
+            rows = [ (_str(r.name), str(r.data_objects),
+                      "%.4f" % r.time, "%.4f" % r.self_time,
+                      str(r.rule_calls), _format_rss(r.rss))
+                     for r in records ]
+        else:
+            names = 2
+            header = ('Component', 'Type', 'Time', 'Self Time',
+                      'Data Objects', 'Rule Calls', 'RSS')
+            rows = [ (r.name, r.ctype, "%.4f" % r.time,
+                      "%.4f" % r.self_time, str(r.data_objects),
+                      str(r.rule_calls), _format_rss(r.rss))
+                     for r in records ]
+        _width = [ max([len(header[i])] + [len(row[i]) for row in rows])
+                   for i in range(len(header)) ]
+        ostream.write("  ".join("%-*s" % (_width[i], x)
+                                for i, x in enumerate(header)).rstrip()
+                      + "\n")
+        for row in rows:
+            # (left-justify the names, right-justify the statistics)
+            ostream.write("  ".join(("%-*s" if i < names else "%*s")
+                                    % (_width[i], x)
+                                    for i, x in enumerate(row)).rstrip()
+                          + "\n")
+        ostream.write("Total construction time: %.4f seconds\n"
+                      % (self.construction_time(),))
+
+    def construction_time(self):
+        """Return the time spent constructing the top-level components"""
+        return sum(r.time for r in self.records if r.depth == 0)
+
+    def to_dict(self):
+        """Return the profile as a (JSON-serializable) dictionary"""
+        return {
+            'total_time': self.total_time,
+            'construction_time': self.construction_time(),
+            'components': [r.as_dict() for r in self.records],
+            'blocks': [r.as_dict() for r in self.block_summary()],
+            }
+
+    def to_json(self, ostream=None, **kwds):
+        """
+        Return the profile as a JSON string (or write it to a stream).
+        The keyword arguments are passed to json.dumps().
+        """
+        ans = json.dumps(self.to_dict(), **kwds)
+        if ostream is None:
+            return ans
+        ostream.write(ans)
+
+
+def _name(component, parent=None):
+    # This is tricky: while an indexed block is being constructed, the
+    # block data exists, but it has not been added to the _data of its
+    # parent component (so the index lookup in getname() fails).
+    try:
+        return component.name
+    except:
+        if parent is None:
+            parent = component.parent_block()
+        if parent is None:
+            return component.local_name
+        return _name(parent) + '.' + component.local_name
+
+
+def _sort_key(val):
+    # (None sorts before all the numbers and strings)
+    return (val is not None, val)
+
+
+def _str(val):
+    return '[Model]' if val is None else str(val)
+
+
+def _format_rss(rss):
+    if rss is None:
+        return '-'
+    if abs(rss) < 1024:
+        return "%d B" % (rss,)
+    for units in ('KB', 'MB'):
+        rss /= 1024.
+        if abs(rss) < 1024:
+            return "%.1f %s" % (rss, units)
+    return "%.1f GB" % (rss / 1024.,)
@@ -39,10 +39,13 @@ except:
 #from pyomo.util.plugin import *
 
 from pyomo.core.base.component import Component
+from pyomo.core.base.clone import copy_object
 #from pyomo.core.base.plugin import *
 from pyomo.core.base.numvalue import *
 from pyomo.core.base.numvalue import native_numeric_types, native_types
 from pyomo.core.base.var import _VarData, Var
+from pyomo.core.base.expr_visitor import \
+    SimpleExpressionVisitor, ExpressionValueVisitor
 
 import pyomo.core.base.expr_common
 from pyomo.core.base.expr_common import \
@@ -61,40 +64,35 @@ def identify_variables( expr,
                         include_potentially_variable=False ):
     if not allow_duplicates:
         _seen = set()
-    _stack = [ ([expr], 0, 1) ]
-    while _stack:
-        _argList, _idx, _len = _stack.pop()
-        while _idx < _len:
-            _sub = _argList[_idx]
-            _idx += 1
-            if type(_sub) in native_types:
-                pass
-            elif _sub.is_expression():
-                _stack.append(( _argList, _idx, _len ))
-                if type(_sub) is _ProductExpression:
-                    if _sub._denominator:
-                        _stack.append(
-                            (_sub._denominator, 0, len(_sub._denominator)) )
-                    _argList = _sub._numerator
-                else:
-                    _argList = _sub._args
-                _idx = 0
-                _len = len(_argList)
-            elif isinstance(_sub, _VarData):
-                if ( include_fixed
-                     or not _sub.is_fixed()
-                     or include_potentially_variable ):
-                    if not allow_duplicates:
-                        if id(_sub) in _seen:
-                            continue
-                        _seen.add(id(_sub))
-                    yield _sub
-            elif include_potentially_variable and _sub._potentially_variable():
+    for arg in _argument_visitor.xleaves(expr):
+        if type(arg) in native_types:
+            pass
+        elif isinstance(arg, _VarData):
+            if ( include_fixed
+                 or not arg.is_fixed()
+                 or include_potentially_variable ):
                 if not allow_duplicates:
-                    if id(_sub) in _seen:
+                    if id(arg) in _seen:
                         continue
-                    _seen.add(id(_sub))
-                yield _sub
+                    _seen.add(id(arg))
+                yield arg
+        elif include_potentially_variable and arg._potentially_variable():
+            if not allow_duplicates:
+                if id(arg) in _seen:
+                    continue
+                _seen.add(id(arg))
+            yield arg
+
+# The classes of the (non-native) objects that are not expressions,
+# i.e., the leaves of the expression trees
+_leaf_classes = set()
+
+def _is_leaf_class(cls):
+    if issubclass(cls, _ExpressionBase):
+        return False
+    _leaf_classes.add(cls)
+    return True
+
 
 class _ExpressionBase(NumericValue):
     """An object that defines a mathematical expression that can be evaluated"""
@@ -112,27 +110,50 @@ class _ExpressionBase(NumericValue):
             result[i] = getattr(self, i)
         return result
 
+    def __deepcopy__(self, memo):
+        # (copy the slots directly instead of going through the generic
+        # __reduce_ex__ / __getstate__ machinery)
+        return copy_object(self, memo)
+
     def to_string(self, ostream=None, verbose=None, precedence=0):
         """Print this expression"""
         if ostream is None:
             ostream = sys.stdout
         _verbose = pyomo.core.base.expr_common.TO_STRING_VERBOSE \
                    if verbose is None else verbose
-        ostream.write(self.getname() + "( ")
+        # Each expression generates the text around its arguments,
+        # and (argument, precedence) tuples for the arguments
+        _stack = [ self._to_string_tokens(_verbose, precedence) ]
+        while _stack:
+            for token in _stack[-1]:
+                if token.__class__ is not tuple:
+                    ostream.write(token)
+                    continue
+                arg, arg_precedence = token
+                if isinstance(arg, _ExpressionBase):
+                    _stack.append(
+                        arg._to_string_tokens(_verbose, arg_precedence))
+                    break
+                try:
+                    arg.to_string( ostream=ostream, verbose=verbose,
+                                   precedence=arg_precedence )
+                except AttributeError:
+                    ostream.write("(%s)" % (arg,))
+            else:
+                _stack.pop()
+
+    def _to_string_tokens(self, verbose, precedence):
+        yield self.getname() + "( "
         first = True
         for arg in self._args:
             if first:
                 first = False
-            elif _verbose:
-                ostream.write(" , ")
+            elif verbose:
+                yield " , "
             else:
-                ostream.write(", ")
-            try:
-                arg.to_string( ostream=ostream, precedence=self._precedence(),
-                               verbose=verbose )
-            except AttributeError:
-                ostream.write("(%s)" % (arg,))
-        ostream.write(" )")
+                yield ", "
+            yield (arg, self._precedence())
+        yield " )"
 
     def clone(self, substitute=None):
         return clone_expression(self, substitute)
@@ -155,28 +176,95 @@ WARNING: _ExpressionBase.simplify() has been deprecated and removed from
     # course change over time, but at any point in time,
     # they are constant. hence, the name.
     #
+    # NB: the methods that walk the expression tree first check the
+    # arguments of this expression directly, and only use the
+    # (non-recursive) expression visitors if an argument is itself an
+    # expression.  This keeps the common case of a shallow expression
+    # (e.g., a linear sum of variables) as fast as possible.  The
+    # classes of the arguments are checked with _leaf_classes, as
+    # isinstance() is comparatively slow.
+    #
     def is_constant(self):
-        for arg in self._args:
+        for arg in self._constant_args():
+            if arg.__class__ in native_types:
+                continue
+            if arg.__class__ not in _leaf_classes \
+               and not _is_leaf_class(arg.__class__):
+                break
             if not arg.is_constant():
                 return False
+        else:
+            return True
+        for arg in _constant_visitor.xleaves(self):
+            if arg.__class__ not in native_types and not arg.is_constant():
+                return False
         return True
 
     def is_fixed(self):
-        for arg in self._args:
+        for arg in self._fixed_args():
+            if arg.__class__ in native_types:
+                continue
+            if arg.__class__ not in _leaf_classes \
+               and not _is_leaf_class(arg.__class__):
+                break
             if not arg.is_fixed():
                 return False
+        else:
+            return True
+        for arg in _fixed_visitor.xleaves(self):
+            if arg.__class__ not in native_types and not arg.is_fixed():
+                return False
         return True
 
     def _potentially_variable(self):
-        for arg in self._args:
+        for arg in self._arguments():
+            if arg.__class__ in native_types:
+                continue
+            if arg.__class__ not in _leaf_classes \
+               and not _is_leaf_class(arg.__class__):
+                break
             if arg._potentially_variable():
                 return True
+        else:
+            return False
+        for arg in _potentially_variable_visitor.xleaves(self):
+            if arg.__class__ not in native_types \
+               and arg._potentially_variable():
+                return True
         return False
 
+    def _constant_args(self):
+        """The arguments that determine if this expression is constant"""
+        return self._args
+
+    def _fixed_args(self):
+        """The arguments that determine if this expression is fixed"""
+        return self._args
+
     def is_expression(self):
         return True
 
-    def polynomial_degree(self, ):
+    def _arguments(self):
+        """The arguments of this expression (in evaluation order)"""
+        return self._args
+
+    def polynomial_degree(self):
+        degrees = []
+        for arg in self._arguments():
+            if arg.__class__ in native_types:
+                degrees.append(0)
+            elif arg.__class__ not in _leaf_classes \
+                 and not _is_leaf_class(arg.__class__):
+                return _polynomial_degree_visitor.dfs_postorder_stack(self)
+            else:
+                degrees.append(arg.polynomial_degree())
+        return self._polynomial_degree(degrees)
+
+    def _polynomial_degree(self, result):
+        """
+        Return the polynomial degree of this expression given the list
+        of the degrees of its arguments
+        """
         return None
 
     def _precedence(self):
@@ -191,7 +279,7 @@ WARNING: _ExpressionBase.simplify() has been deprecated and removed from
         """Evaluate the expression"""
         try:
             return self._apply_operation(
-                self._evaluate_arglist(self._args,
+                self._evaluate_arglist(self._arguments(),
                                        exception=exception))
         except (ValueError, TypeError):
             if exception:
@@ -201,7 +289,16 @@ WARNING: _ExpressionBase.simplify() has been deprecated and removed from
     def _evaluate_arglist(self, arglist, exception=True):
         for arg in arglist:
             try:
-                yield value(arg, exception=exception)
+                if arg.__class__ in native_types:
+                    yield arg
+                elif arg.__class__ in _leaf_classes \
+                     or arg.__class__ is Expr_if \
+                     or _is_leaf_class(arg.__class__):
+                    yield value(arg, exception=exception)
+                else:
+                    # Evaluate argument expressions with the
+                    # (non-recursive) evaluation visitor
+                    yield _evaluate_expression(arg, exception)
             except Exception:
                 if exception:
                     e = sys.exc_info()[1]
@@ -245,32 +342,11 @@ class _ExternalFunctionExpression(_ExpressionBase):
     def getname(self, *args, **kwds):
         return self._fcn.getname(*args, **kwds)
 
-    def polynomial_degree(self):
-        return None
-
-    def is_constant(self):
-        for arg in self._args:
-            if isinstance(arg, basestring):
-                continue
-            if not arg.is_constant():
-                return False
-        return True
-
-    def is_fixed(self):
-        for arg in self._args:
-            if isinstance(arg, basestring):
-                continue
-            if not arg.is_fixed():
-                return False
-        return True
-
-    def _potentially_variable(self):
-        for arg in self._args:
-            if isinstance(arg, basestring):
-                continue
-            if arg._potentially_variable():
-                return True
-        return False
+    # the base class implementations are fine (string arguments
+    # are native types, which are skipped by the expression visitors)
+    #def is_constant(self)
+    #def is_fixed(self)
+    #def _potentially_variable(self)
 
     def _apply_operation(self, values):
         return self._fcn.evaluate(values)
@@ -300,10 +376,25 @@ class _IntrinsicFunctionExpression(_ExpressionBase):
     def getname(self, *args, **kwds):
         return self._name
 
-    def polynomial_degree(self):
-        if self.is_fixed():
-            return 0
-        return None
+    def _polynomial_degree(self, result):
+        # A function of fixed arguments is a constant (even if an
+        # argument is not a polynomial, e.g., an external function)
+        for arg, x in zip(self._args, result):
+            if x != 0 and not (x is None and _is_fixed_nonpolynomial(arg)):
+                return None
+        return 0
+
+
+def _is_fixed_nonpolynomial(arg):
+    """
+    Return True if an argument whose polynomial degree is None is
+    fixed.  Intrinsic functions (and powers) of fixed arguments have
+    degree 0, so only the other expressions (e.g., external functions)
+    need to be checked.
+    """
+    return arg.__class__ not in native_types \
+        and not isinstance(arg, _IntrinsicFunctionExpression) \
+        and arg.is_fixed()
 
 
 # Should this actually be a special class, or just an instance of
@@ -331,15 +422,20 @@ class _PowExpression(_IntrinsicFunctionExpression):
     #def __getstate__(self):
     #    return _IntrinsicFunctionExpression.__getstate__(self)
 
-    def polynomial_degree(self):
+    def _polynomial_degree(self, result):
         # _PowExpression is a tricky thing.  In general, a**b is
         # nonpolynomial, however, if b == 0, it is a constant
         # expression, and if a is polynomial and b is a positive
         # integer, it is also polynomial.  While we would like to just
         # call this a non-polynomial expression, these exceptions occur
         # too frequently (and in particular, a**2)
-        if self._args[1].is_fixed():
-            if self._args[0].is_fixed():
+        base, exponent = result
+        if exponent is None and _is_fixed_nonpolynomial(self._args[1]):
+            exponent = 0
+        if exponent == 0:
+            # the exponent is fixed
+            if base == 0 or (base is None and
+                             _is_fixed_nonpolynomial(self._args[0])):
                 return 0
             try:
                 # NOTE: use value before int() so that we don't
@@ -347,7 +443,6 @@ class _PowExpression(_IntrinsicFunctionExpression):
                 #       NumericValue
                 exp = value(self._args[1])
                 if exp == int(exp):
-                    base = self._args[0].polynomial_degree()
                     if base is not None and exp > 0:
                         return base * exp
                     elif exp == 0:
@@ -356,10 +451,11 @@ class _PowExpression(_IntrinsicFunctionExpression):
                 pass
         return None
 
-    def is_fixed(self):
-        if self._args[1].is_fixed():
-            return self._args[0].is_fixed() or bool(self._args[1] == 0)
-        return False
+    def _fixed_args(self):
+        if self._args[1].is_fixed() and bool(self._args[1] == 0):
+            # x**0 is fixed (regardless of x)
+            return ()
+        return self._args
 
     # the base class implementation is fine
     #def _potentially_variable(self)
@@ -367,34 +463,27 @@ class _PowExpression(_IntrinsicFunctionExpression):
     def _precedence(self):
         return _PowExpression.PRECEDENCE
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
+    def _to_string_tokens(self, verbose, precedence):
         # For verbose mode, rely on the underlying base expression
         # (prefix) expression printer
-        _verbose = pyomo.core.base.expr_common.TO_STRING_VERBOSE \
-                   if verbose is None else verbose
-        if _verbose:
-            return super(_PowExpression, self).to_string(
-                ostream, verbose, precedence)
+        if verbose:
+            for token in super(_PowExpression, self)._to_string_tokens(
+                    verbose, precedence):
+                yield token
+            return
 
-        if ostream is None:
-            ostream = sys.stdout
         _my_precedence = self._precedence()
         if precedence and _my_precedence > precedence:
-            ostream.write("( ")
+            yield "( "
         first = True
         for arg in self._args:
             if first:
                 first = False
             else:
-                ostream.write("**")
-            try:
-                arg.to_string( ostream=ostream, verbose=verbose,
-                               precedence=self._precedence() )
-            except AttributeError:
-                ostream.write("(%s)" % (arg,))
+                yield "**"
+            yield (arg, _my_precedence)
         if precedence and _my_precedence > precedence:
-            ostream.write(" )")
+            yield " )"
 
 class _LinearExpression(_ExpressionBase):
 
@@ -406,10 +495,14 @@ class _LinearExpression(_ExpressionBase):
      # below, to provide documentation as to how arguments are munged.
 
     def polynomial_degree(self):
-        # NB: We can't use max() here because None (non-polynomial)
-        # overrides a numeric value (and max() just ignores it)
+        # Sums of variables are by far the most common expressions, so
+        # their degree is computed without building the list of the
+        # argument degrees (see _ExpressionBase.polynomial_degree)
         degree = 0
         for x in self._args:
+            if x.__class__ not in _leaf_classes \
+               and not _is_leaf_class(x.__class__):
+                return _polynomial_degree_visitor.dfs_postorder_stack(self)
             x_degree = x.polynomial_degree()
             if x_degree is None:
                 return None
@@ -417,6 +510,17 @@ class _LinearExpression(_ExpressionBase):
                degree = x_degree
         return degree
 
+    def _polynomial_degree(self, result):
+        # NB: We can't use max() here because None (non-polynomial)
+        # overrides a numeric value (and max() just ignores it)
+        degree = 0
+        for x_degree in result:
+            if x_degree is None:
+                return None
+            if x_degree > degree:
+               degree = x_degree
+        return degree
+
 
 class _InequalityExpression(_LinearExpression):
     """An object that defines a series of less-than or
@@ -473,32 +577,19 @@ class _InequalityExpression(_LinearExpression):
             arg1 = arg2
         return True
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
-        if ostream is None:
-            ostream = sys.stdout
+    def _to_string_tokens(self, verbose, precedence):
         _my_precedence = self._precedence()
         if precedence and _my_precedence > precedence:
-            ostream.write("( ")
+            yield "( "
         for i, strict in enumerate(self._strict):
-            arg = self._args[i]
-            try:
-                arg.to_string( ostream=ostream, verbose=verbose,
-                               precedence=_my_precedence )
-            except AttributeError:
-                ostream.write("(%s)" % (arg,))
+            yield (self._args[i], _my_precedence)
             if strict:
-                ostream.write("  <  ")
+                yield "  <  "
             else:
-                ostream.write("  <=  ")
-        arg = self._args[-1]
-        try:
-            arg.to_string( ostream=ostream, verbose=verbose,
-                           precedence=_my_precedence )
-        except AttributeError:
-            ostream.write("(%s)" % (arg,))
+                yield "  <=  "
+        yield (self._args[-1], _my_precedence)
         if precedence and _my_precedence > precedence:
-            ostream.write(" )")
+            yield " )"
 
 
 class _EqualityExpression(_LinearExpression):
@@ -531,26 +622,19 @@ class _EqualityExpression(_LinearExpression):
         """Method that defines the equal-to operation"""
         return next(values) == next(values)
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
-        if ostream is None:
-            ostream = sys.stdout
+    def _to_string_tokens(self, verbose, precedence):
         _my_precedence = self._precedence()
         if precedence and _my_precedence > precedence:
-            ostream.write("( ")
+            yield "( "
         first = True
         for arg in self._args:
             if first:
                 first = False
             else:
-                ostream.write("  ==  ")
-            try:
-                arg.to_string( ostream=ostream, verbose=verbose,
-                               precedence=_my_precedence)
-            except AttributeError:
-                ostream.write("(%s)" % (arg,))
+                yield "  ==  "
+            yield (arg, _my_precedence)
         if precedence and _my_precedence > precedence:
-            ostream.write(" )")
+            yield " )"
 
 
 # It is common to generate sums of const*var (which immediately get
@@ -581,46 +665,27 @@ class _ProductExpression(_ExpressionBase):
             result[i] = getattr(self, i)
         return result
 
-    def is_constant(self):
-        for arg in self._numerator:
-            if not arg.is_constant():
-                return False
-        for arg in self._denominator:
-            if not arg.is_constant():
-                return False
-        return True
+    def _arguments(self):
+        return self._numerator + self._denominator
 
-    def is_fixed(self):
-        for arg in self._numerator:
-            if not arg.is_fixed():
-                return False
-        for arg in self._denominator:
-            if not arg.is_fixed():
-                return False
-        return True
+    def _constant_args(self):
+        return self._numerator + self._denominator
 
-    def _potentially_variable(self):
-        for arg in self._numerator:
-            if arg._potentially_variable():
-                return True
-        for arg in self._denominator:
-            if arg._potentially_variable():
-                return True
-        return False
+    def _fixed_args(self):
+        return self._numerator + self._denominator
 
     def _precedence(self):
         return _ProductExpression.PRECEDENCE
 
-    def polynomial_degree(self):
-        for x in self._denominator:
-            if x.polynomial_degree() != 0:
+    def _polynomial_degree(self, result):
+        n = len(self._numerator)
+        for x in result[n:]:
+            if x != 0:
                 return None
         try:
-            return sum(x.polynomial_degree() for x in self._numerator)
+            return sum(result[:n])
         except TypeError:
             return None
-        except ValueError:
-            return None
 
     def invert(self):
         tmp = self._denominator
@@ -628,77 +693,57 @@ class _ProductExpression(_ExpressionBase):
         self._numerator = tmp
         self._coef = 1.0/self._coef
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
-        if ostream is None:
-            ostream = sys.stdout
-        _verbose = pyomo.core.base.expr_common.TO_STRING_VERBOSE \
-                   if verbose is None else verbose
+    def _to_string_tokens(self, verbose, precedence):
         _my_precedence = self._precedence()
-        if _verbose:
-            ostream.write("prod( num=( ")
+        if verbose:
+            yield "prod( num=( "
         elif precedence and _my_precedence > precedence:
-            ostream.write("( ")
+            yield "( "
         first = True
         if self._coef != 1:
-            ostream.write(str(self._coef))
+            yield str(self._coef)
             first = False
         for arg in self._numerator:
             if first:
                 first = False
-            elif _verbose:
-                ostream.write(" , ")
+            elif verbose:
+                yield " , "
             else:
-                ostream.write(" * ")
-            try:
-                arg.to_string( ostream=ostream, verbose=verbose,
-                               precedence=_my_precedence )
-            except AttributeError:
-                ostream.write("(%s)" % (arg,))
+                yield " * "
+            yield (arg, _my_precedence)
         if first:
-            ostream.write('1')
+            yield '1'
         if len(self._denominator) > 0:
-            if _verbose:
-                ostream.write(" ) , denom=( ")
+            if verbose:
+                yield " ) , denom=( "
             elif len(self._denominator) == 1:
-                ostream.write(" / ")
+                yield " / "
             else:
-                ostream.write(" / ( ")
+                yield " / ( "
             first = True
             for arg in self._denominator:
                 if first:
                     first = False
-                elif _verbose:
-                    ostream.write(" , ")
+                elif verbose:
+                    yield " , "
                 else:
-                    ostream.write(" * ")
-                try:
-                    arg.to_string( ostream=ostream, verbose=verbose,
-                                   precedence=_my_precedence )
-                except AttributeError:
-                    ostream.write("(%s)" % (arg,))
-            if len(self._denominator) > 1 and not _verbose:
-                ostream.write(" )")
-        if _verbose:
-            ostream.write(" ) )")
+                    yield " * "
+                yield (arg, _my_precedence)
+            if len(self._denominator) > 1 and not verbose:
+                yield " )"
+        if verbose:
+            yield " ) )"
         elif precedence and _my_precedence > precedence:
-            ostream.write(" )")
+            yield " )"
 
-    def __call__(self, exception=True):
+    def _apply_operation(self, values):
         """Evaluate the expression"""
-        try:
-            ans = self._coef
-            for n in self._evaluate_arglist(self._numerator,
-                                            exception=exception):
-                ans *= n
-            for n in self._evaluate_arglist(self._denominator,
-                                            exception=exception):
-                ans /= n
-            return ans
-        except (TypeError, ValueError):
-            if exception:
-                raise
-            return None
+        ans = self._coef
+        for n in xrange(len(self._numerator)):
+            ans *= next(values)
+        for n in xrange(len(self._denominator)):
+            ans /= next(values)
+        return ans
 
 # It is common to generate sums of sums (which immediately get
 # thrown away by the simplifications in generate_expression): this gives
@@ -740,50 +785,41 @@ class _SumExpression(_LinearExpression):
     def negate(self):
         self.scale(-1)
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
-        if ostream is None:
-            ostream = sys.stdout
-        _verbose = pyomo.core.base.expr_common.TO_STRING_VERBOSE \
-                   if verbose is None else verbose
+    def _to_string_tokens(self, verbose, precedence):
         _my_precedence = self._precedence()
-        if _verbose:
-            ostream.write("sum( ")
+        if verbose:
+            yield "sum( "
         elif precedence and _my_precedence > precedence:
-                ostream.write("( ")
+            yield "( "
         first = True
         if self._const != 0:
-            ostream.write(str(self._const))
+            yield str(self._const)
             first = False
         for i, arg in enumerate(self._args):
             if first:
                 first = False
                 if self._coef[i] < 0:
-                    ostream.write(" - ")
-            elif _verbose:
-                ostream.write(" , ")
+                    yield " - "
+            elif verbose:
+                yield " , "
             elif self._coef[i] < 0:
-                ostream.write(" - ")
+                yield " - "
             else:
-                ostream.write(" + ")
+                yield " + "
             if self._coef[i] == 1:
                 _sub_precedence = _my_precedence
-            elif _verbose:
-                ostream.write(str(self._coef[i])+" *  ")
+            elif verbose:
+                yield str(self._coef[i])+" *  "
                 _sub_precedence = _my_precedence
             elif self._coef[i] == -1:
                 _sub_precedence = _ProductExpression.PRECEDENCE
             else:
-                ostream.write(str(abs(self._coef[i]))+"*")
+                yield str(abs(self._coef[i]))+"*"
                 _sub_precedence = _ProductExpression.PRECEDENCE
-            try:
-                arg.to_string( ostream=ostream, verbose=verbose,
-                               precedence=_sub_precedence )
-            except AttributeError:
-                ostream.write("(%s)" % arg)
+            yield (arg, _sub_precedence)
             first=False
-        if _verbose or ( precedence and _my_precedence > precedence ):
-            ostream.write(" )")
+        if verbose or ( precedence and _my_precedence > precedence ):
+            yield " )"
 
     def _apply_operation(self, values):
         """Evaluate the expression"""
@@ -817,51 +853,47 @@ class Expr_if(_ExpressionBase):
     def getname(self, *args, **kwds):
         return "Expr_if"
 
-    def is_constant(self):
+    def _constant_args(self):
         if self._if.is_constant():
             if self._if():
-                return self._then.is_constant()
+                return (self._then,)
             else:
-                return self._else.is_constant()
+                return (self._else,)
         else:
-            return False
+            # the condition is not constant
+            return (self._if,)
 
-    def is_fixed(self):
+    def _fixed_args(self):
         if self._if.is_fixed():
             if self._if():
-                return self._then.is_fixed()
+                return (self._then,)
             else:
-                return self._else.is_fixed()
+                return (self._else,)
         else:
-            return False
+            # the condition is not fixed
+            return (self._if,)
 
     # the base class implementation is fine
     #def _potentially_variable(self)
 
-    def polynomial_degree(self):
-        if self._if.is_fixed():
+    def _polynomial_degree(self, result):
+        if result[0] == 0:
+            # the condition is fixed
             if self._if():
-                return self._then.polynomial_degree()
+                return result[1]
             else:
-                return self._else.polynomial_degree()
+                return result[2]
         else:
             return None
 
-    def to_string(self, ostream=None, verbose=None, precedence=0):
-        """Print this expression"""
-        if ostream is None:
-            ostream = sys.stdout
-        _my_precedence = self._precedence()
-        ostream.write("Expr_if( if=( ")
-        self._if.to_string( ostream=ostream, verbose=verbose,
-                            precedence=self._precedence() )
-        ostream.write(" ), then=( ")
-        self._then.to_string( ostream=ostream, verbose=verbose,
-                              precedence=self._precedence() )
-        ostream.write(" ), else=( ")
-        self._else.to_string( ostream=ostream, verbose=verbose,
-                              precedence=self._precedence())
-        ostream.write(" ) )")
+    def _to_string_tokens(self, verbose, precedence):
+        yield "Expr_if( if=( "
+        yield (self._if, self._precedence())
+        yield " ), then=( "
+        yield (self._then, self._precedence())
+        yield " ), else=( "
+        yield (self._else, self._precedence())
+        yield " ) )"
 
     def __call__(self, exception=True):
         """Evaluate the expression"""
@@ -891,6 +923,14 @@ class _GetItemExpression(_ExpressionBase):
     def polynomial_degree(self):
         return 0 if self.is_fixed() else 1
 
+    def _constant_args(self):
+        # the expression visitors call is_constant() for this expression
+        return None
+
+    def _fixed_args(self):
+        # the expression visitors call is_fixed() for this expression
+        return None
+
     def is_constant(self):
         return False
 
@@ -904,6 +944,120 @@ class _GetItemExpression(_ExpressionBase):
         return self._base.__getitem__(tuple(value(i) for i in self._args))
 
 
+#
+# Expression visitors used to evaluate and query coopr3 expression
+# trees without recursion
+#
+
+class _ArgumentVisitor(SimpleExpressionVisitor):
+    """Walk the arguments of expressions (including named expressions)"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types or not node.is_expression():
+            return None
+        return node._arguments()
+
+
+class _PotentiallyVariableVisitor(SimpleExpressionVisitor):
+    """Walk the arguments of expressions (stopping at named expressions)"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._arguments()
+
+
+class _FixedVisitor(SimpleExpressionVisitor):
+    """Walk the arguments that determine if an expression is fixed"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._fixed_args()
+
+
+class _ConstantVisitor(SimpleExpressionVisitor):
+    """Walk the arguments that determine if an expression is constant"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._constant_args()
+
+
+class _EvaluationVisitor(ExpressionValueVisitor):
+
+    __slots__ = ('_exception',)
+
+    def __init__(self, exception):
+        self._exception = exception
+
+    def children(self, node):
+        return node._arguments()
+
+    def visiting_potential_leaf(self, node):
+        # The leaves are evaluated (lazily) by _evaluate_arglist().
+        # Expr_if is also evaluated there, as it only evaluates one of
+        # its branches.
+        if node.__class__ in native_types \
+           or node.__class__ is Expr_if \
+           or not isinstance(node, _ExpressionBase):
+            return True, node
+        return False, None
+
+    def visit(self, node, values):
+        return node._apply_operation(
+            node._evaluate_arglist(values, exception=self._exception))
+
+
+class _PolynomialDegreeVisitor(ExpressionValueVisitor):
+
+    __slots__ = ()
+
+    def children(self, node):
+        return node._arguments()
+
+    def visiting_potential_leaf(self, node):
+        if node.__class__ in native_types:
+            return True, 0
+        if node.__class__ is not _GetItemExpression \
+           and isinstance(node, _ExpressionBase):
+            return False, None
+        return True, node.polynomial_degree()
+
+    def visit(self, node, values):
+        return node._polynomial_degree(values)
+
+
+def _evaluate_expression(expr, exception):
+    if exception:
+        return _evaluation_visitor.dfs_postorder_stack(expr)
+    try:
+        return _safe_evaluation_visitor.dfs_postorder_stack(expr)
+    except (ValueError, TypeError):
+        return None
+
+
+_argument_visitor = _ArgumentVisitor()
+_potentially_variable_visitor = _PotentiallyVariableVisitor()
+_fixed_visitor = _FixedVisitor()
+_constant_visitor = _ConstantVisitor()
+_evaluation_visitor = _EvaluationVisitor(True)
+_safe_evaluation_visitor = _EvaluationVisitor(False)
+_polynomial_degree_visitor = _PolynomialDegreeVisitor()
+
+
 def _generate_expression__clone_if_needed(obj, target):
     #print(getrefcount(obj) - UNREFERENCED_EXPR_COUNT, target)
     if getrefcount(obj) - UNREFERENCED_EXPR_COUNT == target:
@@ -38,6 +38,7 @@ from pyomo.core.base.numvalue import *
 from pyomo.core.base.numvalue import native_types, native_numeric_types
 from pyomo.core.base.var import _VarData, Var
 from pyomo.core.base.param import _ParamData
+from pyomo.core.base.expr_visitor import SimpleExpressionVisitor
 from pyomo.core.base import expr_common as common
 import pyomo.core.base.expr_common
 from pyomo.core.base.expr_common import \
@@ -97,6 +98,18 @@ def identify_variables( expr,
                 yield _sub
 
 
+# The classes of the (non-native) objects that are not expressions,
+# i.e., the leaves of the expression trees.  Checking the class of an
+# argument against this set is faster than isinstance().
+_leaf_classes = set()
+
+def _is_leaf_class(cls):
+    if issubclass(cls, _ExpressionBase):
+        return False
+    _leaf_classes.add(cls)
+    return True
+
+
 class _ExpressionBase(NumericValue):
     """An object that defines a mathematical expression that can be evaluated"""
 
@@ -185,27 +198,67 @@ class _ExpressionBase(NumericValue):
     # of course change over time, but at any point in time, they are
     # "fixed". hence, the name.
     #
-    # FIXME: These need to be made non-recursive
+    #
+    # NB: these methods first check the arguments of this expression
+    # directly, and only use the (non-recursive) expression visitors
+    # if an argument is itself an expression (see _leaf_classes).
+    #
     def is_constant(self):
-        for a in self._args:
+        for a in self._constant_args():
+            if a.__class__ in native_numeric_types:
+                continue
+            if a.__class__ not in _leaf_classes \
+               and not _is_leaf_class(a.__class__):
+                break
+            if not a.is_constant():
+                return False
+        else:
+            return True
+        for a in _constant_visitor.xleaves(self):
             if a.__class__ not in native_numeric_types and not a.is_constant():
                 return False
         return True
 
-    # FIXME: These need to be made non-recursive
     def is_fixed(self):
-        for a in self._args:
+        for a in self._fixed_args():
+            if a.__class__ in native_numeric_types:
+                continue
+            if a.__class__ not in _leaf_classes \
+               and not _is_leaf_class(a.__class__):
+                break
+            if not a.is_fixed():
+                return False
+        else:
+            return True
+        for a in _fixed_visitor.xleaves(self):
             if a.__class__ not in native_numeric_types and not a.is_fixed():
                 return False
         return True
 
-    # FIXME: These need to be made non-recursive
     def _potentially_variable(self):
         for a in self._args:
+            if a.__class__ in native_numeric_types:
+                continue
+            if a.__class__ not in _leaf_classes \
+               and not _is_leaf_class(a.__class__):
+                break
+            if a._potentially_variable():
+                return True
+        else:
+            return False
+        for a in _potentially_variable_visitor.xleaves(self):
             if a.__class__ not in native_numeric_types and a._potentially_variable():
                 return True
         return False
 
+    def _constant_args(self):
+        """The arguments that determine if this expression is constant"""
+        return self._args
+
+    def _fixed_args(self):
+        """The arguments that determine if this expression is fixed"""
+        return self._args
+
     def is_expression(self):
         return True
 
@@ -444,19 +497,21 @@ class _PowExpression(_ExpressionBase):
                 pass
         return None
 
-    def is_fixed(self):
+    def _fixed_args(self):
         if self._args[1].__class__ not in native_numeric_types and not self._args[1].is_fixed():
-            return False
-        return value(self._args[1]) == 0 or \
-            self._args[0].__class__ in native_numeric_types or \
-            self._args[0].is_fixed()
+            return self._args[1:]
+        if value(self._args[1]) == 0:
+            # x**0 is fixed (regardless of x)
+            return ()
+        return self._args
 
-    def is_constant(self):
+    def _constant_args(self):
         if self._args[1].__class__ not in native_numeric_types and not self._args[1].is_constant():
-            return False
-        return value(self._args[1]) == 0 or \
-            self._args[0].__class__ in native_numeric_types or \
-            self._args[0].is_constant()
+            return self._args[1:]
+        if value(self._args[1]) == 0:
+            # x**0 is constant (regardless of x)
+            return ()
+        return self._args
 
     # the base class implementation is fine
     #def _potentially_variable(self)
@@ -826,23 +881,23 @@ class Expr_if(_ExpressionBase):
     def getname(self, *args, **kwds):
         return "Expr_if"
 
-    def is_constant(self):
+    def _constant_args(self):
         if self._if.is_constant():
             if self._if():
-                return self._then.is_constant()
+                return (self._then,)
             else:
-                return self._else.is_constant()
+                return (self._else,)
         else:
-            return False
+            return (self._if,)
 
-    def is_fixed(self):
+    def _fixed_args(self):
         if self._if.is_fixed():
             if self._if():
-                return self._then.is_fixed()
+                return (self._then,)
             else:
-                return self._else.is_fixed()
+                return (self._else,)
         else:
-            return False
+            return (self._if,)
 
     # the base class implementation is fine
     #def _potentially_variable(self)
@@ -928,6 +983,14 @@ class _GetItemExpression(_ExpressionBase):
     def getname(self, *args, **kwds):
         return self._base.getname(*args, **kwds)
 
+    def _constant_args(self):
+        # the expression visitors call is_constant() for this expression
+        return None
+
+    def _fixed_args(self):
+        # the expression visitors call is_fixed() for this expression
+        return None
+
     def is_constant(self):
         return False
 
@@ -1000,11 +1063,8 @@ class _LinearExpression(_ExpressionBase):
     def getname(self, *args, **kwds):
         return 'linear'
 
-    def is_constant(self):
-        if self._const.__class__ not in native_numeric_types \
-           and not self._const.is_constant():
-            return False
-        return super(_LinearExpression, self).is_constant()
+    def _constant_args(self):
+        return self._arguments()
 
     def _inline_operator(self):
         return ' + '
@@ -1319,6 +1379,51 @@ class _LinearExpression(_ExpressionBase):
         return self
 
 
+#
+# Expression visitors used to query pyomo4 expression trees without
+# recursion
+#
+
+class _PotentiallyVariableVisitor(SimpleExpressionVisitor):
+    """Walk the arguments of expressions (stopping at named expressions)"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._args
+
+
+class _FixedVisitor(SimpleExpressionVisitor):
+    """Walk the arguments that determine if an expression is fixed"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._fixed_args()
+
+
+class _ConstantVisitor(SimpleExpressionVisitor):
+    """Walk the arguments that determine if an expression is constant"""
+
+    __slots__ = ()
+
+    def children(self, node):
+        if node.__class__ in native_types \
+           or not isinstance(node, _ExpressionBase):
+            return None
+        return node._constant_args()
+
+
+_potentially_variable_visitor = _PotentiallyVariableVisitor()
+_fixed_visitor = _FixedVisitor()
+_constant_visitor = _ConstantVisitor()
+
 
 def generate_expression(etype, _self, _other):
     if etype > _inplace: #and etype < 2*_inplace:#etype[0] == 'i':
@@ -0,0 +1,374 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+#
+# Compile expressions (and constraints) into evaluators that compute
+# their values over NumPy arrays of variable values, i.e., for many
+# points with a single walk of the expression tree.
+#
+
+from __future__ import division
+
+__all__ = ('compile_expression', 'compile_constraints',
+           'VectorizedExpression', 'VectorizedConstraints')
+
+import operator
+
+from six import itervalues
+
+from pyomo.core.base import expr as EXPR
+from pyomo.core.base import expr_coopr3 as EXPR3
+from pyomo.core.base import expr_pyomo4 as EXPR4
+from pyomo.core.base.expr_visitor import ExpressionValueVisitor
+from pyomo.core.base.expression import _ExpressionData
+from pyomo.core.base.constraint import Constraint, _ConstraintData
+from pyomo.core.base.numvalue import native_types, value
+
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+#
+# The operations of the compiled expressions.  Each operation is
+# called with the expression node and the list of the values of its
+# arguments (arrays with one value per point, or scalars for the
+# arguments that do not depend on the inputs).
+#
+
+if numpy_available:
+    _intrinsic_functions = {
+        'log': numpy.log,
+        'log10': numpy.log10,
+        'sin': numpy.sin,
+        'cos': numpy.cos,
+        'tan': numpy.tan,
+        'sinh': numpy.sinh,
+        'cosh': numpy.cosh,
+        'tanh': numpy.tanh,
+        'asin': numpy.arcsin,
+        'acos': numpy.arccos,
+        'atan': numpy.arctan,
+        'asinh': numpy.arcsinh,
+        'acosh': numpy.arccosh,
+        'atanh': numpy.arctanh,
+        'exp': numpy.exp,
+        'sqrt': numpy.sqrt,
+        'ceil': numpy.ceil,
+        'floor': numpy.floor,
+        'abs': numpy.abs,
+        'pow': operator.pow,
+    }
+else:
+    _intrinsic_functions = {}
+
+def _pointwise_operation(node, values):
+    # Fall back on the (scalar) operation of the expression, which is
+    # evaluated one point at a time
+    if isinstance(node, EXPR3._ExpressionBase):
+        _apply = lambda point: node._apply_operation(iter(point))
+    else:
+        _apply = lambda point: node._apply_operation(list(point))
+    if not values:
+        return _apply(())
+    points = numpy.broadcast(*(values + [0]))
+    if not points.shape:
+        return _apply(tuple(values))
+    ans = numpy.empty(points.shape)
+    for i, point in enumerate(points):
+        ans.flat[i] = _apply(point[:-1])
+    return ans
+
+def _intrinsic_function(node, values):
+    fcn = _intrinsic_functions.get(node._name, None)
+    if fcn is None:
+        return _pointwise_operation(node, values)
+    return fcn(*values)
+
+def _coopr3_sum(node, values):
+    return sum(c*v for c, v in zip(node._coef, values)) + node._const
+
+def _coopr3_product(node, values):
+    ans = node._coef
+    n = len(node._numerator)
+    for v in values[:n]:
+        ans = ans * v
+    for v in values[n:]:
+        ans = ans / v
+    return ans
+
+def _pyomo4_linear(node, values):
+    # The arguments are the (nonzero) constant, the terms and the
+    # coefficients of the terms (see _ExpressionCompiler.children())
+    n = len(node._args)
+    if not n:
+        return values[0] if values else 0
+    ans = values[0] if len(values) > 2*n else 0
+    for v, c in zip(values[-2*n:-n], values[-n:]):
+        ans = ans + c * v
+    return ans
+
+def _inequality(node, values):
+    ans = True
+    for i, strict in enumerate(node._strict):
+        if strict:
+            ans = numpy.logical_and(ans, values[i] < values[i+1])
+        else:
+            ans = numpy.logical_and(ans, values[i] <= values[i+1])
+    return ans
+
+_operations = {
+    _ExpressionData: lambda node, values: values[0],
+    EXPR3._SumExpression: _coopr3_sum,
+    EXPR3._ProductExpression: _coopr3_product,
+    EXPR3._IntrinsicFunctionExpression: _intrinsic_function,
+    EXPR4._SumExpression: lambda node, values: sum(values),
+    EXPR4._ProductExpression: lambda node, values: values[0] * values[1],
+    EXPR4._DivisionExpression: lambda node, values: values[0] / values[1],
+    EXPR4._NegationExpression: lambda node, values: -values[0],
+    EXPR4._PowExpression: lambda node, values: values[0] ** values[1],
+    EXPR4._UnaryFunctionExpression: _intrinsic_function,
+    EXPR4._LinearExpression: _pyomo4_linear,
+}
+for _module in (EXPR3, EXPR4):
+    _operations[_module._InequalityExpression] = _inequality
+    _operations[_module._EqualityExpression] = \
+        lambda node, values: numpy.equal(values[0], values[1])
+    _operations[_module.Expr_if] = \
+        lambda node, values: numpy.where(values[0], values[1], values[2])
+    _operations[_module._ExternalFunctionExpression] = _pointwise_operation
+del _module
+
+def _get_operation(node):
+    try:
+        return _operations[node.__class__]
+    except KeyError:
+        pass
+    if isinstance(node, (EXPR3._GetItemExpression, EXPR4._GetItemExpression)):
+        raise TypeError(
+            "Cannot compile the template expression '%s' into a vectorized "
+            "evaluator" % (node,))
+    for cls in node.__class__.__mro__:
+        if cls in _operations:
+            fcn = _operations[cls]
+            break
+    else:
+        fcn = _pointwise_operation
+    _operations[node.__class__] = fcn
+    return fcn
+
+#
+# The compiled expressions are programs for a stack machine: the
+# (postfix) instructions push the input columns, constants and the
+# values of the other leaves, or replace the values of the arguments on
+# the top of the stack with the value of an expression node.
+#
+
+_INPUT = 0
+_CONSTANT = 1
+_VALUE = 2
+_OPERATION = 3
+
+
+class _ExpressionCompiler(ExpressionValueVisitor):
+
+    __slots__ = ('_index', 'program')
+
+    def __init__(self, index):
+        self._index = index
+        self.program = []
+
+    def children(self, node):
+        if node.__class__ is EXPR4._LinearExpression:
+            # The coefficients of the linear terms may also depend on
+            # the inputs (e.g., mutable parameters)
+            return tuple(node._arguments()) + tuple(
+                node._coef[id(arg)] for arg in node._args)
+        return tuple(node._arguments())
+
+    def visiting_potential_leaf(self, node):
+        if node.__class__ in native_types:
+            self.program.append((_CONSTANT, node))
+            return True, None
+        if id(node) in self._index:
+            self.program.append((_INPUT, self._index[id(node)]))
+            return True, None
+        if not node.is_expression():
+            self.program.append((_VALUE, node))
+            return True, None
+        return False, None
+
+    def visit(self, node, values):
+        self.program.append(
+            (_OPERATION, (_get_operation(node), node, len(values))))
+
+
+class VectorizedExpression(object):
+    """
+    An expression compiled into an evaluator that computes its value
+    for many points (values of the input variables) at once.
+
+    Calling the evaluator with an N-by-len(variables) array of input
+    values returns an array of the N values of the expression.  The
+    values of any other leaves of the expression (e.g., fixed variables
+    or mutable parameters that are not inputs) are read when the
+    evaluator is called.  Points for which the expression is undefined
+    (e.g., log of a negative number) evaluate to nan or inf.
+    """
+
+    __slots__ = ('expr', 'variables', '_program')
+
+    def __init__(self, expr, variables=None, _index=None):
+        if not numpy_available:
+            raise RuntimeError(
+                "The numpy module is not available.  "
+                "Cannot compile vectorized expression evaluators.")
+        self.expr = expr
+        if variables is None:
+            variables = list(EXPR.identify_variables(expr)) \
+                        if expr.__class__ not in native_types else []
+        self.variables = list(variables)
+        if _index is None:
+            _index = _input_index(self.variables)
+        compiler = _ExpressionCompiler(_index)
+        compiler.dfs_postorder_stack(expr)
+        self._program = compiler.program
+
+    def __call__(self, X):
+        """Return the values of the expression for the rows of X"""
+        return self._evaluate(*_input_columns(X, len(self.variables)))
+
+    def _evaluate(self, npoints, columns):
+        _stack = []
+        with numpy.errstate(all='ignore'):
+            for code, arg in self._program:
+                if code is _INPUT:
+                    _stack.append(columns[arg])
+                elif code is _OPERATION:
+                    fcn, node, nargs = arg
+                    if nargs:
+                        values = _stack[-nargs:]
+                        del _stack[-nargs:]
+                    else:
+                        values = []
+                    _stack.append(fcn(node, values))
+                elif code is _CONSTANT:
+                    _stack.append(arg)
+                else:
+                    _stack.append(value(arg))
+        ans = numpy.empty(npoints)
+        ans[:] = _stack[0]
+        return ans
+
+
+class VectorizedConstraints(object):
+    """
+    A list of constraints compiled into an evaluator that computes the
+    values of their bodies (and their residuals) for many points at
+    once.
+
+    Calling the evaluator with an N-by-len(variables) array of input
+    values returns the N-by-len(constraints) matrix of the residuals of
+    the constraints, i.e., the amount by which each point violates the
+    bounds of each constraint (0 for the points that satisfy the
+    constraint).
+    """
+
+    __slots__ = ('constraints', 'variables', '_bodies')
+
+    def __init__(self, constraints, variables=None):
+        if not numpy_available:
+            raise RuntimeError(
+                "The numpy module is not available.  "
+                "Cannot compile vectorized constraint evaluators.")
+        if isinstance(constraints, Constraint):
+            constraints = [ c for c in itervalues(constraints) if c.active ]
+        elif isinstance(constraints, _ConstraintData):
+            constraints = [ constraints ]
+        self.constraints = list(constraints)
+        if variables is None:
+            variables = []
+            _seen = set()
+            for c in self.constraints:
+                if c.body.__class__ in native_types:
+                    continue
+                for v in EXPR.identify_variables(c.body):
+                    if id(v) not in _seen:
+                        _seen.add(id(v))
+                        variables.append(v)
+        self.variables = list(variables)
+        _index = _input_index(self.variables)
+        self._bodies = [ VectorizedExpression(c.body, self.variables, _index)
+                         for c in self.constraints ]
+
+    def __call__(self, X):
+        return self.residual(X)
+
+    def body(self, X):
+        """Return the matrix of the values of the constraint bodies"""
+        npoints, columns = _input_columns(X, len(self.variables))
+        ans = numpy.empty((npoints, len(self._bodies)))
+        for j, body in enumerate(self._bodies):
+            ans[:,j] = body._evaluate(npoints, columns)
+        return ans
+
+    def lower(self):
+        """Return the array of the (current) lower bounds"""
+        return numpy.array([ -numpy.inf if c.lower is None else value(c.lower)
+                             for c in self.constraints ], dtype=float)
+
+    def upper(self):
+        """Return the array of the (current) upper bounds"""
+        return numpy.array([ numpy.inf if c.upper is None else value(c.upper)
+                             for c in self.constraints ], dtype=float)
+
+    def residual(self, X):
+        """Return the matrix of the bound violations of the constraints"""
+        body = self.body(X)
+        with numpy.errstate(invalid='ignore'):
+            return numpy.maximum(
+                numpy.maximum(self.lower() - body, body - self.upper()), 0)
+
+    def feasible(self, X, tol=1e-6):
+        """Return the array of flags of the points that are feasible"""
+        with numpy.errstate(invalid='ignore'):
+            return numpy.all(self.residual(X) <= tol, axis=1)
+
+
+def _input_index(variables):
+    return dict((id(v), i) for i, v in enumerate(variables))
+
+def _input_columns(X, nvars):
+    X = numpy.asarray(X, dtype=float)
+    if X.ndim != 2 or X.shape[1] != nvars:
+        raise ValueError(
+            "Expected an array of points with shape (N, %s) (got %s)"
+            % (nvars, X.shape))
+    return X.shape[0], [ X[:,i] for i in range(nvars) ]
+
+def compile_expression(expr, variables=None):
+    """
+    Compile an expression into a VectorizedExpression that is
+    evaluated over arrays of the values of the variables.  The
+    variables (or mutable parameters) in the list of variables are the
+    inputs of the evaluator (by default, all variables that appear in
+    the expression).
+    """
+    return VectorizedExpression(expr, variables)
+
+def compile_constraints(constraints, variables=None):
+    """
+    Compile a Constraint component (its active constraints), a
+    constraint or a list of constraints into a VectorizedConstraints
+    evaluator.  The variables (or mutable parameters) in the list of
+    variables are the inputs of the evaluator (by default, all
+    variables that appear in the constraint bodies).
+    """
+    return VectorizedConstraints(constraints, variables)
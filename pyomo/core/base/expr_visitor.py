@@ -0,0 +1,169 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+#
+# Expression tree walkers that use explicit stacks instead of Python
+# recursion, so the depth of the expressions they can walk is limited
+# only by the available memory (and not by the recursion limit).
+#
+
+__all__ = ('SimpleExpressionVisitor', 'ExpressionValueVisitor')
+
+from pyomo.core.base.numvalue import native_types
+
+
+class SimpleExpressionVisitor(object):
+    """
+    A visitor that walks an expression tree in prefix order.
+
+    Derived classes override children() to select the arguments that
+    are walked below each node, and visit() / finalize() to process the
+    nodes and return the result of dfs_preorder_stack().  The xleaves()
+    generator may be used to stop the walk early (e.g., when testing if
+    any leaf of an expression satisfies a condition).
+    """
+
+    __slots__ = ()
+
+    def children(self, node):
+        """
+        Return the arguments of a node that are walked, or None if the
+        node is a leaf.
+        """
+        if node.__class__ in native_types or not node.is_expression():
+            return None
+        return node._arguments()
+
+    def visit(self, node):
+        """Process a node of the expression tree."""
+        pass
+
+    def finalize(self):
+        """Return the result of dfs_preorder_stack()."""
+        return None
+
+    def xpreorder(self, expr):
+        """Generate the nodes of an expression tree in prefix order."""
+        children = self.children
+        _stack = [ iter((expr,)) ]
+        while _stack:
+            for node in _stack[-1]:
+                yield node
+                args = children(node)
+                if args:
+                    _stack.append(iter(args))
+                    break
+            else:
+                _stack.pop()
+
+    def xleaves(self, expr):
+        """Generate the leaves of an expression tree in prefix order."""
+        children = self.children
+        _stack = [ iter((expr,)) ]
+        while _stack:
+            for node in _stack[-1]:
+                args = children(node)
+                if args is None:
+                    yield node
+                elif args:
+                    _stack.append(iter(args))
+                    break
+            else:
+                _stack.pop()
+
+    def dfs_preorder_stack(self, expr):
+        """
+        Call visit() for every node of an expression tree (in prefix
+        order) and return the result of finalize().
+        """
+        visit = self.visit
+        for node in self.xpreorder(expr):
+            visit(node)
+        return self.finalize()
+
+
+class ExpressionValueVisitor(object):
+    """
+    A visitor that computes a value for every node of an expression
+    tree in postfix order.
+
+    Derived classes override visiting_potential_leaf() to return the
+    values of the leaves, and visit() to compute the value of an
+    expression node from the values of its arguments (in the order
+    returned by children()).  visiting_potential_leaf() is called for
+    every node before its arguments are walked, so it may also return
+    the value of an expression node whose arguments should not be
+    walked.
+    """
+
+    __slots__ = ()
+
+    def children(self, node):
+        """Return the (sequence of) arguments of an expression node."""
+        return tuple(node._arguments())
+
+    def visiting_potential_leaf(self, node):
+        """
+        Return (True, value) if the value of the node is known without
+        walking its arguments, and (False, None) otherwise.
+        """
+        raise NotImplementedError("Derived expression visitor (%s) failed "
+                                  "to implement visiting_potential_leaf()"
+                                  % (str(self.__class__),))
+
+    def visit(self, node, values):
+        """
+        Return the value of an expression node given the list of the
+        values of its arguments.
+        """
+        raise NotImplementedError("Derived expression visitor (%s) failed "
+                                  "to implement visit()"
+                                  % (str(self.__class__),))
+
+    def finalize(self, ans):
+        """Return the result of dfs_postorder_stack()."""
+        return ans
+
+    def dfs_postorder_stack(self, expr):
+        """
+        Compute the value of every node of an expression tree and return
+        the result of finalize() for the value of the root.
+        """
+        leaf = self.visiting_potential_leaf
+        children = self.children
+        visit = self.visit
+        flag, ans = leaf(expr)
+        if flag:
+            return self.finalize(ans)
+        _stack = []
+        _obj = expr
+        _argList = children(expr)
+        _idx = 0
+        _len = len(_argList)
+        _result = []
+        while 1:  # Note: 1 is faster than True for Python 2.x
+            while _idx < _len:
+                _sub = _argList[_idx]
+                _idx += 1
+                flag, ans = leaf(_sub)
+                if flag:
+                    _result.append(ans)
+                else:
+                    _stack.append( (_obj, _argList, _idx, _len, _result) )
+                    _obj     = _sub
+                    _argList = children(_sub)
+                    _idx     = 0
+                    _len     = len(_argList)
+                    _result  = []
+            ans = visit(_obj, _result)
+            if _stack:
+                _obj, _argList, _idx, _len, _result = _stack.pop()
+                _result.append(ans)
+            else:
+                return self.finalize(ans)
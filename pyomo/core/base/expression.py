@@ -525,6 +525,9 @@ class IndexedExpression(Expression):
         if (type(expr) is tuple) and \
            (expr == Expression.Skip):
             return None
+        if index in self._data:
+            # the expression is replaced
+            self._data_index = None
         cdata = _GeneralExpressionData(expr, component=self)
         self._data[index] = cdata
         return cdata
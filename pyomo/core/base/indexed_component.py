@@ -24,6 +24,9 @@ logger = logging.getLogger('pyomo.core')
 
 UnindexedComponent_set = set([None])
 
+# A sentinel for failed lookups (None is a valid index)
+_NotFound = object()
+
 
 def normalize_index(index):
     """
@@ -171,6 +174,20 @@ class _IndexedComponent_slicer(object):
 
         max_fixed = 0 if not fixed else max(fixed)
 
+        # If the index set can look up the indices that match the
+        # slice (e.g., with hash indexes), only those indices are
+        # checked (instead of every index of the component)
+        if fixed and ellipsis is None:
+            _candidates = getattr(component._index, '_slice_candidates', None)
+            if _candidates is not None:
+                _candidates = _candidates(fixed, explicit_index_count)
+            if _candidates is not None:
+                _data = component._data
+                for index in _candidates:
+                    if index in _data:
+                        yield _data[index]
+                return
+
         for index in component.__iter__():
             # We want a tuple of indices, so convert scalard to tuples
             _idx = index if type(index) is tuple else (index,)
@@ -255,6 +272,11 @@ class IndexedComponent(Component):
         _index              The set of valid indices
         _implicit_subsets   A temporary data element that stores
                                 sets that are transfered to the model
+        _data_index         A dictionary from the ids of the component
+                                data objects to their indices, which
+                                is built when it is first needed (and
+                                reset when component data objects are
+                                replaced or deleted)
     """
 
     #
@@ -273,6 +295,7 @@ class IndexedComponent(Component):
         Component.__init__(self, **kwds)
         #
         self._data = {}
+        self._data_index = None
         #
         if len(args) == 0:
             #
@@ -306,6 +329,16 @@ class IndexedComponent(Component):
             self._implicit_subsets = tmp
             self._index = tmp[0].cross(*tmp[1:])
 
+    def __getstate__(self):
+        """
+        This method must be defined to discard the reverse index of
+        the component data, which is keyed by the (process-specific)
+        ids of the component data objects.
+        """
+        state = super(IndexedComponent, self).__getstate__()
+        state['_data_index'] = None
+        return state
+
     def to_dense_data(self):
         """TODO"""
         for ndx in self._index:
@@ -316,6 +349,7 @@ class IndexedComponent(Component):
         """Clear the data in this component"""
         if UnindexedComponent_set != self._index:
             self._data = {}
+            self._data_index = None
         else:
             raise DeveloperError(
                 "Derived scalar component %s failed to define clear()."
@@ -653,13 +687,50 @@ the value() function.""" % ( self.name, i ))
                 "for scalar instances."
                 % (self.__class__.__name__,))
 
+    def _index_of_data(self, component_data):
+        """
+        Return the index of a component data object that is stored in
+        this component, or raise a KeyError.
+
+        The index is found with a reverse index (the id_index_map())
+        of the component data.  The derived components (and the
+        transformations) add and delete component data directly in
+        the _data dictionary, so the reverse index can be stale: it
+        is rebuilt when it is missing, when a lookup misses, or when
+        it returns an index of another object.
+        """
+        _data = self._data
+        _data_index = self._data_index
+        if _data_index is not None:
+            idx = _data_index.get(id(component_data), _NotFound)
+            if idx is not _NotFound:
+                try:
+                    if _data[idx] is component_data:
+                        return idx
+                except (KeyError, IndexError):
+                    pass
+        _data_index = self._data_index = self.id_index_map()
+        idx = _data_index.get(id(component_data), _NotFound)
+        if idx is not _NotFound:
+            return idx
+        raise KeyError("Component data object is not stored in "
+                       "component %s" % (self.name,))
+
     def id_index_map(self):
         """
         Return an dictionary id->index for
         all ComponentData instances.
         """
+        # (the _data dictionary is iterated directly, since the
+        # iteration over the component can visit the index set when
+        # component data has been added and deleted directly)
+        if isinstance(self._data, dict):
+            _items = iteritems(self._data)
+        else:
+            # some derived components store their data in sequences
+            _items = iteritems(self)
         result = {}
-        for index, component_data in iteritems(self):
+        for index, component_data in _items:
             result[id(component_data)] = index
         return result
 
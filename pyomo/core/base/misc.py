@@ -50,6 +50,7 @@ def create_name(name, ndx):
 
 
 def apply_indexed_rule(obj, rule, model, index, options=None):
+    apply_indexed_rule.call_counter += 1
     try:
         if options is None:
             if index.__class__ is tuple:
@@ -90,12 +91,20 @@ def apply_indexed_rule(obj, rule, model, index, options=None):
                     return rule(model, index, **options)
 
 def apply_parameterized_indexed_rule(obj, rule, model, param, index):
+    apply_parameterized_indexed_rule.call_counter += 1
     if index.__class__ is tuple:
         return rule(model, param, *index)
     if index is None:
         return rule(model, param)
     return rule(model, param, index)
 
+# [profiling] call_counter is a count of the number of calls to
+# apply_indexed_rule() and apply_parameterized_indexed_rule() (the
+# ConstructionProfiler reports the number of rule calls made while
+# constructing each component)
+apply_indexed_rule.call_counter = 0
+apply_parameterized_indexed_rule.call_counter = 0
+
 def _safe_to_str(obj):
     try:
         return str(obj)
@@ -610,6 +610,11 @@ class NumericConstant(NumericValue):
             state[i] = getattr(self,i)
         return state
 
+    def __deepcopy__(self, memo):
+        # Numeric constants are never modified, so copies of
+        # expressions share them
+        return self
+
     def is_constant(self):
         return True
 
@@ -594,6 +594,9 @@ class IndexedObjective(Objective):
     #
     def add(self, index, expr):
         """Add an objective with a given index."""
+        if index in self._data:
+            # the objective is replaced
+            self._data_index = None
         cdata = self._check_skip_add(index, expr)
         if cdata is not None:
             self._data[index] = cdata
@@ -26,6 +26,7 @@ from pyomo.core.base.misc import apply_indexed_rule, apply_parameterized_indexed
 from pyomo.core.base.component import Component, register_component, ComponentData
 from pyomo.core.base.indexed_component import IndexedComponent, UnindexedComponent_set
 from pyomo.core.base.numvalue import native_numeric_types
+from pyomo.core.base.sorted_list import SortedList
 
 from six import itervalues, iteritems
 from six.moves import xrange
@@ -110,6 +111,57 @@ def simple_set_rule( fn ):
 class _SetDataBase(ComponentData):
     __slots__ = tuple()
 
+    def _slice_candidates(self, fixed, dimen):
+        """
+        Return the members of this set that match a slice template,
+        or None if the members cannot be looked up.
+
+        The slice template (fixed) is a dictionary that maps positions
+        in the members to values, and dimen is the number of indices
+        in the slice.  The members are found with per-position hash
+        indexes (value -> members), which are built on the first
+        slice that fixes a position.
+        """
+        if dimen < 2 or self.value is None or \
+           self.parent_component().dimen != dimen:
+            return None
+        _slice_index = self._slice_index
+        if _slice_index is None:
+            _slice_index = self._slice_index = {}
+        best = None
+        for pos, val in iteritems(fixed):
+            if pos < 0:
+                return None
+            _index = _slice_index.get(pos, None)
+            if _index is None:
+                _index = _slice_index[pos] = {}
+                for member in self.value:
+                    try:
+                        _index[member[pos]].append(member)
+                    except KeyError:
+                        _index[member[pos]] = [member]
+            try:
+                members = _index.get(val, ())
+            except TypeError:
+                # unhashable slice values are compared with each member
+                return None
+            if best is None or len(members) < len(best[1]):
+                best = (pos, members)
+        if best is None:
+            return None
+        others = [(pos, val) for pos, val in iteritems(fixed)
+                  if pos != best[0]]
+        return [member for member in best[1]
+                if all(member[pos] == val for pos, val in others)]
+
+    def _update_slice_index(self, val):
+        """Add a new member to the per-position hash indexes"""
+        for pos, _index in iteritems(self._slice_index):
+            try:
+                _index[val[pos]].append(val)
+            except KeyError:
+                _index[val[pos]] = [val]
+
 
 class _SetData(_SetDataBase):
     """
@@ -122,9 +174,11 @@ class _SetData(_SetDataBase):
     Public Class Attributes:
         value       The set values
         _bounds     The tuple of bound values
+        _slice_index    The per-position hash indexes of the members
+                            (see _slice_candidates)
     """
 
-    __slots__ = ('value', '_bounds')
+    __slots__ = ('value', '_bounds', '_slice_index')
 
     def __init__(self, owner, bounds):
         #
@@ -143,6 +197,7 @@ class _SetData(_SetDataBase):
         state = super(_SetData, self).__getstate__()
         for i in _SetData.__slots__:
             state[i] = getattr(self, i)
+        state['_slice_index'] = None
         return state
 
     # Note: because None of the slots on this class need to be edited,
@@ -181,6 +236,7 @@ class _SetData(_SetDataBase):
         Reset the set data
         """
         self.value = set()
+        self._slice_index = None
 
     def _add(self, val, verify=True):
         """
@@ -190,6 +246,8 @@ class _SetData(_SetDataBase):
         """
         if verify:
             self._component()._verify(val)
+        if self._slice_index is not None and val not in self.value:
+            self._update_slice_index(val)
         self.value.add(val)
 
     def _discard(self, val):
@@ -198,6 +256,7 @@ class _SetData(_SetDataBase):
         if the element does not already exist.
         """
         self.value.discard(val)
+        self._slice_index = None
 
     def __len__(self):
         """
@@ -230,20 +289,23 @@ class _OrderedSetData(_SetDataBase):
         value       The set values
         _bounds     The tuple of bound values
         order_dict  A dictionary that maps from element value to element id.
-                        Indices in this dictionary start with 1 (not 0).
+                        Indices in this dictionary start with 0.
 
     The ordering supported in this class depends on the 'ordered' attribute
     of the owning component:
         InsertionOrder      The order_dict maps from the insertion order
                                 back to the member of the value array.
         SortedOrder         The ordered attribute of the owning component can
-                                be used to define the sort order.  By default,
+                                be used to define the sort key.  By default,
                                 the Python ordering of the set types is used.
-                                Note that a _stable_ sort method is required
-                                if the discard method is used.
+                                The values are stored in a SortedList, which
+                                keeps them sorted as they are added, and the
+                                order_dict is only used to test membership
+                                (its values are None).
     """
 
-    __slots__ = ('value', 'order_dict', '_bounds', '_is_sorted')
+    __slots__ = ('value', 'order_dict', '_bounds', '_is_sorted',
+                 '_slice_index')
 
     def __init__(self, owner, bounds):
         #
@@ -266,6 +328,7 @@ class _OrderedSetData(_SetDataBase):
         state = super(_OrderedSetData, self).__getstate__()
         for i in _OrderedSetData.__slots__:
             state[i] = getattr(self, i)
+        state['_slice_index'] = None
         return state
 
     # Note: because None of the slots on this class need to be edited,
@@ -292,22 +355,30 @@ class _OrderedSetData(_SetDataBase):
     def _sort(self):
         """
         Sort the set using the 'ordered' attribute of the owning
-        component.  This recreates the order_dict dictionary, which indicates
-        that the set is sorted.
+        component.  The values of sorted sets are kept sorted as they
+        are added, so this only re-sorts the values if the sort key of
+        the owning component has changed.
         """
+        if self._is_sorted:
+            _key = self._sort_key()
+            if _key is not self.value._key:
+                self.value = SortedList(self.value, key=_key)
+                self._slice_index = None
+
+    def _sort_key(self):
         _sorter = self.parent_component().ordered
-        self.value = sorted(self.value, key=None if _sorter is Set.SortedOrder else _sorter)
-        self.order_dict = dict((j,i) for i,j in enumerate(self.value))
-        self._is_sorted = 1
+        return None if _sorter is Set.SortedOrder else _sorter
 
     def _clear(self):
         """
         Reset the set data
         """
-        self.value = []
-        self.order_dict = {}
         if self._is_sorted:
-            self._is_sorted = 1
+            self.value = SortedList(key=self._sort_key())
+        else:
+            self.value = []
+        self.order_dict = {}
+        self._slice_index = None
 
     def _add(self, val, verify=True):
         """
@@ -317,10 +388,18 @@ class _OrderedSetData(_SetDataBase):
         """
         if verify:
             self._component()._verify(val)
-        self.order_dict[val] = len(self.value)
-        self.value.append(val)
+        if self._slice_index is not None:
+            if self._is_sorted or val in self.order_dict:
+                # (the members of the hash indexes are kept in order)
+                self._slice_index = None
+            else:
+                self._update_slice_index(val)
         if self._is_sorted:
-            self._is_sorted = 2
+            self.order_dict[val] = None
+            self.value.add(val)
+        else:
+            self.order_dict[val] = len(self.value)
+            self.value.append(val)
 
     def _discard(self, val):
         """
@@ -331,10 +410,13 @@ class _OrderedSetData(_SetDataBase):
             _id = self.order_dict.pop(val)
         except KeyError:
             return
+        self._slice_index = None
+        if self._is_sorted:
+            self.value.remove(val)
+            return
         del self.value[_id]
         #
-        # Update the order_dict: this assumes the user-specified sorter
-        # (if one was used) is stable.
+        # Update the order_dict
         #
         for i in xrange(_id,len(self.value)):
             self.order_dict[self.value[i]] = i
@@ -349,8 +431,6 @@ class _OrderedSetData(_SetDataBase):
         """
         Return an iterator for the set.
         """
-        if self._is_sorted == 2:
-            self._sort()
         return self.value.__iter__()
 
     def __contains__(self, val):
@@ -363,16 +443,12 @@ class _OrderedSetData(_SetDataBase):
         """
         Return the first element of the set.
         """
-        if self._is_sorted == 2:
-            self._sort()
         return self[1]
 
     def last(self):
         """
         Return the last element of the set.
         """
-        if self._is_sorted == 2:
-            self._sort()
         return self[len(self)]
 
     def __getitem__(self, idx):
@@ -382,8 +458,6 @@ class _OrderedSetData(_SetDataBase):
         The public Set API is 1-based, even though the
         internal order_dict is (pythonically) 0-based.
         """
-        if self._is_sorted == 2:
-            self._sort()
         if idx >= 1:
             if idx > len(self):
                 raise IndexError("Cannot index a RangeSet past the last element")
@@ -401,8 +475,10 @@ class _OrderedSetData(_SetDataBase):
         Return the position index of the input value.  The
         position indices start at 1.
         """
-        if self._is_sorted == 2:
-            self._sort()
+        if self._is_sorted:
+            if match_element not in self.order_dict:
+                raise KeyError(match_element)
+            return self.value.index(match_element) + 1
         try:
             return self.order_dict[match_element] + 1
         except IndexError:
@@ -1489,6 +1565,25 @@ class _SetProduct(_SetOperator):
             for i in itertools.product(*self.set_tuple):
                 yield pyutilib_misc_flatten_tuple(i)
 
+    def _slice_candidates(self, fixed, dimen):
+        """
+        Return a generator of the members of this product that match a
+        slice template (a dictionary that maps positions to values),
+        or None if the members cannot be generated.  The members are
+        generated from the fixed values and the sets of the free
+        positions, so the whole product is never iterated.
+        """
+        if dimen != len(self.set_tuple) or not self.is_flat_product():
+            return None
+        _sets = list(self.set_tuple)
+        for pos, val in iteritems(fixed):
+            if pos < 0:
+                return None
+            if val not in _sets[pos]:
+                return ()
+            _sets[pos] = (val,)
+        return itertools.product(*_sets)
+
     def _set_contains(self, element):
         # Do we really need to check if element is a tuple???
         # if type(element) is not tuple:
@@ -1610,6 +1705,7 @@ class IndexedSet(Set):
         """
         if UnindexedComponent_set != self._index:
             self._data = {}
+            self._data_index = None
         else:
             #
             # TODO: verify that this could happen
@@ -0,0 +1,257 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+__all__ = ['SortedList']
+
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+
+class SortedList(object):
+    """
+    A sequence that keeps its elements sorted as they are added.
+
+    The elements are stored in a list of sorted sublists (with at most
+    2*_load elements each), so an element is inserted or removed by
+    bisecting the maximum keys of the sublists and then the keys of a
+    single (short) sublist.  The positions of the elements are found
+    with a binary indexed (Fenwick) tree of the lengths of the
+    sublists, which is rebuilt when sublists are split or removed.
+    Hence, add(), remove(), index() and positional lookups are
+    O(log n) operations (plus the cost of shifting a short sublist).
+
+    Constructor Arguments:
+        iterable    The initial elements
+        key         A function that returns the sort key of an element.
+                        If it is None, the elements are compared
+                        directly.  Elements with equal keys are kept in
+                        the order in which they were added.
+    """
+
+    _load = 500
+
+    def __init__(self, iterable=(), key=None):
+        self._key = key
+        self.clear()
+        self.update(iterable)
+
+    def clear(self):
+        """Remove all the elements"""
+        self._lists = []
+        # the keys of the elements (the sublists themselves if there
+        # is no key function)
+        self._keys = [] if self._key is not None else self._lists
+        self._maxes = []
+        self._len = 0
+        self._index = None
+
+    def update(self, iterable):
+        """Add the elements of an iterable, and rebuild the sublists"""
+        values = list(chain(self, iterable))
+        values.sort(key=self._key)
+        self.clear()
+        _load = self._load
+        for i in range(0, len(values), _load):
+            self._lists.append(values[i:i+_load])
+        if self._key is not None:
+            self._keys.extend([self._key(v) for v in l] for l in self._lists)
+        self._maxes.extend(k[-1] for k in self._keys)
+        self._len = len(values)
+
+    def add(self, value):
+        """Add an element (after the elements with an equal key)"""
+        _key = value if self._key is None else self._key(value)
+        _lists = self._lists
+        _maxes = self._maxes
+        self._len += 1
+        if not _maxes:
+            _lists.append([value])
+            if self._key is not None:
+                self._keys.append([_key])
+            _maxes.append(_key)
+            self._index = None
+            return
+        pos = bisect_right(_maxes, _key)
+        if pos == len(_maxes):
+            pos -= 1
+            _lists[pos].append(value)
+            if self._key is not None:
+                self._keys[pos].append(_key)
+            _maxes[pos] = _key
+        else:
+            idx = bisect_right(self._keys[pos], _key)
+            _lists[pos].insert(idx, value)
+            if self._key is not None:
+                self._keys[pos].insert(idx, _key)
+        if len(_lists[pos]) > 2*self._load:
+            self._split(pos)
+        elif self._index is not None:
+            self._update_index(pos, 1)
+
+    def remove(self, value):
+        """Remove an element, or raise a ValueError"""
+        pos, idx = self._find(value)
+        _lists = self._lists
+        _keys = self._keys
+        del _lists[pos][idx]
+        if self._key is not None:
+            del _keys[pos][idx]
+        self._len -= 1
+        if _lists[pos]:
+            self._maxes[pos] = _keys[pos][-1]
+            if self._index is not None:
+                self._update_index(pos, -1)
+        else:
+            del _lists[pos]
+            if self._key is not None:
+                del _keys[pos]
+            del self._maxes[pos]
+            self._index = None
+
+    def discard(self, value):
+        """Remove an element, if it is in the list"""
+        try:
+            self.remove(value)
+        except ValueError:
+            pass
+
+    def index(self, value):
+        """Return the (0-based) position of an element"""
+        pos, idx = self._find(value)
+        return self._position(pos, idx)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return chain.from_iterable(reversed(l) for l in reversed(self._lists))
+
+    def __contains__(self, value):
+        try:
+            self._find(value)
+        except ValueError:
+            return False
+        return True
+
+    def __getitem__(self, idx):
+        if type(idx) is slice:
+            return list(self)[idx]
+        _len = self._len
+        if idx < 0:
+            idx += _len
+        if idx < 0 or idx >= _len:
+            raise IndexError("list index out of range")
+        _lists = self._lists
+        # (fast paths for the first and last elements)
+        if idx < len(_lists[0]):
+            return _lists[0][idx]
+        _last = _len - len(_lists[-1])
+        if idx >= _last:
+            return _lists[-1][idx - _last]
+        pos, idx = self._locate(idx)
+        return _lists[pos][idx]
+
+    def __eq__(self, other):
+        if isinstance(other, SortedList):
+            other = list(other)
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def _find(self, value):
+        """Return the sublist and sublist position of an element"""
+        _key = value if self._key is None else self._key(value)
+        _maxes = self._maxes
+        _keys = self._keys
+        pos = bisect_left(_maxes, _key)
+        if pos < len(_maxes):
+            idx = bisect_left(_keys[pos], _key)
+            if self._key is None:
+                if _keys[pos][idx] == value:
+                    return pos, idx
+            else:
+                # search the elements with an equal key
+                _lists = self._lists
+                while pos < len(_maxes):
+                    _sublist = _keys[pos]
+                    while idx < len(_sublist):
+                        if _sublist[idx] != _key:
+                            raise ValueError("%r is not in list" % (value,))
+                        if _lists[pos][idx] == value:
+                            return pos, idx
+                        idx += 1
+                    pos += 1
+                    idx = 0
+        raise ValueError("%r is not in list" % (value,))
+
+    def _split(self, pos):
+        """Split a sublist that is too long"""
+        _load = self._load
+        _lists = self._lists
+        _lists[pos:pos+1] = [_lists[pos][:_load], _lists[pos][_load:]]
+        if self._key is not None:
+            _keys = self._keys
+            _keys[pos:pos+1] = [_keys[pos][:_load], _keys[pos][_load:]]
+        self._maxes.insert(pos, self._keys[pos][-1])
+        self._index = None
+
+    def _build_index(self):
+        """Build the binary indexed tree of the sublist lengths"""
+        _index = [0]
+        _index.extend(len(l) for l in self._lists)
+        n = len(_index)
+        for i in range(1, n):
+            j = i + (i & -i)
+            if j < n:
+                _index[j] += _index[i]
+        self._index = _index
+
+    def _update_index(self, pos, delta):
+        _index = self._index
+        n = len(_index)
+        i = pos + 1
+        while i < n:
+            _index[i] += delta
+            i += i & -i
+
+    def _position(self, pos, idx):
+        """Return the position of an element of a sublist"""
+        if self._index is None:
+            self._build_index()
+        _index = self._index
+        i = pos
+        while i > 0:
+            idx += _index[i]
+            i -= i & -i
+        return idx
+
+    def _locate(self, idx):
+        """Return the sublist and sublist position of a position"""
+        if self._index is None:
+            self._build_index()
+        _index = self._index
+        n = len(_index) - 1
+        pos = 0
+        bit = 1 << (n.bit_length() - 1)
+        while bit:
+            i = pos + bit
+            if i <= n and _index[i] <= idx:
+                pos = i
+                idx -= _index[i]
+            bit >>= 1
+        return pos, idx
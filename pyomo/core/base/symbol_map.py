@@ -7,10 +7,12 @@
 #  This software is distributed under the BSD License.
 #  _________________________________________________________________________
 
-__all__ = ['SymbolMap', 'symbol_map_from_instance']
+__all__ = ['SymbolMap', 'CompactSymbolMap', 'symbol_map_from_instance']
 
+from collections import MutableMapping
 from weakref import ref as weakref_ref
-from six import iteritems, iterkeys
+from six import iteritems, iterkeys, itervalues
+from six.moves import xrange
 from pyomo.core.base.label import TextLabeler
 
 
@@ -191,3 +193,205 @@ class SymbolMap(object):
             return self.aliases[symbol]()
         else:
             return SymbolMap.UnknownSymbol
+
+
+#
+# A compact symbol map for the objects that are labeled by a prefix and
+# their (integer) position, e.g., the variables (v0, v1, ...),
+# constraints (c0, c1, ...) and objectives (o0, ...) of an NL file.
+# The objects are stored in one list per prefix, and their symbols are
+# only generated when they are requested.
+#
+# The byObject and bySymbol attributes are views that provide the
+# dictionary interface of the SymbolMap attributes (symbols that are
+# added through the SymbolMap methods are stored in regular
+# dictionaries).  The reverse index that maps object ids to positions
+# is only built when it is used.  The indexed entries that are deleted
+# from (or replaced in) a view are recorded by the view, so the
+# positions (and the symbols) of the other objects do not change.
+#
+class CompactSymbolMap(SymbolMap):
+
+    def __init__(self):
+        SymbolMap.__init__(self)
+        #
+        # objects:  prefix -> list of object weakrefs
+        #
+        # (as in the SymbolMap, the objects are not kept alive by the
+        # symbol map)
+        #
+        self.objects = {}
+        self._ids = None
+        self.byObject = _CompactByObject(self)
+        self.bySymbol = _CompactBySymbol(self)
+
+    def addIndexedSymbols(self, prefix, objs):
+        """
+        Add objects that are labeled prefix+str(i), where i is the
+        position of the object in the list of objects with this prefix
+        (i.e., the first call for a prefix labels the objects starting
+        from 0, and later calls continue the numbering).
+        """
+        if not prefix or prefix[-1].isdigit():
+            raise ValueError(
+                "Invalid symbol prefix '%s': the prefix must not be empty "
+                "or end with a digit" % (prefix,))
+        self.objects.setdefault(prefix, []).extend(
+            weakref_ref(obj) for obj in objs)
+        self._ids = None
+
+    def getIndexedObjects(self, prefix):
+        """
+        Return the list of the objects that were added with a prefix
+        (the objects that no longer exist are None).
+        """
+        return [obj_ref() for obj_ref in self.objects.get(prefix, ())]
+
+    def getIndex(self, obj):
+        """
+        Return the (prefix, index) tuple of an object that was added
+        with addIndexedSymbols().  Raises KeyError for other objects.
+        """
+        return self._index()[id(obj)]
+
+    def _index(self):
+        if self._ids is None:
+            self._ids = ids = {}
+            for prefix, obj_refs in iteritems(self.objects):
+                for i, obj_ref in enumerate(obj_refs):
+                    obj = obj_ref()
+                    if obj is not None:
+                        ids[id(obj)] = (prefix, i)
+        return self._ids
+
+    def _getIndexedRef(self, symbol):
+        # (the prefixes do not end with a digit)
+        prefix = symbol.rstrip('0123456789')
+        obj_refs = self.objects.get(prefix, None)
+        if obj_refs is not None:
+            i = symbol[len(prefix):]
+            if i and (i[0] != '0' or i == '0'):
+                i = int(i)
+                if i < len(obj_refs):
+                    return obj_refs[i]
+        return None
+
+    def getObject(self, symbol):
+        """
+        Return the object corresponding to a symbol
+        """
+        obj_ref = self._getIndexedRef(symbol)
+        if obj_ref is None or symbol in self.bySymbol._deleted:
+            return SymbolMap.getObject(self, symbol)
+        return obj_ref()
+
+    def copy(self):
+        """
+        Return a copy of this symbol map
+        """
+        ans = CompactSymbolMap()
+        for prefix, obj_refs in iteritems(self.objects):
+            ans.objects[prefix] = list(obj_refs)
+        for view, ans_view in ((self.byObject, ans.byObject),
+                               (self.bySymbol, ans.bySymbol)):
+            ans_view._other.update(view._other)
+            ans_view._deleted.update(view._deleted)
+        ans.aliases.update(self.aliases)
+        return ans
+
+
+class _CompactByObject(MutableMapping):
+    """
+    A view of a CompactSymbolMap that maps object ids to symbols
+    """
+
+    def __init__(self, smap):
+        self._smap = smap
+        self._other = {}
+        # the ids of the indexed objects that are deleted from the view
+        self._deleted = set()
+
+    def _indexed(self, obj_id):
+        return obj_id in self._smap._index() and obj_id not in self._deleted
+
+    def __getitem__(self, obj_id):
+        if self._indexed(obj_id):
+            prefix, i = self._smap._index()[obj_id]
+            return prefix + str(i)
+        return self._other[obj_id]
+
+    def __contains__(self, obj_id):
+        return self._indexed(obj_id) or obj_id in self._other
+
+    def __setitem__(self, obj_id, symbol):
+        if self._indexed(obj_id):
+            self._deleted.add(obj_id)
+        self._other[obj_id] = symbol
+
+    def __delitem__(self, obj_id):
+        if self._indexed(obj_id):
+            self._deleted.add(obj_id)
+        else:
+            del self._other[obj_id]
+
+    def __iter__(self):
+        for obj_id in self._smap._index():
+            if obj_id not in self._deleted:
+                yield obj_id
+        for obj_id in self._other:
+            yield obj_id
+
+    def __len__(self):
+        ids = self._smap._index()
+        return len(ids) + len(self._other) \
+            - sum(1 for obj_id in self._deleted if obj_id in ids)
+
+
+class _CompactBySymbol(MutableMapping):
+    """
+    A view of a CompactSymbolMap that maps symbols to object weakrefs
+    """
+
+    def __init__(self, smap):
+        self._smap = smap
+        self._other = {}
+        # the indexed symbols that are deleted from the view
+        self._deleted = set()
+
+    def _indexed(self, symbol):
+        return self._smap._getIndexedRef(symbol) is not None \
+            and symbol not in self._deleted
+
+    def __getitem__(self, symbol):
+        obj_ref = self._smap._getIndexedRef(symbol)
+        if obj_ref is None or symbol in self._deleted:
+            return self._other[symbol]
+        return obj_ref
+
+    def __contains__(self, symbol):
+        return self._indexed(symbol) or symbol in self._other
+
+    def __setitem__(self, symbol, obj_weakref):
+        if self._indexed(symbol):
+            self._deleted.add(symbol)
+        self._other[symbol] = obj_weakref
+
+    def __delitem__(self, symbol):
+        if self._indexed(symbol):
+            self._deleted.add(symbol)
+        else:
+            del self._other[symbol]
+
+    def __iter__(self):
+        for prefix, obj_refs in iteritems(self._smap.objects):
+            for i in xrange(len(obj_refs)):
+                symbol = prefix + str(i)
+                if symbol not in self._deleted:
+                    yield symbol
+        for symbol in self._other:
+            yield symbol
+
+    def __len__(self):
+        # (the deleted symbols are indexed symbols)
+        return sum(len(objs) for objs in itervalues(self._smap.objects)) \
+            + len(self._other) - len(self._deleted)
@@ -104,6 +104,7 @@ class ComponentDict(collections.MutableMapping):
                     # release the current component
                     # * see __delitem__ for explanation
                     self._data[key]._component = None
+                    self._data_index = None
                 self._data[key] = val
                 return
             elif (key in self._data) and (self._data[key] is val):
@@ -143,6 +144,7 @@ class ComponentDict(collections.MutableMapping):
         obj = self._data[key]
         obj._component = None
         del self._data[key]
+        self._data_index = None
 
     def __getitem__(self, key): return self._data[key]
     def __iter__(self): return self._data.__iter__()
@@ -95,6 +95,7 @@ class ComponentList(collections.MutableSequence):
                     self._active |= getattr(item, '_active', True)
                 self._data[i]._component = None
                 self._data[i] = item
+                self._data_index = None
                 return
             elif self._data[i] is item:
                 # a very special case that makes sense to handle
@@ -130,6 +131,7 @@ class ComponentList(collections.MutableSequence):
                 if hasattr(self, "_active"):
                     self._active |= getattr(item, '_active', True)
                 self._data.insert(i, item)
+                self._data_index = None
                 return
             # see note about allowing components to live in more than
             # one container
@@ -160,6 +162,7 @@ class ComponentList(collections.MutableSequence):
         obj = self._data[i]
         obj._component = None
         del self._data[i]
+        self._data_index = None
 
     def __getitem__(self, i): return self._data[i]
     def __len__(self): return self._data.__len__()
@@ -211,6 +214,7 @@ class ComponentList(collections.MutableSequence):
         data = self._data
         for i in range(n//2):
             data[i], data[n-i-1] = data[n-i-1], data[i]
+        self._data_index = None
 
 #
 # ComponentList needs to come before IndexedComponent
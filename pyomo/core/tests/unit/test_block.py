@@ -1624,6 +1624,69 @@ class TestBlock(unittest.TestCase):
             sorted(id(x) for x in (m.x, m.y[1], nb.x, nb.y[1])),
         )
 
+    def test_clone_shared_leaves(self):
+        m = ConcreteModel()
+        m.I = Set(initialize=[1,2])
+        m.p = Param(m.I, initialize={1:2, 2:3})
+        m.q = Param(m.I, initialize={1:4, 2:5}, mutable=True)
+        m.x = Var(m.I, within=NonNegativeReals, initialize=1)
+        m.e = Expression(expr=m.x[1]**2)
+        m.c = Constraint(expr=m.p[1]*m.x[1] + m.q[2]*m.x[2] + m.e <= 7)
+
+        n = m.clone()
+        # the global sets and the numeric constants are shared
+        self.assertIs(n.x[1].domain, NonNegativeReals)
+        self.assertIs(n.e.expr._args[1], m.e.expr._args[1])
+        # everything else is copied
+        self.assertIsNot(n.I, m.I)
+        self.assertIs(n.x.index_set(), n.I)
+        self.assertIsNot(n.p._data, m.p._data)
+        self.assertEqual(n.p._data, m.p._data)
+        self.assertIsNot(n.q[2], m.q[2])
+        self.assertIs(n.q[2].parent_component(), n.q)
+        self.assertIs(n.e.parent_block(), n)
+        self.assertEqual(
+            sorted(id(x) for x in identify_variables(n.c.body)),
+            sorted(id(x) for x in (n.x[1], n.x[2])),
+        )
+        # ... and the copies are independent of the original model
+        n.q[2] = 10
+        n.x[1].value = 2
+        self.assertEqual(value(m.c.body), 2 + 5 + 1)
+        self.assertEqual(value(n.c.body), 4 + 10 + 4)
+        self.assertEqual(n.x[1].index(), 1)
+        self.assertEqual(n.q[2].name, 'q[2]')
+
+    def test_copy_values_from(self):
+        m = ConcreteModel()
+        m.x = Var([1,2], initialize=0)
+        m.p = Param(initialize=1, mutable=True)
+        m.r = Param(initialize=3)
+        m.b = Block([1,2])
+        m.b[2].y = Var()
+        m.b[2].q = Param([1,2], mutable=True)
+
+        n = m.clone()
+        n.x[1].value = 5
+        n.x[2].fix(6)
+        n.p = 7
+        n.b[2].y.value = 8
+        n.b[2].q[1] = 9
+
+        m.copy_values_from(n)
+        self.assertEqual(m.x[1].value, 5)
+        self.assertFalse(m.x[1].fixed)
+        self.assertEqual(m.x[2].value, 6)
+        self.assertTrue(m.x[2].fixed)
+        self.assertEqual(m.p.value, 7)
+        self.assertEqual(m.r.value, 3)
+        self.assertEqual(m.b[2].y.value, 8)
+        self.assertEqual(m.b[2].q[1].value, 9)
+        self.assertNotIn(2, m.b[2].q._data)
+
+        m.b[1].z = Var()
+        self.assertRaises(KeyError, n.copy_values_from, m)
+
 
     def Xtest_display(self):
         self.block.A = RangeSet(1,4)
@@ -0,0 +1,150 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the model construction profiler
+#
+
+import json
+
+import pyutilib.th as unittest
+from six import StringIO
+
+from pyomo.environ import *
+import pyomo.core.base.construction_profiler as construction_profiler
+
+
+def _create_model():
+    model = AbstractModel()
+    model.I = Set(initialize=[1,2,3])
+    model.p = Param(model.I, initialize=lambda m,i: 2*i)
+    model.x = Var(model.I)
+    model.c = Constraint(model.I, rule=lambda m,i: m.x[i] >= m.p[i])
+    def b_rule(b, i):
+        b.y = Var()
+        b.c = Constraint(expr=b.y >= i)
+    model.b = Block([1,2], rule=b_rule)
+    model.o = Objective(rule=lambda m: summation(m.x))
+    return model
+
+
+class TestConstructionProfiler(unittest.TestCase):
+
+    def setUp(self):
+        with ConstructionProfiler() as profiler:
+            self.instance = _create_model().create_instance()
+        self.profiler = profiler
+
+    def test_records(self):
+        records = dict((r.name, r) for r in self.profiler.records)
+        self.assertEqual(sorted(records),
+                         ['I', 'b', 'b[1].c', 'b[1].y', 'b[2].c', 'b[2].y',
+                          'b_index', 'c', 'o', 'p', 'x'])
+        self.assertEqual(records['c'].ctype, 'Constraint')
+        self.assertEqual(records['c'].data_objects, 3)
+        self.assertEqual(records['c'].rule_calls, 3)
+        self.assertEqual(records['p'].rule_calls, 3)
+        self.assertEqual(records['x'].rule_calls, 0)
+        self.assertEqual(records['o'].data_objects, 1)
+        self.assertEqual(records['c'].depth, 0)
+        self.assertEqual(records['c'].block, self.instance.name)
+        self.assertTrue(records['c'].time >= 0)
+        self.assertTrue(records['c'].rss is not None)
+        # the components declared by the block rule are nested in the
+        # construction of the block
+        self.assertEqual(records['b'].rule_calls, 2)
+        self.assertEqual(records['b'].data_objects, 2)
+        self.assertEqual(records['b[1].c'].depth, 1)
+        self.assertEqual(records['b[1].c'].block, 'b[1]')
+        nested = sum(records[name].time for name in
+                     ('b[1].c', 'b[1].y', 'b[2].c', 'b[2].y'))
+        self.assertAlmostEqual(records['b'].self_time,
+                               records['b'].time - nested)
+        self.assertAlmostEqual(self.profiler.construction_time(),
+                               sum(r.time for r in self.profiler.records
+                                   if r.depth == 0))
+        self.assertTrue(
+            self.profiler.total_time >= self.profiler.construction_time())
+
+    def test_inactive(self):
+        self.assertIs(construction_profiler._active_profiler, None)
+        _create_model().create_instance()
+        self.assertEqual(len(self.profiler.records), 11)
+
+    def test_concrete_model(self):
+        with ConstructionProfiler(track_memory=False) as profiler:
+            model = ConcreteModel()
+            model.x = Var([1,2], initialize=lambda m,i: i)
+            model.b = Block()
+            model.b.y = Var()
+        self.assertEqual([(r.name, r.data_objects, r.rule_calls, r.rss)
+                          for r in profiler.records],
+                         [('x_index', 1, 0, None),
+                          ('x', 2, 2, None),
+                          ('b', 1, 0, None),
+                          ('b.y', 1, 0, None)])
+
+    def test_block_summary(self):
+        blocks = dict((r.name, r) for r in self.profiler.block_summary())
+        self.assertEqual(sorted(blocks), ['b[1]', 'b[2]', self.instance.name])
+        self.assertEqual(blocks['b[1]'].data_objects, 2)
+        self.assertEqual(blocks[self.instance.name].data_objects, 7)
+        self.assertEqual(blocks[self.instance.name].rule_calls, 8)
+
+    def test_sorted_records(self):
+        records = self.profiler.sorted_records('data_objects', limit=3)
+        self.assertEqual([r.data_objects for r in records], [3, 3, 3])
+        # (ties are kept in construction order)
+        self.assertEqual([r.name for r in records], ['p', 'x', 'c'])
+        records = self.profiler.sorted_records('name', reverse=False)
+        self.assertEqual(records[0].name, 'I')
+        records = self.profiler.sorted_records('time')
+        self.assertEqual([r.time for r in records],
+                         sorted((r.time for r in records), reverse=True))
+        self.assertRaises(ValueError, self.profiler.sorted_records, 'bogus')
+
+    def test_report(self):
+        output = StringIO()
+        self.profiler.report(ostream=output, sort_by='name', reverse=False,
+                             limit=2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['Component', 'Type', 'Time', 'Self', 'Time',
+                          'Data', 'Objects', 'Rule', 'Calls', 'RSS'])
+        self.assertEqual([line.split()[:2] for line in lines[1:3]],
+                         [['I', 'Set'], ['b', 'Block']])
+        self.assertTrue(lines[3].startswith('Total construction time: '))
+        self.assertEqual(len(lines), 4)
+
+        output = StringIO()
+        self.profiler.report(ostream=output, sort_by='rule_calls',
+                             blocks=True)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0].split()[:2], ['Block', 'Components'])
+        self.assertEqual(lines[1].split()[:2], [self.instance.name, '7'])
+        self.assertEqual(len(lines), 5)
+
+    def test_json(self):
+        data = json.loads(self.profiler.to_json())
+        self.assertEqual(sorted(data),
+                         ['blocks', 'components', 'construction_time',
+                          'total_time'])
+        self.assertEqual(len(data['components']), 11)
+        self.assertEqual(len(data['blocks']), 3)
+        self.assertEqual(data['components'][0]['name'], 'I')
+        self.assertEqual(
+            sorted(data['components'][0]),
+            sorted(construction_profiler.ConstructionRecord.fields))
+
+        output = StringIO()
+        self.profiler.to_json(ostream=output)
+        self.assertEqual(json.loads(output.getvalue()), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
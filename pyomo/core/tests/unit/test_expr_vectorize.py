@@ -0,0 +1,173 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the vectorized expression evaluators
+#
+
+import sys
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+from pyomo.core.base import expr_common, expr as EXPR
+from pyomo.core.base.expr_vectorize import (compile_expression,
+                                            compile_constraints,
+                                            numpy_available)
+if numpy_available:
+    import numpy
+
+
+@unittest.skipIf(not numpy_available, "NumPy is not available")
+class TestVectorizedExpression_coopr3(unittest.TestCase):
+
+    mode = expr_common.Mode.coopr3_trees
+
+    def setUp(self):
+        EXPR.set_expression_tree_format(self.mode)
+        m = self.m = ConcreteModel()
+        m.x = Var([1,2,3], initialize=1)
+        m.p = Param(mutable=True, initialize=2)
+        self.X = numpy.random.RandomState(0).uniform(0.1, 3, (20,3))
+
+    def tearDown(self):
+        EXPR.set_expression_tree_format(expr_common._default_mode)
+
+    def _check(self, expr, variables=None):
+        if variables is None:
+            variables = [self.m.x[1], self.m.x[2], self.m.x[3]]
+        ans = compile_expression(expr, variables)(self.X)
+        self.assertEqual(ans.shape, (len(self.X),))
+        for row, val in zip(self.X, ans):
+            for v, x in zip(variables, row):
+                v.value = x
+            self.assertAlmostEqual(val, value(expr))
+
+    def test_linear(self):
+        m = self.m
+        self._check(m.x[1] + 2*m.x[2] - m.p*m.x[3])
+        self._check(3 - m.x[1])
+        self._check(-m.x[2])
+
+    def test_nonlinear(self):
+        m = self.m
+        self._check(m.x[1]*m.x[2]/m.x[3])
+        self._check(1/m.x[1])
+        self._check(m.x[1]**m.p + m.x[2]**m.x[3])
+        self._check(sin(m.x[1])**2 + exp(-m.x[2]) + log(m.x[3]))
+        self._check(sqrt(m.x[1]) + floor(m.x[2]) + abs(m.x[1] - m.x[3]))
+
+    def test_expr_if(self):
+        m = self.m
+        self._check(EXPR.Expr_if(IF=m.x[1] <= m.x[2],
+                                 THEN=m.x[1], ELSE=m.x[3]))
+
+    def test_constant(self):
+        ans = compile_expression(self.m.p*2, [self.m.x[1]])(self.X[:,:1])
+        self.assertEqual(list(ans), [4]*len(self.X))
+
+    def test_param_input(self):
+        # mutable parameters may be inputs (e.g., for sensitivity sweeps)
+        m = self.m
+        self._check(m.p*m.x[1] + m.x[2], [m.p, m.x[1], m.x[2]])
+        self.assertEqual(value(m.p), self.X[-1][0])
+
+    def test_leaf_values(self):
+        # the leaves that are not inputs are evaluated when the
+        # evaluator is called
+        m = self.m
+        f = compile_expression(m.p*m.x[1] + m.x[2], [m.x[1]])
+        X = numpy.array([[1.], [2.]])
+        self.assertEqual(list(f(X)), [3, 5])
+        m.p = 3
+        m.x[2].value = 0
+        self.assertEqual(list(f(X)), [3, 6])
+
+    def test_default_variables(self):
+        m = self.m
+        f = compile_expression(m.x[3]*m.x[1])
+        self.assertEqual([v.name for v in f.variables], ['x[3]', 'x[1]'])
+
+    def test_undefined(self):
+        f = compile_expression(log(self.m.x[1]), [self.m.x[1]])
+        ans = f(numpy.array([[1.], [-1.], [0.]]))
+        self.assertEqual(ans[0], 0)
+        self.assertTrue(numpy.isnan(ans[1]))
+        self.assertTrue(numpy.isinf(ans[2]))
+
+    def test_bad_shape(self):
+        f = compile_expression(self.m.x[1] + self.m.x[2])
+        self.assertRaises(ValueError, f, self.X)
+        self.assertRaises(ValueError, f, [1, 2])
+
+    def test_deep_expression(self):
+        m = self.m
+        m.q = Param(mutable=True, initialize=0.5)
+        e = m.x[1]
+        for i in range(5*sys.getrecursionlimit()):
+            e = EXPR.generate_expression_bypassCloneCheck(
+                expr_common._mul, m.q,
+                EXPR.generate_expression_bypassCloneCheck(
+                    expr_common._add, e, m.x[2]))
+        ans = compile_expression(e, [m.x[1], m.x[2]])(
+            numpy.array([[1., 1.], [2., 3.]]))
+        self.assertAlmostEqual(ans[0], 1)
+        self.assertAlmostEqual(ans[1], 3)
+
+
+class TestVectorizedExpression_pyomo4(TestVectorizedExpression_coopr3):
+
+    mode = expr_common.Mode.pyomo4_trees
+
+
+@unittest.skipIf(not numpy_available, "NumPy is not available")
+class TestVectorizedConstraints(unittest.TestCase):
+
+    def setUp(self):
+        m = self.m = ConcreteModel()
+        m.x = Var([1,2], initialize=1)
+        m.p = Param(mutable=True, initialize=1)
+        m.c = Constraint([1,2], rule=lambda m, i: (0, m.x[i]**2, 4))
+        m.d = Constraint(expr=m.x[1] + m.x[2] == m.p)
+        m.e = Constraint(expr=m.x[1] >= m.x[2])
+        self.X = numpy.array([[1., 0.], [3., -1.], [0.5, 0.5]])
+
+    def test_body(self):
+        m = self.m
+        f = compile_constraints([m.c[1], m.c[2], m.d], [m.x[1], m.x[2]])
+        self.assertEqual(f.body(self.X).tolist(),
+                         [[1, 0, 1], [9, 1, 2], [0.25, 0.25, 1]])
+        self.assertEqual(f.lower().tolist(), [0, 0, 1])
+        self.assertEqual(f.upper().tolist(), [4, 4, 1])
+
+    def test_residual(self):
+        m = self.m
+        f = compile_constraints([m.c[1], m.c[2], m.d, m.e],
+                                [m.x[1], m.x[2]])
+        self.assertEqual(f(self.X).tolist(),
+                         [[0, 0, 0, 0], [5, 0, 1, 0], [0, 0, 0, 0]])
+        self.assertEqual(f.feasible(self.X).tolist(), [True, False, True])
+        m.p = 2
+        self.assertEqual(f.residual(self.X)[:,2].tolist(), [1, 0, 1])
+
+    def test_component(self):
+        m = self.m
+        f = compile_constraints(m.c)
+        self.assertEqual(f.constraints, [m.c[1], m.c[2]])
+        self.assertEqual(f.variables, [m.x[1], m.x[2]])
+        m.c[2].deactivate()
+        f = compile_constraints(m.c)
+        self.assertEqual(f.constraints, [m.c[1]])
+        self.assertEqual(f.variables, [m.x[1]])
+        f = compile_constraints(m.d)
+        self.assertEqual(f.constraints, [m.d])
+        self.assertEqual(f(self.X).tolist(), [[0], [1], [0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
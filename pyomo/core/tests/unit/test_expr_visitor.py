@@ -0,0 +1,270 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the (non-recursive) expression visitors
+#
+
+import os
+import sys
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__))+os.sep
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+from pyomo.core.base import expr_common, expr as EXPR
+from pyomo.core.base.expr_visitor import (SimpleExpressionVisitor,
+                                          ExpressionValueVisitor)
+from pyomo.core.base.numvalue import native_types
+from pyomo.repn import generate_canonical_repn
+
+
+class _NodeCollector(SimpleExpressionVisitor):
+
+    def __init__(self):
+        self.nodes = []
+
+    def visit(self, node):
+        self.nodes.append(node)
+
+    def finalize(self):
+        return self.nodes
+
+
+class _LeafCounter(ExpressionValueVisitor):
+
+    def visiting_potential_leaf(self, node):
+        if node.__class__ in native_types or not node.is_expression():
+            return True, 1
+        return False, None
+
+    def visit(self, node, values):
+        return sum(values)
+
+
+class TestExpressionVisitors(unittest.TestCase):
+
+    def setUp(self):
+        EXPR.set_expression_tree_format(expr_common.Mode.coopr3_trees)
+        self.m = ConcreteModel()
+        self.m.x = Var(range(4), initialize=2)
+
+    def tearDown(self):
+        EXPR.set_expression_tree_format(expr_common._default_mode)
+
+    def test_xpreorder(self):
+        x = self.m.x
+        e = x[0]*x[1] + sin(x[2])
+        nodes = list(SimpleExpressionVisitor().xpreorder(e))
+        self.assertIs(nodes[0], e)
+        self.assertEqual([n for n in nodes if not n.is_expression()],
+                         [x[0], x[1], x[2]])
+        self.assertEqual(len(nodes), 6)
+
+    def test_xleaves(self):
+        x = self.m.x
+        e = x[0]*x[1] + sin(x[2]) + x[3]
+        self.assertEqual(list(SimpleExpressionVisitor().xleaves(e)),
+                         [x[0], x[1], x[2], x[3]])
+        self.assertEqual(list(SimpleExpressionVisitor().xleaves(x[0])),
+                         [x[0]])
+
+    def test_dfs_preorder_stack(self):
+        x = self.m.x
+        e = x[0] + x[1]
+        self.assertEqual(_NodeCollector().dfs_preorder_stack(e),
+                         [e, x[0], x[1]])
+
+    def test_dfs_postorder_stack(self):
+        x = self.m.x
+        e = x[0]*x[1] + sin(x[2]) + x[3]
+        self.assertEqual(_LeafCounter().dfs_postorder_stack(e), 4)
+        self.assertEqual(_LeafCounter().dfs_postorder_stack(x[0]), 1)
+
+    def test_not_implemented(self):
+        e = self.m.x[0] + self.m.x[1]
+        self.assertRaises(NotImplementedError,
+                          ExpressionValueVisitor().dfs_postorder_stack, e)
+
+        class _Visitor(ExpressionValueVisitor):
+            def visiting_potential_leaf(self, node):
+                if node.is_expression():
+                    return False, None
+                return True, 1
+        self.assertRaises(NotImplementedError,
+                          _Visitor().dfs_postorder_stack, e)
+
+
+class TestPolynomialDegree_coopr3(unittest.TestCase):
+
+    def setUp(self):
+        EXPR.set_expression_tree_format(expr_common.Mode.coopr3_trees)
+        self.m = ConcreteModel()
+        self.m.x = Var(initialize=1)
+        self.m.y = Var()
+        self.m.f = ExternalFunction(library='foo.so', function='bar')
+        self.m.x.fix(1)
+
+    def tearDown(self):
+        EXPR.set_expression_tree_format(expr_common._default_mode)
+
+    def test_external_function_fixed_arguments(self):
+        # functions (and powers) of fixed external function calls
+        # are constants
+        m = self.m
+        self.assertEqual(exp(m.f(m.x)).polynomial_degree(), 0)
+        self.assertEqual(abs(m.f(m.x)).polynomial_degree(), 0)
+        self.assertEqual(sin(exp(m.f(m.x))).polynomial_degree(), 0)
+        self.assertEqual((m.f(m.x)**2).polynomial_degree(), 0)
+        self.assertEqual((2**m.f(m.x)).polynomial_degree(), 0)
+        self.assertEqual((m.f(m.x)**m.f(m.x)).polynomial_degree(), 0)
+        self.assertEqual((exp(m.f(m.x))*m.y).polynomial_degree(), 1)
+        # ... but the external function calls are not polynomials
+        self.assertEqual(m.f(m.x).polynomial_degree(), None)
+        self.assertEqual((m.f(m.x)*m.y).polynomial_degree(), None)
+        self.assertEqual((m.f(m.x) + m.y).polynomial_degree(), None)
+
+    def test_external_function_variable_arguments(self):
+        m = self.m
+        self.assertEqual(m.f(m.y).polynomial_degree(), None)
+        self.assertEqual(exp(m.f(m.y)).polynomial_degree(), None)
+        self.assertEqual((m.f(m.y)**2).polynomial_degree(), None)
+        self.assertEqual(exp(m.f(m.x) + m.y).polynomial_degree(), None)
+
+
+class TestDeepExpressions_coopr3(unittest.TestCase):
+
+    mode = expr_common.Mode.coopr3_trees
+
+    def setUp(self):
+        EXPR.set_expression_tree_format(self.mode)
+        # Deep enough that recursive walkers fail
+        self.depth = 5*sys.getrecursionlimit()
+        self.m = ConcreteModel()
+        self.m.x = Var(range(self.depth), initialize=1)
+        self.m.p = Param(mutable=True, initialize=0.5)
+        self.m.y = Var(initialize=1)
+        self.m.z = Var(initialize=1)
+
+    def tearDown(self):
+        EXPR.set_expression_tree_format(expr_common._default_mode)
+
+    def _generate(self, etype, a, b):
+        # The expressions are built without the reference count
+        # checks (which clone the expressions recursively)
+        return EXPR.generate_expression_bypassCloneCheck(etype, a, b)
+
+    def _horner(self, depth=None, x=None):
+        # p*(p*(p*(x[0] + x[1]) + x[2]) + ...)
+        m = self.m
+        if depth is None:
+            depth = self.depth
+        if x is None:
+            x = m.x
+        e = x[0]
+        for i in range(1, depth):
+            e = self._generate(
+                expr_common._mul, m.p,
+                self._generate(expr_common._add, e, x[i]))
+        return e
+
+    def _nonlinear(self):
+        # x[n]*(x[n-1]*(... x[1]*(x[0] + x[1]) ...) + x[n])
+        m = self.m
+        e = m.x[0]
+        for i in range(1, self.depth):
+            e = self._generate(
+                expr_common._mul, m.x[i],
+                self._generate(expr_common._add, e, m.x[i]))
+        return e
+
+    def test_value(self):
+        self.assertAlmostEqual(value(self._horner()), 1.0)
+
+    def test_polynomial_degree(self):
+        self.assertEqual(self._horner().polynomial_degree(), 1)
+        self.assertEqual(self._nonlinear().polynomial_degree(), self.depth)
+
+    def test_is_fixed(self):
+        e = self._horner()
+        self.assertFalse(e.is_fixed())
+        self.assertFalse(e.is_constant())
+        self.assertTrue(e._potentially_variable())
+        self.m.x.fix()
+        self.assertTrue(e.is_fixed())
+        self.assertEqual(e.polynomial_degree(), 0)
+
+    def test_to_string(self):
+        # (the names of the elements of large indexed variables are
+        # slow to generate)
+        s = str(self._horner(x=[self.m.z]+[self.m.y]*self.depth))
+        self.assertEqual(s.count('y'), self.depth-1)
+        self.assertTrue(s.startswith("p * ( p * ( p * ( "))
+        self.assertTrue(s.endswith("y ) + y ) + y )"))
+
+    def test_identify_variables(self):
+        e = self._horner()
+        self.assertEqual(len(list(EXPR.identify_variables(e))), self.depth)
+
+    def test_canonical_repn(self):
+        # (the time to collect the terms of this expression is
+        # quadratic in its depth)
+        depth = 2*sys.getrecursionlimit()
+        repn = generate_canonical_repn(self._horner(depth))
+        self.assertEqual(len(repn.variables), depth)
+        coef = dict((v.name, c) for v, c in zip(repn.variables, repn.linear))
+        self.assertAlmostEqual(coef['x[%s]' % (depth-1,)], 0.5)
+        self.assertAlmostEqual(coef['x[%s]' % (depth-2,)], 0.25)
+
+    def test_quadratic_canonical_repn(self):
+        m = self.m
+        e = m.x[0]
+        for i in range(1, self.depth):
+            e = self._generate(
+                expr_common._add, e,
+                self._generate(expr_common._mul, m.x[i-1], m.x[i]))
+        repn = generate_canonical_repn(e)
+        self.assertEqual(len(repn[2]), self.depth-1)
+        self.assertEqual(len(repn[-1]), self.depth)
+
+    def test_write_nl(self):
+        m = self.m
+        m.c = Constraint(expr=(None, self._nonlinear(), 1))
+        m.o = Objective(expr=m.x[0])
+        fname = currdir+'deep_expression.nl'
+        m.write(fname, format='nl')
+        with open(fname) as f:
+            nl = f.read()
+        os.remove(fname)
+        # one product and one sum for each level of the expression
+        self.assertEqual(nl.count("o2\n"), self.depth-1)
+        self.assertEqual(nl.count("o0\n"), self.depth-1)
+
+
+class TestDeepExpressions_pyomo4(TestDeepExpressions_coopr3):
+
+    mode = expr_common.Mode.pyomo4_trees
+
+    def test_to_string(self):
+        s = str(self._horner(x=[self.m.z]+[self.m.y]*self.depth))
+        self.assertEqual(s.count('y'), self.depth-1)
+
+    @unittest.skip("The general canonical repn does not support "
+                   "pyomo4 expression trees")
+    def test_quadratic_canonical_repn(self):
+        pass
+
+    @unittest.skip("The NL writer expression tree format is set when "
+                   "it is imported")
+    def test_write_nl(self):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
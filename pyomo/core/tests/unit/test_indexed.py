@@ -139,6 +139,70 @@ class TestIndexedComponent(unittest.TestCase):
             TypeError, 'found when trying to retrieve index for component',
             m.x.__getitem__, {})
 
+    def test_data_index(self):
+        m = ConcreteModel()
+        m.x = Var(Any, dense=False)
+        for i in [1,2,3]:
+            m.x.add(i)
+        self.assertIs(m.x._data_index, None)
+        self.assertEqual(m.x[2].index(), 2)
+        self.assertEqual(m.x[2].name, 'x[2]')
+        self.assertEqual(len(m.x._data_index), 3)
+        # the reverse index is rebuilt after the data changes
+        m.x.add(4)
+        self.assertEqual(m.x[4].index(), 4)
+        self.assertEqual(m.x[4].name, 'x[4]')
+        old = m.x[1]
+        del m.x._data[1]
+        self.assertIs(old.index(), None)
+        self.assertRaises(RuntimeError, old.getname)
+        m.x._data[5] = old
+        self.assertEqual(old.index(), 5)
+        self.assertEqual(old.name, 'x[5]')
+
+    def test_data_index_invalidation(self):
+        m = ConcreteModel()
+        m.c = Constraint(Any)
+        m.x = Var()
+        for i in [1,2,3]:
+            m.c.add(i, m.x >= i)
+        self.assertEqual(m.c[3].name, 'c[3]')
+        self.assertRaises(KeyError, m.c._index_of_data, m.x)
+        # replacing or deleting constraints resets the reverse index
+        old = m.c[2]
+        m.c.add(2, m.x >= 4)
+        self.assertIs(m.c._data_index, None)
+        self.assertEqual(m.c[2].index(), 2)
+        self.assertIs(old.index(), None)
+        del m.c[3]
+        self.assertIs(m.c._data_index, None)
+        self.assertEqual(m.c[1].name, 'c[1]')
+        self.assertEqual(sorted(m.c._data_index.values()), [1, 2])
+
+    def test_data_index_delete_and_add(self):
+        # the transformations delete component data directly from the
+        # _data dictionary, so the size of the reverse index can match
+        # the size of the _data dictionary while it is stale
+        m = ConcreteModel()
+        m.I = Set(initialize=[1,2])
+        m.x = Var()
+        m.c = Constraint(m.I, rule=lambda m, i: m.x >= i)
+        self.assertEqual(m.c[1].name, 'c[1]')
+        m.c.add(3, m.x >= 3)
+        del m.c._data[1]
+        self.assertEqual(m.c[3].name, 'c[3]')
+        self.assertEqual(m.c[2].index(), 2)
+
+    def test_data_index_clone(self):
+        m = ConcreteModel()
+        m.x = Var([1,2,3], dense=True)
+        self.assertEqual(m.x[3].name, 'x[3]')
+        self.assertIsNot(m.x._data_index, None)
+        i = m.clone()
+        self.assertIs(i.x._data_index, None)
+        self.assertEqual(i.x[3].index(), 3)
+        self.assertEqual(i.x[3].name, 'x[3]')
+
 
 class TestComponentSlices(unittest.TestCase):
     def setUp(self):
@@ -354,5 +418,69 @@ class TestComponentSlices(unittest.TestCase):
         self.assertRaises( TypeError, _slicer.next )
 
 
+class TestSparseSlices(unittest.TestCase):
+
+    def setUp(self):
+        self.m = m = ConcreteModel()
+        m.I = Set(initialize=range(10), ordered=True)
+        m.S = Set(within=m.I*m.I*m.I, ordered=True,
+                  initialize=((i,j,k) for i in range(10)
+                              for j in range(10)
+                              for k in range(10) if (i+j+k) % 7 == 0))
+        m.x = Var(m.S)
+        m.y = Var(m.I, m.I, m.I, dense=False)
+
+    def tearDown(self):
+        self.m = None
+
+    def _scan(self, component, fixed):
+        # the indices that match a slice (by scanning every index)
+        return [ component[idx] for idx in component
+                 if all(idx[pos] == val for pos, val in fixed.items()) ]
+
+    def test_sparse_set(self):
+        m = self.m
+        self.assertEqual(list(m.x[1,:,3]), self._scan(m.x, {0:1, 2:3}))
+        self.assertEqual(list(m.x[:,:,6]), self._scan(m.x, {2:6}))
+        self.assertEqual(list(m.x[2,5,:]), [m.x[2,5,0], m.x[2,5,7]])
+        self.assertEqual(list(m.x[2,20,:]), [])
+        self.assertEqual(list(m.x[1,...]), self._scan(m.x, {0:1}))
+        self.assertEqual(sorted(m.S._slice_index), [0, 1, 2])
+        # the hash indexes are updated with the set
+        m.S.add((2,5,1))
+        self.assertEqual(list(m.S._slice_candidates({0:2, 1:5}, 3)),
+                         [(2,5,0), (2,5,7), (2,5,1)])
+        # (the component data is sparse)
+        self.assertEqual(list(m.x[2,5,:]), [m.x[2,5,0], m.x[2,5,7]])
+        m.S.remove((2,5,0))
+        self.assertIs(m.S._slice_index, None)
+        self.assertEqual(list(m.S._slice_candidates({0:2, 1:5}, 3)),
+                         [(2,5,7), (2,5,1)])
+
+    def test_sparse_component(self):
+        m = self.m
+        for idx in m.S:
+            m.y[idx] = 1
+        self.assertEqual(list(m.y[1,:,3]), self._scan(m.y, {0:1, 2:3}))
+        self.assertEqual(list(m.y[:,3,:]), self._scan(m.y, {1:3}))
+        self.assertEqual(list(m.y[11,:,3]), [])
+
+    def test_product(self):
+        m = self.m
+        m.z = Var(m.I, m.I, m.I, dense=True)
+        self.assertEqual(list(m.z[1,:,3]),
+                         [m.z[1,j,3] for j in range(10)])
+        self.assertEqual(list(m.z[1,11,:]), [])
+        self.assertEqual(list(m.z[:,:,:]), list(m.z.values()))
+
+    def test_clone(self):
+        m = self.m
+        self.assertEqual(len(list(m.x[1,:,:])), len(self._scan(m.x, {0:1})))
+        self.assertIsNot(m.S._slice_index, None)
+        i = m.clone()
+        self.assertIs(i.S._slice_index, None)
+        self.assertEqual(list(i.x[1,:,3]), self._scan(i.x, {0:1, 2:3}))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -12,15 +12,17 @@
 # Test             Class to test the Model class
 #
 
+import gc
 import os
 import sys
 from os.path import abspath, dirname
 currdir = dirname(abspath(__file__))+os.sep
 import pickle
+import weakref
 import pyutilib.th as unittest
 import pyutilib.services
 import pyomo.opt
-from pyomo.opt import SolutionStatus
+from pyomo.opt import SolutionStatus, SolverResults, Solution
 from pyomo.opt.parallel.local import SolverManager_Serial
 from pyomo.environ import *
 from pyomo.core.base.expr import identify_variables
@@ -34,6 +36,10 @@ except ImportError:
     yaml_available=False
 
 
+def _suffix_values(suffix):
+    return dict((component.name, val) for component, val in suffix.items())
+
+
 class Test(unittest.TestCase):
 
     def tearDown(self):
@@ -412,6 +418,115 @@ class Test(unittest.TestCase):
         self.assertEqual(model.nobjectives(), 4)
         self.assertEqual(model.nconstraints(), 4)
 
+    def _solution_pool_model(self):
+        model = ConcreteModel()
+        model.x = Var([1,2,3], bounds=(0,4))
+        model.o = Objective(expr=summation(model.x))
+        model.c = Constraint(expr=model.x[1] + model.x[2] <= 4)
+        model.d = Constraint(expr=model.x[3] <= 3)
+        model.dual = Suffix(direction=Suffix.IMPORT)
+        model.rc = Suffix(direction=Suffix.IMPORT)
+        results = SolverResults()
+        for i in range(3):
+            soln = Solution()
+            soln._cuid = False
+            soln.status = SolutionStatus.feasible
+            soln.gap = float(i)
+            soln.variable['x[1]'] = {'Value': i, 'Rc': -i}
+            soln.variable['x[2]'] = {'Value': i+0.5}
+            if i != 1:
+                soln.variable['x[3]'] = {'Value': 3}
+            soln.objective['o'] = {'Value': 2*i+3.5}
+            soln.constraint['c'] = {'Dual': i}
+            if i == 2:
+                soln.constraint['d'] = {'Dual': 1}
+            results.solution.insert(soln)
+        return model, results
+
+    def test_solution_pool(self):
+        model, results = self._solution_pool_model()
+        model.solutions.load_from(results, select=None)
+        self.assertEqual(len(model.solutions), 3)
+        self.assertEqual([soln.gap for soln in model.solutions], [0, 1, 2])
+        # the solutions share the ordering of the objects
+        self.assertEqual(sorted(v().name for v in
+                                model.solutions._objects['variable'][0]),
+                         ['x[1]', 'x[2]', 'x[3]'])
+        model.solutions.select(1)
+        self.assertEqual(model.x[1].value, 1)
+        self.assertEqual(model.x[2].value, 1.5)
+        self.assertIs(model.x[3].value, None)
+        self.assertTrue(model.x[3].stale)
+        self.assertEqual(_suffix_values(model.rc), {'x[1]': -1})
+        self.assertEqual(_suffix_values(model.dual), {'c': 1})
+        model.solutions.select(2)
+        self.assertEqual(model.x[1].value, 2)
+        self.assertEqual(model.x[3].value, 3)
+        self.assertFalse(model.x[3].stale)
+        self.assertEqual(_suffix_values(model.dual), {'c': 2, 'd': 1})
+        model.solutions.select(0)
+        self.assertEqual(_suffix_values(model.rc), {'x[1]': 0})
+        self.assertEqual(_suffix_values(model.dual), {'c': 0})
+
+    def test_solution_pool_fixed_vars(self):
+        model, results = self._solution_pool_model()
+        model.x[2].fix(2)
+        model.solutions.load_from(results, select=None)
+        model.solutions.select(1)
+        self.assertEqual(model.x[1].value, 1)
+        self.assertEqual(model.x[2].value, 2)
+        model.x[2].unfix()
+        model.solutions.select(0)
+        self.assertEqual(model.x[2].value, 2)
+
+    def test_solution_pool_store_to(self):
+        model, results = self._solution_pool_model()
+        model.solutions.load_from(results, select=None)
+        model.solutions.select(2)
+        model.solutions.store_to(results)
+        self.assertEqual(len(results.solution), 3)
+        soln = results.solution(2)
+        self.assertEqual(soln.gap, 1)
+        self.assertEqual(soln.variable['x[1]']['Value'], 2)
+        self.assertEqual(soln.variable['x[1]']['Rc'], -1)
+        self.assertEqual(soln.constraint['c']['Dual'], 1)
+        self.assertFalse('d' in soln.constraint)
+        soln = results.solution(3)
+        self.assertEqual(soln.constraint['d']['Dual'], 1)
+
+    def test_solution_pool_pickle(self):
+        model, results = self._solution_pool_model()
+        model.solutions.load_from(results, select=None)
+        tmodel = pickle.loads(pickle.dumps(model))
+        self.assertEqual(len(tmodel.solutions), 3)
+        tmodel.solutions.select(2)
+        self.assertEqual(tmodel.x[1].value, 2)
+        self.assertEqual(tmodel.x[3].value, 3)
+        self.assertEqual(_suffix_values(tmodel.dual), {'c': 2, 'd': 1})
+        tmodel.solutions.select(1)
+        self.assertEqual(tmodel.x[1].value, 1)
+        self.assertTrue(tmodel.x[3].stale)
+        # the unpickled solutions reference the objects of the
+        # unpickled model
+        self.assertIs(tmodel.solutions._objects['constraint'][0][0](),
+                      tmodel.c)
+
+    def test_solution_pool_weak_references(self):
+        model, results = self._solution_pool_model()
+        model.solutions.load_from(results, select=None)
+        d = weakref.ref(model.d)
+        model.del_component('d')
+        gc.collect()
+        self.assertIs(d(), None)
+        # the solutions skip the objects that have been deleted
+        model.solutions.select(2)
+        self.assertEqual(model.x[1].value, 2)
+        self.assertEqual(_suffix_values(model.dual), {'c': 2})
+        tmodel = pickle.loads(pickle.dumps(model))
+        tmodel.solutions.select(2)
+        self.assertEqual(tmodel.x[3].value, 3)
+        self.assertEqual(_suffix_values(tmodel.dual), {'c': 2})
+
     @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
     def test_solve_with_pickle(self):
         model = ConcreteModel()
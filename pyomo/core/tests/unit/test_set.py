@@ -2252,6 +2252,55 @@ class Misc(PyomoModel):
         self.assertEqual(len(tmp),9)
 
 
+class SortedSetTests(unittest.TestCase):
+
+    def test_incremental_add(self):
+        m = ConcreteModel()
+        m.A = Set(ordered=Set.SortedOrder, initialize=[5,1,3])
+        self.assertEqual(list(m.A), [1,3,5])
+        # interleave additions with ordered access
+        m.A.add(4)
+        self.assertEqual(m.A.ord(4), 3)
+        self.assertEqual(m.A.ord(5), 4)
+        m.A.add(0)
+        self.assertEqual(m.A.first(), 0)
+        self.assertEqual(m.A.next(3), 4)
+        self.assertEqual(m.A.prev(3), 1)
+        self.assertEqual(m.A.nextw(5), 0)
+        self.assertEqual(m.A.prevw(0), 5)
+        self.assertEqual(m.A[2], 1)
+        self.assertEqual(m.A[-1], 5)
+        self.assertEqual(m.A.value, [0,1,3,4,5])
+        self.assertRaises(KeyError, m.A.ord, 2)
+        m.A.remove(3)
+        self.assertEqual(m.A.next(1), 4)
+        self.assertEqual(m.A.ord(5), 4)
+        self.assertEqual(list(m.A), [0,1,4,5])
+        self.assertFalse(3 in m.A)
+
+    def test_sort_key(self):
+        m = ConcreteModel()
+        m.A = Set(ordered=lambda x: -x, initialize=[1,2])
+        m.A.add(3)
+        m.A.add(0)
+        self.assertEqual(list(m.A), [3,2,1,0])
+        self.assertEqual(m.A.ord(1), 3)
+        m.A.discard(2)
+        self.assertEqual(m.A.next(3), 1)
+
+    def test_indexed(self):
+        m = ConcreteModel()
+        m.A = Set([1,2], ordered=Set.SortedOrder,
+                  initialize={1: [3,1], 2: [2]})
+        m.A[1].add(2)
+        self.assertEqual(list(m.A[1]), [1,2,3])
+        self.assertEqual(m.A[1].ord(2), 2)
+        i = m.clone()
+        i.A[1].add(0)
+        self.assertEqual(list(i.A[1]), [0,1,2,3])
+        self.assertEqual(list(m.A[1]), [1,2,3])
+
+
 class SetIO(PyomoModel):
 
     def setUp(self):
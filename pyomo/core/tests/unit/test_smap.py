@@ -12,8 +12,15 @@
 
 from six import StringIO
 import os
+from os.path import abspath, dirname, join
+currdir = dirname(abspath(__file__))
+import gc
+import pickle
+import weakref
 import pyutilib.th as unittest
 from pyomo.environ import *
+from pyomo.opt import SolverResults, SolverStatus
+from pyomo.opt.results import Solution
 
 
 class Test(unittest.TestCase):
@@ -121,5 +128,151 @@ class Test(unittest.TestCase):
         self.assertEqual( id(smap.getObject('X')), id(self.instance.x) )
         self.assertEqual( id(smap.getObject('y')), id(SymbolMap.UnknownSymbol) )
 
+
+class TestCompact(unittest.TestCase):
+
+    def setUp(self):
+        model = ConcreteModel()
+        model.x = Var([1,2,3])
+        model.c = Constraint([1,2], rule=lambda m, i: m.x[i] >= 0)
+        model.o = Objective(expr=model.x[1])
+        self.instance = model
+
+    def tearDown(self):
+        self.instance = None
+
+    def test_add_indexed(self):
+        m = self.instance
+        smap = CompactSymbolMap()
+        smap.addIndexedSymbols('v', [m.x[3], m.x[1]])
+        smap.addIndexedSymbols('v', [m.x[2]])
+        smap.addIndexedSymbols('c', list(m.c.values()))
+        self.assertEqual(set(smap.bySymbol.keys()),
+                         set(['v0','v1','v2','c0','c1']))
+        self.assertEqual(len(smap.bySymbol), 5)
+        self.assertEqual(len(smap.byObject), 5)
+        self.assertIs(smap.getObject('v0'), m.x[3])
+        self.assertIs(smap.getObject('v2'), m.x[2])
+        self.assertIs(smap.bySymbol['c1'](), m.c[2])
+        self.assertEqual(smap.byObject[id(m.x[1])], 'v1')
+        self.assertEqual(smap.getSymbol(m.c[1]), 'c0')
+        self.assertEqual(smap.getIndex(m.x[2]), ('v', 2))
+        self.assertRaises(KeyError, smap.getIndex, m.o)
+        for symb in ('v3', 'v01', 'x0', 'v', '0', 'v-1'):
+            self.assertIs(smap.getObject(symb), SymbolMap.UnknownSymbol)
+            self.assertFalse(symb in smap.bySymbol)
+        self.assertFalse(id(m.o) in smap.byObject)
+
+    def test_bad_prefix(self):
+        smap = CompactSymbolMap()
+        self.assertRaises(ValueError, smap.addIndexedSymbols, 'v1', [])
+        self.assertRaises(ValueError, smap.addIndexedSymbols, '', [])
+
+    def test_symbols_and_aliases(self):
+        # symbols that are not indexed are stored in the views
+        m = self.instance
+        smap = CompactSymbolMap()
+        smap.addIndexedSymbols('v', [m.x[1]])
+        self.assertEqual(smap.getSymbol(m.o, TextLabeler()), 'o')
+        smap.addSymbol(m.x[2], 'x2')
+        smap.alias(m.o, '__default_objective__')
+        self.assertEqual(set(smap.bySymbol), set(['v0','o','x2']))
+        self.assertIs(smap.getObject('o'), m.o)
+        self.assertIs(smap.getObject('x2'), m.x[2])
+        self.assertIs(smap.getObject('__default_objective__'), m.o)
+        self.assertEqual(smap.byObject[id(m.x[2])], 'x2')
+        del smap.bySymbol['x2']
+        self.assertIs(smap.getObject('x2'), SymbolMap.UnknownSymbol)
+        self.assertEqual(dict(smap.byObject),
+                         {id(m.x[1]): 'v0', id(m.o): 'o', id(m.x[2]): 'x2'})
+
+    def test_delete(self):
+        m = self.instance
+        smap = CompactSymbolMap()
+        smap.addIndexedSymbols('v', [m.x[1], m.x[2], m.x[3]])
+        smap.addSymbol(m.o, 'o')
+        # (as in the persistent solver plugins)
+        symbol = smap.byObject[id(m.x[2])]
+        del smap.byObject[id(m.x[2])]
+        del smap.bySymbol[symbol]
+        self.assertEqual(symbol, 'v1')
+        self.assertFalse(id(m.x[2]) in smap.byObject)
+        self.assertFalse('v1' in smap.bySymbol)
+        self.assertRaises(KeyError, smap.byObject.__getitem__, id(m.x[2]))
+        self.assertRaises(KeyError, smap.bySymbol.__delitem__, 'v1')
+        self.assertIs(smap.getObject('v1'), SymbolMap.UnknownSymbol)
+        # the other objects keep their symbols
+        self.assertEqual(smap.getSymbol(m.x[3]), 'v2')
+        self.assertIs(smap.getObject('v2'), m.x[3])
+        self.assertEqual(sorted(smap.bySymbol), ['o', 'v0', 'v2'])
+        self.assertEqual(len(smap.bySymbol), 3)
+        self.assertEqual(len(smap.byObject), 3)
+        self.assertIs(smap.bySymbol.pop('v0')(), m.x[1])
+        self.assertEqual(smap.byObject.pop(id(m.o)), 'o')
+        self.assertEqual(sorted(smap.bySymbol), ['o', 'v2'])
+        self.assertEqual(sorted(smap.byObject.values()), ['v0', 'v2'])
+        # replacing an indexed entry
+        smap.byObject[id(m.x[3])] = 'x3'
+        self.assertEqual(smap.byObject[id(m.x[3])], 'x3')
+        self.assertEqual(len(smap.byObject), 2)
+        smap_copy = smap.copy()
+        self.assertEqual(dict(smap_copy.byObject), dict(smap.byObject))
+        self.assertEqual(sorted(smap_copy.bySymbol), ['o', 'v2'])
+
+    def test_copy(self):
+        m = self.instance
+        smap = CompactSymbolMap()
+        smap.addIndexedSymbols('v', [m.x[1], m.x[2]])
+        smap.alias(m.x[1], 'X')
+        smap_copy = smap.copy()
+        smap.addIndexedSymbols('v', [m.x[3]])
+        self.assertIs(smap_copy.getObject('v1'), m.x[2])
+        self.assertIs(smap_copy.getObject('v2'), SymbolMap.UnknownSymbol)
+        self.assertIs(smap_copy.getObject('X'), m.x[1])
+
+    def test_weak_references(self):
+        # the symbol map does not keep the objects alive
+        m = ConcreteModel()
+        m.x = Var([1,2])
+        smap = CompactSymbolMap()
+        smap.addIndexedSymbols('v', [m.x[1], m.x[2]])
+        self.assertEqual(smap.getIndexedObjects('v'), [m.x[1], m.x[2]])
+        self.assertEqual(smap.getIndexedObjects('c'), [])
+        x1 = weakref.ref(m.x[1])
+        m = None
+        gc.collect()
+        self.assertIs(x1(), None)
+        self.assertEqual(smap.getIndexedObjects('v'), [None, None])
+        self.assertIs(smap.getObject('v0'), None)
+        self.assertIs(smap.bySymbol['v0'](), None)
+        self.assertEqual(len(smap.byObject), 0)
+        self.assertEqual(len(smap.bySymbol), 2)
+
+    def test_pickle(self):
+        self.assertRaises(RuntimeError, pickle.dumps, CompactSymbolMap())
+
+    def test_nl_load_solution(self):
+        m = self.instance
+        fname = join(currdir, 'compact_smap.nl')
+        fname, smap_id = m.write(fname, format='nl')
+        os.remove(fname)
+        smap = m.solutions.symbol_map[smap_id]
+        self.assertIsInstance(smap, CompactSymbolMap)
+        results = SolverResults()
+        results.solver.status = SolverStatus.ok
+        soln = Solution()
+        for symb in smap.bySymbol:
+            if symb[0] == 'v':
+                soln.variable[symb] = {'Value': int(symb[1:])+1}
+        results.solution.insert(soln)
+        results._smap_id = smap_id
+        m.solutions.load_from(results)
+        # (x[3] does not appear in the NL file)
+        self.assertEqual(sorted(smap.bySymbol), ['c0', 'c1', 'o0', 'v0', 'v1'])
+        for i in range(2):
+            self.assertEqual(smap.getObject('v%d' % i).value, i+1)
+        self.assertEqual(m.x[3].value, None)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for pyomo.core.base.sorted_list
+#
+
+import pickle
+import random
+
+import pyutilib.th as unittest
+
+from pyomo.core.base.sorted_list import SortedList
+
+
+class _SmallSortedList(SortedList):
+    # (a small load, so that the sublists are split)
+    _load = 4
+
+
+class TestSortedList(unittest.TestCase):
+
+    def test_empty(self):
+        l = SortedList()
+        self.assertEqual(len(l), 0)
+        self.assertEqual(list(l), [])
+        self.assertRaises(IndexError, l.__getitem__, 0)
+        self.assertRaises(ValueError, l.index, 1)
+        self.assertRaises(ValueError, l.remove, 1)
+        self.assertFalse(1 in l)
+        l.discard(1)
+
+    def test_add(self):
+        random.seed(1000)
+        values = [random.randint(0, 50) for i in range(200)]
+        l = _SmallSortedList()
+        ref = []
+        for val in values:
+            l.add(val)
+            ref.append(val)
+            ref.sort()
+            self.assertEqual(l[len(ref)//2], ref[len(ref)//2])
+            self.assertEqual(l.index(val), ref.index(val))
+        self.assertEqual(list(l), ref)
+        self.assertEqual(list(reversed(l)), ref[::-1])
+        self.assertEqual([l[i] for i in range(len(l))], ref)
+        self.assertEqual([l[-i] for i in range(1, len(l)+1)], ref[::-1])
+        self.assertEqual(l[3:10], ref[3:10])
+        self.assertRaises(IndexError, l.__getitem__, len(l))
+        self.assertRaises(IndexError, l.__getitem__, -len(l)-1)
+        self.assertTrue(len(l._lists) > 1)
+
+    def test_remove(self):
+        random.seed(1000)
+        values = list(range(100))
+        l = _SmallSortedList(values)
+        random.shuffle(values)
+        ref = list(range(100))
+        for val in values:
+            l.remove(val)
+            ref.remove(val)
+            self.assertEqual(list(l), ref)
+            if ref:
+                self.assertEqual(l.index(ref[-1]), len(ref)-1)
+            self.assertFalse(val in l)
+            self.assertRaises(ValueError, l.remove, val)
+        self.assertEqual(len(l), 0)
+        l.add(1)
+        self.assertEqual(list(l), [1])
+
+    def test_key(self):
+        # elements with equal keys keep their insertion order
+        l = _SmallSortedList(key=lambda x: x[0])
+        ref = []
+        for i in range(30):
+            val = (i % 3, i)
+            l.add(val)
+            ref.append(val)
+        ref.sort(key=lambda x: x[0])
+        self.assertEqual(list(l), ref)
+        self.assertEqual(l.index((1, 16)), ref.index((1, 16)))
+        self.assertRaises(ValueError, l.index, (1, 17))
+        l.remove((2, 2))
+        ref.remove((2, 2))
+        self.assertEqual(list(l), ref)
+
+    def test_compare(self):
+        l = SortedList([3,1,2])
+        self.assertEqual(l, [1,2,3])
+        self.assertEqual(l, SortedList([1,2,3]))
+        self.assertNotEqual(l, [3,2,1])
+        self.assertEqual(repr(l), '[1, 2, 3]')
+
+    def test_pickle(self):
+        l = _SmallSortedList(range(20))
+        l.add(5)
+        m = pickle.loads(pickle.dumps(l))
+        self.assertEqual(list(m), list(l))
+        m.add(7)
+        self.assertEqual(m.index(8), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
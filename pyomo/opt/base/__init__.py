@@ -17,3 +17,4 @@ from pyomo.opt.base.solvers import *
 from pyomo.opt.base.results import *
 from pyomo.opt.base.problem import *
 from pyomo.opt.base.formats import *
+from pyomo.opt.base.compression import *
@@ -0,0 +1,158 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+#
+# Support for writing problem files through a compressor
+#
+# gzip - gzip-compressed output (*.gz), using the gzip module
+# zstd - Zstandard-compressed output (*.zst), using the zstandard
+#        module if it is installed, and otherwise by piping through
+#        the zstd executable
+#
+__all__ = ['compression_extensions',
+           'guess_compression',
+           'strip_compression_extension',
+           'compression_available',
+           'open_compressed_output']
+
+import io
+import gzip
+import subprocess
+
+import six
+
+from pyutilib.services import register_executable, registered_executable
+
+try:
+    import zstandard
+    zstandard_available = True
+except ImportError:
+    zstandard_available = False
+
+compression_extensions = {'gzip': '.gz',
+                          'zstd': '.zst'}
+
+# The compression levels used when writing files. gzip level 6 is the
+# default of the gzip executable, and zstd level 3 is the default of
+# the zstd executable.
+_compression_levels = {'gzip': 6,
+                       'zstd': 3}
+
+# The size (in bytes) of the buffer between the writer and the
+# compressor
+_buffer_size = 1 << 20
+
+def guess_compression(filename):
+    """
+    Return the compression implied by the extension of a filename, or
+    None if the filename does not have a compressed extension.
+    """
+    for compression, ext in six.iteritems(compression_extensions):
+        if filename.endswith(ext):
+            return compression
+    return None
+
+def strip_compression_extension(filename):
+    """Remove a compressed extension from a filename."""
+    compression = guess_compression(filename)
+    if compression is None:
+        return filename
+    return filename[:-len(compression_extensions[compression])]
+
+def compression_available(compression):
+    """
+    Return True if files can be written with the given compression.
+    """
+    if compression == 'gzip':
+        return True
+    elif compression == 'zstd':
+        return zstandard_available or \
+            (registered_executable('zstd') is not None)
+    return False
+
+class _CompressedOutput(object):
+    """
+    A text file object that writes through a compressor. The write
+    methods of the outermost stream are bound to this object, and
+    the streams are closed from the outermost to the innermost.
+    """
+
+    def __init__(self, ostream, streams, process=None):
+        self._ostream = ostream
+        self._streams = streams
+        self._process = process
+        self.write = ostream.write
+        self.writelines = ostream.writelines
+        self.flush = ostream.flush
+        self.closed = False
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for stream in self._streams:
+            stream.close()
+        if self._process is not None:
+            if self._process.wait() != 0:
+                raise RuntimeError(
+                    "The zstd executable returned nonzero error code (%s)"
+                    % (self._process.returncode))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, t, v, traceback):
+        self.close()
+
+def _text_stream(binary):
+    if six.PY3:
+        return io.TextIOWrapper(binary, write_through=True)
+    return binary
+
+def open_compressed_output(filename, compression=None, buffering=-1):
+    """
+    Open a file for writing text through the given compressor. The
+    compressed data is written directly to the file (no uncompressed
+    copy is created). If compression is None, the file is opened
+    without compression.
+    """
+    if compression is None:
+        return open(filename, "w", buffering)
+    if compression not in compression_extensions:
+        raise ValueError(
+            "Unknown compression '%s' (valid choices are: %s)"
+            % (compression, ', '.join(sorted(compression_extensions))))
+    if buffering < 0:
+        buffering = _buffer_size
+    level = _compression_levels[compression]
+    if compression == 'gzip':
+        compressor = gzip.GzipFile(filename, "wb", level)
+        buffered = io.BufferedWriter(compressor, buffering)
+        ostream = _text_stream(buffered)
+        return _CompressedOutput(ostream, [ostream, compressor])
+    if zstandard_available:
+        output_file = open(filename, "wb")
+        compressor = zstandard.ZstdCompressor(level=level).\
+            stream_writer(output_file)
+        buffered = io.BufferedWriter(compressor, buffering)
+        ostream = _text_stream(buffered)
+        return _CompressedOutput(ostream, [ostream, output_file])
+    zstd = registered_executable('zstd')
+    if zstd is None:
+        raise RuntimeError(
+            "Writing zstd-compressed files requires either the "
+            "zstandard module or the zstd executable")
+    process = subprocess.Popen([zstd.get_path(), '-q', '-f',
+                                '-%d' % level, '-o', filename],
+                               stdin=subprocess.PIPE,
+                               bufsize=buffering)
+    ostream = _text_stream(process.stdin)
+    return _CompressedOutput(ostream, [ostream], process=process)
+
+register_executable(name='zstd')
@@ -14,6 +14,8 @@ __all__ = ['ProblemFormat', 'ResultsFormat', 'guess_format']
 
 from pyutilib.enum import Enum
 
+from pyomo.opt.base.compression import strip_compression_extension
+
 #
 # pyomo - A pyomo.core.PyomoModel object, or a *.py file that defines such an object
 # cpxlp - A CPLEX LP file
@@ -43,6 +45,8 @@ ResultsFormat = Enum('osrl', 'results', 'sol', 'soln', 'yaml', 'json')
 
 
 def guess_format(filename):
+    # e.g., 'model.lp.gz' is a (compressed) CPLEX LP file
+    filename = strip_compression_extension(filename)
     formats = {}
     formats['py']=ProblemFormat.pyomo
     formats['nl']=ProblemFormat.nl
@@ -784,13 +784,209 @@ class OptSolver(Plugin):
         return config
 
 
+def _component_data_objects(obj):
+    """
+    Return the list of component data objects in a component (or the
+    list with a component data object).
+    """
+    if obj.is_indexed():
+        return list(obj.values())
+    return [obj]
+
+
 class PersistentSolver(OptSolver):
+    """
+    A solver that keeps a solver-side model across solves.
+
+    A Pyomo model is compiled into the solver with compile_instance(),
+    and subsequent solves of this model reuse the solver model.
+    Changes to the Pyomo model are applied to the solver model with
+    the incremental methods (add_variable, remove_variable,
+    add_constraint, remove_constraint, update_variable_bounds,
+    update_constraint_rhs and update_objective_coefficients), so
+    iterative algorithms only pay for the changes between solves.
+
+    The incremental methods accept components or component data
+    objects, and they call the corresponding _add_variable(), ...,
+    methods of the solver plugins with each component data object.
+    """
 
     def __init__(self, **kwds):
         """ Constructor """
 
         OptSolver.__init__(self,**kwds)
 
+    def compile_instance(self,
+                         pyomo_instance,
+                         symbolic_solver_labels=False,
+                         output_fixed_variable_bounds=False,
+                         skip_trivial_constraints=False):
+        """Create the solver model for a Pyomo model"""
+        raise NotImplementedError
+
+    def instance_compiled(self):
+        """True if a Pyomo model has been compiled"""
+        raise NotImplementedError
+
+    def compile_objective(self, pyomo_instance):
+        """Replace the objective of the solver model"""
+        raise NotImplementedError
+
+    def compile_variable_bounds(self, pyomo_instance, vars_to_update):
+        """
+        Update the variable bounds of the solver model.  The bounds of
+        all variables are updated if vars_to_update is empty;
+        otherwise, it is a list of (variable name, index) tuples.
+        """
+        from pyomo.core.base import Var
+        self._check_compiled("compile variable bounds")
+        if len(vars_to_update) == 0:
+            byObject = self._symbol_map.byObject
+            self.update_variable_bounds(
+                vardata for vardata
+                in pyomo_instance.component_data_objects(Var, active=True)
+                if id(vardata) in byObject)
+        else:
+            self.update_variable_bounds(
+                pyomo_instance.find_component(var_name)[var_index]
+                for var_name, var_index in vars_to_update)
+
+    def _remove_symbol(self, component_data):
+        """
+        Remove a component data object from the symbol map of the
+        compiled instance, and return its symbol.
+        """
+        symbol = self._symbol_map.byObject[id(component_data)]
+        del self._symbol_map.byObject[id(component_data)]
+        del self._symbol_map.bySymbol[symbol]
+        return symbol
+
+    def _check_compiled(self, action):
+        if not self.instance_compiled():
+            raise RuntimeError("***The %s solver plugin cannot %s - no "
+                               "instance is presently compiled"
+                               % (self.type, action))
+
+    def _compiled_data_objects(self, components, action, compiled=True):
+        """
+        Generate the component data objects in a component (or list
+        of components), checking whether they are in the solver model.
+        """
+        self._check_compiled(action)
+        if not isinstance(components, (list, tuple)):
+            components = [components]
+        byObject = self._symbol_map.byObject
+        for component in components:
+            for obj in _component_data_objects(component):
+                if (id(obj) in byObject) != compiled:
+                    if compiled:
+                        msg = "'%s' is not in the compiled instance"
+                    else:
+                        msg = "'%s' is already in the compiled instance"
+                    raise ValueError("The %s solver plugin cannot %s: "
+                                     % (self.type, action)
+                                     + msg % (obj.name,))
+                yield obj
+
+    def add_variable(self, var):
+        """Add a variable (or the variables in a component) to the solver model"""
+        for vardata in list(self._compiled_data_objects(
+                var, "add variables", compiled=False)):
+            self._add_variable(vardata)
+        self._update()
+
+    def remove_variable(self, var):
+        """Remove a variable (or the variables in a component) from the solver model"""
+        for vardata in list(self._compiled_data_objects(
+                var, "remove variables")):
+            self._remove_variable(vardata)
+        self._update()
+
+    def add_constraint(self, con):
+        """Add a constraint (or the constraints in a component) to the solver model"""
+        for condata in list(self._compiled_data_objects(
+                con, "add constraints", compiled=False)):
+            if condata.active:
+                self._add_constraint(condata)
+        self._update()
+
+    def remove_constraint(self, con):
+        """Remove a constraint (or the constraints in a component) from the solver model"""
+        for condata in list(self._compiled_data_objects(
+                con, "remove constraints")):
+            self._remove_constraint(condata)
+        self._update()
+
+    def update_variable_bounds(self, var):
+        """
+        Update the bounds of a variable (or the variables in a
+        component, or an iterable of variables) in the solver model.
+        The bounds of fixed variables are set to their values.
+        """
+        if hasattr(var, 'is_indexed'):
+            var = [var]
+        for vardata in list(self._compiled_data_objects(
+                list(var), "update variable bounds")):
+            self._update_variable_bounds(vardata)
+        self._update()
+
+    def update_constraint_rhs(self, con):
+        """
+        Update the bounds (the right-hand-side) of a constraint (or the
+        constraints in a component) in the solver model.  The
+        variable coefficients are not updated.
+        """
+        for condata in list(self._compiled_data_objects(
+                con, "update constraint bounds")):
+            self._update_constraint_rhs(condata)
+        self._update()
+
+    def update_objective_coefficients(self, coefficients):
+        """
+        Update the linear objective coefficients of variables in the
+        solver model, given a dictionary (or a list of tuples) that
+        maps variables to coefficients.
+        """
+        if hasattr(coefficients, 'items'):
+            coefficients = coefficients.items()
+        pairs = []
+        for var, coef in coefficients:
+            for vardata in self._compiled_data_objects(
+                    var, "update objective coefficients"):
+                pairs.append((vardata, coef))
+        for vardata, coef in pairs:
+            self._set_objective_coefficient(vardata, coef)
+        self._update()
+
+    #
+    # The methods that are implemented by the solver plugins
+    #
+
+    def _add_variable(self, vardata):
+        raise NotImplementedError
+
+    def _remove_variable(self, vardata):
+        raise NotImplementedError
+
+    def _add_constraint(self, condata):
+        raise NotImplementedError
+
+    def _remove_constraint(self, condata):
+        raise NotImplementedError
+
+    def _update_variable_bounds(self, vardata):
+        raise NotImplementedError
+
+    def _update_constraint_rhs(self, condata):
+        raise NotImplementedError
+
+    def _set_objective_coefficient(self, vardata, coef):
+        raise NotImplementedError
+
+    def _update(self):
+        """Apply pending changes to the solver model"""
+        pass
+
 
 
 def default_config_block(solver, init=False):
@@ -11,14 +11,24 @@
 __all__ = ()
 
 import time
+import shutil
+import logging
+import tempfile
+from collections import deque
 
 try:
     from collections import OrderedDict
 except ImportError:                         #pragma:nocover
     from ordereddict import OrderedDict
 
+import pyutilib.misc
+from pyutilib.common import ApplicationError
+from pyutilib.services import TempfileManager
+
 from pyomo.util.plugin import alias
 import pyomo.opt
+from pyomo.opt.base import OptSolver
+from pyomo.opt.solver import SystemCallSolver
 from pyomo.opt.parallel.manager import (ActionManagerError,
                                         ActionStatus,
                                         ActionHandle)
@@ -27,6 +37,8 @@ from pyomo.opt.parallel.async_solver import AsynchronousSolverManager
 import six
 from six import string_types
 
+logger = logging.getLogger('pyomo.opt')
+
 class SolverManager_Serial(AsynchronousSolverManager):
 
     alias("serial", doc="Synchronously execute solvers locally")
@@ -80,3 +92,296 @@ class SolverManager_Serial(AsynchronousSolverManager):
                             explanation=("No queued evaluations available in "
                                          "the 'serial' solver manager, which "
                                          "executes solvers synchronously"))
+
+
+def _copy_solver(opt):
+    """
+    Create a new solver with the configuration of a (shell) solver.
+    Each solve requires its own solver, since the solvers store the
+    state of the solve.
+    """
+    kwds = {}
+    if opt._user_executable is not None:
+        kwds['executable'] = opt._user_executable
+        kwds['validate'] = False
+    _opt = type(opt)(**kwds)
+    _opt.name = opt.name
+    if opt._problem_format is not None:
+        _opt.set_problem_format(opt._problem_format)
+    _opt._results_format = opt._results_format
+    _opt._default_variable_value = opt._default_variable_value
+    _opt.options.update(opt.options)
+    _opt.deactivate()
+    return _opt
+
+
+def prepare_queued_solve(manager, solver_type, args, kwds):
+    """
+    The common part of the queue operations of the solver managers
+    that execute the solvers outside of the calling process (the
+    'subprocess', 'pool' and 'asl_workers' solver managers).
+
+    The solver (the 'solver' or 'opt' keyword) is created if it is a
+    name, and it must be an instance of solver_type.  The models in the
+    arguments must be constructed, and the names of their active import
+    suffixes are added to the 'suffixes' keyword.  The problem files
+    are written when the solves are queued, so they are not streamed to
+    the solvers (the 'pipe' keyword is discarded).
+
+    Returns the solver, a flag that indicates whether the solver was
+    created, and a dictionary with the solver options (the options of
+    the solver, updated with the 'options' and 'options_string'
+    keywords).
+    """
+    opt = kwds.pop('solver', kwds.pop('opt', None))
+    if opt is None:
+        raise ActionManagerError(
+            "No solver passed to %s, use keyword option 'solver'"
+            % (type(manager).__name__) )
+    created = isinstance(opt, string_types)
+    if created:
+        opt = pyomo.opt.SolverFactory(
+            opt, solver_io=kwds.pop('solver_io', None))
+    if not isinstance(opt, solver_type):
+        if created:
+            opt.deactivate()
+        raise ActionManagerError(
+            "The %s cannot apply solver '%s', which is not a %s"
+            % (type(manager).__name__, opt.name, solver_type.__name__))
+
+    #
+    # The following block of code is taken from the OptSolver.solve()
+    # method, which we do not directly invoke with this interface
+    #
+    from pyomo.core.base import Block
+    from pyomo.core.base.suffix import active_import_suffix_generator
+    for arg in args:
+        if isinstance(arg, Block):
+            if not arg.is_constructed():
+                raise RuntimeError(
+                    "Attempting to solve model=%s with unconstructed "
+                    "component(s)" % (arg.name,) )
+
+            model_suffixes = list(name for (name,comp) \
+                                  in active_import_suffix_generator(arg))
+            if len(model_suffixes) > 0:
+                kwds_suffixes = kwds.setdefault('suffixes',[])
+                for name in model_suffixes:
+                    if name not in kwds_suffixes:
+                        kwds_suffixes.append(name)
+
+    # The problem files are written when the solves are queued
+    # (and cannot be streamed to the solvers)
+    kwds.pop('pipe', None)
+
+    solver_options = {}
+    for key in opt.options:
+        solver_options[key] = opt.options[key]
+    solver_options.update(kwds.pop('options', {}))
+    solver_options.update(
+        OptSolver._options_string_to_dict(kwds.pop('options_string', '')))
+    return opt, created, solver_options
+
+
+class SolverManager_Subprocess(AsynchronousSolverManager):
+    """
+    A solver manager that executes shell solvers asynchronously in
+    subprocesses, so that a single (Python) process can apply many
+    solvers concurrently.
+
+    The problem files are written when the solves are queued, and the
+    results are loaded into the models by the wait_*() methods.  The
+    number of concurrent subprocesses is limited by the
+    'max_processes' keyword (by default, it is unlimited).
+    """
+
+    alias("subprocess",
+          doc="Execute shell solvers asynchronously in local subprocesses")
+
+    def __init__(self, **kwds):
+        self.max_processes = kwds.pop('max_processes', None)
+        if self.max_processes is not None and self.max_processes < 1:
+            raise ValueError(
+                "The 'subprocess' solver manager requires at least one "
+                "process (max_processes=%s)" % (self.max_processes,))
+        super(SolverManager_Subprocess, self).__init__(**kwds)
+
+    def clear(self):
+        """
+        Clear manager state
+        """
+        super(SolverManager_Subprocess, self).clear()
+        self._pending = deque()
+        self._running = OrderedDict()
+        self._tasks = {}
+
+    def cancel(self, ah):
+        """
+        Cancel a queued solve, killing the solver if it is executing.
+        """
+        task = self._tasks.get(ah.id, None)
+        if task is None:
+            raise ActionManagerError(
+                "Cannot cancel action %s, which is not queued" % (ah,))
+        if ah.id in self._running:
+            task.opt._kill_solver()
+        else:
+            self._pending.remove(ah.id)
+        self._remove_task(ah.id, ActionStatus.error)
+        self.queued_action_counter -= 1
+        self._start_pending_solvers()
+
+    def _perform_queue(self, ah, *args, **kwds):
+        """
+        Perform the queue operation.  This method returns the ActionHandle,
+        and the ActionHandle status indicates whether the queue was successful.
+        """
+        opt, created, solver_options = \
+            prepare_queued_solve(self, SystemCallSolver, args, kwds)
+        if not created:
+            opt = _copy_solver(opt)
+        opt.options.update(solver_options)
+        opt.available(exception_flag=True)
+        from pyomo.core.base import Block
+        _model = None
+        for arg in args:
+            if isinstance(arg, Block):
+                _model = arg
+
+        #
+        # The temporary files of each solve are created in a separate
+        # directory, which is removed when the solve completes.
+        #
+        task = pyutilib.misc.Bunch(
+            opt=opt,
+            model=_model,
+            tempdir=tempfile.mkdtemp(prefix='tmp_solve',
+                                     dir=TempfileManager.tempdir),
+            time_start=time.time())
+        self._tasks[ah.id] = task
+        try:
+            with _TaskTempfiles(task, push=False):
+                opt._presolve(*args, **kwds)
+            if _model is not None:
+                opt._initialize_callbacks(_model)
+        except:
+            self._remove_task(ah.id, ActionStatus.error)
+            raise
+
+        self._pending.append(ah.id)
+        self._start_pending_solvers()
+        return ah
+
+    def _perform_wait_any(self):
+        """
+        Perform the wait_any operation.  This method returns an
+        ActionHandle with the results of waiting.  If None is returned
+        then the ActionManager assumes that it can call this method again.
+        Note that an ActionHandle can be returned with a dummy value,
+        to indicate an error.
+        """
+        if len(self._running) == 0:
+            self._start_pending_solvers()
+        if len(self._running) == 0:
+            return ActionHandle(error=True,
+                                explanation=("No queued evaluations available "
+                                             "in the 'subprocess' solver "
+                                             "manager"))
+        for ah_id, task in six.iteritems(self._running):
+            status = task.opt._poll_solver()
+            if status is not None:
+                break
+        else:
+            time.sleep(0.01)
+            return None
+
+        opt = task.opt
+        try:
+            if status.rc:
+                logger.error(
+                    "Solver (%s) returned non-zero return code (%s)"
+                    % (opt.name, status.rc,))
+                if status.log:
+                    logger.error("Solver log:\n" + str(status.log))
+                raise ApplicationError(
+                    "Solver (%s) did not exit normally" % opt.name)
+            with _TaskTempfiles(task, pop=False):
+                results = opt._postsolve()
+            results._smap_id = opt._smap_id
+            results._smap = None
+            _model = task.model
+            if _model is not None:
+                if opt._load_solutions:
+                    _model.solutions.load_from(
+                        results,
+                        select=opt._select_index,
+                        default_variable_value=opt._default_variable_value)
+                    results._smap_id = None
+                    results.solution.clear()
+                else:
+                    results._smap = _model.solutions.symbol_map[opt._smap_id]
+                    _model.solutions.delete_symbol_map(opt._smap_id)
+        except:
+            self._remove_task(ah_id, ActionStatus.error)
+            self.queued_action_counter -= 1
+            self._start_pending_solvers()
+            raise
+        results.pyomo_solve_time = time.time()-task.time_start
+
+        self.results[ah_id] = results
+        self._remove_task(ah_id, ActionStatus.done)
+        self._start_pending_solvers()
+        return self.event_handle[ah_id]
+
+    def _start_pending_solvers(self):
+        while len(self._pending) and \
+              ((self.max_processes is None) or
+               (len(self._running) < self.max_processes)):
+            ah_id = self._pending.popleft()
+            task = self._tasks[ah_id]
+            try:
+                with _TaskTempfiles(task):
+                    task.opt._start_solver()
+            except:
+                self._remove_task(ah_id, ActionStatus.error)
+                self.queued_action_counter -= 1
+                raise
+            self._running[ah_id] = task
+
+    def _remove_task(self, ah_id, status):
+        task = self._tasks.pop(ah_id)
+        self._running.pop(ah_id, None)
+        self.event_handle[ah_id].status = status
+        if status is not ActionStatus.done and task.model is not None:
+            task.model.solutions.delete_symbol_map(
+                getattr(task.opt, '_smap_id', None))
+        if not task.opt._keepfiles:
+            shutil.rmtree(task.tempdir, ignore_errors=True)
+
+
+
+class _TaskTempfiles(object):
+    """
+    A context in which the temporary files are created in the
+    directory of a solve.  The files are removed with the directory
+    (and not when the context exits), since the solves are
+    interleaved.  The context of the TempfileManager that is pushed
+    by the _presolve() method of the solvers is popped on exit, and
+    the context that is popped by _postsolve() is pushed on entry.
+    """
+
+    def __init__(self, task, push=True, pop=True):
+        self.tempdir = task.tempdir
+        self.push = push
+        self.pop = pop
+
+    def __enter__(self):
+        self._tempdir = TempfileManager.tempdir
+        TempfileManager.tempdir = self.tempdir
+        if self.push:
+            TempfileManager.push()
+
+    def __exit__(self, t, v, traceback):
+        TempfileManager.tempdir = self._tempdir
+        if self.pop:
+            TempfileManager.pop(remove=False)
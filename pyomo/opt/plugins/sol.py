@@ -11,7 +11,11 @@
 # Class for reading an AMPL *.sol file
 #
 
+__all__ = ['AmplSolution', 'read_sol']
+
 import re
+import struct
+import warnings
 
 import pyutilib.misc
 
@@ -23,8 +27,349 @@ from pyomo.opt import (SolverResults,
                        SolverStatus,
                        TerminationCondition)
 
+from six import iteritems
 from six.moves import xrange
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+
+class AmplSolution(object):
+    """
+    The data in an AMPL *.sol file.
+
+    The primal (x) and dual (y) values are NumPy arrays (or lists, if
+    NumPy is not available) that are ordered like the variables and
+    constraints of the NL file.  The suffix values are stored in a
+    dictionary that maps the suffix kind (0-var, 1-con, 2-obj,
+    3-prob) to a dictionary that maps the suffix names to a tuple of
+    (index, value) arrays.
+    """
+
+    __slots__ = ('message', 'options', 'vbtol', 'n_con', 'n_var',
+                 'objno', 'solve_result_num', 'x', 'y', 'suffixes',
+                 'remaining')
+
+    def __init__(self):
+        self.message = ""
+        self.options = []
+        self.vbtol = None
+        self.n_con = 0
+        self.n_var = 0
+        self.objno = 0
+        self.solve_result_num = 0
+        if numpy_available:
+            self.x = numpy.zeros(0)
+            self.y = numpy.zeros(0)
+        else:
+            self.x = []
+            self.y = []
+        self.suffixes = {}
+        self.remaining = ""
+
+    def status(self):
+        """
+        Return a tuple of the termination condition, solver status,
+        solution status and a message for the solve_result_num
+        """
+        return _solve_result_status(self.solve_result_num)
+
+
+def read_sol(filename, suffixes=None):
+    """
+    Read an AMPL *.sol file (in text or binary format) and return an
+    AmplSolution object.
+
+    The primal and dual values are parsed in bulk.  The suffixes that
+    match one of the regular expressions in the suffixes list are
+    read (by default, all suffixes are read).
+    """
+    with open(filename, "rb") as f:
+        header = f.read(10)
+    if header[4:10] == b'binary' and \
+       struct.unpack('i', header[:4])[0] == 6:
+        with open(filename, "rb") as f:
+            return _read_binary_sol(f.read(), suffixes)
+    with open(filename, "r") as f:
+        return _read_text_sol(f, suffixes)
+
+
+def _match(name, suffixes):
+    return suffixes is None or any(re.match(suf, name) for suf in suffixes)
+
+
+def _parse_values(data, count):
+    """
+    Parse a string with one value per line, which is expected to
+    contain count values
+    """
+    data = data.rstrip()
+    nlines = data.count('\n')+1 if data else 0
+    if nlines != count:
+        raise ValueError("expected %s values, but found %s lines"
+                         % (count, nlines))
+    if numpy_available:
+        with warnings.catch_warnings():
+            # (the values are checked below)
+            warnings.simplefilter("ignore")
+            ans = numpy.fromstring(data, dtype=float, sep=' ')
+        if len(ans) != count:
+            raise ValueError("expected %s values in %s lines"
+                             % (count, count))
+        return ans
+    return [float(val) for val in data.split('\n')]
+
+
+def _read_text_sol(fin, suffixes):
+    ans = AmplSolution()
+    #
+    msg = ""
+    line = fin.readline()
+    if line.strip() == "":
+        line = fin.readline()
+    while line:
+        if line[0] == '\n' or (line[0] == '\r' and line[1] == '\n'):
+            break
+        msg += line
+        line = fin.readline()
+    ans.message = msg
+    z = []
+    line = fin.readline()
+    if line[:7] == "Options":
+        line = fin.readline()
+        nopts = int(line)
+        need_vbtol = False
+        if nopts > 4:           # WEH - when is this true?
+            nopts -= 2
+            need_vbtol = True
+        for i in xrange(nopts + 4):
+            line = fin.readline()
+            z += [int(line)]
+        if need_vbtol:          # WEH - when is this true?
+            line = fin.readline()
+            ans.vbtol = float(line)
+    else:
+        raise ValueError("no Options line found")
+    ans.options = z[:nopts]
+    ans.n_con = z[nopts]
+    ans.n_var = z[nopts + 2]
+    m = z[nopts + 1] # constraints
+    n = z[nopts + 3] # variables
+    #
+    # The values are followed by the (optional) objno line
+    #
+    data = fin.read()
+    if data.startswith("objno"):
+        end = 0
+    else:
+        end = data.find("\nobjno")+1
+        if end == 0:
+            end = len(data)
+    values = _parse_values(data[:end], m+n)
+    ans.y = values[:m]
+    ans.x = values[m:]
+    lines = data[end:].split('\n')
+    if len(lines) and lines[-1] == "":
+        lines.pop()
+    if len(lines):
+        line = lines[0]
+        t = line.split()
+        if len(t) != 3:
+            raise ValueError("expected two numbers in objno line, "
+                             "but found '%s'" % (line))
+        ans.objno, ans.solve_result_num = int(t[1]), int(t[2])
+    #
+    # Read the suffixes
+    #
+    i = 1
+    while i < len(lines):
+        line = lines[i].split()
+        i += 1
+        if not line:
+            continue
+        if line[0] != 'suffix':
+            # We assume this is the start of a
+            # section like kestrel_option, which
+            # comes after all suffixes.
+            ans.remaining = "".join(l.strip()+"; " for l in lines[i:])
+            break
+        unmasked_kind = int(line[1])
+        kind = unmasked_kind & 3 # 0-var, 1-con, 2-obj, 3-prob
+        nvalues = int(line[2])
+        tabline = int(line[5])
+        suffix_name = lines[i].strip()
+        # ignore the translation of the table number to string
+        # value for now, this information can be obtained from the
+        # solver documentation
+        i += 1 + tabline
+        if _match(suffix_name, suffixes):
+            block = lines[i:i+nvalues]
+            if len(block) != nvalues:
+                raise ValueError("expected %s values for suffix '%s'"
+                                 % (nvalues, suffix_name))
+            if numpy_available:
+                vals = numpy.array(" ".join(block).split(), dtype=float)
+                if len(vals) != 2*nvalues:
+                    raise ValueError("invalid values for suffix '%s'"
+                                     % (suffix_name))
+                vals = vals.reshape((nvalues, 2))
+                index = vals[:,0].astype(int)
+                vals = vals[:,1]
+                if (unmasked_kind & 4) == 0:
+                    vals = vals.astype(int)
+            else:
+                convert_function = int
+                if (unmasked_kind & 4) == 4:
+                    convert_function = float
+                block = [val.split() for val in block]
+                index = [int(val[0]) for val in block]
+                vals = [convert_function(val[1]) for val in block]
+            ans.suffixes.setdefault(kind, {})[suffix_name] = (index, vals)
+        i += nvalues
+    return ans
+
+
+def _binary_records(data):
+    """
+    Generate the (Fortran-style) records of a binary *.sol file,
+    which are delimited by their length
+    """
+    pos = 0
+    while pos < len(data):
+        L = struct.unpack_from('i', data, pos)[0]
+        end = pos+4+L
+        if end+4 > len(data) or struct.unpack_from('i', data, end)[0] != L:
+            raise ValueError("invalid record at offset %s of a binary "
+                             "sol file" % (pos,))
+        yield data[pos+4:end]
+        pos = end+4
+
+
+def _unpack(fmt, record):
+    if numpy_available:
+        return numpy.frombuffer(record, dtype=fmt)
+    return list(struct.unpack('%s%s' % (len(record)//struct.calcsize(fmt),
+                                        fmt), record))
+
+
+def _read_binary_sol(data, suffixes):
+    ans = AmplSolution()
+    records = _binary_records(data)
+    next(records)               # "binary"
+    msg = ""
+    for rec in records:
+        if not rec:
+            break
+        msg += rec.decode('latin-1') + "\n"
+    ans.message = msg
+    rec = next(records, None)
+    if rec is None:
+        raise ValueError("no Options record found")
+    z = struct.unpack_from('i', rec)
+    nopts = z[0]
+    need_vbtol = False
+    if nopts > 4:
+        nopts -= 2
+        need_vbtol = True
+    z = struct.unpack_from('%si' % (nopts+5,), rec)[1:]
+    if need_vbtol:
+        ans.vbtol = struct.unpack_from('d', rec, 4*(nopts+5))[0]
+    ans.options = list(z[:nopts])
+    ans.n_con = z[nopts]
+    ans.n_var = z[nopts + 2]
+    m = z[nopts + 1] # constraints
+    n = z[nopts + 3] # variables
+    for attr, count in (('y', m), ('x', n)):
+        if count:
+            rec = next(records, b'')
+            if len(rec) != 8*count:
+                raise ValueError("expected %s values in the %s record"
+                                 % (count, attr))
+            setattr(ans, attr, _unpack('d', rec))
+    rec = next(records, None)
+    if rec is not None:
+        if len(rec) != 8:
+            raise ValueError("invalid objno record")
+        ans.objno, ans.solve_result_num = struct.unpack('2i', rec)
+    for rec in records:
+        unmasked_kind, nvalues, namelen, tablen = struct.unpack('4i', rec)
+        suffix_name = next(records)[:namelen].rstrip(b'\0').decode('latin-1')
+        if tablen:
+            next(records)
+        rec = next(records)
+        if not _match(suffix_name, suffixes):
+            continue
+        if (unmasked_kind & 4) == 4:
+            if len(rec) == 12*nvalues:
+                fmt = [('index', 'i'), ('value', 'd')]
+            else:
+                fmt = [('index', 'i'), ('pad', 'i'), ('value', 'd')]
+        else:
+            fmt = [('index', 'i'), ('value', 'i')]
+        size = sum(struct.calcsize(t) for _, t in fmt)
+        if len(rec) != size*nvalues:
+            raise ValueError("invalid values for suffix '%s'"
+                             % (suffix_name))
+        if numpy_available:
+            vals = numpy.frombuffer(rec, dtype=numpy.dtype(fmt))
+            index, vals = vals['index'], vals['value']
+        else:
+            vals = list(struct.unpack(
+                ''.join(t for _, t in fmt)*nvalues, rec))
+            width = len(fmt)
+            index, vals = vals[0::width], vals[width-1::width]
+        ans.suffixes.setdefault(unmasked_kind & 3, {})[suffix_name] = \
+            (index, vals)
+    return ans
+
+
+def _solve_result_status(solve_result_num):
+    """
+    Return the termination condition, solver status, solution status
+    and message for an AMPL solve_result_num
+    """
+    if (solve_result_num >= 0) and (solve_result_num <= 99):
+        return (TerminationCondition.optimal,
+                SolverStatus.ok,
+                SolutionStatus.optimal,
+                "OPTIMAL SOLUTION FOUND!")
+    elif (solve_result_num >= 100) and (solve_result_num <= 199):
+        return (TerminationCondition.optimal,
+                SolverStatus.warning,
+                SolutionStatus.optimal,
+                "Optimal solution indicated, but ERROR LIKELY!")
+    elif (solve_result_num >= 200) and (solve_result_num <= 299):
+        return (TerminationCondition.infeasible,
+                SolverStatus.warning,
+                SolutionStatus.infeasible,
+                "INFEASIBLE SOLUTION: constraints cannot be satisfied!")
+    elif (solve_result_num >= 300) and (solve_result_num <= 399):
+        return (TerminationCondition.unbounded,
+                SolverStatus.warning,
+                SolutionStatus.unbounded,
+                "UNBOUNDED PROBLEM: the objective can be improved "
+                "without limit!")
+    elif (solve_result_num >= 400) and (solve_result_num <= 499):
+        return (TerminationCondition.maxIterations,
+                SolverStatus.warning,
+                SolutionStatus.stoppedByLimit,
+                "EXCEEDED MAXIMUM NUMBER OF ITERATIONS: the solver "
+                "was stopped by a limit that you set!")
+    elif (solve_result_num >= 500) and (solve_result_num <= 599):
+        return (TerminationCondition.internalSolverError,
+                SolverStatus.error,
+                SolutionStatus.error,
+                "FAILURE: the solver stopped by an error condition "
+                "in the solver routines!")
+    return (TerminationCondition.unknown,
+            SolverStatus.ok,
+            SolutionStatus.unknown,
+            "")
+
+
 class ResultsReader_sol(results.AbstractResultsReader):
     """
     Class that reads in a *.sol results file and generates a
@@ -43,8 +388,8 @@ class ResultsReader_sol(results.AbstractResultsReader):
         Parse a *.sol file
         """
         try:
-            with open(filename,"r") as f:
-                return self._load(f, res, soln, suffixes)
+            return self._load(read_sol(filename, suffixes=suffixes),
+                              res, soln, suffixes)
         except ValueError as e:
             with open(filename,"r") as f:
                 fdata = f.read()
@@ -53,101 +398,29 @@ class ResultsReader_sol(results.AbstractResultsReader):
                 "SOL File Output:\n%s"
                 % (filename, str(e), fdata))
 
-    def _load(self, fin, res, soln, suffixes):
+    def _load(self, sol, res, soln, suffixes):
 
         if res is None:
             res = SolverResults()
         #
-        msg = ""
-        line = fin.readline()
-        if line.strip() == "":
-            line = fin.readline()
-        while line:
-            if line[0] == '\n' or (line[0] == '\r' and line[1] == '\n'):
-                break
-            msg += line
-            line = fin.readline()
-        z = []
-        line = fin.readline()
-        if line[:7] == "Options":
-            line = fin.readline()
-            nopts = int(line)
-            need_vbtol = False
-            if nopts > 4:           # WEH - when is this true?
-                nopts -= 2
-                need_vbtol = True
-            for i in xrange(nopts + 4):
-                line = fin.readline()
-                z += [int(line)]
-            if need_vbtol:          # WEH - when is this true?
-                line = fin.readline()
-                z += [float(line)]
+        if numpy_available:
+            # (the results store Python floats)
+            x = sol.x.tolist()
+            y = sol.y.tolist()
         else:
-            raise ValueError("no Options line found")
-        n = z[nopts + 3] # variables
-        m = z[nopts + 1] # constraints
-        x = []
-        y = []
-        i = 0
-        while i < m:
-            line = fin.readline()
-            y.append(float(line))
-            i += 1
-        i = 0
-        while i < n:
-            line = fin.readline()
-            x.append(float(line))
-            i += 1
-        objno = [0,0]
-        line = fin.readline()
-        if line:                    # WEH - when is this true?
-            if line[:5] != "objno":         #pragma:nocover
-                raise ValueError("expected 'objno', found '%s'" % (line))
-            t = line.split()
-            if len(t) != 3:
-                raise ValueError("expected two numbers in objno line, "
-                                 "but found '%s'" % (line))
-            objno = [int(t[1]), int(t[2])]
+            x = sol.x
+            y = sol.y
+        msg = sol.message
         res.solver.message = msg.strip()
         res.solver.message = res.solver.message.replace("\n","; ")
         res.solver.message = pyutilib.misc.yaml_fix(res.solver.message)
         ##res.solver.instanceName = osrl.header.instanceName
         ##res.solver.systime = osrl.header.time
-        res.solver.status = SolverStatus.ok
-        soln_status = SolutionStatus.unknown
-        if (objno[1] >= 0) and (objno[1] <= 99):
-            objno_message = "OPTIMAL SOLUTION FOUND!"
-            res.solver.termination_condition = TerminationCondition.optimal
-            res.solver.status = SolverStatus.ok
-            soln_status = SolutionStatus.optimal
-        elif (objno[1] >= 100) and (objno[1] <= 199):
-            objno_message = "Optimal solution indicated, but ERROR LIKELY!"
-            res.solver.termination_condition = TerminationCondition.optimal
-            res.solver.status = SolverStatus.warning
-            soln_status = SolutionStatus.optimal
-        elif (objno[1] >= 200) and (objno[1] <= 299):
-            objno_message = "INFEASIBLE SOLUTION: constraints cannot be satisfied!"
-            res.solver.termination_condition = TerminationCondition.infeasible
-            res.solver.status = SolverStatus.warning
-            soln_status = SolutionStatus.infeasible
-        elif (objno[1] >= 300) and (objno[1] <= 399):
-            objno_message = "UNBOUNDED PROBLEM: the objective can be improved without limit!"
-            res.solver.termination_condition = TerminationCondition.unbounded
-            res.solver.status = SolverStatus.warning
-            soln_status = SolutionStatus.unbounded
-        elif (objno[1] >= 400) and (objno[1] <= 499):
-            objno_message = ("EXCEEDED MAXIMUM NUMBER OF ITERATIONS: the solver "
-                             "was stopped by a limit that you set!")
-            res.solver.termination_condition = TerminationCondition.maxIterations
-            res.solver.status = SolverStatus.warning
-            soln_status = SolutionStatus.stoppedByLimit
-        elif (objno[1] >= 500) and (objno[1] <= 599):
-            objno_message = ("FAILURE: the solver stopped by an error condition "
-                             "in the solver routines!")
-            res.solver.termination_condition = TerminationCondition.internalSolverError
-            res.solver.status = SolverStatus.error
-            soln_status = SolutionStatus.error
-        res.solver.id = objno[1]
+        (res.solver.termination_condition,
+         res.solver.status,
+         soln_status,
+         objno_message) = sol.status()
+        res.solver.id = sol.solve_result_num
         ##res.problem.name = osrl.header.instanceName
         if res.solver.termination_condition in [TerminationCondition.unknown,
                         TerminationCondition.maxIterations,
@@ -176,72 +449,34 @@ class ResultsReader_sol(results.AbstractResultsReader):
                 for i in xrange(0,len(y)):
                     soln_constraint["c"+str(i)] = {"Dual" : y[i]}
 
-            ### Read suffixes ###
-            line = fin.readline()
-            while line:
-                line = line.strip()
-                if line == "":
-                    continue
-                line = line.split()
-                if line[0] != 'suffix':
-                    # We assume this is the start of a
-                    # section like kestrel_option, which
-                    # comes after all suffixes.
-                    remaining = ""
-                    line = fin.readline()
-                    while line:
-                        remaining += line.strip()+"; "
-                        line = fin.readline()
-                    res.solver.message += remaining
-                    break
-                unmasked_kind = int(line[1])
-                kind = unmasked_kind & 3 # 0-var, 1-con, 2-obj, 3-prob
-                convert_function = int
-                if (unmasked_kind & 4) == 4:
-                    convert_function = float
-                nvalues = int(line[2])
-                namelen = int(line[3])
-                tablen = int(line[4])
-                tabline = int(line[5])
-                suffix_name = fin.readline().strip()
-                if any(re.match(suf,suffix_name) for suf in suffixes):
-                    # ignore translation of the table number to string value for now,
-                    # this information can be obtained from the solver documentation
-                    for n in xrange(tabline):
-                        fin.readline()
+            ### Load suffixes ###
+            for kind, values in sorted(iteritems(sol.suffixes)):
+                for suffix_name, (index, vals) in sorted(iteritems(values)):
+                    if numpy_available:
+                        index = index.tolist()
+                        vals = vals.tolist()
                     if kind == 0: # Var
-                        for cnt in xrange(nvalues):
-                            suf_line = fin.readline().split()
-                            soln_variable["v"+suf_line[0]][suffix_name] = \
-                                convert_function(suf_line[1])
+                        for idx, val in zip(index, vals):
+                            soln_variable["v"+str(idx)][suffix_name] = val
                     elif kind == 1: # Con
-                        for cnt in xrange(nvalues):
-                            suf_line = fin.readline().split()
-                            key = "c"+suf_line[0]
+                        # convert the first letter of the suffix name to upper case,
+                        # mainly for pretty-print / output purposes. these are lower-cased
+                        # when loaded into real suffixes, so it is largely redundant.
+                        translated_suffix_name = suffix_name[0].upper() + suffix_name[1:]
+                        for idx, val in zip(index, vals):
+                            key = "c"+str(idx)
                             if key not in soln_constraint:
                                 soln_constraint[key] = {}
-                            # convert the first letter of the suffix name to upper case,
-                            # mainly for pretty-print / output purposes. these are lower-cased
-                            # when loaded into real suffixes, so it is largely redundant.
-                            translated_suffix_name = suffix_name[0].upper() + suffix_name[1:]
-                            soln_constraint[key][translated_suffix_name] = \
-                                convert_function(suf_line[1])
+                            soln_constraint[key][translated_suffix_name] = val
                     elif kind == 2: # Obj
-                        for cnt in xrange(nvalues):
-                            suf_line = fin.readline().split()
-                            soln.objective.setdefault("o"+suf_line[0],{})[suffix_name] = \
-                                convert_function(suf_line[1])
+                        for idx, val in zip(index, vals):
+                            soln.objective.setdefault("o"+str(idx),{})[suffix_name] = val
                     elif kind == 3: # Prob
                         # Skip problem kind suffixes for now. Not sure the
                         # best place to put them in the results object
-                        for cnt in xrange(nvalues):
-                            suf_line = fin.readline().split()
-                            soln.problem[suffix_name] = convert_function(suf_line[1])
-                else:
-                    # do not store the suffix in the solution object
-                    for cnt in xrange(nvalues):
-                        fin.readline()
-                line = fin.readline()
+                        for val in vals:
+                            soln.problem[suffix_name] = val
+            res.solver.message += sol.remaining
 
         #
         # This is a bit of a hack to accommodate PICO.  If
@@ -250,7 +485,7 @@ class ResultsReader_sol(results.AbstractResultsReader):
         # is that these may be inconsistent values!
         #
         if res.problem.number_of_constraints == 0:
-            res.problem.number_of_constraints = m
-        res.problem.number_of_variables = n
+            res.problem.number_of_constraints = len(y)
+        res.problem.number_of_variables = len(x)
         res.problem.number_of_objectives = 1
         return res
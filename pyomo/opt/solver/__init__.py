@@ -7,5 +7,6 @@
 #  This software is distributed under the BSD License.
 #  _________________________________________________________________________
 
+from pyomo.opt.solver.cache import *
 from pyomo.opt.solver.shellcmd import *
 from pyomo.opt.solver.ilmcmd import *
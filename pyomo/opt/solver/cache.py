@@ -0,0 +1,169 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+__all__ = ['SolverCapabilityCache', 'solver_capability_cache']
+
+import os
+import json
+import logging
+import tempfile
+
+logger = logging.getLogger('pyomo.opt')
+
+#
+# The default location of the cache file, which can be changed with
+# the PYOMO_SOLVER_CACHE environment variable (an empty value disables
+# the file, so that the probes are only cached in memory)
+#
+_default_cache_filename = os.path.join(os.path.expanduser('~'),
+                                       '.pyomo',
+                                       'solver_cache.json')
+
+
+class SolverCapabilityCache(object):
+    """
+    A persistent cache of the results of probing solver executables
+    (e.g., their versions, the problem formats that they support and
+    license checks).
+
+    The results are keyed on the real path of the executables, and
+    they are discarded when the modification time or the size of an
+    executable changes.  The cache is saved in a JSON file, so the
+    executables are only probed once across Python processes.
+    Results that depend on more than the executable (e.g., license
+    checks) are probed with persistent=False, and they are only
+    cached in memory.
+    """
+
+    def __init__(self, filename=None):
+        if filename is None:
+            filename = os.environ.get('PYOMO_SOLVER_CACHE',
+                                      _default_cache_filename)
+        self.set_filename(filename)
+
+    def set_filename(self, filename):
+        """
+        Set the file where the cache is saved.  If the filename is
+        empty (or None), then the cache is only kept in memory.
+        """
+        self.filename = filename if filename else None
+        self._entries = None
+        # the results that are not saved in the file, keyed on
+        # (path, key)
+        self._transient = {}
+
+    def clear(self):
+        """Discard the cached probes (and remove the cache file)"""
+        self._entries = {}
+        self._transient = {}
+        if self.filename is not None:
+            try:
+                os.remove(self.filename)
+            except OSError:
+                pass
+
+    def probe(self, executable, key, func, persistent=True):
+        """
+        Return the cached result of probing an executable, calling
+        func() to probe the executable if there is no valid entry for
+        the key.
+
+        Results that are None are not cached, so failed probes are
+        repeated.  If the executable does not exist, then func() is
+        always called.  If persistent is False, the result is only
+        cached in memory (for the current process).
+        """
+        if executable is None:
+            return func()
+        try:
+            path = os.path.realpath(executable)
+            signature = self._signature(path)
+        except OSError:
+            return func()
+
+        if not persistent:
+            entry = self._transient.get((path, key))
+            if (entry is not None) and (entry[0] == signature):
+                return entry[1]
+            result = func()
+            if result is not None:
+                self._transient[(path, key)] = (signature, result)
+            return result
+
+        entry = self._entries_by_path().get(path)
+        if (entry is not None) and (entry['signature'] == signature):
+            if key in entry['probes']:
+                return entry['probes'][key]
+        else:
+            entry = {'signature': signature, 'probes': {}}
+
+        result = func()
+        if result is not None:
+            entry['probes'][key] = result
+            self._entries[path] = entry
+            self._save(path, entry)
+        return result
+
+    @staticmethod
+    def _signature(path):
+        status = os.stat(path)
+        return [status.st_mtime, status.st_size]
+
+    def _entries_by_path(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self):
+        if (self.filename is None) or (not os.path.exists(self.filename)):
+            return {}
+        try:
+            with open(self.filename, 'r') as f:
+                entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            logger.warning("Ignoring the invalid solver cache file '%s'"
+                           % (self.filename))
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def _save(self, path, entry):
+        if self.filename is None:
+            return
+        #
+        # Other processes may have updated the file since it was
+        # read, so the entry is merged into the entries of the file.
+        # The file is replaced (rather than rewritten) so that
+        # concurrent readers never see a partial file.
+        #
+        entries = self._read()
+        entries[path] = entry
+        tmpname = None
+        try:
+            dirname = os.path.dirname(os.path.abspath(self.filename))
+            if not os.path.exists(dirname):
+                os.makedirs(dirname)
+            fd, tmpname = tempfile.mkstemp(dir=dirname,
+                                           prefix='.solver_cache')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            if os.name == 'nt' and os.path.exists(self.filename):
+                os.remove(self.filename)
+            os.rename(tmpname, self.filename)
+        except (IOError, OSError):
+            # the cache is an optimization, and it is not an error if
+            # it cannot be saved
+            if (tmpname is not None) and os.path.exists(tmpname):
+                os.remove(tmpname)
+
+#
+# The cache used by the solver plugins
+#
+solver_capability_cache = SolverCapabilityCache()
@@ -12,7 +12,11 @@ __all__ = ['SystemCallSolver']
 import os
 import sys
 import time
+import errno
 import logging
+import subprocess
+
+import six
 
 import pyutilib.misc
 from pyutilib.common import ApplicationError, WindowsError
@@ -23,9 +27,16 @@ from pyutilib.subprocess import run
 from pyomo.opt.base import *
 from pyomo.opt.base.solvers import *
 from pyomo.opt.results import SolverStatus, SolverResults
+from pyomo.opt.solver.cache import solver_capability_cache
 
 logger = logging.getLogger('pyomo.opt')
 
+# The suffixes of the problem files that are streamed to the
+# executables through named pipes
+_pipe_suffixes = {ProblemFormat.cpxlp: '.pyomo.lp',
+                  ProblemFormat.mps: '.pyomo.mps',
+                  ProblemFormat.nl: '.pyomo.nl'}
+
 class SystemCallSolver(OptSolver):
     """ A generic command line solver """
 
@@ -43,6 +54,17 @@ class SystemCallSolver(OptSolver):
         # broadly useful for reporting, and in cases where
         # a solver plugin may not report execution time.
         self._last_solve_time = None
+        # the subprocess of the solver command (when it is executed
+        # asynchronously)
+        self._process = None
+        # the compressions (e.g., 'gzip') of the problem files
+        # that the executable can read, by problem format
+        self._compressed_problem_formats = {}
+        # the problem formats that the executable reads sequentially,
+        # so that the problem files can be streamed to it through a
+        # named pipe (while they are written)
+        self._pipe_problem_formats = set()
+        self._pipe_writer = None
 
         if executable is not None:
             self.set_executable(name=executable, validate=validate)
@@ -122,6 +144,26 @@ class SystemCallSolver(OptSolver):
             return False
         return True
 
+    def version(self):
+        """
+        Returns a tuple describing the solver executable version.
+
+        The versions are cached (across Python processes) for each
+        executable, so an executable is only probed once.
+        """
+        if self._version is None:
+            executable = self.executable()
+            if executable is None:
+                self._version = self._get_version()
+            else:
+                version = solver_capability_cache.probe(executable,
+                                                        'version',
+                                                        self._get_version)
+                if version is not None:
+                    version = tuple(version)
+                self._version = version
+        return self._version
+
     def create_command_line(self,executable,problem_files):
         """
         Create the command line that is executed.
@@ -192,6 +234,50 @@ class SystemCallSolver(OptSolver):
 
         self._keepfiles = kwds.pop("keepfiles", False)
 
+        # Write the problem file through a compressor, if the
+        # executable can read it directly
+        compression = kwds.pop("compression", None)
+        if compression is not None:
+            if compression in self._compressed_problem_formats.get(
+                    self._problem_format, ()):
+                kwds["compression"] = compression
+            else:
+                logger.warning(
+                    "Solver '%s' cannot read %s-compressed problem files "
+                    "in format '%s'; writing an uncompressed problem file"
+                    % (self.name, compression, self._problem_format))
+
+        # Stream the problem file to the executable through a named
+        # pipe, so that writing the problem and starting the solver
+        # overlap (see _convert_problem() and _apply_solver()).  The
+        # problem is then written by _apply_solver(), so its symbol
+        # map (and self._smap_id) do not exist until the solver is
+        # applied: solvers that use the symbol map before that
+        # (see _uses_symbol_map_in_presolve()) write a problem file.
+        self._pipe_writer = None
+        self._pipe = kwds.pop("pipe", False)
+        if self._pipe:
+            if not hasattr(os, 'mkfifo'):
+                reason = "named pipes are not supported on this platform"
+            elif self._problem_format not in self._pipe_problem_formats:
+                reason = "the executable cannot read problem files in " \
+                         "format '%s' through a named pipe" \
+                         % (self._problem_format,)
+            elif self._customized_execute_command():
+                reason = "the solver customizes the execution of the " \
+                         "executable"
+            elif self._uses_symbol_map_in_presolve():
+                reason = "the solver uses the symbol map of the problem " \
+                         "before the executable is started"
+            else:
+                reason = None
+            if reason is not None:
+                logger.warning(
+                    "Solver '%s' cannot stream the problem through a "
+                    "named pipe (%s); writing a problem file"
+                    % (self.name, reason))
+                self._pipe = False
+
         OptSolver._presolve(self, *args, **kwds)
 
         #
@@ -218,7 +304,108 @@ class SystemCallSolver(OptSolver):
            os.path.exists(self._soln_file):
             os.remove(self._soln_file)
 
+    def _uses_symbol_map_in_presolve(self):
+        """
+        Return True if _presolve() uses the symbol map of the problem
+        file (e.g., to write a warm-start file).  The problem file is
+        then never streamed through a named pipe, because the symbol
+        map of a streamed problem is only created by _apply_solver().
+        """
+        return False
+
+    def _convert_problem(self,
+                         args,
+                         problem_format,
+                         valid_problem_formats,
+                         **kwds):
+        if self._pipe:
+            from pyomo.core.base import Block
+            if len(args) == 1 and isinstance(args[0], Block):
+                #
+                # The problem is written by _apply_solver() (after
+                # the executable is started), and the problem file is
+                # a named pipe
+                #
+                filename = TempfileManager.create_tempfile(
+                    suffix=_pipe_suffixes[problem_format]
+                    + compression_extensions.get(
+                        kwds.get('compression', None), ''))
+                os.remove(filename)
+                os.mkfifo(filename)
+                self._pipe_writer = (args[0], problem_format, kwds)
+                return (filename,), problem_format, None
+        return OptSolver._convert_problem(self,
+                                          args,
+                                          problem_format,
+                                          valid_problem_formats,
+                                          **kwds)
+
     def _apply_solver(self):
+        if self._pipe_writer is not None:
+            return self._apply_solver_pipe()
+        self._prepare_command()
+        sys.stdout.flush()
+        self._rc, self._log = self._execute_command(self._command)
+        sys.stdout.flush()
+        return Bunch(rc=self._rc, log=self._log)
+
+    def _apply_solver_pipe(self):
+        """
+        Start the executable, and then write the problem into the
+        named pipe that it reads.
+        """
+        model, problem_format, io_options = self._pipe_writer
+        self._pipe_writer = None
+        filename = self._problem_files[0]
+        self._start_solver()
+        #
+        # Opening the pipe for writing blocks until the executable
+        # opens it for reading, so wait for the executable to open it
+        # (or to exit).  The pipe is then written by the problem
+        # writer.
+        #
+        fd = None
+        while fd is None:
+            try:
+                fd = os.open(filename, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:
+                if sys.exc_info()[1].errno != errno.ENXIO:
+                    self._kill_solver()
+                    raise
+                if self._process.poll() is not None:
+                    break
+                time.sleep(0.01)
+        pipe_closed = False
+        if fd is not None:
+            try:
+                try:
+                    (filename, self._smap_id) = model.write(
+                        filename=filename,
+                        format=problem_format,
+                        solver_capability=self.has_capability,
+                        io_options=io_options)
+                except (IOError, OSError):
+                    # The executable may have closed the pipe (e.g.,
+                    # because it failed)
+                    if sys.exc_info()[1].errno != errno.EPIPE:
+                        raise
+                    pipe_closed = True
+            except:
+                self._kill_solver()
+                raise
+            finally:
+                os.close(fd)
+        status = self._poll_solver()
+        while status is None:
+            time.sleep(0.01)
+            status = self._poll_solver()
+        if not status.rc and (fd is None or pipe_closed):
+            raise ApplicationError(
+                "Solver (%s) exited before reading the problem from "
+                "the named pipe '%s'" % (self.name, filename))
+        return status
+
+    def _prepare_command(self):
         if registered_executable('timer'):
             self._timer = registered_executable('timer').get_path()
         #
@@ -237,11 +424,96 @@ class SystemCallSolver(OptSolver):
             if self._problem_files is not []:
                 print("Solver problem files: %s" % str(self._problem_files))
 
-        sys.stdout.flush()
-        self._rc, self._log = self._execute_command(self._command)
-        sys.stdout.flush()
+    #
+    # The asynchronous counterpart of _apply_solver(): _start_solver()
+    # executes the command in a subprocess, and _poll_solver() returns
+    # None until the subprocess completes.  Solvers are applied
+    # asynchronously as follows:
+    #
+    #     opt._presolve(*args, **kwds)
+    #     opt._start_solver()
+    #     while opt._poll_solver() is None:
+    #         ...
+    #     results = opt._postsolve()
+    #
+
+    def _start_solver(self):
+        """
+        Start executing the solver command without waiting for it to
+        complete.
+        """
+        self._prepare_command()
+        self._process = None
+        if self._customized_execute_command():
+            # Solvers that customize the execution of the command
+            # (e.g., the mock solvers) are executed synchronously
+            self._rc, self._log = self._execute_command(self._command)
+            return
+        command = self._command
+        if isinstance(command.cmd, (list, tuple)):
+            cmd = list(command.cmd)
+        else:
+            cmd = pyutilib.misc.quote_split(command.cmd.strip())
+        _input = command.script if 'script' in command else None
+        self._process_output = TempfileManager.create_tempfile(
+            suffix='.solver.out')
+        self._process_start = time.time()
+        with open(self._process_output, 'w') as OUTPUT:
+            try:
+                self._process = subprocess.Popen(
+                    cmd,
+                    stdin=None if _input is None else subprocess.PIPE,
+                    stdout=OUTPUT,
+                    stderr=subprocess.STDOUT,
+                    env=command.env)
+            except OSError:
+                err = sys.exc_info()[1]
+                msg = 'Could not execute the command: %s\tError message: %s'
+                raise ApplicationError(msg % (command.cmd, err))
+        if _input is not None:
+            self._process.stdin.write(_input.encode())
+            self._process.stdin.close()
+
+    def _customized_execute_command(self):
+        return six.get_unbound_function(type(self)._execute_command) is not \
+            SystemCallSolver.__dict__['_execute_command']
+
+    def _poll_solver(self):
+        """
+        Return the status of the solver (see _apply_solver()) if the
+        solver command has completed, and None otherwise.  The
+        command is killed if it exceeds the time limit.
+        """
+        if self._process is not None:
+            rc = self._process.poll()
+            if rc is None:
+                if (self._timelimit is None) or \
+                   (time.time() - self._process_start < self._timelimit):
+                    return None
+                self._kill_solver()
+                rc = -1
+            self._process = None
+            self._last_solve_time = time.time() - self._process_start
+            with open(self._process_output, 'r') as OUTPUT:
+                log = OUTPUT.read()
+            if self._tee:
+                sys.stdout.write(log)
+                sys.stdout.flush()
+            self._rc, self._log = rc, log
         return Bunch(rc=self._rc, log=self._log)
 
+    def _kill_solver(self):
+        """
+        Kill the solver command (if it is executing).
+        """
+        if self._process is not None and self._process.poll() is None:
+            try:
+                self._process.kill()
+            except OSError:
+                # The process may have completed before the kill
+                pass
+            self._process.wait()
+
     def _postsolve(self):
 
         if self._log_file is not None:
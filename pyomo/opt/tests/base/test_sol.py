@@ -11,6 +11,7 @@
 #
 
 import os
+import struct
 from os.path import abspath, dirname
 pyomodir = dirname(abspath(__file__))+os.sep+".."+os.sep+".."+os.sep
 currdir = dirname(abspath(__file__))+os.sep
@@ -22,6 +23,7 @@ import pyomo.opt
 from pyomo.opt import (TerminationCondition,
                        SolutionStatus,
                        SolverStatus)
+from pyomo.opt.plugins.sol import read_sol
 
 old_tempdir = pyutilib.services.TempfileManager.tempdir
 
@@ -39,6 +41,29 @@ class Test(unittest.TestCase):
         pyutilib.services.TempfileManager.tempdir = old_tempdir
         if os.path.exists(currdir+"test_sol.txt"):
             os.remove(currdir+"test_sol.txt")
+        for fname in ("test_binary.sol", "test_load.sol", "test_load.nl"):
+            if os.path.exists(currdir+fname):
+                os.remove(currdir+fname)
+
+    def _write_binary_sol(self, filename, x, y, objno, suffixes):
+        def record(fmt, *args):
+            data = struct.pack(fmt, *args)
+            return struct.pack('i', len(data)) + data + \
+                struct.pack('i', len(data))
+        with open(filename, 'wb') as f:
+            f.write(record('6s', b'binary'))
+            f.write(record('6s', b'Solved'))
+            f.write(record(''))
+            f.write(record('8i', 3, 1, 1, 0, len(y), len(y), len(x), len(x)))
+            f.write(record('%sd' % len(y), *y))
+            f.write(record('%sd' % len(x), *x))
+            f.write(record('2i', 0, objno))
+            for kind, name, values in suffixes:
+                f.write(record('4i', kind, len(values), len(name)+1, 0))
+                f.write(record('%ss' % (len(name)+1), name.encode()))
+                fmt = 'id' if kind & 4 else 'ii'
+                f.write(record('='+fmt*len(values),
+                               *[v for pair in values for v in pair]))
 
     def test_factory(self):
         with pyomo.opt.ReaderFactory("sol") as reader:
@@ -105,5 +130,91 @@ class Test(unittest.TestCase):
             with self.assertRaises(ValueError):
                 soln = reader(currdir+"bad_objnoline.sol")
 
+    def test_read_sol(self):
+        sol = read_sol(currdir+"conopt_optimal.sol")
+        self.assertEqual(sol.message.splitlines()[0],
+                         "CONOPT 3.17A: Optimal; objective 1")
+        self.assertEqual(list(sol.options), [1, 1, 0])
+        self.assertEqual((sol.n_con, sol.n_var), (1, 1))
+        self.assertEqual(list(sol.x), [1])
+        self.assertEqual(list(sol.y), [1])
+        self.assertEqual((sol.objno, sol.solve_result_num), (0, 0))
+        self.assertEqual(sol.status()[:3],
+                         (TerminationCondition.optimal,
+                          SolverStatus.ok,
+                          SolutionStatus.optimal))
+        self.assertEqual(sorted(sol.suffixes), [0, 1])
+        index, vals = sol.suffixes[0]['sstatus']
+        self.assertEqual((list(index), list(vals)), ([0], [1]))
+        index, vals = sol.suffixes[1]['sstatus']
+        self.assertEqual((list(index), list(vals)), ([0], [3]))
+        sol = read_sol(currdir+"conopt_optimal.sol", suffixes=['dual'])
+        self.assertEqual(sol.suffixes, {})
+
+    def test_read_binary_sol(self):
+        self._write_binary_sol(currdir+"test_binary.sol",
+                               [1.5, -2.0, 0.0], [3.25],
+                               200,
+                               [(0, 'sstatus', [(0, 1), (2, 3)]),
+                                (5, 'dual', [(0, 0.5)])])
+        sol = read_sol(currdir+"test_binary.sol")
+        self.assertEqual(sol.message, "Solved\n")
+        self.assertEqual(list(sol.x), [1.5, -2.0, 0.0])
+        self.assertEqual(list(sol.y), [3.25])
+        self.assertEqual(sol.solve_result_num, 200)
+        index, vals = sol.suffixes[0]['sstatus']
+        self.assertEqual((list(index), list(vals)), ([0, 2], [1, 3]))
+        index, vals = sol.suffixes[1]['dual']
+        self.assertEqual((list(index), list(vals)), ([0], [0.5]))
+        with pyomo.opt.ReaderFactory("sol") as reader:
+            soln = reader(currdir+"test_binary.sol", suffixes=["sstatus"])
+        self.assertEqual(soln.solver.termination_condition,
+                         TerminationCondition.infeasible)
+        self.assertEqual(soln.solution(0).variable['v2'],
+                         {'Value': 0.0, 'sstatus': 3})
+
+    def test_load_from_sol(self):
+        from pyomo.environ import (ConcreteModel, Var, Objective,
+                                   Constraint, Suffix)
+        model = ConcreteModel()
+        model.x = Var([1,2,3])
+        model.x[3].fix(5)
+        model.o = Objective(expr=model.x[1] + model.x[2] + model.x[3])
+        model.c = Constraint(expr=model.x[1] >= 2*model.x[2])
+        model.d = Constraint(expr=model.x[1] + model.x[2] <= 4)
+        model.dual = Suffix(direction=Suffix.IMPORT)
+        model.sstatus = Suffix(direction=Suffix.IMPORT)
+        model.dual[model.c] = 7
+        fname, smap_id = model.write(currdir+"test_load.nl")
+        smap = model.solutions.symbol_map[smap_id]
+        v = smap.getIndexedObjects('v')
+        c = smap.getIndexedObjects('c')
+        self.assertEqual(len(v), 2)
+        with open(currdir+"test_load.sol", "w") as f:
+            f.write("Solved\n\nOptions\n3\n1\n1\n0\n2\n2\n2\n2\n"
+                    "0.5\n-1.5\n10\n20\nobjno 0 0\n"
+                    "suffix 0 1 8 0 0\nsstatus\n1 2\n"
+                    "suffix 1 1 8 0 0\nsstatus\n0 4\n")
+        sol = read_sol(currdir+"test_load.sol")
+        model.solutions.load_from_sol(sol, smap_id)
+        self.assertEqual((v[0].value, v[1].value), (10, 20))
+        self.assertFalse(v[0].stale)
+        self.assertEqual(model.x[3].value, 5)
+        self.assertEqual((model.dual[c[0]], model.dual[c[1]]), (0.5, -1.5))
+        self.assertEqual(len(model.sstatus), 2)
+        self.assertEqual(model.sstatus[v[1]], 2)
+        self.assertEqual(model.sstatus[c[0]], 4)
+        self.assertNotIn(smap_id, model.solutions.symbol_map)
+        # The sol file must match the NL file
+        model.x[3].unfix()
+        fname, smap_id = model.write(currdir+"test_load.nl")
+        self.assertRaises(ValueError,
+                          model.solutions.load_from_sol, sol, smap_id)
+        model.x[3].fix()
+        fname, smap_id = model.write(currdir+"test_load.nl")
+        sol.solve_result_num = 500
+        self.assertRaises(ValueError,
+                          model.solutions.load_from_sol, sol, smap_id)
+
 if __name__ == "__main__":
     unittest.main()
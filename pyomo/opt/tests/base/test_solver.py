@@ -20,6 +20,8 @@ import pyutilib.services
 
 import pyomo.util.plugin
 import pyomo.opt
+from pyomo.core.base import SymbolMap, TextLabeler, ComponentMap
+from pyomo.environ import *
 
 old_tempdir = pyutilib.services.TempfileManager.tempdir
 
@@ -36,6 +38,141 @@ class TestSolver1(pyomo.opt.OptSolver):
         return False
 
 
+class TestPersistentSolver1(pyomo.opt.PersistentSolver):
+    """A persistent solver that records the incremental updates"""
+
+    def __init__(self, **kwds):
+        kwds['type'] = 'ptest_type'
+        pyomo.opt.PersistentSolver.__init__(self,**kwds)
+        self._symbol_map = None
+        self.updates = []
+
+    def compile_instance(self, pyomo_instance, **kwds):
+        self._symbol_map = SymbolMap()
+        for ctype in (Var, Constraint):
+            self._symbol_map.createSymbols(
+                pyomo_instance.component_data_objects(ctype, active=True),
+                TextLabeler())
+
+    def instance_compiled(self):
+        return self._symbol_map is not None
+
+    def _add_variable(self, vardata):
+        self._symbol_map.getSymbol(vardata, TextLabeler())
+        self.updates.append(('add_variable', vardata.name))
+
+    def _remove_variable(self, vardata):
+        del self._symbol_map.byObject[id(vardata)]
+        self.updates.append(('remove_variable', vardata.name))
+
+    def _add_constraint(self, condata):
+        self._symbol_map.getSymbol(condata, TextLabeler())
+        self.updates.append(('add_constraint', condata.name))
+
+    def _remove_constraint(self, condata):
+        del self._symbol_map.byObject[id(condata)]
+        self.updates.append(('remove_constraint', condata.name))
+
+    def _update_variable_bounds(self, vardata):
+        self.updates.append(('bounds', vardata.name, vardata.lb, vardata.ub))
+
+    def _update_constraint_rhs(self, condata):
+        self.updates.append(('rhs', condata.name, value(condata.upper)))
+
+    def _set_objective_coefficient(self, vardata, coef):
+        self.updates.append(('objective', vardata.name, coef))
+
+    def _update(self):
+        self.updates.append('update')
+
+
+class PersistentSolverDebug(unittest.TestCase):
+
+    def setUp(self):
+        m = self.model = ConcreteModel()
+        m.x = Var([1,2], bounds=(0,1))
+        m.y = Var()
+        m.c = Constraint(expr=m.x[1] + m.x[2] <= 1)
+        self.opt = TestPersistentSolver1()
+
+    def test_not_compiled(self):
+        self.assertFalse(self.opt.instance_compiled())
+        self.assertRaises(RuntimeError, self.opt.add_variable, self.model.y)
+        self.assertRaises(RuntimeError,
+                          self.opt.update_variable_bounds, self.model.x)
+        self.assertRaises(RuntimeError,
+                          self.opt.update_objective_coefficients,
+                          ComponentMap([(self.model.y, 1)]))
+        self.assertEqual(self.opt.updates, [])
+
+    def test_variables(self):
+        m = self.model
+        self.opt.compile_instance(m)
+        m.z = Var([1,2])
+        self.opt.add_variable(m.z)
+        self.assertEqual(self.opt.updates,
+                         [('add_variable', 'z[1]'),
+                          ('add_variable', 'z[2]'),
+                          'update'])
+        # the variables are already compiled
+        self.assertRaises(ValueError, self.opt.add_variable, m.z[1])
+        del self.opt.updates[:]
+        self.opt.remove_variable([m.z[2], m.y])
+        self.assertEqual(self.opt.updates,
+                         [('remove_variable', 'z[2]'),
+                          ('remove_variable', 'y'),
+                          'update'])
+        self.assertRaises(ValueError, self.opt.remove_variable, m.y)
+
+    def test_constraints(self):
+        m = self.model
+        self.opt.compile_instance(m)
+        m.d = Constraint([1,2], rule=lambda m, i: m.x[i] <= 2)
+        m.d[2].deactivate()
+        self.opt.add_constraint(m.d)
+        self.assertEqual(self.opt.updates,
+                         [('add_constraint', 'd[1]'), 'update'])
+        del self.opt.updates[:]
+        m.d[1].set_value(m.x[1] <= 3)
+        self.opt.update_constraint_rhs(m.d[1])
+        self.opt.remove_constraint(m.c)
+        self.assertEqual(self.opt.updates,
+                         [('rhs', 'd[1]', 3), 'update',
+                          ('remove_constraint', 'c'), 'update'])
+        self.assertRaises(ValueError, self.opt.update_constraint_rhs, m.c)
+
+    def test_bounds(self):
+        m = self.model
+        self.opt.compile_instance(m)
+        m.x[2].setub(2)
+        self.opt.update_variable_bounds(m.x)
+        self.assertEqual(self.opt.updates,
+                         [('bounds', 'x[1]', 0, 1),
+                          ('bounds', 'x[2]', 0, 2),
+                          'update'])
+        del self.opt.updates[:]
+        self.opt.compile_variable_bounds(m, [('x', 2)])
+        self.assertEqual(self.opt.updates,
+                         [('bounds', 'x[2]', 0, 2), 'update'])
+        del self.opt.updates[:]
+        self.opt.compile_variable_bounds(m, [])
+        self.assertEqual(len(self.opt.updates), 4)
+
+    def test_objective_coefficients(self):
+        m = self.model
+        self.opt.compile_instance(m)
+        self.opt.update_objective_coefficients([(m.x, 2), (m.y, -1)])
+        self.assertEqual(self.opt.updates,
+                         [('objective', 'x[1]', 2),
+                          ('objective', 'x[2]', 2),
+                          ('objective', 'y', -1),
+                          'update'])
+        m.z = Var()
+        self.assertRaises(ValueError,
+                          self.opt.update_objective_coefficients,
+                          ComponentMap([(m.z, 1)]))
+
+
 class OptSolverDebug(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,189 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for pyomo.opt.solver.cache
+#
+
+import os
+import shutil
+import tempfile
+
+import pyutilib.th as unittest
+
+from pyomo.opt.solver import (SystemCallSolver,
+                              SolverCapabilityCache,
+                              solver_capability_cache)
+
+
+class _Probe(object):
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+class _VersionSolver(SystemCallSolver):
+
+    def __init__(self, executable, **kwds):
+        kwds['type'] = 'version_test'
+        SystemCallSolver.__init__(self, **kwds)
+        self._exe = executable
+        self.probe = _Probe((1,2,3,0))
+
+    def _default_executable(self):
+        return self._exe
+
+    def _get_version(self):
+        return self.probe()
+
+
+class TestSolverCapabilityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'cache', 'solvers.json')
+        self.exe = os.path.join(self.tmpdir, 'solver')
+        with open(self.exe, 'w') as f:
+            f.write('#!/bin/sh\n')
+        os.chmod(self.exe, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_probe(self):
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe('1.2')
+        self.assertEqual(cache.probe(self.exe, 'version', probe), '1.2')
+        self.assertEqual(cache.probe(self.exe, 'version', probe), '1.2')
+        self.assertEqual(probe.calls, 1)
+        # the keys are probed separately
+        other = _Probe(True)
+        self.assertEqual(cache.probe(self.exe, 'license', other), True)
+        self.assertEqual(other.calls, 1)
+        self.assertEqual(probe.calls, 1)
+
+    def test_persistent(self):
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe([1,2,3,0])
+        cache.probe(self.exe, 'version', probe)
+        self.assertTrue(os.path.exists(self.filename))
+        cache = SolverCapabilityCache(self.filename)
+        self.assertEqual(cache.probe(self.exe, 'version', probe), [1,2,3,0])
+        self.assertEqual(probe.calls, 1)
+        cache.clear()
+        self.assertFalse(os.path.exists(self.filename))
+        cache.probe(self.exe, 'version', probe)
+        self.assertEqual(probe.calls, 2)
+
+    def test_transient(self):
+        # results probed with persistent=False are only kept in memory
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe(True)
+        self.assertEqual(cache.probe(self.exe, 'license', probe,
+                                     persistent=False), True)
+        self.assertEqual(cache.probe(self.exe, 'license', probe,
+                                     persistent=False), True)
+        self.assertEqual(probe.calls, 1)
+        self.assertFalse(os.path.exists(self.filename))
+        cache.probe(self.exe, 'version', _Probe(1))
+        cache = SolverCapabilityCache(self.filename)
+        cache.probe(self.exe, 'license', probe, persistent=False)
+        self.assertEqual(probe.calls, 2)
+        # (and they are discarded when the executable changes)
+        status = os.stat(self.exe)
+        os.utime(self.exe, (status.st_atime, status.st_mtime+10))
+        cache.probe(self.exe, 'license', probe, persistent=False)
+        self.assertEqual(probe.calls, 3)
+
+    def test_environment(self):
+        old = os.environ.get('PYOMO_SOLVER_CACHE', None)
+        try:
+            os.environ['PYOMO_SOLVER_CACHE'] = self.filename
+            self.assertEqual(SolverCapabilityCache().filename, self.filename)
+            os.environ['PYOMO_SOLVER_CACHE'] = ''
+            self.assertIs(SolverCapabilityCache().filename, None)
+        finally:
+            if old is None:
+                del os.environ['PYOMO_SOLVER_CACHE']
+            else:
+                os.environ['PYOMO_SOLVER_CACHE'] = old
+
+    def test_in_memory(self):
+        cache = SolverCapabilityCache('')
+        probe = _Probe(1)
+        cache.probe(self.exe, 'version', probe)
+        cache.probe(self.exe, 'version', probe)
+        self.assertEqual(probe.calls, 1)
+        self.assertEqual(os.listdir(self.tmpdir), ['solver'])
+
+    def test_modified_executable(self):
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe(1)
+        cache.probe(self.exe, 'version', probe)
+        status = os.stat(self.exe)
+        os.utime(self.exe, (status.st_atime, status.st_mtime+10))
+        cache.probe(self.exe, 'version', probe)
+        self.assertEqual(probe.calls, 2)
+        with open(self.exe, 'a') as f:
+            f.write('exit 0\n')
+        cache = SolverCapabilityCache(self.filename)
+        cache.probe(self.exe, 'version', probe)
+        self.assertEqual(probe.calls, 3)
+
+    def test_failed_probe(self):
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe(None)
+        self.assertIs(cache.probe(self.exe, 'version', probe), None)
+        self.assertIs(cache.probe(self.exe, 'version', probe), None)
+        self.assertEqual(probe.calls, 2)
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_missing_executable(self):
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe(1)
+        missing = os.path.join(self.tmpdir, 'missing')
+        cache.probe(missing, 'version', probe)
+        cache.probe(missing, 'version', probe)
+        cache.probe(None, 'version', probe)
+        self.assertEqual(probe.calls, 3)
+
+    def test_invalid_file(self):
+        os.makedirs(os.path.dirname(self.filename))
+        with open(self.filename, 'w') as f:
+            f.write('{ invalid')
+        cache = SolverCapabilityCache(self.filename)
+        probe = _Probe(1)
+        self.assertEqual(cache.probe(self.exe, 'version', probe), 1)
+        cache = SolverCapabilityCache(self.filename)
+        self.assertEqual(cache.probe(self.exe, 'version', probe), 1)
+        self.assertEqual(probe.calls, 1)
+
+    def test_solver_version(self):
+        filename = solver_capability_cache.filename
+        solver_capability_cache.set_filename(self.filename)
+        try:
+            with _VersionSolver(self.exe) as opt:
+                self.assertEqual(opt.version(), (1,2,3,0))
+            with _VersionSolver(self.exe) as opt:
+                # the cached version is converted back to a tuple
+                self.assertEqual(opt.version(), (1,2,3,0))
+                self.assertEqual(opt.probe.calls, 0)
+            with _VersionSolver(None) as opt:
+                self.assertEqual(opt.version(), (1,2,3,0))
+                self.assertEqual(opt.probe.calls, 1)
+        finally:
+            solver_capability_cache.set_filename(filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
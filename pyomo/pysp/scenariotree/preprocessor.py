@@ -18,6 +18,8 @@ import time
 # simple_preprocessor, which in turn is invoked by the preprocess()
 # method of PyomoModel.
 from pyomo.opt import ProblemFormat, PersistentSolver
+from pyomo.core.base import ComponentMap
+from pyomo.repn.dependencies import RepnDependencyMap
 from pyomo.repn.canonical_repn import LinearCanonicalRepn
 from pyomo.repn.compute_canonical_repn import preprocess_block_objectives \
     as canonical_preprocess_block_objectives
@@ -33,7 +35,6 @@ from pyomo.repn.compute_ampl_repn import preprocess_constraint \
     as ampl_preprocess_constraint
 from pyomo.repn.ampl_repn import generate_ampl_repn
 from pyomo.repn.canonical_repn import generate_canonical_repn
-import pyomo.util
 from pyomo.pysp.util.config import (PySPConfigBlock,
                                     safe_declare_common_option)
 from pyomo.pysp.util.configured_object import PySPConfiguredObject
@@ -41,11 +42,6 @@ from pyomo.pysp.util.configured_object import PySPConfiguredObject
 from six import iteritems, itervalues
 from six.moves import xrange
 
-canonical_expression_preprocessor = \
-    pyomo.util.PyomoAPIFactory("pyomo.repn.compute_canonical_repn")
-ampl_expression_preprocessor = \
-    pyomo.util.PyomoAPIFactory("pyomo.repn.compute_ampl_repn")
-
 
 #
 # We only want to do the minimal amount of work to get the instance
@@ -101,6 +97,11 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
         self.objective_updated = {}
         self.all_constraints_updated = {}
         self.constraints_updated_list = {}
+        # maps between instance name and a (problem format,
+        # RepnDependencyMap) pair for the constraint repns on the
+        # instance, which allows fixed and freed variables to be
+        # preprocessed without preprocessing every constraint
+        self._repn_dependencies = {}
 
     def add_scenario(self, scenario, scenario_instance, scenario_solver):
 
@@ -116,6 +117,7 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
         self.objective_updated[scenario._name] = True
         self.all_constraints_updated[scenario._name] = True
         self.constraints_updated_list[scenario._name] = []
+        self._repn_dependencies[scenario._name] = (None, RepnDependencyMap())
 
         self.objective_updated[scenario._name] = True
         self.all_constraints_updated[scenario._name] = True
@@ -149,6 +151,7 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
         del self.objective_updated[scenario._name]
         del self.all_constraints_updated[scenario._name]
         del self.constraints_updated_list[scenario._name]
+        del self._repn_dependencies[scenario._name]
 
         del self.objective_updated[scenario._name]
         del self.all_constraints_updated[scenario._name]
@@ -389,22 +392,69 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
             _cleanup()
             return
 
+        problem_format = solver.problem_format()
+        dependency_map_format, dependency_map = \
+            self._repn_dependencies[scenario_name]
+        if dependency_map_format != problem_format:
+            # the dependencies do not describe the repns
+            # that are required by this solver
+            dependency_map_format = None
+
+        fixed_variables_preprocessed = False
         if (instance_fixed_variables or instance_freed_variables) and \
            (self._options.preprocess_fixed_variables):
 
-            if self._options.verbose:
-                print("Running full preprocessing for scenario %s"
-                      % (scenario_name))
+            if (dependency_map_format is None) or \
+               instance_all_constraints_updated or \
+               persistent_solver_in_use:
 
-            if solver.problem_format() == ProblemFormat.nl:
-                ampl_expression_preprocessor({}, model=scenario_instance)
-            else:
-                canonical_expression_preprocessor({}, model=scenario_instance)
+                if self._options.verbose:
+                    print("Running full preprocessing for scenario %s"
+                          % (scenario_name))
 
-            # We've preprocessed the entire instance, no point in checking
-            # anything else
-            _cleanup()
-            return
+                dependency_map.clear()
+                if problem_format == ProblemFormat.nl:
+                    preprocess_block_constraints = \
+                        ampl_preprocess_block_constraints
+                    preprocess_block_objectives = \
+                        ampl_preprocess_block_objectives
+                else:
+                    preprocess_block_constraints = \
+                        canonical_preprocess_block_constraints
+                    preprocess_block_objectives = \
+                        canonical_preprocess_block_objectives
+                idMap = {}
+                for block in scenario_instance.block_data_objects(
+                        active=True):
+                    preprocess_block_constraints(
+                        block,
+                        idMap=idMap,
+                        dependency_map=dependency_map)
+                    preprocess_block_objectives(block, idMap=idMap)
+                self._repn_dependencies[scenario_name] = \
+                    (problem_format, dependency_map)
+
+                # We've preprocessed the entire instance, no point in
+                # checking anything else
+                _cleanup()
+                return
+
+            # Only the constraints that reference a fixed or freed
+            # variable need to be preprocessed (along with the
+            # objective)
+            variables = [scenario_instance.find_component(name)[index]
+                         for name, index in (instance_fixed_variables +
+                                             instance_freed_variables)]
+            instance_constraints_updated_list = \
+                list(instance_constraints_updated_list)
+            instance_constraints_updated_list.extend(
+                dependency_map.get_dependents(variables))
+            instance_objective_updated = True
+            fixed_variables_preprocessed = True
+
+            if self._options.verbose:
+                print("Preprocessing constraints that reference fixed or "
+                      "freed variables for scenario %s" % (scenario_name))
 
         if instance_objective_updated:
 
@@ -423,7 +473,8 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
                 solver.compile_objective(scenario_instance)
 
         if (instance_fixed_variables or instance_freed_variables) and \
-           (persistent_solver_in_use):
+           (persistent_solver_in_use) and \
+           (not fixed_variables_preprocessed):
 
             if self._options.verbose:
                 print("Compiling fixed status updates in persistent solver "
@@ -446,18 +497,27 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
                 print("Preprocessing all constraints for scenario %s"
                       % (scenario_name))
 
+            dependency_map.clear()
             if solver.problem_format() == ProblemFormat.nl:
                 idMap = {}
                 for block in scenario_instance.block_data_objects(
                         active=True,
                         descend_into=True):
-                    ampl_preprocess_block_constraints(block, idMap=idMap)
+                    ampl_preprocess_block_constraints(
+                        block,
+                        idMap=idMap,
+                        dependency_map=dependency_map)
             else:
                 idMap = {}
                 for block in scenario_instance.block_data_objects(
                         active=True,
                         descend_into=True):
-                    canonical_preprocess_block_constraints(block, idMap=idMap)
+                    canonical_preprocess_block_constraints(
+                        block,
+                        idMap=idMap,
+                        dependency_map=dependency_map)
+            self._repn_dependencies[scenario_name] = \
+                (problem_format, dependency_map)
 
         elif len(instance_constraints_updated_list) > 0:
 
@@ -488,6 +548,8 @@ class ScenarioTreePreprocessor(PySPConfiguredObject):
                     setattr(block, repn_name, ComponentMap())
                 getattr(block, repn_name)[constraint_data] = \
                     repn_func(constraint_data.body, idMap=idMap)
+                if dependency_map_format is not None:
+                    dependency_map.add(constraint_data, constraint_data.body)
 
         if persistent_solver_in_use and \
            (not solver.instance_compiled()):
@@ -29,7 +29,7 @@ from pyomo.repn.canonical_repn import (collect_linear_canonical_repn,
 from pyomo.core.base import expr_common
 
 import six
-from six import itervalues, iteritems, StringIO
+from six import itervalues, StringIO
 from six.moves import xrange, zip
 
 logger = logging.getLogger('pyomo.core')
@@ -215,521 +215,481 @@ class AmplRepn(object):
             return False
         return True
 
-def _generate_ampl_repn(exp):
-    ampl_repn = AmplRepn()
-
-    # We need to do this not at the global scope in case someone changed
-    # the mode after importing the environment.
-    _using_pyomo4_trees = expr_common.mode == expr_common.Mode.pyomo4_trees
+#
+# Generate the AMPL repn of an expression.
+#
+# The expression tree is walked with an explicit stack of frames, so
+# the depth of the expressions it can process is not limited by the
+# Python recursion limit. Each frame records the expression being
+# processed, the arguments whose repns are needed, the index of the
+# next argument to process, the results collected so far and the
+# handler that combines them into the repn of the expression.
+#
+# Leaves are not converted to AmplRepn objects: the result for an
+# unfixed variable is the variable itself and the result for a fixed
+# leaf is its value. The handlers accept these along with AmplRepn
+# objects.
+#
 
-    exp_type = type(exp)
+# Node kinds (cached by type in _node_kind)
+_kind_native = 0
+_kind_var = 1
+_kind_fixed = 2
+_kind_leaf = 3
+_kind_sum_coopr3 = 4
+_kind_sum_pyomo4 = 5
+_kind_linear_pyomo4 = 6
+_kind_product_coopr3 = 7
+_kind_product_pyomo4 = 8
+_kind_division_pyomo4 = 9
+_kind_negation_pyomo4 = 10
+_kind_pow = 11
+_kind_external = 12
+_kind_intrinsic = 13
+_kind_if = 14
+_kind_relational = 15
+_kind_other = 16
+
+_node_kind = {}
+
+def _classify_node(exp, using_pyomo4_trees):
+    exp_type = exp.__class__
     if exp_type in native_numeric_types:
-        ampl_repn._constant = value(exp)
-        return ampl_repn
+        return _kind_native
+    if not exp.is_expression():
+        if issubclass(exp_type, _VarData):
+            return _kind_var
+        if issubclass(exp_type, (_ParamData, NumericConstant)):
+            return _kind_fixed
+        return _kind_leaf
+    if using_pyomo4_trees:
+        if exp_type is Expr._LinearExpression:
+            return _kind_linear_pyomo4
+        if exp_type is Expr._SumExpression:
+            return _kind_sum_pyomo4
+        if exp_type is Expr._ProductExpression:
+            return _kind_product_pyomo4
+        if exp_type is Expr._DivisionExpression:
+            return _kind_division_pyomo4
+        if exp_type is Expr._NegationExpression:
+            return _kind_negation_pyomo4
+    else:
+        if exp_type is Expr._SumExpression:
+            return _kind_sum_coopr3
+        if exp_type is Expr._ProductExpression:
+            return _kind_product_coopr3
+    if exp_type is Expr._PowExpression:
+        return _kind_pow
+    if exp_type is Expr._ExternalFunctionExpression:
+        return _kind_external
+    if issubclass(exp_type, Expr._IntrinsicFunctionExpression):
+        return _kind_intrinsic
+    if exp_type is Expr.Expr_if:
+        return _kind_if
+    if (exp_type is Expr._InequalityExpression) or \
+       (exp_type is Expr._EqualityExpression):
+        return _kind_relational
+    return _kind_other
+
+def _as_ampl_repn(result):
+    if result.__class__ is AmplRepn:
+        return result
+    ampl_repn = AmplRepn()
+    if result.__class__ in native_numeric_types:
+        ampl_repn._constant = result
+    else:
+        var_ID = id(result)
+        ampl_repn._linear_terms_coef[var_ID] = 1.0
+        ampl_repn._linear_vars[var_ID] = result
+    return ampl_repn
 
-    #
-    # Expression
-    #
-    elif exp.is_expression():
-
-        #
-        # Sum
-        #
-        if _using_pyomo4_trees and (exp_type is Expr._LinearExpression):
-            ampl_repn._constant = value(exp._const)
-            ampl_repn._nonlinear_expr = None
-            for child_exp in exp._args:
-                exp_coef = value(exp._coef[id(child_exp)])
-                if exp_coef != 0:
-                    child_repn = _generate_ampl_repn(child_exp)
-                    # adjust the constant
-                    ampl_repn._constant += exp_coef * child_repn._constant
-
-                    # adjust the linear terms
-                    for var_ID in child_repn._linear_vars:
-                        if var_ID in ampl_repn._linear_terms_coef:
-                            ampl_repn._linear_terms_coef[var_ID] += \
-                                exp_coef * child_repn._linear_terms_coef[var_ID]
-                        else:
-                            ampl_repn._linear_terms_coef[var_ID] = \
-                                exp_coef * child_repn._linear_terms_coef[var_ID]
-                    # adjust the linear vars
-                    ampl_repn._linear_vars.update(child_repn._linear_vars)
-
-                    # adjust the nonlinear terms
-                    if not child_repn._nonlinear_expr is None:
-                        if ampl_repn._nonlinear_expr is None:
-                            ampl_repn._nonlinear_expr = \
-                                [(exp_coef, child_repn._nonlinear_expr)]
-                        else:
-                            ampl_repn._nonlinear_expr.append(
-                                (exp_coef, child_repn._nonlinear_expr))
-                    # adjust the nonlinear vars
-                    ampl_repn._nonlinear_vars.update(child_repn._nonlinear_vars)
-
-            return ampl_repn
-
-        elif _using_pyomo4_trees and (exp_type is Expr._SumExpression):
-            ampl_repn._constant = 0.0
-            ampl_repn._nonlinear_expr = None
-            for child_exp in exp._args:
-                child_repn = _generate_ampl_repn(child_exp)
-                # adjust the constant
-                ampl_repn._constant += child_repn._constant
-
-                # adjust the linear terms
-                for var_ID in child_repn._linear_vars:
-                    if var_ID in ampl_repn._linear_terms_coef:
-                        ampl_repn._linear_terms_coef[var_ID] += \
-                            child_repn._linear_terms_coef[var_ID]
-                    else:
-                        ampl_repn._linear_terms_coef[var_ID] = \
-                            child_repn._linear_terms_coef[var_ID]
-                # adjust the linear vars
-                ampl_repn._linear_vars.update(child_repn._linear_vars)
-
-                # adjust the nonlinear terms
-                if not child_repn._nonlinear_expr is None:
-                    if ampl_repn._nonlinear_expr is None:
-                        ampl_repn._nonlinear_expr = \
-                            [(1, child_repn._nonlinear_expr)]
-                    else:
-                        ampl_repn._nonlinear_expr.append(
-                            (1, child_repn._nonlinear_expr))
-                # adjust the nonlinear vars
-                ampl_repn._nonlinear_vars.update(child_repn._nonlinear_vars)
-            return ampl_repn
-
-        elif exp_type is Expr._SumExpression:
-            assert not _using_pyomo4_trees
-            ampl_repn._constant = exp._const
-            ampl_repn._nonlinear_expr = None
-            for i in xrange(len(exp._args)):
-                exp_coef = exp._coef[i]
-                if exp_coef != 0:
-                    child_exp = exp._args[i]
-                    child_repn = _generate_ampl_repn(child_exp)
-                    # adjust the constant
-                    ampl_repn._constant += exp_coef * child_repn._constant
-
-                    # adjust the linear terms
-                    for var_ID in child_repn._linear_vars:
-                        if var_ID in ampl_repn._linear_terms_coef:
-                            ampl_repn._linear_terms_coef[var_ID] += \
-                                exp_coef * child_repn._linear_terms_coef[var_ID]
-                        else:
-                            ampl_repn._linear_terms_coef[var_ID] = \
-                                exp_coef * child_repn._linear_terms_coef[var_ID]
-                    # adjust the linear vars
-                    ampl_repn._linear_vars.update(child_repn._linear_vars)
-
-                    # adjust the nonlinear terms
-                    if not child_repn._nonlinear_expr is None:
-                        if ampl_repn._nonlinear_expr is None:
-                            ampl_repn._nonlinear_expr = \
-                                [(exp_coef, child_repn._nonlinear_expr)]
-                        else:
-                            ampl_repn._nonlinear_expr.append(
-                                (exp_coef, child_repn._nonlinear_expr))
-                    # adjust the nonlinear vars
-                    ampl_repn._nonlinear_vars.update(child_repn._nonlinear_vars)
-            return ampl_repn
-
-        #
-        # Product
-        #
-        elif (not _using_pyomo4_trees) and \
-             (exp_type is Expr._ProductExpression):
-            #
-            # Iterate through the denominator.  If they
-            # aren't all constants, then simply return this
-            # expression.
-            #
-            denom = 1.0
-            for e in exp._denominator:
-                if e.is_fixed():
-                    denom *= value(e)
+def _leaf_result(exp):
+    if exp.is_fixed():
+        return value(exp)
+    elif isinstance(exp, _VarData):
+        return exp
+    raise ValueError("Unexpected expression type: "+str(exp))
+
+def _combine_sum(exp, results, data):
+    # coefs is None for an (unweighted) pyomo4 sum
+    constant, coefs = data
+    ampl_repn = AmplRepn()
+    linear_terms_coef = ampl_repn._linear_terms_coef
+    linear_vars = ampl_repn._linear_vars
+    nonlinear_vars = ampl_repn._nonlinear_vars
+    nonlinear_expr = None
+    for i, child in enumerate(results):
+        exp_coef = 1 if coefs is None else coefs[i]
+        child_type = child.__class__
+        if child_type is AmplRepn:
+            # adjust the constant
+            constant += exp_coef * child._constant
+            # adjust the linear terms
+            child_coef = child._linear_terms_coef
+            for var_ID in child._linear_vars:
+                if var_ID in linear_terms_coef:
+                    linear_terms_coef[var_ID] += exp_coef * child_coef[var_ID]
                 else:
-                    ampl_repn._nonlinear_expr = exp
-                    break
-                if denom == 0.0:
-                    raise ZeroDivisionError(
-                        "Divide-by-zero error - offending sub-expression: "+str(e))
-
-            if ampl_repn._nonlinear_expr is not None:
-                # we have a nonlinear expression ... build up all the vars
-                for e in exp._denominator:
-                    arg_repn = _generate_ampl_repn(e)
-                    ampl_repn._nonlinear_vars.update(arg_repn._linear_vars)
-                    ampl_repn._nonlinear_vars.update(arg_repn._nonlinear_vars)
-
-                for e in exp._numerator:
-                    arg_repn = _generate_ampl_repn(e)
-                    ampl_repn._nonlinear_vars.update(arg_repn._linear_vars)
-                    ampl_repn._nonlinear_vars.update(arg_repn._nonlinear_vars)
-                return ampl_repn
-
-            #
-            # OK, the denominator is a constant.
-            #
-            # build up the ampl_repns for the numerator
-            n_linear_args = 0
-            n_nonlinear_args = 0
-            arg_repns = list()
-            for e in exp._numerator:
-                e_repn = _generate_ampl_repn(e)
-                arg_repns.append(e_repn)
-                # check if the expression is not nonlinear else it is nonlinear
-                if e_repn._nonlinear_expr is not None:
-                    n_nonlinear_args += 1
-                # Check whether the expression is constant or else it is linear
-                elif len(e_repn._linear_vars) > 0:
-                    n_linear_args += 1
-                # At this point we do not have a nonlinear
-                # expression and there are no linear
-                # terms. If the expression constant is zero,
-                # then we have a zero term in the product
-                # expression, so the entire product
-                # expression becomes trivial.
-                elif e_repn._constant == 0.0:
-                    ampl_repn = e_repn
-                    return ampl_repn
-
-            is_nonlinear = False
-            if n_linear_args > 1 or n_nonlinear_args > 0:
-                is_nonlinear = True
-
-            if is_nonlinear:
-                # do like AMPL and simply return the expression
-                # without extracting the potentially linear part
-                ampl_repn = AmplRepn()
-                ampl_repn._nonlinear_expr = exp
-                for repn in arg_repns:
-                    ampl_repn._nonlinear_vars.update(repn._linear_vars)
-                    ampl_repn._nonlinear_vars.update(repn._nonlinear_vars)
-                return ampl_repn
-
-            else: # is linear or constant
-                ampl_repn = current_repn = arg_repns[0]
-                for i in xrange(1,len(arg_repns)):
-                    e_repn = arg_repns[i]
-                    ampl_repn = AmplRepn()
-
-                    # const_c * const_e
-                    ampl_repn._constant = current_repn._constant * e_repn._constant
-
-                    # const_e * L_c
-                    if e_repn._constant != 0.0:
-                        for (var_ID, var) in iteritems(current_repn._linear_vars):
-                            ampl_repn._linear_terms_coef[var_ID] = \
-                                current_repn._linear_terms_coef[var_ID] * \
-                                e_repn._constant
-                        ampl_repn._linear_vars.update(current_repn._linear_vars)
-
-                    # const_c * L_e
-                    if current_repn._constant != 0.0:
-                        for (e_var_ID,e_var) in iteritems(e_repn._linear_vars):
-                            if e_var_ID in ampl_repn._linear_vars:
-                                ampl_repn._linear_terms_coef[e_var_ID] += \
-                                    current_repn._constant * \
-                                    e_repn._linear_terms_coef[e_var_ID]
-                            else:
-                                ampl_repn._linear_terms_coef[e_var_ID] = \
-                                    current_repn._constant * \
-                                    e_repn._linear_terms_coef[e_var_ID]
-                        ampl_repn._linear_vars.update(e_repn._linear_vars)
-                    current_repn = ampl_repn
-
-            # now deal with the product expression's coefficient that needs
-            # to be applied to all parts of the ampl_repn
-            ampl_repn._constant *= exp._coef/denom
-            for var_ID in ampl_repn._linear_terms_coef:
-                ampl_repn._linear_terms_coef[var_ID] *= exp._coef/denom
-
-            return ampl_repn
-
-        elif _using_pyomo4_trees and (exp_type is Expr._ProductExpression):
-            # It is assumed this is a binary operator
-            # (x=args[0], y=args[1])
-            assert len(exp._args) == 2
-
-            n_linear_args = 0
-            n_nonlinear_args = 0
-            arg_repns = list()
-            for e in exp._args:
-                e_repn = _generate_ampl_repn(e)
-                arg_repns.append(e_repn)
-                # check if the expression is not nonlinear else it is nonlinear
-                if e_repn._nonlinear_expr is not None:
-                    n_nonlinear_args += 1
-                # Check whether the expression is constant or else it is linear
-                elif len(e_repn._linear_vars) > 0:
-                    n_linear_args += 1
-                # At this point we do not have a nonlinear
-                # expression and there are no linear
-                # terms. If the expression constant is zero,
-                # then we have a zero term in the product
-                # expression, so the entire product
-                # expression becomes trivial.
-                elif e_repn._constant == 0.0:
-                    ampl_repn = e_repn
-                    return ampl_repn
-
-            is_nonlinear = False
-            if n_linear_args > 1 or n_nonlinear_args > 0:
-                is_nonlinear = True
-
-            if is_nonlinear:
-                # do like AMPL and simply return the expression
-                # without extracting the potentially linear part
-                ampl_repn = AmplRepn()
-                ampl_repn._nonlinear_expr = exp
-                for repn in arg_repns:
-                    ampl_repn._nonlinear_vars.update(repn._linear_vars)
-                    ampl_repn._nonlinear_vars.update(repn._nonlinear_vars)
-                return ampl_repn
-
-            # is linear or constant
-            ampl_repn = current_repn = arg_repns[0]
-            for i in xrange(1,len(arg_repns)):
-                e_repn = arg_repns[i]
-                ampl_repn = AmplRepn()
-
-                # const_c * const_e
-                ampl_repn._constant = current_repn._constant * e_repn._constant
-
-                # const_e * L_c
-                if e_repn._constant != 0.0:
-                    for (var_ID, var) in iteritems(current_repn._linear_vars):
-                        ampl_repn._linear_terms_coef[var_ID] = \
-                            current_repn._linear_terms_coef[var_ID] * \
-                            e_repn._constant
-                    ampl_repn._linear_vars.update(current_repn._linear_vars)
-
-                # const_c * L_e
-                if current_repn._constant != 0.0:
-                    for (e_var_ID,e_var) in iteritems(e_repn._linear_vars):
-                        if e_var_ID in ampl_repn._linear_vars:
-                            ampl_repn._linear_terms_coef[e_var_ID] += \
-                                current_repn._constant * \
-                                e_repn._linear_terms_coef[e_var_ID]
-                        else:
-                            ampl_repn._linear_terms_coef[e_var_ID] = \
-                                current_repn._constant * \
-                                e_repn._linear_terms_coef[e_var_ID]
-                    ampl_repn._linear_vars.update(e_repn._linear_vars)
-                current_repn = ampl_repn
-
-            return ampl_repn
-
-        elif _using_pyomo4_trees and (exp_type is Expr._DivisionExpression):
-            # It is assumed this is a binary operator
-            # (numerator=args[0], denominator=args[1])
-            assert len(exp._args) == 2
-
-            #
-            # Check the denominator, if it is not constant,
-            # then simply return this expression.
-            #
-            numerator, denominator = exp._args
-            if not is_fixed(denominator):
-                ampl_repn._nonlinear_expr = exp
-                # we have a nonlinear expression, so build up all the vars
-                for e in exp._args:
-                    arg_repn = _generate_ampl_repn(e)
-                    ampl_repn._nonlinear_vars.update(arg_repn._linear_vars)
-                    ampl_repn._nonlinear_vars.update(arg_repn._nonlinear_vars)
-                return ampl_repn
-
-            denominator = value(denominator)
-            if denominator == 0:
-                raise ZeroDivisionError(
-                    "Divide-by-zero error - offending sub-expression: "+str(exp._args[1]))
-
-            #
-            # OK, the denominator is a constant.
-            #
-
-            # build up the ampl_repn for the numerator
-            ampl_repn = _generate_ampl_repn(numerator)
-            # check if the expression is not nonlinear else it is nonlinear
-            if ampl_repn._nonlinear_expr is not None:
-                # do like AMPL and simply return the expression
-                # without extracting the potentially linear part
-                # (be sure to set this to the original expression,
-                # not just the numerators)
-                ampl_repn._nonlinear_expr = exp
-                return ampl_repn
-
-            #
-            # OK, we have a linear numerator with a constant denominator
-            #
-
-            # update any constants and coefficients by dividing
-            # by the fixed denominator
-            ampl_repn._constant /= denominator
-            for var_ID in ampl_repn._linear_terms_coef:
-                ampl_repn._linear_terms_coef[var_ID] /= denominator
-
-            return ampl_repn
-
-        elif _using_pyomo4_trees and (exp_type is Expr._NegationExpression):
-            assert len(exp._args) == 1
-            ampl_repn = _generate_ampl_repn(exp._args[0])
-            if ampl_repn._nonlinear_expr is not None:
-                # do like AMPL and simply return the expression
-                # without extracting the potentially linear part
-                ampl_repn._nonlinear_expr = exp
-                return ampl_repn
-
-            # this subexpression is linear, so update any
-            # constants and coefficients by negating them
-            ampl_repn._constant *= -1
-            for var_ID in ampl_repn._linear_terms_coef:
-                ampl_repn._linear_terms_coef[var_ID] *= -1
-
-            return ampl_repn
-
-        #
-        # Power Expressions
-        #
-        elif exp_type is Expr._PowExpression:
-            assert(len(exp._args) == 2)
-            base_repn = _generate_ampl_repn(exp._args[0])
-            base_repn_fixed = base_repn.is_fixed()
-            exponent_repn = _generate_ampl_repn(exp._args[1])
-            exponent_repn_fixed = exponent_repn.is_fixed()
-
-            if base_repn_fixed and exponent_repn_fixed:
-                ampl_repn._constant = base_repn._constant**exponent_repn._constant
-            elif exponent_repn_fixed and exponent_repn._constant == 1.0:
-                ampl_repn = base_repn
-            elif exponent_repn_fixed and exponent_repn._constant == 0.0:
-                ampl_repn._constant = 1.0
+                    linear_terms_coef[var_ID] = exp_coef * child_coef[var_ID]
+            # adjust the linear vars
+            linear_vars.update(child._linear_vars)
+            # adjust the nonlinear terms
+            if child._nonlinear_expr is not None:
+                if nonlinear_expr is None:
+                    nonlinear_expr = [(exp_coef, child._nonlinear_expr)]
+                else:
+                    nonlinear_expr.append((exp_coef, child._nonlinear_expr))
+            # adjust the nonlinear vars
+            nonlinear_vars.update(child._nonlinear_vars)
+        elif child_type in native_numeric_types:
+            constant += exp_coef * child
+        else:
+            # the repn of a variable has a zero constant
+            constant += exp_coef * 0
+            var_ID = id(child)
+            if var_ID in linear_terms_coef:
+                linear_terms_coef[var_ID] += exp_coef * 1.0
             else:
-                # instead, let's just return the expression we are given and only
-                # use the ampl_repn for the vars
-                ampl_repn._nonlinear_expr = exp
-                ampl_repn._nonlinear_vars = base_repn._nonlinear_vars
-                ampl_repn._nonlinear_vars.update(exponent_repn._nonlinear_vars)
-                ampl_repn._nonlinear_vars.update(base_repn._linear_vars)
-                ampl_repn._nonlinear_vars.update(exponent_repn._linear_vars)
-            return ampl_repn
-
-        #
-        # External Functions
-        #
-        elif exp_type is Expr._ExternalFunctionExpression:
-            # In theory, the argument are fixed, we can simply evaluate this expression
-            if exp.is_fixed():
-                ampl_repn._constant = value(exp)
-                return ampl_repn
-
-            # this is inefficient since it is using much more than what we need
-            ampl_repn._nonlinear_expr = exp
-            for arg in exp._args:
-                if isinstance(arg, basestring):
-                    continue
-                child_repn = _generate_ampl_repn(arg)
-                ampl_repn._nonlinear_vars.update(child_repn._nonlinear_vars)
-                ampl_repn._nonlinear_vars.update(child_repn._linear_vars)
-            return ampl_repn
-
-        #
-        # Intrinsic Functions
-        #
-        elif isinstance(exp,Expr._IntrinsicFunctionExpression):
-            # Checking isinstance above accounts for the fact that _AbsExpression
-            # is a subclass of _IntrinsicFunctionExpression
-            assert(len(exp._args) == 1)
-
-            # the argument is fixed, we can simply evaluate this expression
-            if exp._args[0].is_fixed():
-                ampl_repn._constant = value(exp)
-                return ampl_repn
-
-            # this is inefficient since it is using much more than what we need
-            child_repn = _generate_ampl_repn(exp._args[0])
-
-            ampl_repn._nonlinear_expr = exp
-            ampl_repn._nonlinear_vars = child_repn._nonlinear_vars
-            ampl_repn._nonlinear_vars.update(child_repn._linear_vars)
-            return ampl_repn
-
-        #
-        # AMPL-style If-Then-Else expression
-        #
-        elif exp_type is Expr.Expr_if:
-            if exp._if.is_fixed():
-                if exp._if():
-                    ampl_repn = _generate_ampl_repn(exp._then)
+                linear_terms_coef[var_ID] = exp_coef * 1.0
+                linear_vars[var_ID] = child
+    ampl_repn._constant = constant
+    ampl_repn._nonlinear_expr = nonlinear_expr
+    return ampl_repn
+
+def _combine_nonlinear(exp, results, data):
+    # do like AMPL and simply return the expression and only use the
+    # repns of the arguments for the vars
+    ampl_repn = AmplRepn()
+    ampl_repn._nonlinear_expr = exp
+    nonlinear_vars = ampl_repn._nonlinear_vars
+    for arg in results:
+        if arg.__class__ is AmplRepn:
+            nonlinear_vars.update(arg._linear_vars)
+            nonlinear_vars.update(arg._nonlinear_vars)
+        elif arg.__class__ not in native_numeric_types:
+            nonlinear_vars[id(arg)] = arg
+    return ampl_repn
+
+def _combine_function(exp, results, data):
+    # the same as _combine_nonlinear, but the nonlinear vars of each
+    # argument are collected first
+    ampl_repn = AmplRepn()
+    ampl_repn._nonlinear_expr = exp
+    nonlinear_vars = ampl_repn._nonlinear_vars
+    for arg in results:
+        if arg.__class__ is AmplRepn:
+            nonlinear_vars.update(arg._nonlinear_vars)
+            nonlinear_vars.update(arg._linear_vars)
+        elif arg.__class__ not in native_numeric_types:
+            nonlinear_vars[id(arg)] = arg
+    return ampl_repn
+
+def _combine_product(exp, results, scale):
+    # scale is the product coefficient divided by the (fixed)
+    # denominator for coopr3 trees, and None for pyomo4 trees. Zero
+    # constant arguments are handled by the walker.
+    n_linear_args = 0
+    n_nonlinear_args = 0
+    for arg in results:
+        if arg.__class__ is AmplRepn:
+            if arg._nonlinear_expr is not None:
+                n_nonlinear_args += 1
+            elif len(arg._linear_vars) > 0:
+                n_linear_args += 1
+        elif arg.__class__ not in native_numeric_types:
+            n_linear_args += 1
+
+    if n_linear_args > 1 or n_nonlinear_args > 0:
+        return _combine_nonlinear(exp, results, None)
+
+    # is linear or constant
+    ampl_repn = current_repn = _as_ampl_repn(results[0])
+    for i in xrange(1, len(results)):
+        e_repn = _as_ampl_repn(results[i])
+        ampl_repn = AmplRepn()
+
+        # const_c * const_e
+        ampl_repn._constant = current_repn._constant * e_repn._constant
+
+        # const_e * L_c
+        if e_repn._constant != 0.0:
+            for var_ID in current_repn._linear_vars:
+                ampl_repn._linear_terms_coef[var_ID] = \
+                    current_repn._linear_terms_coef[var_ID] * \
+                    e_repn._constant
+            ampl_repn._linear_vars.update(current_repn._linear_vars)
+
+        # const_c * L_e
+        if current_repn._constant != 0.0:
+            for e_var_ID in e_repn._linear_vars:
+                if e_var_ID in ampl_repn._linear_vars:
+                    ampl_repn._linear_terms_coef[e_var_ID] += \
+                        current_repn._constant * \
+                        e_repn._linear_terms_coef[e_var_ID]
                 else:
-                    ampl_repn = _generate_ampl_repn(exp._else)
+                    ampl_repn._linear_terms_coef[e_var_ID] = \
+                        current_repn._constant * \
+                        e_repn._linear_terms_coef[e_var_ID]
+            ampl_repn._linear_vars.update(e_repn._linear_vars)
+        current_repn = ampl_repn
+
+    if scale is not None:
+        # apply the product expression's coefficient to all parts of
+        # the ampl_repn
+        ampl_repn._constant *= scale
+        for var_ID in ampl_repn._linear_terms_coef:
+            ampl_repn._linear_terms_coef[var_ID] *= scale
+    return ampl_repn
+
+def _combine_division(exp, results, denominator):
+    ampl_repn = _as_ampl_repn(results[0])
+    if ampl_repn._nonlinear_expr is not None:
+        # do like AMPL and simply return the expression
+        # without extracting the potentially linear part
+        ampl_repn._nonlinear_expr = exp
+        return ampl_repn
+    ampl_repn._constant /= denominator
+    for var_ID in ampl_repn._linear_terms_coef:
+        ampl_repn._linear_terms_coef[var_ID] /= denominator
+    return ampl_repn
+
+def _combine_negation(exp, results, data):
+    ampl_repn = _as_ampl_repn(results[0])
+    if ampl_repn._nonlinear_expr is not None:
+        ampl_repn._nonlinear_expr = exp
+        return ampl_repn
+    ampl_repn._constant *= -1
+    for var_ID in ampl_repn._linear_terms_coef:
+        ampl_repn._linear_terms_coef[var_ID] *= -1
+    return ampl_repn
+
+def _combine_pow(exp, results, data):
+    base, exponent = results
+    if base.__class__ in native_numeric_types:
+        base_fixed = True
+        base_constant = base
+    elif base.__class__ is AmplRepn:
+        base_fixed = base.is_fixed()
+        base_constant = base._constant
+    else:
+        base_fixed = False
+    if exponent.__class__ in native_numeric_types:
+        exponent_fixed = True
+        exponent_constant = exponent
+    elif exponent.__class__ is AmplRepn:
+        exponent_fixed = exponent.is_fixed()
+        exponent_constant = exponent._constant
+    else:
+        exponent_fixed = False
+
+    if base_fixed and exponent_fixed:
+        return base_constant**exponent_constant
+    elif exponent_fixed and exponent_constant == 1.0:
+        return base
+    elif exponent_fixed and exponent_constant == 0.0:
+        return 1.0
+    base_repn = _as_ampl_repn(base)
+    exponent_repn = _as_ampl_repn(exponent)
+    ampl_repn = AmplRepn()
+    ampl_repn._nonlinear_expr = exp
+    ampl_repn._nonlinear_vars = base_repn._nonlinear_vars
+    ampl_repn._nonlinear_vars.update(exponent_repn._nonlinear_vars)
+    ampl_repn._nonlinear_vars.update(base_repn._linear_vars)
+    ampl_repn._nonlinear_vars.update(exponent_repn._linear_vars)
+    return ampl_repn
+
+def _combine_if(exp, results, data):
+    if_repn, then_repn, else_repn = [_as_ampl_repn(arg) for arg in results]
+    ampl_repn = AmplRepn()
+    ampl_repn._nonlinear_expr = exp
+    ampl_repn._nonlinear_vars = if_repn._nonlinear_vars
+    ampl_repn._nonlinear_vars.update(then_repn._nonlinear_vars)
+    ampl_repn._nonlinear_vars.update(else_repn._nonlinear_vars)
+    ampl_repn._nonlinear_vars.update(if_repn._linear_vars)
+    ampl_repn._nonlinear_vars.update(then_repn._linear_vars)
+    ampl_repn._nonlinear_vars.update(else_repn._linear_vars)
+    return ampl_repn
+
+def _combine_passthrough(exp, results, data):
+    return results[0]
+
+def _ampl_repn_frame(exp, kind):
+    """
+    Return the frame [exp, args, next_arg, results, combine, data,
+    stop_on_zero] for an expression, or its result if it can be
+    generated without visiting its arguments.
+    """
+    if kind is _kind_sum_coopr3:
+        args = exp._args
+        coefs = exp._coef
+        if 0 in coefs:
+            nz = [i for i in xrange(len(args)) if coefs[i] != 0]
+            args = [args[i] for i in nz]
+            coefs = [coefs[i] for i in nz]
+        return [exp, args, 0, [], _combine_sum, (exp._const, coefs), False]
+
+    elif kind is _kind_product_coopr3:
+        # Iterate through the denominator. If they aren't all
+        # constants, then simply return this expression.
+        denom = 1.0
+        for e in exp._denominator:
+            if e.is_fixed():
+                denom *= value(e)
             else:
-                if_repn = _generate_ampl_repn(exp._if)
-                then_repn = _generate_ampl_repn(exp._then)
-                else_repn = _generate_ampl_repn(exp._else)
-                ampl_repn._nonlinear_expr = exp
-                ampl_repn._nonlinear_vars = if_repn._nonlinear_vars
-                ampl_repn._nonlinear_vars.update(then_repn._nonlinear_vars)
-                ampl_repn._nonlinear_vars.update(else_repn._nonlinear_vars)
-                ampl_repn._nonlinear_vars.update(if_repn._linear_vars)
-                ampl_repn._nonlinear_vars.update(then_repn._linear_vars)
-                ampl_repn._nonlinear_vars.update(else_repn._linear_vars)
-            return ampl_repn
-        elif (exp_type is Expr._InequalityExpression) or \
-             (exp_type is Expr._EqualityExpression):
-            for arg in exp._args:
-                arg_repn = _generate_ampl_repn(arg)
-                ampl_repn._nonlinear_vars.update(arg_repn._nonlinear_vars)
-                ampl_repn._nonlinear_vars.update(arg_repn._linear_vars)
-            ampl_repn._nonlinear_expr = exp
-            return ampl_repn
-        elif exp.is_fixed():
-            ampl_repn._constant = value(exp)
-            return ampl_repn
-
-        #
-        # Expression (the component)
-        #
-        elif isinstance(exp, _ExpressionData):
-            ampl_repn = _generate_ampl_repn(exp.expr)
-            return ampl_repn
-
-        #
-        # ERROR
-        #
-        else:
-            raise ValueError("Unsupported expression type: "+str(type(exp))+" ("+str(exp)+")")
+                return [exp, list(exp._denominator) + list(exp._numerator),
+                        0, [], _combine_nonlinear, None, False]
+            if denom == 0.0:
+                raise ZeroDivisionError(
+                    "Divide-by-zero error - offending sub-expression: "+str(e))
+        return [exp, exp._numerator, 0, [], _combine_product,
+                exp._coef/denom, True]
+
+    elif kind is _kind_linear_pyomo4:
+        args = []
+        coefs = []
+        for child_exp in exp._args:
+            exp_coef = value(exp._coef[id(child_exp)])
+            if exp_coef != 0:
+                args.append(child_exp)
+                coefs.append(exp_coef)
+        return [exp, args, 0, [], _combine_sum,
+                (value(exp._const), coefs), False]
+
+    elif kind is _kind_sum_pyomo4:
+        return [exp, exp._args, 0, [], _combine_sum, (0.0, None), False]
+
+    elif kind is _kind_product_pyomo4:
+        assert len(exp._args) == 2
+        return [exp, exp._args, 0, [], _combine_product, None, True]
+
+    elif kind is _kind_division_pyomo4:
+        assert len(exp._args) == 2
+        numerator, denominator = exp._args
+        if not is_fixed(denominator):
+            return [exp, exp._args, 0, [], _combine_nonlinear, None, False]
+        denominator = value(denominator)
+        if denominator == 0:
+            raise ZeroDivisionError(
+                "Divide-by-zero error - offending sub-expression: " +
+                str(exp._args[1]))
+        return [exp, (numerator,), 0, [], _combine_division,
+                denominator, False]
+
+    elif kind is _kind_negation_pyomo4:
+        assert len(exp._args) == 1
+        return [exp, exp._args, 0, [], _combine_negation, None, False]
+
+    elif kind is _kind_pow:
+        assert(len(exp._args) == 2)
+        return [exp, exp._args, 0, [], _combine_pow, None, False]
+
+    elif kind is _kind_external:
+        if exp.is_fixed():
+            return value(exp)
+        return [exp, [arg for arg in exp._args
+                      if not isinstance(arg, basestring)],
+                0, [], _combine_function, None, False]
+
+    elif kind is _kind_intrinsic:
+        assert(len(exp._args) == 1)
+        if exp._args[0].is_fixed():
+            return value(exp)
+        return [exp, exp._args, 0, [], _combine_function, None, False]
+
+    elif kind is _kind_if:
+        if exp._if.is_fixed():
+            if exp._if():
+                return [exp, (exp._then,), 0, [], _combine_passthrough,
+                        None, False]
+            return [exp, (exp._else,), 0, [], _combine_passthrough,
+                    None, False]
+        return [exp, (exp._if, exp._then, exp._else), 0, [], _combine_if,
+                None, False]
+
+    elif kind is _kind_relational:
+        return [exp, exp._args, 0, [], _combine_function, None, False]
 
-    #
-    # Constant
-    #
     elif exp.is_fixed():
-        ### GAH: Why were we even checking this
-        #if not exp.value.__class__ in native_numeric_types:
-        #    ampl_repn = _generate_ampl_repn(exp.value)
-        #    return ampl_repn
-        ampl_repn._constant = value(exp)
-        return ampl_repn
+        return value(exp)
 
-    #
-    # Variable
-    #
-    elif isinstance(exp, _VarData):
-        if exp.fixed:
-            ampl_repn._constant = exp.value
-            return ampl_repn
-        var_ID = id(exp)
-        ampl_repn._linear_terms_coef[var_ID] = 1.0
-        ampl_repn._linear_vars[var_ID] = exp
-        return ampl_repn
+    elif isinstance(exp, _ExpressionData):
+        return [exp, (exp.expr,), 0, [], _combine_passthrough, None, False]
 
-    #
-    # ERROR
-    #
-    else:
-        raise ValueError("Unexpected expression type: "+str(exp))
+    raise ValueError("Unsupported expression type: " +
+                     str(type(exp))+" ("+str(exp)+")")
+
+def _generate_ampl_repn(exp):
+    # We need to do this not at the global scope in case someone changed
+    # the mode after importing the environment.
+    _using_pyomo4_trees = expr_common.mode == expr_common.Mode.pyomo4_trees
+
+    try:
+        kind = _node_kind[exp.__class__]
+    except KeyError:
+        kind = _node_kind[exp.__class__] = \
+            _classify_node(exp, _using_pyomo4_trees)
+    if kind is _kind_native:
+        return _as_ampl_repn(exp)
+    elif kind is _kind_var:
+        return _as_ampl_repn(value(exp) if exp.fixed else exp)
+    elif kind is _kind_fixed:
+        return _as_ampl_repn(value(exp))
+    elif kind is _kind_leaf:
+        return _as_ampl_repn(_leaf_result(exp))
+    frame = _ampl_repn_frame(exp, kind)
+    if frame.__class__ is not list:
+        return _as_ampl_repn(frame)
+
+    node_kind = _node_kind
+    stack = [frame]
+    while 1:
+        args = frame[1]
+        i = frame[2]
+        if i < len(args):
+            frame[2] = i + 1
+            arg = args[i]
+            try:
+                kind = node_kind[arg.__class__]
+            except KeyError:
+                kind = node_kind[arg.__class__] = \
+                    _classify_node(arg, _using_pyomo4_trees)
+            if kind is _kind_native:
+                result = arg
+            elif kind is _kind_var:
+                result = value(arg) if arg.fixed else arg
+            elif kind is _kind_fixed:
+                result = value(arg)
+            elif kind is _kind_leaf:
+                result = _leaf_result(arg)
+            else:
+                result = _ampl_repn_frame(arg, kind)
+                if result.__class__ is list:
+                    frame = result
+                    stack.append(frame)
+                    continue
+        else:
+            result = frame[4](frame[0], frame[3], frame[5])
+            stack.pop()
+            if not stack:
+                return _as_ampl_repn(result)
+            frame = stack[-1]
+
+        # pass the result to the frame that requested it. A zero term
+        # in a product expression makes the entire product trivial.
+        while frame[6]:
+            if result.__class__ is AmplRepn:
+                if (result._nonlinear_expr is not None) or \
+                   (len(result._linear_vars) > 0) or \
+                   (result._constant != 0.0):
+                    break
+            elif (result.__class__ not in native_numeric_types) or \
+                 (result != 0.0):
+                break
+            stack.pop()
+            if not stack:
+                return _as_ampl_repn(result)
+            frame = stack[-1]
+        frame[3].append(result)
 
 def generate_ampl_repn(exp, idMap=None):
     # We need to do this not at the global scope in case someone changed
@@ -8,7 +8,8 @@
 #  _________________________________________________________________________
 
 __all__ = ("_LinearConstraintData", "MatrixConstraint",
-           "compile_block_linear_constraints",)
+           "compile_block_linear_constraints",
+           "generate_block_linear_matrix", "BlockLinearMatrix")
 
 import time
 import logging
@@ -19,18 +20,27 @@ from weakref import ref as weakref_ref
 from pyomo.core.base.set_types import Any
 from pyomo.core.base import (SortComponents,
                              Var,
-                             Constraint)
+                             Constraint,
+                             Objective,
+                             minimize)
 from pyomo.core.base.numvalue import (is_fixed,
                                       value,
                                       ZeroConstant)
 from pyomo.core.base.component import register_component
+from pyomo.core.base.suffix import ComponentMap
 from pyomo.core.base.constraint import (IndexedConstraint,
                                         SimpleConstraint,
                                         _ConstraintData)
 from pyomo.repn.canonical_repn import (generate_canonical_repn,
+                                       canonical_degree,
                                        LinearCanonicalRepn)
 
-from six import iteritems
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
 from six.moves import xrange
 
 logger = logging.getLogger('pyomo.core')
@@ -65,173 +75,92 @@ def compile_block_linear_constraints(parent_block,
             "Attempting to compile block '%s' with unconstructed "
             "component(s)" % (parent_block.name))
 
-    #
-    # Linear MatrixConstraint in CSR format
-    #
-    SparseMat_pRows = []
-    SparseMat_jCols = []
-    SparseMat_Vals = []
-    Ranges = []
-    RangeTypes = []
-
-    def _get_bound(exp):
-        if exp is None:
-            return None
-        if is_fixed(exp):
-            return value(exp)
-        raise ValueError("non-fixed bound: " + str(exp))
-
     start_time = time.time()
     if verbose:
-        print("Sorting active blocks...")
+        print("Compiling active linear constraints...")
 
+    #
+    # Collect the active linear constraints in CSR format
+    #
     sortOrder = SortComponents.indices | SortComponents.alphabetical
-    all_blocks = [_b for _b in parent_block.block_data_objects(
-        active=True,
+    matrix = generate_block_linear_matrix(
+        parent_block,
         sort=sortOrder,
-        descend_into=descend_into)]
+        descend_into=descend_into,
+        skip_nonlinear_constraints=True,
+        skip_trivial_constraints=skip_trivial_constraints,
+        include_objective=False,
+        use_numpy=False)
+    nrows = matrix.nrows
+    ncols = matrix.ncols
+    nnz = matrix.nnz
 
-    stop_time = time.time()
-    if verbose:
-        print("Time to sort active blocks: %.2f seconds"
-              % (stop_time-start_time))
-
-    start_time = time.time()
-    if verbose:
-        print("Collecting variables on active blocks...")
-
-    #
-    # First Pass: assign each variable a deterministic id
-    #             (an index in a list)
-    #
-    VarSymbolToVarObject = []
-    for block in all_blocks:
-        VarSymbolToVarObject.extend(
-            block.component_data_objects(Var,
-                                         sort=sortOrder,
-                                         descend_into=False))
-    VarIDToVarSymbol = \
-        dict((id(vardata), index)
-             for index, vardata in enumerate(VarSymbolToVarObject))
+    Ranges = []
+    RangeTypes = []
+    for row, constraint_data in enumerate(matrix.constraints):
+        assert not isinstance(constraint_data.parent_component(),
+                              MatrixConstraint)
+        L = matrix.row_lower[row] \
+            if (constraint_data.lower is not None) else None
+        U = matrix.row_upper[row] \
+            if (constraint_data.upper is not None) else None
+        Ranges.append(L if (L is not None) else 0)
+        Ranges.append(U if (U is not None) else 0)
+        if (L is not None) and \
+           (U is not None) and \
+           (not constraint_data.equality):
+            RangeTypes.append(MatrixConstraint.LowerBound |
+                              MatrixConstraint.UpperBound)
+        elif constraint_data.equality:
+            RangeTypes.append(MatrixConstraint.Equality)
+        elif L is not None:
+            assert U is None
+            RangeTypes.append(MatrixConstraint.LowerBound)
+        else:
+            assert U is not None
+            RangeTypes.append(MatrixConstraint.UpperBound)
 
     stop_time = time.time()
     if verbose:
-        print("Time to collect variables on active blocks: %.2f seconds"
+        print("Time to compile active linear constraints: %.2f seconds"
               % (stop_time-start_time))
 
     start_time = time.time()
     if verbose:
-        print("Compiling active linear constraints...")
+        print("Removing compiled constraint objects...")
 
     #
-    # Second Pass: collect and remove active linear constraints
+    # Remove compiled (and skipped trivial) constraints
     #
-    constraint_data_to_remove = []
     empty_constraint_containers_to_remove = []
-    constraint_containers_to_remove = []
-    constraint_containers_to_check = set()
-    referenced_variable_symbols = set()
-    nnz = 0
-    nrows = 0
-    SparseMat_pRows = [0]
-    for block in all_blocks:
-
+    for block in parent_block.block_data_objects(active=True,
+                                                 sort=sortOrder,
+                                                 descend_into=descend_into):
         if hasattr(block, '_canonical_repn'):
             del block._canonical_repn
         if hasattr(block, '_ampl_repn'):
             del block._ampl_repn
-
         for constraint in block.component_objects(Constraint,
                                                   active=True,
                                                   sort=sortOrder,
                                                   descend_into=False):
-
-            assert not isinstance(constraint, MatrixConstraint)
-
             if len(constraint) == 0:
+                empty_constraint_containers_to_remove.append(
+                    (block, constraint))
+    constraint_data_to_remove = []
+    constraint_containers_to_remove = []
+    constraint_containers_to_check = set()
+    for constraint_data in \
+            matrix.constraints + matrix.trivial_constraints:
+        constraint = constraint_data.parent_component()
+        block = constraint.parent_block()
+        if isinstance(constraint, SimpleConstraint):
+            constraint_containers_to_remove.append((block, constraint))
+        else:
+            constraint_data_to_remove.append((constraint,
+                                              constraint_data.index()))
+            constraint_containers_to_check.add((block, constraint))
 
-                empty_constraint_containers_to_remove.append((block, constraint))
-
-            else:
-
-                singleton = isinstance(constraint, SimpleConstraint)
-
-                for index, constraint_data in iteritems(constraint):
-
-                    if constraint_data.body.polynomial_degree() <= 1:
-
-                        # collect for removal
-                        if singleton:
-                            constraint_containers_to_remove.append((block, constraint))
-                        else:
-                            constraint_data_to_remove.append((constraint, index))
-                            constraint_containers_to_check.add((block, constraint))
-
-                        canonical_repn = generate_canonical_repn(constraint_data.body)
-
-                        assert isinstance(canonical_repn, LinearCanonicalRepn)
-
-                        row_variable_symbols = []
-                        row_coefficients = []
-                        if canonical_repn.variables is None:
-                            if skip_trivial_constraints:
-                                continue
-                        else:
-                            row_variable_symbols = \
-                                [VarIDToVarSymbol[id(vardata)]
-                                 for vardata in canonical_repn.variables]
-                            referenced_variable_symbols.update(
-                                row_variable_symbols)
-                            assert canonical_repn.linear is not None
-                            row_coefficients = canonical_repn.linear
-
-                        SparseMat_pRows.append(SparseMat_pRows[-1] + \
-                                               len(row_variable_symbols))
-                        SparseMat_jCols.extend(row_variable_symbols)
-                        SparseMat_Vals.extend(row_coefficients)
-
-                        nnz += len(row_variable_symbols)
-                        nrows += 1
-
-                        L = _get_bound(constraint_data.lower)
-                        U = _get_bound(constraint_data.upper)
-                        constant = value(canonical_repn.constant)
-                        if constant is None:
-                            constant = 0
-
-                        Ranges.append(L - constant if (L is not None) else 0)
-                        Ranges.append(U - constant if (U is not None) else 0)
-                        if (L is not None) and \
-                           (U is not None) and \
-                           (not constraint_data.equality):
-                            RangeTypes.append(MatrixConstraint.LowerBound |
-                                              MatrixConstraint.UpperBound)
-                        elif constraint_data.equality:
-                            RangeTypes.append(MatrixConstraint.Equality)
-                        elif L is not None:
-                            assert U is None
-                            RangeTypes.append(MatrixConstraint.LowerBound)
-                        else:
-                            assert U is not None
-                            RangeTypes.append(MatrixConstraint.UpperBound)
-
-                        # Start freeing up memory
-                        constraint_data.set_value(None)
-
-    ncols = len(referenced_variable_symbols)
-
-    stop_time = time.time()
-    if verbose:
-        print("Time to compile active linear constraints: %.2f seconds"
-              % (stop_time-start_time))
-
-    start_time = time.time()
-    if verbose:
-        print("Removing compiled constraint objects...")
-
-    #
-    # Remove compiled constraints
-    #
     constraints_removed = 0
     constraint_containers_removed = 0
     for block, constraint in empty_constraint_containers_to_remove:
@@ -256,26 +185,6 @@ def compile_block_linear_constraints(parent_block,
         print("Time to remove compiled constraint objects: %.2f seconds"
               % (stop_time-start_time))
 
-    start_time = time.time()
-    if verbose:
-        print("Assigning variable column indices...")
-
-    #
-    # Assign a column index to the set of referenced variables
-    #
-    ColumnIndexToVarSymbol = sorted(referenced_variable_symbols)
-    VarSymbolToColumnIndex = dict((symbol, column)
-                                  for column, symbol in enumerate(ColumnIndexToVarSymbol))
-    SparseMat_jCols = [VarSymbolToColumnIndex[symbol] for symbol in SparseMat_jCols]
-    del VarSymbolToColumnIndex
-    ColumnIndexToVarObject = [VarSymbolToVarObject[var_symbol]
-                              for var_symbol in ColumnIndexToVarSymbol]
-
-    stop_time = time.time()
-    if verbose:
-        print("Time to assign variable column indices: %.2f seconds"
-              % (stop_time-start_time))
-
     start_time = time.time()
     if verbose:
         print("Converting compiled constraint data to array storage...")
@@ -285,13 +194,16 @@ def compile_block_linear_constraints(parent_block,
     #
     # Convert to array storage
     #
-
     number_storage = 'f' if single_precision_storage else 'd'
-    SparseMat_pRows = array.array('L', SparseMat_pRows)
-    SparseMat_jCols = array.array('L', SparseMat_jCols)
-    SparseMat_Vals = array.array(number_storage, SparseMat_Vals)
+    SparseMat_pRows = matrix.indptr
+    SparseMat_jCols = matrix.indices
+    SparseMat_Vals = matrix.data
+    if single_precision_storage:
+        SparseMat_Vals = array.array(number_storage, SparseMat_Vals)
     Ranges = array.array(number_storage, Ranges)
     RangeTypes = array.array('B', RangeTypes)
+    ColumnIndexToVarObject = matrix.variables
+    del matrix
 
     stop_time = time.time()
     if verbose:
@@ -318,6 +230,315 @@ def compile_block_linear_constraints(parent_block,
                                                 RangeTypes,
                                                 ColumnIndexToVarObject))
 
+class BlockLinearMatrix(object):
+    """
+    The linear part of a block stored in compressed sparse row (CSR)
+    form.  Instances are created by generate_block_linear_matrix.
+
+    Public attributes:
+        variables       A list of variables (one per column).
+        constraints     A list of constraint data objects (one per
+                            row).
+        var_index       A ComponentMap from variable to column index.
+        con_index       A ComponentMap from constraint to row index.
+        indptr          The CSR row pointer array (length nrows+1).
+        indices         The CSR column index array (length nnz).
+        data            The CSR coefficient array (length nnz).
+        row_lower       The row lower bounds (-inf when missing). The
+                            constant of the constraint body has been
+                            moved into the bounds.
+        row_upper       The row upper bounds (+inf when missing).
+        col_lower       The column lower bounds (-inf when missing).
+        col_upper       The column upper bounds (+inf when missing).
+        col_type        A list of 'C' (continuous), 'B' (binary) or
+                            'I' (integer) flags, one per column.
+        objective       The active objective (or None).
+        sense           The sense of the objective.
+        c               The dense linear objective vector.
+        c0              The objective constant.
+        nonlinear_constraints   Constraints that were not included
+                                    because they are nonlinear.
+        trivial_constraints     Constraints that were not included
+                                    because they have no variables.
+
+    The arrays are NumPy arrays when NumPy is available (and not
+    disabled), otherwise they are array.array objects.
+    """
+
+    def __init__(self):
+        self.variables = []
+        self.constraints = []
+        self.var_index = ComponentMap()
+        self.con_index = ComponentMap()
+        self.indptr = None
+        self.indices = None
+        self.data = None
+        self.row_lower = None
+        self.row_upper = None
+        self.col_lower = None
+        self.col_upper = None
+        self.col_type = []
+        self.objective = None
+        self.sense = minimize
+        self.c = None
+        self.c0 = 0.0
+        self.nonlinear_constraints = []
+        self.trivial_constraints = []
+
+    @property
+    def nrows(self):
+        """The number of rows (constraints) in the matrix."""
+        return len(self.constraints)
+
+    @property
+    def ncols(self):
+        """The number of columns (variables) in the matrix."""
+        return len(self.variables)
+
+    @property
+    def nnz(self):
+        """The number of stored nonzeros in the matrix."""
+        return len(self.data)
+
+    def coo(self):
+        """
+        Return the matrix in coordinate (COO) format as a tuple of
+        arrays (row, col, data).
+        """
+        indptr = self.indptr
+        if numpy_available and isinstance(indptr, numpy.ndarray):
+            row = numpy.repeat(numpy.arange(self.nrows, dtype=indptr.dtype),
+                               numpy.diff(indptr))
+        else:
+            row = array.array(indptr.typecode)
+            for i in xrange(self.nrows):
+                row.extend([i] * (indptr[i+1] - indptr[i]))
+        return row, self.indices, self.data
+
+#
+# Extract the linear constraints (and objective) of a block as a
+# sparse matrix without modifying the block.
+#
+def generate_block_linear_matrix(block,
+                                 active=True,
+                                 sort=SortComponents.deterministic,
+                                 descend_into=True,
+                                 skip_nonlinear_constraints=False,
+                                 skip_trivial_constraints=False,
+                                 include_objective=True,
+                                 use_numpy=None):
+    """
+    Collect the linear constraints on a block (and its sub-blocks) into
+    a BlockLinearMatrix in a single pass.
+
+    Columns are ordered by the order in which the variables are
+    declared on the collected blocks, and only variables that appear
+    (unfixed) in a collected constraint or the objective are included.
+    Rows follow the order of the constraints. Canonical representations
+    provided on a block (see the _gen_con_canonical_repn flag) are
+    reused, but generated representations are not stored on the block.
+
+    Raises a ValueError for nonlinear constraints (unless
+    skip_nonlinear_constraints is True), for a nonlinear objective and
+    when there is more than one active objective.
+    """
+
+    if use_numpy is None:
+        use_numpy = numpy_available
+    elif use_numpy and (not numpy_available):
+        raise ValueError("NumPy array storage was requested but NumPy "
+                         "is not available")
+
+    def _get_bound(exp):
+        if exp is None:
+            return None
+        if is_fixed(exp):
+            return value(exp)
+        raise ValueError("non-fixed bound: " + str(exp))
+
+    all_blocks = list(block.block_data_objects(active=active,
+                                               sort=sort,
+                                               descend_into=descend_into))
+
+    #
+    # Assign each variable a deterministic symbol (its declaration
+    # order); referenced variables declared elsewhere are appended
+    # in the order they are encountered
+    #
+    VarSymbolToVarObject = []
+    for _block in all_blocks:
+        VarSymbolToVarObject.extend(
+            _block.component_data_objects(Var,
+                                          sort=sort,
+                                          descend_into=False))
+    VarIDToVarSymbol = \
+        dict((id(vardata), index)
+             for index, vardata in enumerate(VarSymbolToVarObject))
+
+    def _get_symbols(variables):
+        symbols = []
+        for vardata in variables:
+            symbol = VarIDToVarSymbol.get(id(vardata))
+            if symbol is None:
+                symbol = VarIDToVarSymbol[id(vardata)] = \
+                    len(VarSymbolToVarObject)
+                VarSymbolToVarObject.append(vardata)
+            symbols.append(symbol)
+        return symbols
+
+    result = BlockLinearMatrix()
+    constraints = result.constraints
+    pRows = [0]
+    jCols = []
+    Vals = []
+    RowLower = []
+    RowUpper = []
+    ObjSymbols = []
+    ObjCoefs = []
+    inf = float('inf')
+    for _block in all_blocks:
+
+        gen_con_canonical_repn = \
+            getattr(_block, "_gen_con_canonical_repn", True)
+        gen_obj_canonical_repn = \
+            getattr(_block, "_gen_obj_canonical_repn", True)
+
+        if include_objective:
+            for objective_data in _block.component_data_objects(
+                    Objective,
+                    active=True,
+                    sort=sort,
+                    descend_into=False):
+
+                if result.objective is not None:
+                    raise ValueError(
+                        "More than one active objective defined for "
+                        "block '%s': %s, %s"
+                        % (block.name,
+                           result.objective.name,
+                           objective_data.name))
+
+                if gen_obj_canonical_repn:
+                    canonical_repn = \
+                        generate_canonical_repn(objective_data.expr)
+                else:
+                    canonical_repn = _block._canonical_repn[objective_data]
+
+                if not isinstance(canonical_repn, LinearCanonicalRepn):
+                    raise ValueError(
+                        "Objective '%s' is not linear (degree=%s)"
+                        % (objective_data.name,
+                           canonical_degree(canonical_repn)))
+
+                result.objective = objective_data
+                result.sense = objective_data.sense
+                if canonical_repn.variables is not None:
+                    ObjSymbols = _get_symbols(canonical_repn.variables)
+                    ObjCoefs = canonical_repn.linear
+                constant = value(canonical_repn.constant)
+                if constant is not None:
+                    result.c0 = constant
+
+        for constraint_data in _block.component_data_objects(
+                Constraint,
+                active=True,
+                sort=sort,
+                descend_into=False):
+
+            if isinstance(constraint_data, LinearCanonicalRepn):
+                canonical_repn = constraint_data
+            elif gen_con_canonical_repn:
+                canonical_repn = \
+                    generate_canonical_repn(constraint_data.body)
+            else:
+                canonical_repn = _block._canonical_repn[constraint_data]
+
+            if not isinstance(canonical_repn, LinearCanonicalRepn):
+                if skip_nonlinear_constraints:
+                    result.nonlinear_constraints.append(constraint_data)
+                    continue
+                raise ValueError(
+                    "Constraint '%s' is not linear (degree=%s)"
+                    % (constraint_data.name,
+                       canonical_degree(canonical_repn)))
+
+            if canonical_repn.variables is None:
+                if skip_trivial_constraints:
+                    result.trivial_constraints.append(constraint_data)
+                    continue
+            else:
+                jCols.extend(_get_symbols(canonical_repn.variables))
+                Vals.extend(canonical_repn.linear)
+            pRows.append(len(jCols))
+            constraints.append(constraint_data)
+
+            L = _get_bound(constraint_data.lower)
+            U = _get_bound(constraint_data.upper)
+            constant = value(canonical_repn.constant)
+            if constant is None:
+                constant = 0
+            RowLower.append(L - constant if (L is not None) else -inf)
+            RowUpper.append(U - constant if (U is not None) else inf)
+
+    #
+    # Assign a column index to the set of referenced variables
+    #
+    ColumnIndexToVarSymbol = sorted(set(jCols).union(ObjSymbols))
+    VarSymbolToColumnIndex = \
+        dict((symbol, column)
+             for column, symbol in enumerate(ColumnIndexToVarSymbol))
+    jCols = [VarSymbolToColumnIndex[symbol] for symbol in jCols]
+    variables = result.variables
+    variables.extend(VarSymbolToVarObject[symbol]
+                     for symbol in ColumnIndexToVarSymbol)
+    ncols = len(variables)
+
+    c = [0.0] * ncols
+    for symbol, coef in zip(ObjSymbols, ObjCoefs):
+        c[VarSymbolToColumnIndex[symbol]] += coef
+    del VarSymbolToColumnIndex
+
+    ColLower = []
+    ColUpper = []
+    col_type = result.col_type
+    var_index = result.var_index
+    for column, vardata in enumerate(variables):
+        var_index[vardata] = column
+        lb = vardata.lb
+        ub = vardata.ub
+        ColLower.append(lb if (lb is not None) else -inf)
+        ColUpper.append(ub if (ub is not None) else inf)
+        if vardata.is_binary():
+            col_type.append('B')
+        elif vardata.is_integer():
+            col_type.append('I')
+        else:
+            col_type.append('C')
+
+    con_index = result.con_index
+    for row, constraint_data in enumerate(constraints):
+        con_index[constraint_data] = row
+
+    #
+    # Convert to array storage
+    #
+    if use_numpy:
+        result.indptr = numpy.array(pRows, dtype=numpy.int64)
+        result.indices = numpy.array(jCols, dtype=numpy.int64)
+        _float_array = lambda x: numpy.array(x, dtype=numpy.float64)
+    else:
+        result.indptr = array.array('L', pRows)
+        result.indices = array.array('L', jCols)
+        _float_array = lambda x: array.array('d', x)
+    result.data = _float_array(Vals)
+    result.row_lower = _float_array(RowLower)
+    result.row_upper = _float_array(RowUpper)
+    result.col_lower = _float_array(ColLower)
+    result.col_upper = _float_array(ColUpper)
+    result.c = _float_array(c)
+
+    return result
+
 class _LinearConstraintData(_ConstraintData, LinearCanonicalRepn):
     """
     This class defines the data for a single linear constraint
@@ -30,10 +30,12 @@ from pyomo.core.base.connector import _ConnectorData, SimpleConnector, Connector
 from pyomo.core.base.var import SimpleVar, Var, _GeneralVarData, _VarData
 
 from pyomo.core.base.expr_pyomo4 import TreeWalkerHelper
+from pyomo.core.base.expr_visitor import (SimpleExpressionVisitor,
+                                          ExpressionValueVisitor)
 
 import six
 from six import iterkeys, itervalues, iteritems, StringIO
-from six.moves import xrange, reduce
+from six.moves import xrange
 
 using_py3 = six.PY3
 
@@ -225,84 +227,138 @@ def repn_mult(r1, r2, coef=1.0):
     return rep
 
 def collect_variables(exp, idMap):
-    if exp.is_expression():
-        ans = {}
-        if exp.__class__ is expr._ProductExpression:
-            for subexp in exp._numerator:
-                ans.update(collect_variables(subexp, idMap))
-            for subexp in exp._denominator:
-                ans.update(collect_variables(subexp, idMap))
-        else:
-            # This is fragile: we assume that all other expression
-            # objects "play nice" and just use the _args member.
-            for subexp in exp._args:
-                ans.update(collect_variables(subexp, idMap))
-        return ans
-    elif exp.is_fixed():
-        # NB: is_fixed() returns True for constants and variables with
-        # fixed values
-        return {}
-    elif (exp.__class__ is _GeneralVarData) or isinstance(exp, _VarData):
-        id_ = id(exp)
-        if id_ in idMap[None]:
-            key = idMap[None][id_]
+    ans = {}
+    for leaf in _variable_collector.xleaves(exp):
+        if leaf.is_fixed():
+            # NB: is_fixed() returns True for constants and variables with
+            # fixed values
+            continue
+        elif (leaf.__class__ is _GeneralVarData) or isinstance(leaf, _VarData):
+            id_ = id(leaf)
+            if id_ in idMap[None]:
+                key = idMap[None][id_]
+            else:
+                key = len(idMap) - 1
+                idMap[None][id_] = key
+                idMap[key] = leaf
+            ans[key] = leaf
         else:
-            key = len(idMap) - 1
-            idMap[None][id_] = key
-            idMap[key] = exp
-        return { key : exp }
-    else:
-        raise ValueError("Unexpected expression type: "+str(exp))
+            raise ValueError("Unexpected expression type: "+str(leaf))
+    return ans
 
-#
-# Temporary canonical expressions
-#
-# temp_const = { 0: {None:0.0} }
-# temp_var = { 1: {GeneralCanonicalRepn({None:1}):1.0} }
-# temp_nonl = { None: None }
+class _VariableCollector(SimpleExpressionVisitor):
+
+    __slots__ = ()
+
+    def children(self, node):
+        if not node.is_expression():
+            return None
+        if node.__class__ is expr._ProductExpression:
+            return node._numerator + node._denominator
+        # This is fragile: we assume that all other expression
+        # objects "play nice" and just use the _args member.
+        return node._args
+
+_variable_collector = _VariableCollector()
 
 #
-# Internal function for collecting canonical representation, which is
-# called recursively.
+# The general canonical representation is collected by a postfix walk
+# of the expression tree (see _GeneralCanonicalRepnVisitor).  The walk
+# returns fixed subexpressions as a 1-tuple holding the subexpression
+# (instead of a repn), so the value of a fixed subexpression is only
+# computed for the largest fixed subexpression that contains it.
 #
-def collect_general_canonical_repn(exp, idMap, compute_values):
-#     global temp_const
-#     global temp_var
-#     global temp_nonl
-    temp_const = { 0: {None:0.0} }
-    temp_var = { 1: {GeneralCanonicalRepn({None:1}):1.0} }
-    temp_nonl = { None: None }
-    exp_type = type(exp)
+def _fixed_repn(fixed, compute_values):
+    if compute_values:
+        return { 0: {None:value(fixed[0])} }
+    else:
+        return { 0: {None:fixed[0]} }
 
-    #
-    # Constant
-    #
-    if exp.is_fixed():
-        if compute_values:
-            temp_const[0][None] = value(exp)
+class _GeneralCanonicalRepnVisitor(ExpressionValueVisitor):
+
+    __slots__ = ('idMap', 'compute_values')
+
+    def __init__(self, idMap, compute_values):
+        self.idMap = idMap
+        self.compute_values = compute_values
+
+    def children(self, node):
+        exp_type = type(node)
+        if exp_type is expr._SumExpression:
+            return node._args
+        elif exp_type is expr._ProductExpression:
+            # The denominator is checked when the product is visited
+            return node._numerator
+        elif exp_type is expr._PowExpression:
+            return node._args[:1]
+        elif exp_type is expr.Expr_if:
+            if node._if.is_fixed():
+                if node._if():
+                    return (node._then,)
+                else:
+                    return (node._else,)
+            return ()
+        elif isinstance(node, _ExpressionData):
+            return (node.expr,)
+        return ()
+
+    def visiting_potential_leaf(self, node):
+        if node.__class__ in native_numeric_types:
+            return True, (node,)
+        elif node.is_expression():
+            return False, None
+        #
+        # Constant
+        #
+        elif node.is_fixed():
+            return True, (node,)
+        #
+        # Variable
+        #
+        elif (node.__class__ is _GeneralVarData) or isinstance(node, _VarData):
+            idMap = self.idMap
+            id_ = id(node)
+            if id_ in idMap[None]:
+                key = idMap[None][id_]
+            else:
+                key = len(idMap) - 1
+                idMap[None][id_] = key
+                idMap[key] = node
+            return True, { -1: {key:node},
+                           1: {GeneralCanonicalRepn({key:1}):1.0} }
+        #
+        # Connector
+        #
+        elif type(node) is _ConnectorData or node.type() is Connector:
+            # Silently omit constraint...  The ConnectorExpander should
+            # expand this constraint into indvidual constraints that
+            # reference "real" variables.
+            return True, {}
+        #
+        # ERROR
+        #
         else:
-            temp_const[0][None] = exp
-        return temp_const
-    #
-    # Expression
-    #
-    elif exp.is_expression():
+            raise ValueError("Unexpected expression (type %s): %s" %
+                             ( type(node).__name__, str(node) ))
+
+    def visit(self, node, values):
+        compute_values = self.compute_values
+        exp_type = type(node)
 
         #
         # Sum
         #
         if exp_type is expr._SumExpression:
-            if exp._const != 0.0:
-                repn = { 0: {None:exp._const} }
+            if all(type(val) is tuple for val in values):
+                return (node,)
+            if node._const != 0.0:
+                repn = { 0: {None:node._const} }
             else:
                 repn = {}
-            for i in xrange(len(exp._args)):
-                repn = repn_add(
-                    repn,
-                    collect_general_canonical_repn(exp._args[i],
-                                                   idMap,
-                                                   compute_values),
-                    coef=exp._coef[i])
+            for i, val in enumerate(values):
+                if type(val) is tuple:
+                    val = _fixed_repn(val, compute_values)
+                repn = repn_add(repn, val, coef=node._coef[i])
             return repn
         #
         # Product
@@ -313,103 +369,90 @@ def collect_general_canonical_repn(exp, idMap, compute_values):
             # constants, then simply return this expression.
             #
             denom=1.0
-            for e in exp._denominator:
+            for e in node._denominator:
                 if e.is_fixed():
                     denom *= e()
                 else:
-                    temp_nonl[None] = exp
-                    return temp_nonl
+                    return { None: node }
                 if denom == 0.0:
                     print("Divide-by-zero error - offending sub-expression:")
                     e.pprint()
                     raise ZeroDivisionError
+            if all(type(val) is tuple for val in values):
+                return (node,)
             #
             # OK, the denominator is a constant.
             #
-            repn = { 0: {None:exp._coef / denom} }
-            for e in exp._numerator:
-                repn = repn_mult(
-                    repn,
-                    collect_general_canonical_repn(e,
-                                                   idMap,
-                                                   compute_values))
+            repn = { 0: {None:node._coef / denom} }
+            for val in values:
+                if type(val) is tuple:
+                    val = _fixed_repn(val, compute_values)
+                repn = repn_mult(repn, val)
             return repn
         #
         # Power Expression
         #
         elif exp_type is expr._PowExpression:
-            if exp.polynomial_degree() is None:
+            base = values[0]
+            if node._args[1].is_fixed():
+                if type(base) is tuple or value(node._args[1]) == 0:
+                    return (node,)
+            if node.polynomial_degree() is None:
                 raise TypeError("Unsupported general power expression: "
-                                +str(exp._args))
+                                +str(node._args))
 
-            # If this is of the form EXPR**1, we can just get the
+            # If this is of the form EXPR**1, we can just use the
             # representation of EXPR
-            if exp._args[1] == 1:
-                return collect_general_canonical_repn(exp._args[0],
-                                                      idMap,
-                                                      compute_values)
+            if node._args[1] == 1:
+                return base
             # The only other way to get a polynomial expression is if
             # exp=EXPR**p where p is fixed a nonnegative integer.  We
-            # can expand this expression and generate a canonical
-            # representation from there.  If p=0, this expression is
-            # constant (and is processed by the is_fixed code above
+            # can expand this expression into a product of p copies of
+            # EXPR.  If p=0, this expression is constant (and is
+            # processed above)
             # NOTE: There is no check for 0**0
-            return collect_general_canonical_repn(
-                        reduce( lambda x,y: x*y, [exp._args[0]]*int(value(exp._args[1])), 1.0 ),
-                        idMap,
-                        compute_values)
+            repn = { 0: {None:1.0} }
+            for i in xrange(int(value(node._args[1]))):
+                repn = repn_mult(repn, base)
+            return repn
+        #
+        # If-Then-Else (the walked branch is selected by children())
+        #
         elif exp_type is expr.Expr_if:
-            if exp._if.is_fixed():
-                if exp._if():
-                    return collect_general_canonical_repn(exp._then,
-                                                          idMap,
-                                                          compute_values)
-                else:
-                    return collect_general_canonical_repn(exp._else,
-                                                          idMap,
-                                                          compute_values)
-            else:
-                temp_nonl[None] = exp
-                return temp_nonl
+            if not values:
+                return { None: node }
+            elif type(values[0]) is tuple:
+                return (node,)
+            return values[0]
         #
         # Expression (the component)
-        # (faster check)
-        elif isinstance(exp, _ExpressionData):
-            return collect_general_canonical_repn(exp.expr,
-                                                  idMap,
-                                                  compute_values)
+        #
+        elif isinstance(node, _ExpressionData):
+            if type(values[0]) is tuple:
+                return (node,)
+            return values[0]
+        #
+        # Constant
+        #
+        elif node.is_fixed():
+            return (node,)
         #
         # ERROR
         #
         else:
-            raise ValueError("Unsupported expression type: "+str(exp))
-    #
-    # Variable
-    #
-    elif (exp.__class__ is _GeneralVarData) or isinstance(exp, _VarData):
-        id_ = id(exp)
-        if id_ in idMap[None]:
-            key = idMap[None][id_]
-        else:
-            key = len(idMap) - 1
-            idMap[None][id_] = key
-            idMap[key] = exp
-        temp_var = { -1: {key:exp}, 1: {GeneralCanonicalRepn({key:1}):1.0} }
-        return temp_var
-    #
-    # Connector
-    #
-    elif exp_type is _ConnectorData or exp.type() is Connector:
-        # Silently omit constraint...  The ConnectorExpander should
-        # expand this constraint into indvidual constraints that
-        # reference "real" variables.
-        return {}
-    #
-    # ERROR
-    #
-    else:
-        raise ValueError("Unexpected expression (type %s): " %
-                         ( type(exp).__name__, str(exp) ))
+            raise ValueError("Unsupported expression type: "+str(node))
+
+    def finalize(self, ans):
+        if type(ans) is tuple:
+            return _fixed_repn(ans, self.compute_values)
+        return ans
+
+#
+# Internal function for collecting canonical representation
+#
+def collect_general_canonical_repn(exp, idMap, compute_values):
+    return _GeneralCanonicalRepnVisitor(idMap, compute_values).\
+        dfs_postorder_stack(exp)
 
 ##############################################################################
 ##############################################################################
@@ -619,6 +662,14 @@ class pyomo4_CompiledLinearCanonicalRepn(LinearCanonicalRepn):
         return self
 
 
+#
+# The linear collectors of expressions with arguments are generators
+# that yield (arg, multiplier, coef, varmap) for every argument that
+# must be collected before they continue.  collect_linear_canonical_repn
+# runs them with an explicit stack (instead of recursion), so the
+# arguments are collected in the same order as a recursive walk.
+#
+
 def _collect_linear_sum(exp, idMap, multiplier, coef, varmap, compute_values):
 
     coef[None] += multiplier * exp._const  # None is the constant term in the coefficient map.
@@ -629,7 +680,7 @@ def _collect_linear_sum(exp, idMap, multiplier, coef, varmap, compute_values):
 
         # Special case... <sigh>
         if ((arg.__class__ is _GeneralVarData) or isinstance(arg, _VarData)) and (not arg.fixed):
-            # save an expensive recursion - this is by far the most common case.
+            # save an expensive collector call - this is by far the most common case.
             id_ = id(arg)
             if id_ in idMap[None]:
                 key = idMap[None][id_]
@@ -644,7 +695,7 @@ def _collect_linear_sum(exp, idMap, multiplier, coef, varmap, compute_values):
             else:
                 coef[key] = multiplier * six.next(arg_coef_iterator)
         else:
-            _linear_collectors[arg.__class__](arg, idMap, multiplier * six.next(arg_coef_iterator), coef, varmap, compute_values)
+            yield arg, multiplier * six.next(arg_coef_iterator), coef, varmap
 
 def _collect_linear_prod(exp, idMap, multiplier, coef, varmap, compute_values):
 
@@ -671,7 +722,7 @@ def _collect_linear_prod(exp, idMap, multiplier, coef, varmap, compute_values):
             else:
                 multiplier *= subexp
         else:
-            _linear_collectors[subexp.__class__](subexp, idMap, 1, _coef, _varmap, compute_values)
+            yield subexp, 1, _coef, _varmap
             if not _varmap:
                 multiplier *= _coef[None]
                 _coef[None] = 0
@@ -695,8 +746,7 @@ def _collect_linear_pow(exp, idMap, multiplier, coef, varmap, compute_values):
         else:
             coef[None] += multiplier * exp
     elif value(exp._args[1]) == 1:
-        arg = exp._args[0]
-        _linear_collectors[arg.__class__](arg, idMap, multiplier, coef, varmap, compute_values)
+        yield exp._args[0], multiplier, coef, varmap
     else:
         raise TypeError( "Unsupported power expression: "+str(exp._args) )
 
@@ -704,11 +754,9 @@ def _collect_branching_expr(exp, idMap, multiplier, coef, varmap, compute_values
 
     if exp._if.is_fixed():
         if exp._if():
-            arg = exp._then
-            _linear_collectors[arg.__class__](arg, idMap, multiplier, coef, varmap, compute_values)
+            yield exp._then, multiplier, coef, varmap
         else:
-            arg = exp._else
-            _linear_collectors[arg.__class__](arg, idMap, multiplier, coef, varmap, compute_values)
+            yield exp._else, multiplier, coef, varmap
     else:
         raise TypeError( "Unsupported dynamic If-Then-Else expression: "+str(exp._args) )
 
@@ -762,7 +810,7 @@ def _collect_identity(exp, idMap, multiplier, coef, varmap, compute_values):
         else:
             coef[None] += multiplier * exp
     else:
-        _linear_collectors[exp.__class__](exp, idMap, multiplier, coef, varmap, compute_values)
+        yield exp, multiplier, coef, varmap
 
 
 _linear_collectors = {
@@ -785,21 +833,42 @@ _linear_collectors = {
     SimpleObjective        : _collect_identity
     }
 
-def collect_linear_canonical_repn(exp, idMap, compute_values=True):
-
-    idMap.setdefault(None, {})
-    coef = { None : 0 }
-    varmap = {}
+def _get_linear_collector(exp):
     try:
-        _linear_collectors[exp.__class__](exp, idMap, 1, coef, varmap, compute_values)
+        return _linear_collectors[exp.__class__]
     except KeyError:
         if isinstance(exp, _VarData):
-            _collect_linear_var(exp, idMap, 1, coef, varmap, compute_values)
+            return _collect_linear_var
         elif isinstance(exp, _ExpressionData):
-            _collect_identity(exp, idMap, 1, coef, varmap, compute_values)
+            return _collect_identity
         else:
             raise ValueError( "Unexpected expression (type %s): %s" %
                               (type(exp).__name__, str(exp)) )
+
+def collect_linear_canonical_repn(exp, idMap, compute_values=True):
+
+    idMap.setdefault(None, {})
+    coef = { None : 0 }
+    varmap = {}
+    _stack = []
+    _collector = _get_linear_collector(exp)(exp, idMap, 1, coef, varmap,
+                                            compute_values)
+    if _collector is not None:
+        _stack.append(_collector)
+    while _stack:
+        for _sub, _multiplier, _coef, _varmap in _stack[-1]:
+            try:
+                _collector = _linear_collectors[_sub.__class__]
+            except KeyError:
+                _collector = _get_linear_collector(_sub)
+            _collector = _collector(_sub, idMap, _multiplier, _coef, _varmap,
+                                    compute_values)
+            if _collector is not None:
+                # collect the arguments of _sub before continuing
+                _stack.append(_collector)
+                break
+        else:
+            _stack.pop()
     return coef, varmap
 
 #########################################################################
@@ -19,7 +19,7 @@ from pyomo.repn import generate_ampl_repn
 
 from six import iteritems
 
-def preprocess_block_objectives(block, idMap=None):
+def preprocess_block_objectives(block, idMap=None, dependency_map=None):
 
     # Get/Create the ComponentMap for the repn
     if not hasattr(block,'_ampl_repn'):
@@ -45,8 +45,10 @@ def preprocess_block_objectives(block, idMap=None):
             raise
 
         block_ampl_repn[objective_data] = ampl_repn
+        if dependency_map is not None:
+            dependency_map.add(objective_data, objective_data.expr)
 
-def preprocess_block_constraints(block, idMap=None):
+def preprocess_block_constraints(block, idMap=None, dependency_map=None):
 
     # Get/Create the ComponentMap for the repn
     if not hasattr(block,'_ampl_repn'):
@@ -60,12 +62,14 @@ def preprocess_block_constraints(block, idMap=None):
         preprocess_constraint(block,
                               constraint,
                               idMap=idMap,
-                              block_ampl_repn=block_ampl_repn)
+                              block_ampl_repn=block_ampl_repn,
+                              dependency_map=dependency_map)
 
 def preprocess_constraint(block,
                           constraint,
                           idMap=None,
-                          block_ampl_repn=None):
+                          block_ampl_repn=None,
+                          dependency_map=None):
 
     from pyomo.repn.beta.matrix import MatrixConstraint
     if isinstance(constraint, MatrixConstraint):
@@ -101,11 +105,14 @@ def preprocess_constraint(block,
             raise
 
         block_ampl_repn[constraint_data] = ampl_repn
+        if dependency_map is not None:
+            dependency_map.add(constraint_data, constraint_data.body)
 
 def preprocess_constraint_data(block,
                                constraint_data,
                                idMap=None,
-                               block_ampl_repn=None):
+                               block_ampl_repn=None,
+                               dependency_map=None):
 
     if isinstance(constraint_data, LinearCanonicalRepn):
         return
@@ -132,6 +139,8 @@ def preprocess_constraint_data(block,
         raise
 
     block_ampl_repn[constraint_data] = ampl_repn
+    if dependency_map is not None:
+        dependency_map.add(constraint_data, constraint_data.body)
 
 @pyomo.util.pyomo_api(namespace='pyomo.repn')
 def compute_ampl_repn(data, model=None):
@@ -18,7 +18,7 @@ import pyomo.core.base.connector
 
 from six import iteritems
 
-def preprocess_block_objectives(block, idMap=None):
+def preprocess_block_objectives(block, idMap=None, dependency_map=None):
 
     # Get/Create the ComponentMap for the canonical_repn
     if not hasattr(block, '_canonical_repn'):
@@ -43,8 +43,10 @@ def preprocess_block_objectives(block, idMap=None):
             raise
 
         block_canonical_repn[objective_data] = objective_data_repn
+        if dependency_map is not None:
+            dependency_map.add(objective_data, objective_data.expr)
 
-def preprocess_block_constraints(block, idMap=None):
+def preprocess_block_constraints(block, idMap=None, dependency_map=None):
 
     # Get/Create the ComponentMap for the canonical_repn
     if not hasattr(block, '_canonical_repn'):
@@ -58,12 +60,14 @@ def preprocess_block_constraints(block, idMap=None):
         preprocess_constraint(block,
                               constraint,
                               idMap=idMap,
-                              block_canonical_repn=block_canonical_repn)
+                              block_canonical_repn=block_canonical_repn,
+                              dependency_map=dependency_map)
 
 def preprocess_constraint(block,
                           constraint,
                           idMap=None,
-                          block_canonical_repn=None):
+                          block_canonical_repn=None,
+                          dependency_map=None):
 
     from pyomo.repn.beta.matrix import MatrixConstraint
     if isinstance(constraint, MatrixConstraint):
@@ -112,11 +116,14 @@ def preprocess_constraint(block,
             raise
 
         block_canonical_repn[constraint_data] = canonical_repn
+        if dependency_map is not None:
+            dependency_map.add(constraint_data, constraint_data.body)
 
 def preprocess_constraint_data(block,
                                constraint_data,
                                idMap=None,
-                               block_canonical_repn=None):
+                               block_canonical_repn=None,
+                               dependency_map=None):
 
     if isinstance(constraint_data, LinearCanonicalRepn):
         return
@@ -153,6 +160,8 @@ def preprocess_constraint_data(block,
         raise
 
     block_canonical_repn[constraint_data] = canonical_repn
+    if dependency_map is not None:
+        dependency_map.add(constraint_data, constraint_data.body)
 
 @pyomo.util.pyomo_api(namespace='pyomo.repn')
 def compute_canonical_repn(data, model=None):
@@ -0,0 +1,155 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+#
+# Track the components whose current values are folded into the
+# cached repn of a constraint or objective
+#
+
+__all__ = ("RepnDependencyMap",)
+
+from pyomo.core.base import expr, ComponentMap
+import pyomo.core.base.expr_common
+from pyomo.core.base.numvalue import native_types
+from pyomo.core.base.expression import _ExpressionData
+from pyomo.core.base import var
+from pyomo.core.base import param
+
+from six import itervalues, string_types
+
+_using_pyomo4_trees = False
+if pyomo.core.base.expr_common.mode == \
+   pyomo.core.base.expr_common.Mode.pyomo4_trees:
+    _using_pyomo4_trees = True
+
+# The dependency kinds recorded by _collect_repn_dependencies
+_dep_var = 0
+_dep_param = 1
+_dep_named_expr = 2
+
+def _collect_repn_dependencies(exp):
+    """
+    Return the list of (kind, object) tuples for the leaves of an
+    expression whose current values are folded into its repn:
+    variables (fixed or not), mutable parameters, and named
+    expressions (whose expression may be replaced).
+    """
+    deps = []
+    seen = set()
+    stack = [exp]
+    while stack:
+        _sub = stack.pop()
+        if (_sub is None) or (type(_sub) in native_types) or \
+           isinstance(_sub, string_types):
+            continue
+        if id(_sub) in seen:
+            continue
+        seen.add(id(_sub))
+        if isinstance(_sub, _ExpressionData):
+            deps.append((_dep_named_expr, _sub))
+            stack.append(_sub.expr)
+        elif _sub.is_expression():
+            if (not _using_pyomo4_trees) and \
+               (type(_sub) is expr._ProductExpression):
+                stack.extend(_sub._numerator)
+                stack.extend(_sub._denominator)
+            else:
+                stack.extend(_sub._args)
+                if _using_pyomo4_trees and \
+                   (type(_sub) is expr._LinearExpression):
+                    stack.extend(itervalues(_sub._coef))
+                    stack.append(_sub._const)
+        elif isinstance(_sub, var._VarData):
+            deps.append((_dep_var, _sub))
+        elif isinstance(_sub, param._ParamData):
+            deps.append((_dep_param, _sub))
+    return deps
+
+class RepnDependencyMap(object):
+    """
+    A reverse index from the variables, mutable parameters and named
+    expressions that appear in the expressions of constraints and
+    objectives to those constraints and objectives.
+
+    The preprocessing functions in pyomo.repn.compute_canonical_repn
+    and pyomo.repn.compute_ampl_repn register every repn they generate
+    when they are passed a dependency map. After fixing or unfixing
+    variables, or changing the value of mutable parameters, only the
+    repns of the objects returned by get_dependents() need to be
+    regenerated.
+    """
+
+    def __init__(self):
+        # maps constraint/objective data -> tuple of dependencies
+        self._dependencies = ComponentMap()
+        # maps variable/parameter/expression data ->
+        #     ComponentMap(constraint/objective data -> None)
+        self._dependents = ComponentMap()
+
+    def __len__(self):
+        return len(self._dependencies)
+
+    def __contains__(self, obj):
+        return obj in self._dependencies
+
+    def add(self, obj, exp):
+        """
+        Register (or update) the dependencies of the repn of a
+        constraint or objective generated from the expression exp.
+        """
+        if obj in self._dependencies:
+            self.remove(obj)
+        dependents = self._dependents
+        deps = tuple(_obj for _kind, _obj in _collect_repn_dependencies(exp))
+        for dep in deps:
+            if dep in dependents:
+                dependents[dep][obj] = None
+            else:
+                dependents[dep] = ComponentMap(((obj, None),))
+        self._dependencies[obj] = deps
+
+    def remove(self, obj):
+        """Remove a constraint or objective from the dependency map."""
+        dependents = self._dependents
+        for dep in self._dependencies.pop(obj):
+            dep_dependents = dependents[dep]
+            del dep_dependents[obj]
+            if len(dep_dependents) == 0:
+                del dependents[dep]
+
+    def clear(self):
+        self._dependencies.clear()
+        self._dependents.clear()
+
+    def get_dependencies(self, obj):
+        """
+        Return the tuple of variables, mutable parameters and named
+        expressions that the repn of a constraint or objective depends
+        on.
+        """
+        return self._dependencies[obj]
+
+    def get_dependents(self, components):
+        """
+        Return the list of constraints and objectives whose repns
+        depend on any of the variables, mutable parameters or named
+        expressions in components. The list is ordered by the first
+        occurrence of each dependent object in components.
+        """
+        dependents = self._dependents
+        seen = set()
+        result = []
+        for component in components:
+            if component not in dependents:
+                continue
+            for obj in dependents[component]:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    result.append(obj)
+        return result
@@ -31,7 +31,7 @@ import pyomo.util.plugin
 from pyomo.opt import ProblemFormat
 from pyomo.opt.base import *
 from pyomo.core.base import *
-from pyomo.core.base import expr, SymbolMap, Block
+from pyomo.core.base import expr, CompactSymbolMap, Block
 import pyomo.core.base.expr_common
 from pyomo.core.base.var import Var
 from pyomo.core.base import _ExpressionData, Expression, SortComponents
@@ -40,8 +40,11 @@ from pyomo.core.base import var
 from pyomo.core.base import param
 from pyomo.core.base.suffix import active_export_suffix_generator
 from pyomo.repn.ampl_repn import generate_ampl_repn
+from pyomo.repn.dependencies import (_collect_repn_dependencies,
+                                     _dep_var,
+                                     _dep_param)
 
-from six import itervalues, iteritems
+from six import itervalues, iteritems, StringIO
 from six.moves import xrange, zip
 
 _using_pyomo4_trees = False
@@ -139,6 +142,9 @@ if _using_pyomo4_trees:
     _op_template[expr._NegationExpression] = "o16{C}\n"
     _op_comment[expr._NegationExpression] = "\t#-"
 
+_nl_header_line2 = " {0} {1} {2} {3} {4} \t# vars, constraints, " \
+                   "objectives, ranges, eqns\n"
+
 class StopWatch(object):
 
     def __init__(self):
@@ -242,6 +248,114 @@ class RepnWrapper(object):
         self._linear_vars = linear
         self._nonlinear_vars = nonlinear
 
+#
+# Support for incremental NL file writes
+#
+
+# Placeholder state for a variable that is not fixed (its value is not
+# part of the ampl_repn)
+_free_var = object()
+
+def _dependency_state(deps):
+    """
+    Return the list of values that an ampl_repn generated from an
+    expression with the given dependencies was based on.
+    """
+    state = []
+    for kind, obj in deps:
+        if kind == _dep_var:
+            state.append(obj.value if obj.fixed else _free_var)
+        elif kind == _dep_param:
+            state.append(obj.value)
+        else:
+            state.append(obj.expr)
+    return state
+
+def _dependencies_changed(deps, state):
+    for (kind, obj), old in zip(deps, state):
+        if kind == _dep_var:
+            if obj.fixed:
+                if (old is _free_var) or (obj.value != old):
+                    return True
+            elif old is not _free_var:
+                return True
+        elif kind == _dep_param:
+            if obj.value != old:
+                return True
+        elif obj.expr is not old:
+            return True
+    return False
+
+def _get_var_domain(vardata):
+    """
+    Return the domain category that determines where a variable is
+    placed in the NL file column ordering.
+    """
+    if vardata.is_integer():
+        return 'I'
+    elif vardata.is_binary():
+        return 'B'
+    elif vardata.is_continuous():
+        return 'C'
+    return None
+
+class _CachedRepn(object):
+    """
+    The cached ampl_repn for an active objective or constraint, along
+    with the inputs it was generated from.
+    """
+
+    __slots__ = ('data','expr','deps','state','ID','sense')
+
+    def __init__(self, data, exp, ampl_repn, generated, ID=None, sense=None):
+        self.data = data
+        self.ID = ID
+        self.sense = sense
+        self.update(exp, ampl_repn, generated)
+
+    def update(self, exp, ampl_repn, generated):
+        self.expr = exp
+        if generated:
+            self.deps = _collect_repn_dependencies(exp)
+            self.state = _dependency_state(self.deps)
+        else:
+            # The repn was provided by the user (through the
+            # block._ampl_repn map); it changes only if it is replaced.
+            self.deps = None
+            self.state = ampl_repn
+
+class _NLWriterCache(object):
+    """
+    The information that ProblemWriter_nl stores on a model when it is
+    written with the 'incremental' io_option. This includes the
+    variable and constraint ordering, the ampl_repns (along with the
+    values they depend on) and the serialized C, O, J, G and k
+    sections of the NL file.
+
+    The cache is not copied when the model is cloned or pickled; the
+    next write of the new model will be a full write.
+    """
+
+    def __init__(self, options):
+        self.valid = True
+        self.options = options
+        self.objectives = []
+        self.constraints = []
+
+    def __getstate__(self):
+        return {'valid': False}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def __deepcopy__(self, memo):
+        ans = _NLWriterCache(None)
+        ans.__setstate__(self.__getstate__())
+        return ans
+
+    def __copy__(self):
+        return self.__deepcopy__({})
+
 class ProblemWriter_nl(AbstractProblemWriter):
 
     pyomo.util.plugin.alias(str(ProblemFormat.nl),
@@ -305,6 +419,14 @@ class ProblemWriter_nl(AbstractProblemWriter):
         include_all_variable_bounds = \
             io_options.pop("include_all_variable_bounds", False)
 
+        # If True, the writer caches the variable / constraint
+        # ordering and the serialized sections of the NL file on the
+        # model. Later writes (also with incremental=True) reuse that
+        # cache and only regenerate the sections whose inputs changed
+        # (e.g., mutable Param values, bounds, or initial values). Any
+        # structural change to the model triggers a full write.
+        incremental = io_options.pop("incremental", False)
+
         if len(io_options):
             raise ValueError(
                 "ProblemWriter_nl passed unrecognized io_options:\n\t" +
@@ -313,6 +435,15 @@ class ProblemWriter_nl(AbstractProblemWriter):
         if filename is None:
             filename = model.name + ".nl"
 
+        # The NL file can also be written into a file-like object
+        # (e.g., a StringIO), but then there is no name for the .row
+        # and .col files
+        if hasattr(filename, 'write') and symbolic_solver_labels:
+            raise ValueError(
+                "ProblemWriter_nl cannot write the .row and .col files "
+                "(symbolic_solver_labels=True) when the NL file is "
+                "written into a file-like object")
+
         # Generate the operator strings templates. The value of
         # symbolic_solver_labels determines whether or not to
         # include "nl comments" (the equivalent AMPL functionality
@@ -345,15 +476,27 @@ class ProblemWriter_nl(AbstractProblemWriter):
 
         # Pause the GC for the duration of this method
         with PauseGC() as pgc:
-            with open(filename,"w") as f:
-                self._OUTPUT = f
-                symbol_map = self._print_model_NL(
+            if hasattr(filename, 'write'):
+                symbol_map = self._write_NL(
+                    filename,
                     model,
                     solver_capability,
                     show_section_timing=show_section_timing,
                     skip_trivial_constraints=skip_trivial_constraints,
                     file_determinism=file_determinism,
-                    include_all_variable_bounds=include_all_variable_bounds)
+                    include_all_variable_bounds=include_all_variable_bounds,
+                    incremental=incremental)
+            else:
+                with open(filename,"w") as f:
+                    symbol_map = self._write_NL(
+                        f,
+                        model,
+                        solver_capability,
+                        show_section_timing=show_section_timing,
+                        skip_trivial_constraints=skip_trivial_constraints,
+                        file_determinism=file_determinism,
+                        include_all_variable_bounds=include_all_variable_bounds,
+                        incremental=incremental)
 
         self._symbolic_solver_labels = False
         self._output_fixed_variable_bounds = False
@@ -364,6 +507,20 @@ class ProblemWriter_nl(AbstractProblemWriter):
         self._op_string = None
         return filename, symbol_map
 
+    def _write_NL(self, ostream, model, solver_capability, incremental, **kwds):
+        self._OUTPUT = ostream
+        symbol_map = None
+        if incremental:
+            symbol_map = self._print_model_NL_incremental(model,
+                                                          solver_capability,
+                                                          **kwds)
+        if symbol_map is None:
+            symbol_map = self._print_model_NL(model,
+                                              solver_capability,
+                                              incremental=incremental,
+                                              **kwds)
+        return symbol_map
+
     def _get_bound(self, exp):
         if exp is None:
             return None
@@ -371,7 +528,75 @@ class ProblemWriter_nl(AbstractProblemWriter):
             return value(exp)
         raise ValueError("non-fixed bound: " + str(exp))
 
+    # Constraint bound types, used to index the counts of ranges,
+    # single-sided inequalities, equalities and unbounded constraints
+    # that are written to the NL file header.
+    _range_bound = 0
+    _single_sided_bound = 1
+    _equality_bound = 2
+    _no_bound = 3
+    # complementarity conditions that do not count toward the above
+    _uncounted_bound = 4
+
+    def _get_constraint_bounds_NL(self, con_ID, constraint_data, offset):
+        """
+        Return the "r" line for a constraint along with its bound type.
+        """
+        L = None
+        U = None
+        if constraint_data.lower is not None:
+            L = self._get_bound(constraint_data.lower)
+        if constraint_data.upper is not None:
+            U = self._get_bound(constraint_data.upper)
+
+        #if constraint_data.equality:
+        #    assert L == U
+        _type = getattr(constraint_data, '_complementarity', None)
+        _vid = getattr(constraint_data, '_vid', None)
+        if not _type is None:
+            _vid = self._varID_map[_vid]+1
+            bound_type = self._uncounted_bound
+            if _type == 1 or _type == 2:
+                bound_type = self._single_sided_bound
+            elif _type == 3:
+                bound_type = self._range_bound
+            elif _type == 4:
+                bound_type = self._no_bound
+            return "5 {0} {1}\n".format(_type, _vid), bound_type
+        if L == U:
+            if L is None:
+                # No constraint on body
+                return "3\n", self._no_bound
+            else:
+                return "4 %r\n" % (L-offset), self._equality_bound
+        elif L is None:
+            return "1 %r\n" % (U-offset), self._single_sided_bound
+        elif U is None:
+            return "2 %r\n" % (L-offset), self._single_sided_bound
+        elif (L > U):
+            msg = 'Constraint {0}: lower bound greater than upper' \
+                ' bound ({1} > {2})'
+            raise ValueError(msg.format(con_ID, str(L), str(U)))
+        else:
+            # double sided inequality
+            # both are not none and they are valid
+            return "0 %r %r\n" % (L-offset, U-offset), self._range_bound
+
     def _print_nonlinear_terms_NL(self, exp):
+        # The expression is written in prefix order with an explicit
+        # stack of _print_nonlinear_node_NL generators (instead of
+        # recursion), so deep expressions can be written.
+        _stack = [ self._print_nonlinear_node_NL(exp) ]
+        while _stack:
+            for child_exp in _stack[-1]:
+                _stack.append(self._print_nonlinear_node_NL(child_exp))
+                break
+            else:
+                _stack.pop()
+
+    def _print_nonlinear_node_NL(self, exp):
+        # Write the operator of an expression node, and yield the
+        # children that must be written (in order) after it
         OUTPUT = self._OUTPUT
         exp_type = type(exp)
         # JDS: check list first so that after this, we know that exp
@@ -392,7 +617,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     child_exp = exp[i][1]
                     if coef != 1:
                         OUTPUT.write(coef_term_str % (coef))
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
             else:
                 for i in xrange(0,n):
                     assert(exp[i].__class__ is tuple)
@@ -403,7 +628,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                         OUTPUT.write(binary_sum_str)
                     if coef != 1:
                         OUTPUT.write(coef_term_str % (coef))
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
         elif exp_type in native_numeric_types:
             OUTPUT.write(self._op_string[NumericConstant]
                          % (exp))
@@ -423,7 +648,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                         child_coef = exp._coef[id(child_exp)]
                         if child_coef != 1:
                             OUTPUT.write(coef_term_str % (value(child_coef)))
-                        self._print_nonlinear_terms_NL(child_exp)
+                        yield child_exp
                 else:
                     assert n > 0
                     if exp._const != 0:
@@ -436,12 +661,12 @@ class ProblemWriter_nl(AbstractProblemWriter):
                         child_coef = exp._coef[id(child_exp)]
                         if child_coef != 1:
                             OUTPUT.write(coef_term_str % (value(child_coef)))
-                        self._print_nonlinear_terms_NL(child_exp)
+                        yield child_exp
                     child_exp = exp._args[n-1]
                     child_coef = exp._coef[id(child_exp)]
                     if child_coef != 1:
                         OUTPUT.write(coef_term_str % (value(child_coef)))
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
 
             elif _using_pyomo4_trees and (exp_type is expr._SumExpression):
                 nary_sum_str, binary_sum_str, coef_term_str = \
@@ -450,12 +675,12 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 if n > 2:
                     OUTPUT.write(nary_sum_str % (n))
                     for child_exp in exp._args:
-                        self._print_nonlinear_terms_NL(child_exp)
+                        yield child_exp
                 else:
                     for i in xrange(0,n-1):
                         OUTPUT.write(binary_sum_str)
-                        self._print_nonlinear_terms_NL(exp._args[i])
-                    self._print_nonlinear_terms_NL(exp._args[n-1])
+                        yield exp._args[i]
+                    yield exp._args[n-1]
 
             elif exp_type is expr._SumExpression:
                 assert not _using_pyomo4_trees
@@ -471,7 +696,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     for i in xrange(0,n):
                         if exp._coef[i] != 1:
                             OUTPUT.write(coef_term_str % (exp._coef[i]))
-                        self._print_nonlinear_terms_NL(exp._args[i])
+                        yield exp._args[i]
                 else:
                     if exp._const != 0:
                         OUTPUT.write(binary_sum_str)
@@ -481,10 +706,10 @@ class ProblemWriter_nl(AbstractProblemWriter):
                         OUTPUT.write(binary_sum_str)
                         if exp._coef[i] != 1:
                             OUTPUT.write(coef_term_str % (exp._coef[i]))
-                        self._print_nonlinear_terms_NL(exp._args[i])
+                        yield exp._args[i]
                     if exp._coef[n-1] != 1:
                         OUTPUT.write(coef_term_str % (exp._coef[n-1]))
-                    self._print_nonlinear_terms_NL(exp._args[n-1])
+                    yield exp._args[n-1]
 
             elif (not _using_pyomo4_trees) and \
                  (exp_type is expr._ProductExpression):
@@ -507,7 +732,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 for child_exp in exp._numerator:
                     if child_counter < max_count:
                         OUTPUT.write(prod_str)
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
                     child_counter += 1
                 if denom_exists:
                     # print out the denominator
@@ -516,7 +741,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     for child_exp in exp._denominator:
                         if child_counter < max_count:
                             OUTPUT.write(prod_str)
-                        self._print_nonlinear_terms_NL(child_exp)
+                        yield child_exp
                         child_counter += 1
 
             elif _using_pyomo4_trees and (exp_type is expr._ProductExpression):
@@ -526,7 +751,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 for child_exp in exp._args:
                     if child_counter < max_count:
                         OUTPUT.write(prod_str)
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
                     child_counter += 1
 
             elif _using_pyomo4_trees and (exp_type is expr._DivisionExpression):
@@ -536,13 +761,13 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 for child_exp in exp._args:
                     if child_counter < max_count:
                         OUTPUT.write(div_str)
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
                     child_counter += 1
 
             elif _using_pyomo4_trees and (exp_type is expr._NegationExpression):
                 assert len(exp._args) == 1
                 OUTPUT.write(self._op_string[expr._NegationExpression])
-                self._print_nonlinear_terms_NL(exp._args[0])
+                yield exp._args[0]
 
             elif exp_type is expr._ExternalFunctionExpression:
                 fun_str, string_arg_str = \
@@ -561,7 +786,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     if isinstance(arg, basestring):
                         OUTPUT.write(string_arg_str % (len(arg), arg))
                     else:
-                        self._print_nonlinear_terms_NL(arg)
+                        yield arg
             elif (exp_type is expr._PowExpression) or \
                  isinstance(exp, expr._IntrinsicFunctionExpression):
                 intr_expr_str = self._op_string.get(exp.name)
@@ -574,12 +799,12 @@ class ProblemWriter_nl(AbstractProblemWriter):
                                     % (exp.name))
 
                 for child_exp in exp._args:
-                    self._print_nonlinear_terms_NL(child_exp)
+                    yield child_exp
             elif exp_type is expr.Expr_if:
                 OUTPUT.write(self._op_string[expr.Expr_if])
-                self._print_nonlinear_terms_NL(exp._if)
-                self._print_nonlinear_terms_NL(exp._then)
-                self._print_nonlinear_terms_NL(exp._else)
+                yield exp._if
+                yield exp._then
+                yield exp._else
             elif exp_type is expr._InequalityExpression:
                 and_str, lt_str, le_str = \
                     self._op_string[expr._InequalityExpression]
@@ -595,21 +820,21 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     OUTPUT.write(lt_str)
                 else:
                     OUTPUT.write(le_str)
-                self._print_nonlinear_terms_NL(left)
-                self._print_nonlinear_terms_NL(middle)
+                yield left
+                yield middle
                 if not right is None:
                     if exp._strict[1]:
                         OUTPUT.write(lt_str)
                     else:
                         OUTPUT.write(le_str)
-                    self._print_nonlinear_terms_NL(middle)
-                    self._print_nonlinear_terms_NL(right)
+                    yield middle
+                    yield right
             elif exp_type is expr._EqualityExpression:
                 OUTPUT.write(self._op_string[expr._EqualityExpression])
-                self._print_nonlinear_terms_NL(exp._args[0])
-                self._print_nonlinear_terms_NL(exp._args[1])
+                yield exp._args[0]
+                yield exp._args[1]
             elif isinstance(exp, _ExpressionData):
-                self._print_nonlinear_terms_NL(exp.expr)
+                yield exp.expr
             else:
                 raise ValueError(
                     "Unsupported expression type (%s) in _print_nonlinear_terms_NL"
@@ -635,21 +860,59 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 "Unsupported expression type (%s) in _print_nonlinear_terms_NL"
                 % (exp_type))
 
+    def _get_sorter(self, file_determinism):
+        sorter = SortComponents.unsorted
+        if file_determinism >= 1:
+            sorter = sorter | SortComponents.indices
+            if file_determinism >= 2:
+                sorter = sorter | SortComponents.alphabetical
+        return sorter
+
+    def _tabulate_external_functions(self, model):
+        self.external_byFcn = {}
+        external_Libs = set()
+        for fcn in model.component_objects(ExternalFunction, active=True):
+            if fcn._function in self.external_byFcn:
+                if self.external_byFcn[fcn._function][0]._library != fcn._library:
+                    raise RuntimeError(
+                        "The same external function name (%s) is associated "
+                        "with two different libraries (%s through %s, and %s "
+                        "through %s).  The ASL solver will fail to link "
+                        "correctly." %
+                        (fcn._function,
+                         self.external_byFcn[fcn._function]._library,
+                         self.external_byFcn[fcn._function]._library.name,
+                         fcn._library,
+                         fcn.name))
+            else:
+                self.external_byFcn[fcn._function] = \
+                    (fcn, len(self.external_byFcn))
+            external_Libs.add(fcn._library)
+        if external_Libs:
+            os.environ["PYOMO_AMPLFUNC"] = "\n".join(sorted(external_Libs))
+        elif "PYOMO_AMPLFUNC" in os.environ:
+            del os.environ["PYOMO_AMPLFUNC"]
+
     def _print_model_NL(self, model,
                         solver_capability,
                         show_section_timing=False,
                         skip_trivial_constraints=False,
                         file_determinism=1,
-                        include_all_variable_bounds=False):
+                        include_all_variable_bounds=False,
+                        incremental=False):
 
-        output_fixed_variable_bounds = self._output_fixed_variable_bounds
         symbolic_solver_labels = self._symbolic_solver_labels
 
-        sorter = SortComponents.unsorted
-        if file_determinism >= 1:
-            sorter = sorter | SortComponents.indices
-            if file_determinism >= 2:
-                sorter = sorter | SortComponents.alphabetical
+        sorter = self._get_sorter(file_determinism)
+
+        # When writing incrementally, collect the information needed
+        # by the next write of this model
+        cache = None
+        if incremental:
+            cache = _NLWriterCache((symbolic_solver_labels,
+                                    skip_trivial_constraints,
+                                    file_determinism,
+                                    include_all_variable_bounds))
 
         OUTPUT = self._OUTPUT
         assert OUTPUT is not None
@@ -662,8 +925,10 @@ class ProblemWriter_nl(AbstractProblemWriter):
         overall_timer = StopWatch()
         subsection_timer = StopWatch()
 
-        # create the symbol_map
-        symbol_map = SymbolMap()
+        # create the symbol_map (the NL symbols are the prefixes v, c
+        # and o followed by the position of the variable, constraint or
+        # objective)
+        symbol_map = CompactSymbolMap()
 
         name_labeler = self._name_labeler
         # These will get updated when symbolic_solver_labels
@@ -698,29 +963,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
         LinearVarsBool = set()
 
         # Tabulate the External Function definitions
-        self.external_byFcn = {}
-        external_Libs = set()
-        for fcn in model.component_objects(ExternalFunction, active=True):
-            if fcn._function in self.external_byFcn:
-                if self.external_byFcn[fcn._function][0]._library != fcn._library:
-                    raise RuntimeError(
-                        "The same external function name (%s) is associated "
-                        "with two different libraries (%s through %s, and %s "
-                        "through %s).  The ASL solver will fail to link "
-                        "correctly." %
-                        (fcn._function,
-                         self.external_byFcn[fcn._function]._library,
-                         self.external_byFcn[fcn._function]._library.name,
-                         fcn._library,
-                         fcn.name))
-            else:
-                self.external_byFcn[fcn._function] = \
-                    (fcn, len(self.external_byFcn))
-            external_Libs.add(fcn._library)
-        if external_Libs:
-            os.environ["PYOMO_AMPLFUNC"] = "\n".join(sorted(external_Libs))
-        elif "PYOMO_AMPLFUNC" in os.environ:
-            del os.environ["PYOMO_AMPLFUNC"]
+        self._tabulate_external_functions(model)
 
         subsection_timer.reset()
 
@@ -790,8 +1033,16 @@ class ProblemWriter_nl(AbstractProblemWriter):
 
                 obj_ID = trivial_labeler(active_objective)
                 Objectives_dict[obj_ID] = (active_objective, wrapped_ampl_repn)
+                if cache is not None:
+                    cache.objectives.append(_CachedRepn(
+                        active_objective,
+                        active_objective.expr,
+                        ampl_repn,
+                        gen_obj_ampl_repn,
+                        obj_ID,
+                        active_objective.is_minimizing()))
                 self_ampl_obj_id[obj_ID] = n_objs
-                symbol_map.addSymbols([(active_objective, "o%d"%n_objs)])
+                symbol_map.addIndexedSymbols('o', (active_objective,))
 
                 n_objs += 1
                 if ampl_repn.is_nonlinear():
@@ -815,10 +1066,9 @@ class ProblemWriter_nl(AbstractProblemWriter):
         #
         # Count number of constraints and build the ampl_repns
         #
-        n_ranges = 0
-        n_single_sided_ineq = 0
-        n_equals = 0
-        n_unbounded = 0
+        # The number of constraints of each bound type (see
+        # _get_constraint_bounds_NL)
+        bound_type_counts = [0, 0, 0, 0, 0]
         n_nonlinear_constraints = 0
         ConNonlinearVars = set()
         ConNonlinearVarsInt = set()
@@ -863,10 +1113,19 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 ###      (trivial) as a feasibility check for fixed
                 ###      variables, in which case the solver will pick
                 ###      up on the model infeasibility.
+                if cache is not None:
+                    cached_repn = _CachedRepn(constraint_data,
+                                              constraint_data.body,
+                                              ampl_repn,
+                                              gen_con_ampl_repn)
+                    cache.constraints.append(cached_repn)
+
                 if skip_trivial_constraints and ampl_repn.is_fixed():
                     continue
 
                 con_ID = trivial_labeler(constraint_data)
+                if cache is not None:
+                    cached_repn.ID = con_ID
                 wrapped_ampl_repn = RepnWrapper(
                     ampl_repn,
                     list(self_varID_map[id(var)] for var in ampl_repn._linear_vars),
@@ -887,58 +1146,17 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     len(set(wrapped_ampl_repn._linear_vars).union(
                         wrapped_ampl_repn._nonlinear_vars))
 
-                L = None
-                U = None
-                if constraint_data.lower is not None:
-                    L = self._get_bound(constraint_data.lower)
-                if constraint_data.upper is not None:
-                    U = self._get_bound(constraint_data.upper)
-
-                offset = ampl_repn._constant
-                #if constraint_data.equality:
-                #    assert L == U
-                _type = getattr(constraint_data, '_complementarity', None)
-                _vid = getattr(constraint_data, '_vid', None)
-                if not _type is None:
-                    _vid = self_varID_map[_vid]+1
-                    constraint_bounds_dict[con_ID] = \
-                        "5 {0} {1}\n".format(_type, _vid)
-                    if _type == 1 or _type == 2:
-                        n_single_sided_ineq += 1
-                    elif _type == 3:
-                        n_ranges += 1
-                    elif _type == 4:
-                        n_unbounded += 1
+                constraint_bounds_dict[con_ID], bound_type = \
+                    self._get_constraint_bounds_NL(con_ID,
+                                                   constraint_data,
+                                                   ampl_repn._constant)
+                bound_type_counts[bound_type] += 1
+                if getattr(constraint_data, '_complementarity', None) \
+                   is not None:
                     if ampl_repn.is_nonlinear():
                         ccons_nonlin += 1
                     else:
                         ccons_lin += 1
-                else:
-                    if L == U:
-                        if L is None:
-                            # No constraint on body
-                            constraint_bounds_dict[con_ID] = "3\n"
-                            n_unbounded += 1
-                        else:
-                            constraint_bounds_dict[con_ID] = \
-                                "4 %r\n" % (L-offset)
-                            n_equals += 1
-                    elif L is None:
-                        constraint_bounds_dict[con_ID] = "1 %r\n" % (U-offset)
-                        n_single_sided_ineq += 1
-                    elif U is None:
-                        constraint_bounds_dict[con_ID] = "2 %r\n" % (L-offset)
-                        n_single_sided_ineq += 1
-                    elif (L > U):
-                        msg = 'Constraint {0}: lower bound greater than upper' \
-                            ' bound ({1} > {2})'
-                        raise ValueError(msg.format(con_ID, str(L), str(U)))
-                    else:
-                        constraint_bounds_dict[con_ID] = \
-                            "0 %r %r\n" % (L-offset, U-offset)
-                        # double sided inequality
-                        # both are not none and they are valid
-                        n_ranges += 1
 
         sos1 = solver_capability("sos1")
         sos2 = solver_capability("sos2")
@@ -960,9 +1178,12 @@ class ProblemWriter_nl(AbstractProblemWriter):
             (con_ID,row_id) for row_id,con_ID in \
             enumerate(itertools.chain(nonlin_con_order_list,lin_con_order_list)))
         # populate the symbol_map
-        symbol_map.addSymbols(
-            [(Constraints_dict[con_ID][0],"c%d"%row_id) for row_id,con_ID in \
-             enumerate(itertools.chain(nonlin_con_order_list,lin_con_order_list))])
+        symbol_map.addIndexedSymbols(
+            'c', [Constraints_dict[con_ID][0] for con_ID in \
+                  itertools.chain(nonlin_con_order_list,lin_con_order_list)])
+
+        n_ranges, n_single_sided_ineq, n_equals, n_unbounded = \
+            bound_type_counts[:4]
 
         if show_section_timing:
             subsection_timer.report("Generate constraint representations")
@@ -1063,8 +1284,8 @@ class ProblemWriter_nl(AbstractProblemWriter):
         self_ampl_var_id.update((var_ID,column_id)
                                 for column_id,var_ID in enumerate(full_var_list))
         # populate the symbol_map
-        symbol_map.addSymbols([(Vars_dict[var_ID],"v%d"%column_id)
-                               for column_id,var_ID in enumerate(full_var_list)])
+        symbol_map.addIndexedSymbols(
+            'v', [Vars_dict[var_ID] for var_ID in full_var_list])
 
         if show_section_timing:
             subsection_timer.report("Partition variable types")
@@ -1078,12 +1299,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
         # Generate file containing matrices for continuity variables between blocks.
         # This checks for a LOCAL suffix 'lqm' on variables.
         ###
-        lqm_suffix = model.component("lqm")
-        if (lqm_suffix is None) or \
-           (not (lqm_suffix.type() is Suffix)) or \
-           (not lqm_suffix.active) or \
-           (not (lqm_suffix.getDirection() is Suffix.LOCAL)):
-            lqm_suffix = None
+        lqm_suffix = self._get_lqm_suffix(model)
         if lqm_suffix is not None:
             lqm_var_column_ids = []
             for var_ID in full_var_list:
@@ -1119,20 +1335,15 @@ class ProblemWriter_nl(AbstractProblemWriter):
 #        end_time = time.clock()
 #        print (end_time - start_time)
 
-        colfilename = None
-        if OUTPUT.name.endswith('.nl'):
-            colfilename = OUTPUT.name.replace('.nl','.col')
-        else:
-            colfilename = OUTPUT.name+'.col'
         if symbolic_solver_labels:
-            colf = open(colfilename,'w')
-            colfile_line_template = "%s\n"
+            colfile_lines = []
             for var_ID in full_var_list:
                 varname = name_labeler(Vars_dict[var_ID])
-                colf.write(colfile_line_template % varname)
+                colfile_lines.append(varname+"\n")
                 if len(varname) > max_colname_len:
                     max_colname_len = len(varname)
-            colf.close()
+            with open(self._get_aux_filename('.col'),'w') as colf:
+                colf.writelines(colfile_lines)
 
         if show_section_timing:
             subsection_timer.report("Write .col file")
@@ -1141,78 +1352,80 @@ class ProblemWriter_nl(AbstractProblemWriter):
         #
         # Print Header
         #
+        header_lines = []
+        #
         # LINE 1
         #
-        OUTPUT.write("g3 1 1 0\t# problem {0}\n".format(model.name))
+        header_lines.append("g3 1 1 0\t# problem {0}\n".format(model.name))
         #
         # LINE 2
         #
-        OUTPUT.write(" {0} {1} {2} {3} {4} \t# vars, constraints, "
-                     "objectives, ranges, eqns\n" .format(
-                         len(full_var_list),
-                         n_single_sided_ineq + n_ranges+n_equals+n_unbounded,
-                         n_objs,
-                         n_ranges,
-                         n_equals))
+        header_lines.append(_nl_header_line2.format(
+            len(full_var_list),
+            n_single_sided_ineq + n_ranges+n_equals+n_unbounded,
+            n_objs,
+            n_ranges,
+            n_equals))
         #
         # LINE 3
         #
-        OUTPUT.write(" {0} {1} {2} {3} {4} {5}\t# nonlinear constrs, "
-                     "objs; ccons: lin, nonlin, nd, nzlb\n".format(
-                         n_nonlinear_constraints,
-                         n_nonlinear_objs,
-                         ccons_lin,
-                         ccons_nonlin,
-                         ccons_nd,
-                         ccons_nzlb))
+        header_lines.append(" {0} {1} {2} {3} {4} {5}\t# nonlinear constrs, "
+                            "objs; ccons: lin, nonlin, nd, nzlb\n".format(
+                                n_nonlinear_constraints,
+                                n_nonlinear_objs,
+                                ccons_lin,
+                                ccons_nonlin,
+                                ccons_nd,
+                                ccons_nzlb))
         #
         # LINE 4
         #
-        OUTPUT.write(" 0 0\t# network constraints: nonlinear, linear\n")
+        header_lines.append(" 0 0\t# network constraints: nonlinear, linear\n")
         #
         # LINE 5
         #
-        OUTPUT.write(" {0} {1} {2} \t# nonlinear vars in constraints, "
-                     "objectives, both\n".format(
-                         idx_nl_con,
-                         idx_nl_obj,
-                         idx_nl_both))
+        header_lines.append(" {0} {1} {2} \t# nonlinear vars in constraints, "
+                            "objectives, both\n".format(
+                                idx_nl_con,
+                                idx_nl_obj,
+                                idx_nl_both))
 
         #
         # LINE 6
         #
-        OUTPUT.write(" 0 {0} 0 1\t# linear network variables; functions; "
-                     "arith, flags\n".format(len(self.external_byFcn)))
+        header_lines.append(" 0 {0} 0 1\t# linear network variables; functions; "
+                            "arith, flags\n".format(len(self.external_byFcn)))
         #
         # LINE 7
         #
         n_int_nonlinear_b = len(Discrete_Nonlinear_Vars_in_Objs_and_Constraints)
         n_int_nonlinear_c = len(ConNonlinearVarsInt)
         n_int_nonlinear_o = len(ObjNonlinearVarsInt)
-        OUTPUT.write(" {0} {1} {2} {3} {4} \t# discrete variables: binary, "
-                     "integer, nonlinear (b,c,o)\n".format(
-                         len(LinearVarsBool),
-                         len(LinearVarsInt),
-                         n_int_nonlinear_b,
-                         n_int_nonlinear_c,
-                         n_int_nonlinear_o))
+        header_lines.append(" {0} {1} {2} {3} {4} \t# discrete variables: binary, "
+                            "integer, nonlinear (b,c,o)\n".format(
+                                len(LinearVarsBool),
+                                len(LinearVarsInt),
+                                n_int_nonlinear_b,
+                                n_int_nonlinear_c,
+                                n_int_nonlinear_o))
         #
         # LINE 8
         #
         # objective info computed above
-        OUTPUT.write(" {0} {1} \t# nonzeros in Jacobian, obj. gradient\n".format(
+        header_lines.append(" {0} {1} \t# nonzeros in Jacobian, obj. gradient\n".format(
             nnz_grad_constraints,
             len(ObjVars)))
         #
         # LINE 9
         #
-        OUTPUT.write(" %d %d\t# max name lengths: constraints, variables\n"
-                     % (max_rowname_len, max_colname_len))
+        header_lines.append(" %d %d\t# max name lengths: constraints, variables\n"
+                            % (max_rowname_len, max_colname_len))
 
         #
         # LINE 10
         #
-        OUTPUT.write(" 0 0 0 0 0\t# common exprs: b,c,o,c1,o1\n")
+        header_lines.append(" 0 0 0 0 0\t# common exprs: b,c,o,c1,o1\n")
+        OUTPUT.writelines(header_lines)
 
 #        end_time = time.clock()
 #        print (end_time - start_time)
@@ -1224,18 +1437,290 @@ class ProblemWriter_nl(AbstractProblemWriter):
         #
         # "F" lines
         #
-        for fcn, fid in sorted(itervalues(self.external_byFcn),
-                               key=operator.itemgetter(1)):
-            OUTPUT.write("F%d 1 -1 %s\n" % (fid, fcn._function))
+        self._print_external_functions_NL()
 
         #
         # "S" lines
         #
+        suffix_dict = self._print_suffixes_NL(model,
+                                              all_blocks_list,
+                                              sorter,
+                                              solver_capability,
+                                              symbol_map)
+
+        #
+        # "C" lines
+        #
+        # When writing incrementally, the serialized C, O, J and G
+        # segments are saved (indexed by row / objective id) so that
+        # the next write only needs to regenerate the ones that
+        # changed.
+        C_segments = None
+        O_segments = None
+        J_segments = None
+        G_segments = None
+        if cache is not None:
+            n_rows = len(nonlin_con_order_list) + len(lin_con_order_list)
+            C_segments = [None]*n_rows
+            J_segments = [None]*n_rows
+            O_segments = [None]*n_objs
+            G_segments = [None]*n_objs
+
+        if symbolic_solver_labels:
+            rowfile_lines = []
+
+        cu = [0 for i in xrange(len(full_var_list))]
+        for con_ID in nonlin_con_order_list:
+            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
+            row_id = self_ampl_con_id[con_ID]
+            lbl = None
+            if symbolic_solver_labels:
+                lbl = name_labeler(con_data)
+                rowfile_lines.append(lbl+"\n")
+            if C_segments is None:
+                self._print_C_segment_NL(row_id, lbl, wrapped_ampl_repn.repn)
+            else:
+                C_segments[row_id] = self._get_segment_NL(
+                    self._print_C_segment_NL, row_id, lbl, wrapped_ampl_repn.repn)
+                OUTPUT.write(C_segments[row_id])
+
+            for var_ID in set(wrapped_ampl_repn._linear_vars).union(
+                    wrapped_ampl_repn._nonlinear_vars):
+                cu[self_ampl_var_id[var_ID]] += 1
+
+        for con_ID in lin_con_order_list:
+            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
+            row_id = self_ampl_con_id[con_ID]
+            con_vars = set(wrapped_ampl_repn._linear_vars)
+            for var_ID in con_vars:
+                cu[self_ampl_var_id[var_ID]] += 1
+            lbl = None
+            if symbolic_solver_labels:
+                lbl = name_labeler(con_data)
+                rowfile_lines.append(lbl+"\n")
+            if C_segments is None:
+                self._print_C_segment_NL(row_id, lbl, wrapped_ampl_repn.repn)
+            else:
+                C_segments[row_id] = self._get_segment_NL(
+                    self._print_C_segment_NL, row_id, lbl, wrapped_ampl_repn.repn)
+                OUTPUT.write(C_segments[row_id])
+
+        if show_section_timing:
+            subsection_timer.report("Write NL header and suffix lines")
+            subsection_timer.reset()
+
+        #
+        # "O" lines
+        #
+        for obj_ID, (obj, wrapped_ampl_repn) in iteritems(Objectives_dict):
+            obj_id = self_ampl_obj_id[obj_ID]
+            lbl = None
+            if symbolic_solver_labels:
+                lbl = name_labeler(obj)
+                rowfile_lines.append(lbl+"\n")
+            if O_segments is None:
+                self._print_O_segment_NL(obj_id, obj, lbl, wrapped_ampl_repn.repn)
+            else:
+                O_segments[obj_id] = self._get_segment_NL(
+                    self._print_O_segment_NL, obj_id, obj, lbl,
+                    wrapped_ampl_repn.repn)
+                OUTPUT.write(O_segments[obj_id])
+
+        if symbolic_solver_labels:
+            with open(self._get_aux_filename('.row'),'w') as rowf:
+                rowf.writelines(rowfile_lines)
+        del name_labeler
+
+        if show_section_timing:
+            subsection_timer.report("Write objective expression")
+            subsection_timer.reset()
+
+        #
+        # "d" lines
+        #
+        # dual initialization
+        self._print_dual_initialization_NL(suffix_dict, symbol_map)
+
+        #
+        # "x" lines
+        #
+        # variable initialization
+        x_init_list, var_bound_list = \
+            self._get_var_initialization_and_bounds_NL(model,
+                                                       full_var_list,
+                                                       Vars_dict)
+
+        OUTPUT.write("x%d" % (len(x_init_list)))
+        if symbolic_solver_labels:
+            OUTPUT.write("\t# initial guess")
+        OUTPUT.write("\n")
+        OUTPUT.writelines(x_init_list)
+        del x_init_list
+
+        if show_section_timing:
+            subsection_timer.report("Write initializations")
+            subsection_timer.reset()
+
+        #
+        # "r" lines
+        #
+        OUTPUT.write("r")
+        if symbolic_solver_labels:
+            OUTPUT.write("\t#%d ranges (rhs's)"
+                         % (len(nonlin_con_order_list) + len(lin_con_order_list)))
+        OUTPUT.write("\n")
+        # *NOTE: This iteration follows the assignment of the ampl_con_id
+        OUTPUT.writelines(constraint_bounds_dict[con_ID]
+                          for con_ID in itertools.chain(nonlin_con_order_list,
+                                                        lin_con_order_list))
+
+        if show_section_timing:
+            subsection_timer.report("Write constraint bounds")
+            subsection_timer.reset()
+
+        #
+        # "b" lines
+        #
+        OUTPUT.write("b")
+        if symbolic_solver_labels:
+            OUTPUT.write("\t#%d bounds (on variables)"
+                         % (len(var_bound_list)))
+        OUTPUT.write("\n")
+        OUTPUT.writelines(var_bound_list)
+        del var_bound_list
+
+        if show_section_timing:
+            subsection_timer.report("Write variable bounds")
+            subsection_timer.reset()
+
+        #
+        # "k" lines
+        #
+        n1 = len(full_var_list) - 1
+        k_lines = ["k%d" % (n1)]
+        if symbolic_solver_labels:
+            k_lines.append("\t#intermediate Jacobian column lengths")
+        k_lines.append("\n")
+        ktot = 0
+        for i in xrange(n1):
+            ktot += cu[i]
+            k_lines.append("%d\n"%(ktot))
+        del cu
+        OUTPUT.writelines(k_lines)
+
+        if show_section_timing:
+            subsection_timer.report("Write k lines")
+            subsection_timer.reset()
+
+        #
+        # "J" lines
+        #
+        for nc, con_ID in enumerate(itertools.chain(nonlin_con_order_list,
+                                                    lin_con_order_list)):
+            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
+            if J_segments is None:
+                self._print_J_segment_NL(nc, wrapped_ampl_repn)
+            else:
+                J_segments[nc] = self._get_segment_NL(
+                    self._print_J_segment_NL, nc, wrapped_ampl_repn)
+                OUTPUT.write(J_segments[nc])
+
+        if show_section_timing:
+            subsection_timer.report("Write J lines")
+            subsection_timer.reset()
+
+        #
+        # "G" lines
+        #
+        for obj_ID, (obj, wrapped_ampl_repn) in \
+               iteritems(Objectives_dict):
+            obj_id = self_ampl_obj_id[obj_ID]
+            if G_segments is None:
+                self._print_G_segment_NL(obj_id, wrapped_ampl_repn)
+            else:
+                G_segments[obj_id] = self._get_segment_NL(
+                    self._print_G_segment_NL, obj_id, wrapped_ampl_repn)
+                OUTPUT.write(G_segments[obj_id])
+
+        if show_section_timing:
+            subsection_timer.report("Write G lines")
+            subsection_timer.reset()
+            overall_timer.report("Total time")
+
+        if cache is not None:
+            cache.Vars_dict = Vars_dict
+            cache.var_ids = [id(Vars_dict[var_ID])
+                             for var_ID in xrange(len(Vars_dict))]
+            cache.varID_map = self_varID_map
+            cache.full_var_list = full_var_list
+            cache.var_domains = [_get_var_domain(Vars_dict[var_ID])
+                                 for var_ID in full_var_list]
+            cache.ampl_var_id = self_ampl_var_id
+            cache.ampl_con_id = self_ampl_con_id
+            cache.ampl_obj_id = self_ampl_obj_id
+            cache.Objectives_dict = Objectives_dict
+            cache.Constraints_dict = Constraints_dict
+            cache.con_order_list = nonlin_con_order_list + lin_con_order_list
+            cache.external_byFcn = dict(self.external_byFcn)
+            cache.header_lines = header_lines
+            cache.C_segments = C_segments
+            cache.O_segments = O_segments
+            cache.J_segments = J_segments
+            cache.G_segments = G_segments
+            cache.k_lines = k_lines
+            if symbolic_solver_labels:
+                cache.colfile_lines = colfile_lines
+                cache.rowfile_lines = rowfile_lines
+            cache.symbols = symbol_map.copy()
+            model._nl_writer_cache = cache
+
+        return symbol_map
+
+    def _get_aux_filename(self, suffix):
+        """
+        Return the name of a file (e.g., the .row or .col file) that
+        accompanies the NL file being written.
+        """
+        if self._OUTPUT.name.endswith('.nl'):
+            return self._OUTPUT.name.replace('.nl',suffix)
+        else:
+            return self._OUTPUT.name+suffix
+
+    def _get_segment_NL(self, print_method, *args):
+        """
+        Return the text that a _print_*_NL method writes to the NL
+        file (rather than writing it).
+        """
+        OUTPUT = self._OUTPUT
+        self._OUTPUT = StringIO()
+        try:
+            print_method(*args)
+            return self._OUTPUT.getvalue()
+        finally:
+            self._OUTPUT = OUTPUT
+
+    def _print_external_functions_NL(self):
+        OUTPUT = self._OUTPUT
+        for fcn, fid in sorted(itervalues(self.external_byFcn),
+                               key=operator.itemgetter(1)):
+            OUTPUT.write("F%d 1 -1 %s\n" % (fid, fcn._function))
+
+    def _print_suffixes_NL(self,
+                           model,
+                           all_blocks_list,
+                           sorter,
+                           solver_capability,
+                           symbol_map):
+        """
+        Print the "S" lines and return the dictionary of active export
+        suffixes (by name).
+        """
+        OUTPUT = self._OUTPUT
 
         # Tranlate the SOSConstraint component into ampl suffixes
         sos1 = solver_capability("sos1")
         sos2 = solver_capability("sos2")
-        modelSOS = ModelSOS(self_ampl_var_id, self_varID_map)
+        modelSOS = ModelSOS(self.ampl_var_id, self._varID_map)
         for block in all_blocks_list:
             for soscondata in block.component_data_objects(SOSConstraint,
                                                            active=True,
@@ -1247,7 +1732,7 @@ class ProblemWriter_nl(AbstractProblemWriter):
                         "Solver does not support SOS level %s constraints" % (level))
                 modelSOS.count_constraint(soscondata)
 
-        symbol_map_byObject = symbol_map.byObject
+        symbol_map_getIndex = symbol_map.getIndex
 
         var_sosno_suffix = modelSOS.sosno
         var_ref_suffix = modelSOS.ref
@@ -1340,9 +1825,8 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 for component_data, suffix_value in iteritems(suffix):
 
                     try:
-                        symbol = symbol_map_byObject[id(component_data)]
-                        type_tag = symbol[0]
-                        ampl_id = int(symbol[1:])
+                        type_tag, ampl_id = \
+                            symbol_map_getIndex(component_data)
                         if type_tag == 'v':
                             var_s_lines.append((ampl_id, suffix_value))
                         elif type_tag == 'c':
@@ -1396,91 +1880,46 @@ class ProblemWriter_nl(AbstractProblemWriter):
 
         del modelSOS
 
-        #
-        # "C" lines
-        #
-        rowfilename = None
-        if OUTPUT.name.endswith('.nl'):
-            rowfilename = OUTPUT.name.replace('.nl','.row')
+        return suffix_dict
+    def _print_C_segment_NL(self, row_id, lbl, ampl_repn):
+        OUTPUT = self._OUTPUT
+        OUTPUT.write("C%d" % (row_id))
+        if lbl is not None:
+            OUTPUT.write("\t#%s" % (lbl))
+        OUTPUT.write("\n")
+        if ampl_repn.is_nonlinear():
+            self._print_nonlinear_terms_NL(ampl_repn._nonlinear_expr)
         else:
-            rowfilename = OUTPUT.name+'.row'
-        if symbolic_solver_labels:
-            rowf = open(rowfilename,'w')
-
-        cu = [0 for i in xrange(len(full_var_list))]
-        for con_ID in nonlin_con_order_list:
-            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
-            row_id = self_ampl_con_id[con_ID]
-            OUTPUT.write("C%d" % (row_id))
-            if symbolic_solver_labels:
-                lbl = name_labeler(con_data)
-                OUTPUT.write("\t#%s" % (lbl))
-                rowf.write(lbl+"\n")
-            OUTPUT.write("\n")
-            self._print_nonlinear_terms_NL(wrapped_ampl_repn.repn._nonlinear_expr)
-
-            for var_ID in set(wrapped_ampl_repn._linear_vars).union(
-                    wrapped_ampl_repn._nonlinear_vars):
-                cu[self_ampl_var_id[var_ID]] += 1
-
-        for con_ID in lin_con_order_list:
-            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
-            row_id = self_ampl_con_id[con_ID]
-            con_vars = set(wrapped_ampl_repn._linear_vars)
-            for var_ID in con_vars:
-                cu[self_ampl_var_id[var_ID]] += 1
-            OUTPUT.write("C%d" % (row_id))
-            if symbolic_solver_labels:
-                lbl = name_labeler(con_data)
-                OUTPUT.write("\t#%s" % (lbl))
-                rowf.write(lbl+"\n")
-            OUTPUT.write("\n")
             OUTPUT.write("n0\n")
 
-        if show_section_timing:
-            subsection_timer.report("Write NL header and suffix lines")
-            subsection_timer.reset()
-
-        #
-        # "O" lines
-        #
-        for obj_ID, (obj, wrapped_ampl_repn) in iteritems(Objectives_dict):
+    def _print_O_segment_NL(self, obj_id, obj, lbl, ampl_repn):
+        OUTPUT = self._OUTPUT
 
-            k = 0
-            if not obj.is_minimizing():
-                k = 1
+        k = 0
+        if not obj.is_minimizing():
+            k = 1
 
-            OUTPUT.write("O%d %d" % (self_ampl_obj_id[obj_ID], k))
-            if symbolic_solver_labels:
-                lbl = name_labeler(obj)
-                OUTPUT.write("\t#%s" % (lbl))
-                rowf.write(lbl+"\n")
-            OUTPUT.write("\n")
+        OUTPUT.write("O%d %d" % (obj_id, k))
+        if lbl is not None:
+            OUTPUT.write("\t#%s" % (lbl))
+        OUTPUT.write("\n")
 
-            if wrapped_ampl_repn.repn.is_linear():
+        if ampl_repn.is_linear():
+            OUTPUT.write(self._op_string[NumericConstant]
+                         % (ampl_repn._constant))
+        else:
+            if ampl_repn._constant != 0:
+                _, binary_sum_str, _ = self._op_string[expr._SumExpression]
+                OUTPUT.write(binary_sum_str)
                 OUTPUT.write(self._op_string[NumericConstant]
-                             % (wrapped_ampl_repn.repn._constant))
-            else:
-                if wrapped_ampl_repn.repn._constant != 0:
-                    _, binary_sum_str, _ = self._op_string[expr._SumExpression]
-                    OUTPUT.write(binary_sum_str)
-                    OUTPUT.write(self._op_string[NumericConstant]
-                                 % (wrapped_ampl_repn.repn._constant))
-                self._print_nonlinear_terms_NL(wrapped_ampl_repn.repn._nonlinear_expr)
+                             % (ampl_repn._constant))
+            self._print_nonlinear_terms_NL(ampl_repn._nonlinear_expr)
 
-        if symbolic_solver_labels:
-            rowf.close()
-        del name_labeler
-
-        if show_section_timing:
-            subsection_timer.report("Write objective expression")
-            subsection_timer.reset()
-
-        #
-        # "d" lines
-        #
-        # dual initialization
+    def _print_dual_initialization_NL(self, suffix_dict, symbol_map):
+        OUTPUT = self._OUTPUT
+        suffix_line = "{0} {1!r}\n"
         if 'dual' in suffix_dict:
+            symbol_map_getIndex = symbol_map.getIndex
             s_lines = []
             for dual_suffix in suffix_dict['dual']:
 
@@ -1488,27 +1927,31 @@ class ProblemWriter_nl(AbstractProblemWriter):
                     try:
                         # a constraint might not be referenced
                         # (inactive / on inactive block)
-                        symbol = symbol_map_byObject[id(constraint_data)]
-                        type_tag = symbol[0]
+                        type_tag, ampl_con_id = \
+                            symbol_map_getIndex(constraint_data)
                         assert type_tag == 'c'
-                        ampl_con_id = int(symbol[1:])
                         s_lines.append((ampl_con_id, suffix_value))
                     except KeyError:
                         pass
 
             if len(s_lines) > 0:
                 OUTPUT.write("d%d" % (len(s_lines)))
-                if symbolic_solver_labels:
+                if self._symbolic_solver_labels:
                     OUTPUT.write("\t# dual initial guess")
                 OUTPUT.write("\n")
                 OUTPUT.writelines(suffix_line.format(*_l)
                                   for _l in sorted(s_lines,
                                                    key=operator.itemgetter(0)))
 
-        #
-        # "x" lines
-        #
-        # variable initialization
+    def _get_var_initialization_and_bounds_NL(self,
+                                              model,
+                                              full_var_list,
+                                              Vars_dict):
+        """
+        Return the "x" (initial value) and "b" (bounds) lines for the
+        variables in the NL file.
+        """
+        output_fixed_variable_bounds = self._output_fixed_variable_bounds
         var_bound_list = []
         x_init_list = []
         for ampl_var_id, var_ID in enumerate(full_var_list):
@@ -1549,143 +1992,391 @@ class ProblemWriter_nl(AbstractProblemWriter):
                 var_bound_list.append("1 %r\n" % (value(U)))
             else:
                 var_bound_list.append("3\n")
+        return x_init_list, var_bound_list
 
-        OUTPUT.write("x%d" % (len(x_init_list)))
-        if symbolic_solver_labels:
-            OUTPUT.write("\t# initial guess")
-        OUTPUT.write("\n")
-        OUTPUT.writelines(x_init_list)
-        del x_init_list
+    def _print_J_segment_NL(self, nc, wrapped_ampl_repn):
+        OUTPUT = self._OUTPUT
+        self_ampl_var_id = self.ampl_var_id
+        num_nonlinear_vars = len(wrapped_ampl_repn._nonlinear_vars)
+        num_linear_vars = len(wrapped_ampl_repn._linear_vars)
+        if num_nonlinear_vars == 0:
+            if num_linear_vars > 0:
+                linear_dict = dict((var_ID, coef)
+                                   for var_ID, coef in
+                                   zip(wrapped_ampl_repn._linear_vars,
+                                       wrapped_ampl_repn.repn._linear_terms_coef))
+                OUTPUT.write("J%d %d\n"%(nc, num_linear_vars))
+                OUTPUT.writelines(
+                    "%d %r\n" % (self_ampl_var_id[con_var],
+                                 linear_dict[con_var])
+                    for con_var in sorted(linear_dict.keys()))
+        elif num_linear_vars == 0:
+            nl_con_vars = \
+                sorted(wrapped_ampl_repn._nonlinear_vars)
+            OUTPUT.write("J%d %d\n"%(nc, num_nonlinear_vars))
+            OUTPUT.writelines(
+                "%d 0\n"%(self_ampl_var_id[con_var])
+                for con_var in nl_con_vars)
+        else:
+            con_vars = set(wrapped_ampl_repn._nonlinear_vars)
+            nl_con_vars = sorted(
+                con_vars.difference(
+                    wrapped_ampl_repn._linear_vars))
+            con_vars.update(wrapped_ampl_repn._linear_vars)
+            linear_dict = dict(
+                (var_ID, coef) for var_ID, coef in
+                zip(wrapped_ampl_repn._linear_vars,
+                    wrapped_ampl_repn.repn._linear_terms_coef))
+            OUTPUT.write("J%d %d\n"%(nc, len(con_vars)))
+            OUTPUT.writelines(
+                "%d %r\n" % (self_ampl_var_id[con_var],
+                             linear_dict[con_var])
+                for con_var in sorted(linear_dict.keys()))
+            OUTPUT.writelines(
+                "%d 0\n"%(self_ampl_var_id[con_var])
+                for con_var in nl_con_vars)
+
+    def _print_G_segment_NL(self, obj_id, wrapped_ampl_repn):
+        OUTPUT = self._OUTPUT
+        self_ampl_var_id = self.ampl_var_id
+        grad_entries = {}
+        for idx, obj_var in enumerate(
+                wrapped_ampl_repn._linear_vars):
+            grad_entries[self_ampl_var_id[obj_var]] = \
+                wrapped_ampl_repn.repn._linear_terms_coef[idx]
+        for obj_var in wrapped_ampl_repn._nonlinear_vars:
+            if obj_var not in wrapped_ampl_repn._linear_vars:
+                grad_entries[self_ampl_var_id[obj_var]] = 0
+        len_ge = len(grad_entries)
+        if len_ge > 0:
+            OUTPUT.write("G%d %d\n" % (obj_id, len_ge))
+            for var_ID in sorted(grad_entries.keys()):
+                OUTPUT.write("%d %r\n" % (var_ID,
+                                          grad_entries[var_ID]))
+
+    def _get_lqm_suffix(self, model):
+        lqm_suffix = model.component("lqm")
+        if (lqm_suffix is None) or \
+           (not (lqm_suffix.type() is Suffix)) or \
+           (not lqm_suffix.active) or \
+           (not (lqm_suffix.getDirection() is Suffix.LOCAL)):
+            lqm_suffix = None
+        return lqm_suffix
+
+    def _regenerate_cached_repn(self, block, generated, component_data,
+                                exp, cached_repn):
+        """
+        Return the new ampl_repn for an objective or constraint, or
+        None if the cached ampl_repn is still valid.
+        """
+        if not hasattr(block,'_ampl_repn'):
+            block._ampl_repn = ComponentMap()
+        if generated:
+            if (cached_repn.deps is not None) and \
+               (exp is cached_repn.expr) and \
+               (not _dependencies_changed(cached_repn.deps,
+                                          cached_repn.state)):
+                return None
+            ampl_repn = generate_ampl_repn(exp)
+            block._ampl_repn[component_data] = ampl_repn
+        else:
+            ampl_repn = block._ampl_repn[component_data]
+            if (cached_repn.deps is None) and \
+               (ampl_repn is cached_repn.state):
+                return None
+        return ampl_repn
+
+    def _wrap_cached_repn(self, ampl_repn, old_wrapped_ampl_repn):
+        """
+        Return the RepnWrapper for a regenerated ampl_repn, or None if
+        it changes the structure of the NL file (the variables that
+        appear in it or whether it is nonlinear).
+        """
+        self_varID_map = self._varID_map
+        wrapped_ampl_repn = RepnWrapper(
+            ampl_repn,
+            list(self_varID_map[id(var)] for var in ampl_repn._linear_vars),
+            list(self_varID_map[id(var)] for var in ampl_repn._nonlinear_vars))
+        if (ampl_repn.is_nonlinear() !=
+                old_wrapped_ampl_repn.repn.is_nonlinear()) or \
+           (set(wrapped_ampl_repn._linear_vars) !=
+                set(old_wrapped_ampl_repn._linear_vars)) or \
+           (set(wrapped_ampl_repn._nonlinear_vars) !=
+                set(old_wrapped_ampl_repn._nonlinear_vars)):
+            return None
+        return wrapped_ampl_repn
+
+    def _print_model_NL_incremental(self, model,
+                                    solver_capability,
+                                    show_section_timing=False,
+                                    skip_trivial_constraints=False,
+                                    file_determinism=1,
+                                    include_all_variable_bounds=False):
+        """
+        Write the NL file for a model that was last written with the
+        'incremental' io_option, reusing the cached variable and
+        constraint ordering along with every cached section of the
+        file whose inputs did not change. The "x", "r" and "b" lines
+        and the suffixes are always regenerated.
+
+        Returns None (without writing anything) if there is no valid
+        cache or the structure of the model changed, in which case
+        the caller must perform a full write.
+        """
+        symbolic_solver_labels = self._symbolic_solver_labels
 
-        if show_section_timing:
-            subsection_timer.report("Write initializations")
-            subsection_timer.reset()
+        cache = getattr(model, '_nl_writer_cache', None)
+        if (cache is None) or (not cache.valid) or \
+           (cache.options != (symbolic_solver_labels,
+                              skip_trivial_constraints,
+                              file_determinism,
+                              include_all_variable_bounds)):
+            return None
+
+        # The .lqm file is only generated by a full write
+        if self._get_lqm_suffix(model) is not None:
+            return None
+
+        sorter = self._get_sorter(file_determinism)
+
+        OUTPUT = self._OUTPUT
+        assert OUTPUT is not None
+
+        overall_timer = StopWatch()
+        subsection_timer = StopWatch()
+
+        self._tabulate_external_functions(model)
+        if len(self.external_byFcn) != len(cache.external_byFcn):
+            return None
+        for fcn_name, (fcn, fid) in iteritems(self.external_byFcn):
+            if (fcn_name not in cache.external_byFcn) or \
+               (cache.external_byFcn[fcn_name][0] is not fcn) or \
+               (cache.external_byFcn[fcn_name][1] != fid):
+                return None
 
         #
-        # "r" lines
+        # Verify that the model has the same variables, objectives and
+        # constraints (in the same order) as the cached write
         #
-        OUTPUT.write("r")
-        if symbolic_solver_labels:
-            OUTPUT.write("\t#%d ranges (rhs's)"
-                         % (len(nonlin_con_order_list) + len(lin_con_order_list)))
-        OUTPUT.write("\n")
-        # *NOTE: This iteration follows the assignment of the ampl_con_id
-        OUTPUT.writelines(constraint_bounds_dict[con_ID]
-                          for con_ID in itertools.chain(nonlin_con_order_list,
-                                                        lin_con_order_list))
-
-        if show_section_timing:
-            subsection_timer.report("Write constraint bounds")
-            subsection_timer.reset()
+        all_blocks_list = list(model.block_data_objects(active=True, sort=sorter))
+        var_ids = []
+        objectives = []
+        constraints = []
+        for block in all_blocks_list:
+            var_ids.extend(id(vardata) for vardata in
+                           block.component_data_objects(Var,
+                                                        active=True,
+                                                        sort=sorter,
+                                                        descend_into=False))
+            gen_obj_ampl_repn = getattr(block, "_gen_obj_ampl_repn", True)
+            objectives.extend(
+                (block, gen_obj_ampl_repn, objective_data)
+                for objective_data in
+                block.component_data_objects(Objective,
+                                             active=True,
+                                             sort=sorter,
+                                             descend_into=False))
+            gen_con_ampl_repn = getattr(block, "_gen_con_ampl_repn", True)
+            constraints.extend(
+                (block, gen_con_ampl_repn, constraint_data)
+                for constraint_data in
+                block.component_data_objects(Constraint,
+                                             active=True,
+                                             sort=sorter,
+                                             descend_into=False))
+        if (var_ids != cache.var_ids) or \
+           (len(objectives) != len(cache.objectives)) or \
+           (len(constraints) != len(cache.constraints)):
+            return None
+        del var_ids
+
+        Vars_dict = cache.Vars_dict
+        full_var_list = cache.full_var_list
+        for var_ID, domain in zip(full_var_list, cache.var_domains):
+            if _get_var_domain(Vars_dict[var_ID]) != domain:
+                return None
+
+        self._varID_map = cache.varID_map
+        self.ampl_var_id = cache.ampl_var_id
+        self.ampl_con_id = self_ampl_con_id = cache.ampl_con_id
+        self.ampl_obj_id = self_ampl_obj_id = cache.ampl_obj_id
+        Objectives_dict = cache.Objectives_dict
+        Constraints_dict = cache.Constraints_dict
+        con_order_list = cache.con_order_list
 
         #
-        # "b" lines
+        # Regenerate the ampl_repns whose inputs changed. Nothing in
+        # the cache is updated until we know that none of the changes
+        # is structural.
         #
-        OUTPUT.write("b")
-        if symbolic_solver_labels:
-            OUTPUT.write("\t#%d bounds (on variables)"
-                         % (len(var_bound_list)))
-        OUTPUT.write("\n")
-        OUTPUT.writelines(var_bound_list)
-        del var_bound_list
+        changed_objectives = []
+        for (block, generated, objective_data), cached_repn in \
+                zip(objectives, cache.objectives):
+            if objective_data is not cached_repn.data:
+                return None
+            exp = objective_data.expr
+            sense = objective_data.is_minimizing()
+            ampl_repn = self._regenerate_cached_repn(
+                block, generated, objective_data, exp, cached_repn)
+            if ampl_repn is None:
+                if sense == cached_repn.sense:
+                    continue
+                ampl_repn = Objectives_dict[cached_repn.ID][1].repn
+            wrapped_ampl_repn = self._wrap_cached_repn(
+                ampl_repn, Objectives_dict[cached_repn.ID][1])
+            if wrapped_ampl_repn is None:
+                return None
+            changed_objectives.append(
+                (cached_repn, generated, exp, sense, wrapped_ampl_repn))
+        del objectives
+
+        changed_constraints = []
+        for (block, generated, constraint_data), cached_repn in \
+                zip(constraints, cache.constraints):
+            if constraint_data is not cached_repn.data:
+                return None
+            exp = constraint_data.body
+            ampl_repn = self._regenerate_cached_repn(
+                block, generated, constraint_data, exp, cached_repn)
+            if ampl_repn is None:
+                continue
+            if skip_trivial_constraints and \
+               (ampl_repn.is_fixed() != (cached_repn.ID is None)):
+                return None
+            wrapped_ampl_repn = None
+            if cached_repn.ID is not None:
+                wrapped_ampl_repn = self._wrap_cached_repn(
+                    ampl_repn, Constraints_dict[cached_repn.ID][1])
+                if wrapped_ampl_repn is None:
+                    return None
+            changed_constraints.append(
+                (cached_repn, generated, exp, ampl_repn, wrapped_ampl_repn))
+        del constraints
 
         if show_section_timing:
-            subsection_timer.report("Write variable bounds")
+            subsection_timer.report("Regenerate changed representations")
             subsection_timer.reset()
 
         #
-        # "k" lines
+        # Update the cache
         #
-        ktot = 0
-        n1 = len(full_var_list) - 1
-        OUTPUT.write("k%d" % (n1))
-        if symbolic_solver_labels:
-            OUTPUT.write("\t#intermediate Jacobian column lengths")
-        OUTPUT.write("\n")
-        ktot = 0
-        for i in xrange(n1):
-            ktot += cu[i]
-            OUTPUT.write("%d\n"%(ktot))
-        del cu
+        name_labeler = self._name_labeler
+        for cached_repn, generated, exp, sense, wrapped_ampl_repn in \
+                changed_objectives:
+            cached_repn.update(exp, wrapped_ampl_repn.repn, generated)
+            cached_repn.sense = sense
+            obj = cached_repn.data
+            Objectives_dict[cached_repn.ID] = (obj, wrapped_ampl_repn)
+            obj_id = self_ampl_obj_id[cached_repn.ID]
+            lbl = None
+            if symbolic_solver_labels:
+                lbl = name_labeler(obj)
+            cache.O_segments[obj_id] = self._get_segment_NL(
+                self._print_O_segment_NL, obj_id, obj, lbl,
+                wrapped_ampl_repn.repn)
+            cache.G_segments[obj_id] = self._get_segment_NL(
+                self._print_G_segment_NL, obj_id, wrapped_ampl_repn)
+
+        for cached_repn, generated, exp, ampl_repn, wrapped_ampl_repn in \
+                changed_constraints:
+            cached_repn.update(exp, ampl_repn, generated)
+            if cached_repn.ID is None:
+                continue
+            con_data = cached_repn.data
+            Constraints_dict[cached_repn.ID] = (con_data, wrapped_ampl_repn)
+            row_id = self_ampl_con_id[cached_repn.ID]
+            if ampl_repn.is_nonlinear():
+                lbl = None
+                if symbolic_solver_labels:
+                    lbl = name_labeler(con_data)
+                cache.C_segments[row_id] = self._get_segment_NL(
+                    self._print_C_segment_NL, row_id, lbl, ampl_repn)
+            cache.J_segments[row_id] = self._get_segment_NL(
+                self._print_J_segment_NL, row_id, wrapped_ampl_repn)
 
         if show_section_timing:
-            subsection_timer.report("Write k lines")
+            subsection_timer.report("Regenerate changed segments")
             subsection_timer.reset()
 
         #
-        # "J" lines
+        # The "r" lines (constraint bounds) and the number of ranges
+        # and equality constraints in the header
         #
-        for nc, con_ID in enumerate(itertools.chain(nonlin_con_order_list,
-                                                    lin_con_order_list)):
-            con_data, wrapped_ampl_repn = Constraints_dict[con_ID]
-            num_nonlinear_vars = len(wrapped_ampl_repn._nonlinear_vars)
-            num_linear_vars = len(wrapped_ampl_repn._linear_vars)
-            if num_nonlinear_vars == 0:
-                if num_linear_vars > 0:
-                    linear_dict = dict((var_ID, coef)
-                                       for var_ID, coef in
-                                       zip(wrapped_ampl_repn._linear_vars,
-                                           wrapped_ampl_repn.repn._linear_terms_coef))
-                    OUTPUT.write("J%d %d\n"%(nc, num_linear_vars))
-                    OUTPUT.writelines(
-                        "%d %r\n" % (self_ampl_var_id[con_var],
-                                     linear_dict[con_var])
-                        for con_var in sorted(linear_dict.keys()))
-            elif num_linear_vars == 0:
-                nl_con_vars = \
-                    sorted(wrapped_ampl_repn._nonlinear_vars)
-                OUTPUT.write("J%d %d\n"%(nc, num_nonlinear_vars))
-                OUTPUT.writelines(
-                    "%d 0\n"%(self_ampl_var_id[con_var])
-                    for con_var in nl_con_vars)
-            else:
-                con_vars = set(wrapped_ampl_repn._nonlinear_vars)
-                nl_con_vars = sorted(
-                    con_vars.difference(
-                        wrapped_ampl_repn._linear_vars))
-                con_vars.update(wrapped_ampl_repn._linear_vars)
-                linear_dict = dict(
-                    (var_ID, coef) for var_ID, coef in
-                    zip(wrapped_ampl_repn._linear_vars,
-                        wrapped_ampl_repn.repn._linear_terms_coef))
-                OUTPUT.write("J%d %d\n"%(nc, len(con_vars)))
-                OUTPUT.writelines(
-                    "%d %r\n" % (self_ampl_var_id[con_var],
-                                 linear_dict[con_var])
-                    for con_var in sorted(linear_dict.keys()))
-                OUTPUT.writelines(
-                    "%d 0\n"%(self_ampl_var_id[con_var])
-                    for con_var in nl_con_vars)
-
+        bound_type_counts = [0, 0, 0, 0, 0]
+        constraint_bounds_list = []
+        for con_ID in con_order_list:
+            constraint_data, wrapped_ampl_repn = Constraints_dict[con_ID]
+            bound_line, bound_type = self._get_constraint_bounds_NL(
+                con_ID, constraint_data, wrapped_ampl_repn.repn._constant)
+            constraint_bounds_list.append(bound_line)
+            bound_type_counts[bound_type] += 1
+        n_ranges, n_single_sided_ineq, n_equals, n_unbounded = \
+            bound_type_counts[:4]
+
+        header_lines = list(cache.header_lines)
+        header_lines[1] = _nl_header_line2.format(
+            len(full_var_list),
+            n_single_sided_ineq + n_ranges+n_equals+n_unbounded,
+            len(Objectives_dict),
+            n_ranges,
+            n_equals)
+        cache.header_lines = header_lines
+
+        # Rebuild the symbol map from the cached symbols
+        symbol_map = cache.symbols.copy()
 
-        if show_section_timing:
-            subsection_timer.report("Write J lines")
-            subsection_timer.reset()
+        if symbolic_solver_labels:
+            with open(self._get_aux_filename('.col'),'w') as colf:
+                colf.writelines(cache.colfile_lines)
+            with open(self._get_aux_filename('.row'),'w') as rowf:
+                rowf.writelines(cache.rowfile_lines)
 
         #
-        # "G" lines
+        # Write the NL file
         #
-        for obj_ID, (obj, wrapped_ampl_repn) in \
-               iteritems(Objectives_dict):
+        OUTPUT.writelines(header_lines)
+        self._print_external_functions_NL()
+        suffix_dict = self._print_suffixes_NL(model,
+                                              all_blocks_list,
+                                              sorter,
+                                              solver_capability,
+                                              symbol_map)
+        OUTPUT.writelines(cache.C_segments)
+        OUTPUT.writelines(cache.O_segments)
+        self._print_dual_initialization_NL(suffix_dict, symbol_map)
+
+        x_init_list, var_bound_list = \
+            self._get_var_initialization_and_bounds_NL(model,
+                                                       full_var_list,
+                                                       Vars_dict)
+        OUTPUT.write("x%d" % (len(x_init_list)))
+        if symbolic_solver_labels:
+            OUTPUT.write("\t# initial guess")
+        OUTPUT.write("\n")
+        OUTPUT.writelines(x_init_list)
+        del x_init_list
 
-            grad_entries = {}
-            for idx, obj_var in enumerate(
-                    wrapped_ampl_repn._linear_vars):
-                grad_entries[self_ampl_var_id[obj_var]] = \
-                    wrapped_ampl_repn.repn._linear_terms_coef[idx]
-            for obj_var in wrapped_ampl_repn._nonlinear_vars:
-                if obj_var not in wrapped_ampl_repn._linear_vars:
-                    grad_entries[self_ampl_var_id[obj_var]] = 0
-            len_ge = len(grad_entries)
-            if len_ge > 0:
-                OUTPUT.write("G%d %d\n" % (self_ampl_obj_id[obj_ID],
-                                           len_ge))
-                for var_ID in sorted(grad_entries.keys()):
-                    OUTPUT.write("%d %r\n" % (var_ID,
-                                              grad_entries[var_ID]))
+        OUTPUT.write("r")
+        if symbolic_solver_labels:
+            OUTPUT.write("\t#%d ranges (rhs's)" % (len(con_order_list)))
+        OUTPUT.write("\n")
+        OUTPUT.writelines(constraint_bounds_list)
+        del constraint_bounds_list
+
+        OUTPUT.write("b")
+        if symbolic_solver_labels:
+            OUTPUT.write("\t#%d bounds (on variables)"
+                         % (len(var_bound_list)))
+        OUTPUT.write("\n")
+        OUTPUT.writelines(var_bound_list)
+        del var_bound_list
+
+        OUTPUT.writelines(cache.k_lines)
+        OUTPUT.writelines(cache.J_segments)
+        OUTPUT.writelines(cache.G_segments)
 
         if show_section_timing:
-            subsection_timer.report("Write G lines")
+            subsection_timer.report("Write NL file")
             subsection_timer.reset()
             overall_timer.report("Total time")
 
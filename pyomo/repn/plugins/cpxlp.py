@@ -11,9 +11,11 @@
 # Problem Writer for CPLEX LP Format Files
 #
 
+import os
 import logging
 import math
 import operator
+import multiprocessing
 
 from six import iterkeys, iteritems, StringIO
 from six.moves import xrange
@@ -23,6 +25,9 @@ from pyutilib.misc import PauseGC
 import pyomo.util.plugin
 from pyomo.opt import ProblemFormat
 from pyomo.opt.base import AbstractProblemWriter
+from pyomo.opt.base.compression import (compression_extensions,
+                                        guess_compression,
+                                        open_compressed_output)
 from pyomo.core.base import \
     (SymbolMap, TextLabeler,
      NumericLabeler, Constraint, SortComponents,
@@ -41,11 +46,100 @@ def _no_negative_zero(val):
         return 0
     return val
 
+_fork_available = hasattr(os, 'fork')
+
+# The state shared with the worker processes used to generate the
+# constraint rows in parallel. It is set before the workers are
+# forked so that they inherit the model (and the variable labels)
+# without pickling it.
+_parallel_state = None
+
+def _partition_blocks(nblocks, nchunks):
+    """Split range(nblocks) into at most nchunks contiguous ranges."""
+    nchunks = max(1, min(nblocks, nchunks))
+    size, extra = divmod(nblocks, nchunks)
+    chunks = []
+    start = 0
+    for i in xrange(nchunks):
+        stop = start + size + (1 if i < extra else 0)
+        chunks.append((start, stop))
+        start = stop
+    return chunks
+
+def _parallel_map(processes, state, func, args):
+    """
+    Apply func to each item in args using a pool of forked
+    processes that inherit state, and yield the results in order.
+    """
+    global _parallel_state
+    _parallel_state = state
+    try:
+        if hasattr(multiprocessing, 'get_context'):
+            pool = multiprocessing.get_context('fork').Pool(processes)
+        else:
+            pool = multiprocessing.Pool(processes)
+    finally:
+        _parallel_state = None
+    try:
+        for result in pool.imap(func, args):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def _generate_constraint_bodies_LP(block_range):
+    """
+    Generate the constraint bodies for a range of blocks (executed in
+    a worker process). Returns a list of (degree, body, offset) tuples
+    (the body is None for constraints that can not be written) and the
+    list of ids of the referenced variables.
+    """
+    writer, all_blocks, sortOrder, object_symbol_dictionary, \
+        variable_symbol_dictionary, column_order = _parallel_state
+    writer._referenced_variable_ids.clear()
+    get_constraint_body = writer._get_constraint_body_LP
+    rows = []
+    start, stop = block_range
+    for block in all_blocks[start:stop]:
+
+        gen_con_canonical_repn = \
+            getattr(block, "_gen_con_canonical_repn", True)
+
+        for constraint_data in block.component_data_objects(
+                Constraint,
+                active=True,
+                sort=sortOrder,
+                descend_into=False):
+
+            if isinstance(constraint_data, LinearCanonicalRepn):
+                canonical_repn = constraint_data
+            elif gen_con_canonical_repn:
+                canonical_repn = generate_canonical_repn(constraint_data.body)
+            else:
+                canonical_repn = block._canonical_repn[constraint_data]
+
+            degree = canonical_degree(canonical_repn)
+            if degree in (0, 1, 2):
+                body, offset = get_constraint_body(canonical_repn,
+                                                   object_symbol_dictionary,
+                                                   variable_symbol_dictionary,
+                                                   column_order)
+                rows.append((degree, body, value(offset)))
+            else:
+                rows.append((degree, None, None))
+    return rows, list(writer._referenced_variable_ids)
+
 class ProblemWriter_cpxlp(AbstractProblemWriter):
 
     pyomo.util.plugin.alias('cpxlp', 'Generate the corresponding CPLEX LP file')
     pyomo.util.plugin.alias('lp', 'Generate the corresponding CPLEX LP file')
 
+    # The size (in bytes) of the file buffer and the number of
+    # constraint rows collected before each write when the
+    # 'streaming' I/O option is used.
+    _streaming_buffer_size = 1 << 22
+    _streaming_rows_per_write = 4096
+
     def __init__(self):
 
         AbstractProblemWriter.__init__(self, ProblemFormat.cpxlp)
@@ -119,6 +213,21 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         force_objective_constant = \
             io_options.pop("force_objective_constant", False)
 
+        # Write the constraint rows in large blocks through a
+        # buffered file and do not cache the generated canonical
+        # representations on the model, which bounds the memory
+        # required to write very large models.
+        streaming = io_options.pop("streaming", False)
+
+        # Generate the constraint rows of different blocks using
+        # this many (forked) processes. This implies 'streaming'.
+        processes = io_options.pop("processes", 1)
+
+        # Write the LP file through a compressor ('gzip' or
+        # 'zstd'). By default, this is determined by the extension
+        # of the output filename (e.g., 'model.lp.gz').
+        compression = io_options.pop("compression", None)
+
         if len(io_options):
             raise ValueError(
                 "ProblemWriter_cpxlp passed unrecognized io_options:\n\t" +
@@ -137,8 +246,19 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         # clear the collection of referenced variables.
         self._referenced_variable_ids.clear()
 
+        if (compression is not None) and \
+           (compression not in compression_extensions):
+            raise ValueError(
+                "ProblemWriter_cpxlp: unknown compression '%s' (valid "
+                "choices are: %s)"
+                % (compression, ', '.join(sorted(compression_extensions))))
+
         if output_filename is None:
             output_filename = model.name + ".lp"
+            if compression is not None:
+                output_filename += compression_extensions[compression]
+        elif compression is None:
+            compression = guess_compression(output_filename)
 
         # when sorting, there are a non-trivial number of
         # temporary objects created. these all yield
@@ -146,8 +266,13 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         # overhead is non-trivial, and because references
         # are non-circular, everything will be collected
         # immediately anyway.
+        buffering = -1
+        if streaming or (processes > 1):
+            buffering = self._streaming_buffer_size
         with PauseGC() as pgc:
-            with open(output_filename, "w") as output_file:
+            with open_compressed_output(output_filename,
+                                        compression,
+                                        buffering) as output_file:
                 symbol_map = self._print_model_LP(
                     model,
                     output_file,
@@ -159,7 +284,9 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
                     column_order=column_order,
                     skip_trivial_constraints=skip_trivial_constraints,
                     force_objective_constant=force_objective_constant,
-                    include_all_variable_bounds=include_all_variable_bounds)
+                    include_all_variable_bounds=include_all_variable_bounds,
+                    streaming=streaming,
+                    processes=processes)
 
         self._referenced_variable_ids.clear()
 
@@ -381,6 +508,53 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         #
         return offset
 
+    def _get_constraint_body_LP(self,
+                                x,
+                                object_symbol_dictionary,
+                                variable_symbol_dictionary,
+                                column_order):
+        """
+        Return the LP format string for the body of a constraint
+        (as written by _print_expr_canonical) and its constant offset.
+        Linear canonical expressions are formatted in a single join.
+        """
+        if not isinstance(x, LinearCanonicalRepn):
+            body = StringIO()
+            offset = self._print_expr_canonical(x,
+                                                body,
+                                                object_symbol_dictionary,
+                                                variable_symbol_dictionary,
+                                                False,
+                                                column_order)
+            return body.getvalue(), offset
+
+        linear_coef_string_template = '%+'+self._precision_string+' %s\n'
+        coefficients = x.linear
+        if coefficients is not None:
+            variables = x.variables
+            referenced_variable_ids = self._referenced_variable_ids
+            for vardata in variables:
+                referenced_variable_ids[id(vardata)] = vardata
+            if column_order is None:
+                sorted_names = sorted(
+                    zip([variable_symbol_dictionary[id(vardata)]
+                         for vardata in variables],
+                        coefficients))
+            else:
+                sorted_names = sorted(zip(variables, coefficients),
+                                      key=lambda _x: column_order[_x[0]])
+                sorted_names = [(variable_symbol_dictionary[id(var)], coef)
+                                for var, coef in sorted_names]
+            body = ''.join([linear_coef_string_template % (coef, name)
+                            for name, coef in sorted_names])
+        else:
+            body = linear_coef_string_template % (0, 'ONE_VAR_CONSTANT')
+
+        offset = x.constant
+        if offset is None:
+            offset = 0.0
+        return body, offset
+
     def printSOS(self,
                  symbol_map,
                  labeler,
@@ -422,10 +596,30 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
                         column_order=None,
                         skip_trivial_constraints=False,
                         force_objective_constant=False,
-                        include_all_variable_bounds=False):
+                        include_all_variable_bounds=False,
+                        streaming=False,
+                        processes=1):
+
+        # Generating the constraint bodies in parallel relies on
+        # the worker processes being forked from this process
+        if (processes > 1) and (not _fork_available):
+            logger.warning(
+                "Parallel LP file generation requires os.fork(), which "
+                "is not available on this platform. The LP file will be "
+                "written using a single process.")
+            processes = 1
+        # The rows generated in parallel are written using
+        # the streaming code path
+        if processes > 1:
+            streaming = True
 
         symbol_map = SymbolMap()
-        variable_symbol_map = SymbolMap()
+        # When streaming, the variable symbols are only stored
+        # in the symbol map that is returned
+        if streaming:
+            variable_symbol_map = symbol_map
+        else:
+            variable_symbol_map = SymbolMap()
         # NOTE: we use createSymbol instead of getSymbol because we
         #       know whether or not the symbol exists, and don't want
         #       to the overhead of error/duplicate checking.
@@ -465,12 +659,17 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
                     descend_into=False):
 
                 variable_list.append(vardata)
-                variable_label_pairs.append(
-                    (vardata,create_symbol_func(symbol_map,
-                                                vardata,
-                                                labeler)))
+                if streaming:
+                    create_symbol_func(symbol_map, vardata, labeler)
+                else:
+                    variable_label_pairs.append(
+                        (vardata,create_symbol_func(symbol_map,
+                                                    vardata,
+                                                    labeler)))
 
-        variable_symbol_map.addSymbols(variable_label_pairs)
+        if not streaming:
+            variable_symbol_map.addSymbols(variable_label_pairs)
+        del variable_label_pairs
 
         # and extract the information we'll need for rapid labeling.
         object_symbol_dictionary = symbol_map.byObject
@@ -533,7 +732,8 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
                 if gen_obj_canonical_repn:
                     canonical_repn = \
                         generate_canonical_repn(objective_data.expr)
-                    block_canonical_repn[objective_data] = canonical_repn
+                    if not streaming:
+                        block_canonical_repn[objective_data] = canonical_repn
                 else:
                     canonical_repn = block_canonical_repn[objective_data]
 
@@ -585,8 +785,6 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         output_file.write("s.t.\n")
         output_file.write("\n")
 
-        have_nontrivial = False
-
         supports_quadratic_constraint = solver_capability('quadratic_constraint')
 
         def constraint_generator():
@@ -611,7 +809,8 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
                     else:
                         if gen_con_canonical_repn:
                             canonical_repn = generate_canonical_repn(constraint_data.body)
-                            block_canonical_repn[constraint_data] = canonical_repn
+                            if not streaming:
+                                block_canonical_repn[constraint_data] = canonical_repn
                         else:
                             canonical_repn = block_canonical_repn[constraint_data]
 
@@ -626,91 +825,144 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         else:
             yield_all_constraints = constraint_generator
 
+        def serial_constraint_bodies():
+            for constraint_data, canonical_repn in yield_all_constraints():
+                yield (constraint_data,
+                       canonical_degree(canonical_repn),
+                       canonical_repn,
+                       None,
+                       None)
+
+        constraint_bodies = serial_constraint_bodies
+        if processes > 1:
+            # The constraint bodies are generated by the worker
+            # processes (see _generate_constraint_bodies_LP). Since
+            # the labels are created in the order the rows are
+            # written, the output does not depend on the number of
+            # processes.
+            parallel_state = (self,
+                              all_blocks,
+                              sortOrder,
+                              object_symbol_dictionary,
+                              variable_symbol_dictionary,
+                              column_order)
+            def parallel_constraint_bodies():
+                block_chunks = _partition_blocks(len(all_blocks),
+                                                 4 * processes)
+                referenced_variable_ids = self._referenced_variable_ids
+                var_by_id = dict((id(vardata), vardata)
+                                 for vardata in variable_list)
+                for (start, stop), (rows, referenced_ids) in zip(
+                        block_chunks,
+                        _parallel_map(processes,
+                                      parallel_state,
+                                      _generate_constraint_bodies_LP,
+                                      block_chunks)):
+                    for varid in referenced_ids:
+                        referenced_variable_ids[varid] = \
+                            var_by_id.get(varid)
+                    rows = iter(rows)
+                    for block in all_blocks[start:stop]:
+                        for constraint_data in block.component_data_objects(
+                                Constraint,
+                                active=True,
+                                sort=sortOrder,
+                                descend_into=False):
+                            degree, body, offset = next(rows)
+                            yield constraint_data, degree, None, body, offset
+            def sorted_parallel_constraint_bodies():
+                sorted_constraint_list = list(parallel_constraint_bodies())
+                sorted_constraint_list.sort(key=lambda x: row_order[x[0]])
+                return iter(sorted_constraint_list)
+            if row_order is not None:
+                constraint_bodies = sorted_parallel_constraint_bodies
+            else:
+                constraint_bodies = parallel_constraint_bodies
+
         # FIXME: This is a hack to get nested blocks working...
         eq_string_template = "= %"+self._precision_string+'\n'
         geq_string_template = ">= %"+self._precision_string+'\n\n'
         leq_string_template = "<= %"+self._precision_string+'\n\n'
-        for constraint_data, canonical_repn in yield_all_constraints():
-            have_nontrivial = True
 
-            degree = canonical_degree(canonical_repn)
-
-            #
-            # Write constraint
+        constraint_count = [0]
+        def constraint_rows():
+            # Generate the LP file rows one (possibly ranged)
+            # constraint at a time (the body of a ranged constraint
+            # is only formatted once).
             #
-
-            # There are conditions, e.g., when fixing variables, under which
-            # a constraint block might be empty.  Ignore these, for both
-            # practical reasons and the fact that the CPLEX LP format
-            # requires a variable in the constraint body.  It is also
-            # possible that the body of the constraint consists of only a
-            # constant, in which case the "variable" of
-            if degree == 0:
-                if skip_trivial_constraints:
-                    continue
-            elif degree == 2:
-                if not supports_quadratic_constraint:
+            # There are conditions, e.g., when fixing variables, under
+            # which a constraint block might be empty.  Ignore these,
+            # for both practical reasons and the fact that the CPLEX
+            # LP format requires a variable in the constraint body.
+            get_constraint_body = self._get_constraint_body_LP
+            for constraint_data, degree, canonical_repn, body, offset \
+                    in constraint_bodies():
+                constraint_count[0] += 1
+                if degree == 0:
+                    if skip_trivial_constraints:
+                        continue
+                elif degree == 2:
+                    if not supports_quadratic_constraint:
+                        raise ValueError(
+                            "Solver unable to handle quadratic expressions. "
+                            "Constraint at issue: '%s'"
+                            % (constraint_data.name))
+                elif degree != 1:
                     raise ValueError(
-                        "Solver unable to handle quadratic expressions. Constraint"
-                        " at issue: '%s'" % (constraint_data.name))
-            elif degree != 1:
-                raise ValueError(
-                    "Cannot write legal LP file.  Constraint '%s' has a body "
-                    "with nonlinear terms." % (constraint_data.name))
-
-            # Create symbol
-            con_symbol = create_symbol_func(symbol_map, constraint_data, labeler)
-
-            if constraint_data.equality:
-                label = 'c_e_' + con_symbol + '_'
-                alias_symbol_func(symbol_map, constraint_data, label)
-                output_file.write(label+':\n')
-                offset = print_expr_canonical(canonical_repn,
-                                              output_file,
-                                              object_symbol_dictionary,
-                                              variable_symbol_dictionary,
-                                              False,
-                                              column_order)
-                bound = constraint_data.lower
-                bound = self._get_bound(bound) - offset
-                output_file.write(eq_string_template
-                                  % (_no_negative_zero(bound)))
-                output_file.write("\n")
-            else:
-                if constraint_data.lower is not None:
-                    if constraint_data.upper is not None:
+                        "Cannot write legal LP file.  Constraint '%s' has a "
+                        "body with nonlinear terms." % (constraint_data.name))
+
+                con_symbol = create_symbol_func(symbol_map,
+                                                constraint_data,
+                                                labeler)
+                if body is None:
+                    body, offset = get_constraint_body(
+                        canonical_repn,
+                        object_symbol_dictionary,
+                        variable_symbol_dictionary,
+                        column_order)
+                if constraint_data.equality:
+                    label = 'c_e_' + con_symbol + '_'
+                    alias_symbol_func(symbol_map, constraint_data, label)
+                    bound = self._get_bound(constraint_data.lower) - offset
+                    yield label+':\n' + body + \
+                        (eq_string_template % (_no_negative_zero(bound))) + '\n'
+                    continue
+                lower = constraint_data.lower
+                upper = constraint_data.upper
+                if lower is not None:
+                    if upper is not None:
                         label = 'r_l_' + con_symbol + '_'
                     else:
                         label = 'c_l_' + con_symbol + '_'
                     alias_symbol_func(symbol_map, constraint_data, label)
-                    output_file.write(label+':\n')
-                    offset = print_expr_canonical(canonical_repn,
-                                                  output_file,
-                                                  object_symbol_dictionary,
-                                                  variable_symbol_dictionary,
-                                                  False,
-                                                  column_order)
-                    bound = constraint_data.lower
-                    bound = self._get_bound(bound) - offset
-                    output_file.write(geq_string_template
-                                      % (_no_negative_zero(bound)))
-                if constraint_data.upper is not None:
-                    if constraint_data.lower is not None:
+                    bound = self._get_bound(lower) - offset
+                    yield label+':\n' + body + \
+                        (geq_string_template % (_no_negative_zero(bound)))
+                if upper is not None:
+                    if lower is not None:
                         label = 'r_u_' + con_symbol + '_'
                     else:
                         label = 'c_u_' + con_symbol + '_'
                     alias_symbol_func(symbol_map, constraint_data, label)
-                    output_file.write(label+':\n')
-                    offset = print_expr_canonical(canonical_repn,
-                                                  output_file,
-                                                  object_symbol_dictionary,
-                                                  variable_symbol_dictionary,
-                                                  False,
-                                                  column_order)
-                    bound = constraint_data.upper
-                    bound = self._get_bound(bound) - offset
-                    output_file.write(leq_string_template
-                                      % (_no_negative_zero(bound)))
+                    bound = self._get_bound(upper) - offset
+                    yield label+':\n' + body + \
+                        (leq_string_template % (_no_negative_zero(bound)))
+
+        if streaming:
+            rows_per_write = self._streaming_rows_per_write
+            rows = []
+            for row in constraint_rows():
+                rows.append(row)
+                if len(rows) == rows_per_write:
+                    output_file.write(''.join(rows))
+                    del rows[:]
+            output_file.write(''.join(rows))
+            del rows
+        else:
+            for row in constraint_rows():
+                output_file.write(row)
+        have_nontrivial = constraint_count[0] > 0
 
         if not have_nontrivial:
             logger.warning('Empty constraint block written in LP format '  \
@@ -879,8 +1131,12 @@ class ProblemWriter_cpxlp(AbstractProblemWriter):
         # in the active constraints **Note**: warm start method may
         # rely on this for choosing the set of potential warm start
         # variables
-        vars_to_delete = set(variable_symbol_map.byObject.keys()) - \
-                         set(self._referenced_variable_ids.keys())
+        if streaming:
+            vars_to_delete = set(id(vardata) for vardata in variable_list) - \
+                             set(self._referenced_variable_ids.keys())
+        else:
+            vars_to_delete = set(variable_symbol_map.byObject.keys()) - \
+                             set(self._referenced_variable_ids.keys())
         sm_byObject = symbol_map.byObject
         sm_bySymbol = symbol_map.bySymbol
         var_sm_byObject = variable_symbol_map.byObject
@@ -23,6 +23,9 @@ from pyutilib.misc import PauseGC
 import pyomo.util.plugin
 from pyomo.opt import ProblemFormat
 from pyomo.opt.base import AbstractProblemWriter
+from pyomo.opt.base.compression import (compression_extensions,
+                                        guess_compression,
+                                        open_compressed_output)
 from pyomo.core.base import \
     (SymbolMap, TextLabeler,
      NumericLabeler, Constraint, SortComponents,
@@ -125,6 +128,11 @@ class ProblemWriter_mps(AbstractProblemWriter):
         skip_objective_sense = \
             io_options.pop("skip_objective_sense", False)
 
+        # Write the MPS file through a compressor ('gzip' or
+        # 'zstd'). By default, this is determined by the extension
+        # of the output filename (e.g., 'model.mps.gz').
+        compression = io_options.pop("compression", None)
+
         if len(io_options):
             raise ValueError(
                 "ProblemWriter_mps passed unrecognized io_options:\n\t" +
@@ -143,8 +151,19 @@ class ProblemWriter_mps(AbstractProblemWriter):
         # clear the collection of referenced variables.
         self._referenced_variable_ids.clear()
 
+        if (compression is not None) and \
+           (compression not in compression_extensions):
+            raise ValueError(
+                "ProblemWriter_mps: unknown compression '%s' (valid "
+                "choices are: %s)"
+                % (compression, ', '.join(sorted(compression_extensions))))
+
         if output_filename is None:
             output_filename = model.name + ".mps"
+            if compression is not None:
+                output_filename += compression_extensions[compression]
+        elif compression is None:
+            compression = guess_compression(output_filename)
 
         # when sorting, there are a non-trivial number of
         # temporary objects created. these all yield
@@ -153,7 +172,8 @@ class ProblemWriter_mps(AbstractProblemWriter):
         # are non-circular, everything will be collected
         # immediately anyway.
         with PauseGC() as pgc:
-            with open(output_filename, "w") as output_file:
+            with open_compressed_output(output_filename,
+                                        compression) as output_file:
                 symbol_map = self._print_model_MPS(
                     model,
                     output_file,
@@ -0,0 +1,160 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Test the AMPL repns of expressions against their expected values
+#
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+from pyomo.core.base import expr as EXPR
+from pyomo.core.base import expr_common
+from pyomo.repn.ampl_repn import _generate_ampl_repn
+
+def _nonlinear_data(nonlinear_expr, exp):
+    # the nonlinear terms are compared by their values (the expression
+    # strings depend on the tree format), and 'exp' denotes the entire
+    # expression
+    if nonlinear_expr is None:
+        return None
+    if nonlinear_expr is exp:
+        return 'exp'
+    if type(nonlinear_expr) is list:
+        return [(coef, _nonlinear_data(e, exp)) for coef, e in nonlinear_expr]
+    return round(value(nonlinear_expr), 6)
+
+def _repn_data(repn, exp):
+    # the NL writer sorts the variables, so their order is not compared
+    return (repn._constant,
+            sorted((repn._linear_vars[var_ID].name,
+                    repn._linear_terms_coef[var_ID])
+                   for var_ID in repn._linear_vars),
+            _nonlinear_data(repn._nonlinear_expr, exp),
+            sorted(var.name for var in repn._nonlinear_vars.values()))
+
+class TestAmplRepn_coopr3(unittest.TestCase):
+
+    mode = expr_common.Mode.coopr3_trees
+
+    def setUp(self):
+        EXPR.set_expression_tree_format(self.mode)
+        model = self.model = ConcreteModel()
+        model.s = RangeSet(5)
+        model.p = Param(model.s, initialize=lambda m, i: i, mutable=True)
+        model.q = Param(initialize=0, mutable=True)
+        model.x = Var(model.s, initialize=lambda m, i: 1.0 + i)
+        model.y = Var(initialize=0.5)
+        model.z = Var(initialize=3.0)
+        model.z.fix()
+        model.e = Expression(expr=model.x[1]*model.x[2] + model.y)
+
+    def tearDown(self):
+        EXPR.set_expression_tree_format(expr_common._default_mode)
+        self.model = None
+
+    def _cases(self):
+        # (expression, (constant, linear terms, nonlinear terms,
+        #               nonlinear vars))
+        m = self.model
+        return [
+            (3.5,
+             (3.5, [], None, [])),
+            (m.y,
+             (0, [('y', 1.0)], None, [])),
+            (m.z,
+             (3.0, [], None, [])),
+            (m.p[2],
+             (2, [], None, [])),
+            (summation(m.p, m.x) + 4*m.y - 2,
+             (-2.0, [('x[1]', 1.0), ('x[2]', 2.0), ('x[3]', 3.0),
+                     ('x[4]', 4.0), ('x[5]', 5.0), ('y', 4.0)], None, [])),
+            (m.x[1]*m.x[2],
+             (0, [], 'exp', ['x[1]', 'x[2]'])),
+            (m.x[1]*m.x[2] + 3*m.x[3] - m.y/m.p[2] + 1,
+             (1.0, [('x[3]', 3.0), ('y', -0.5)], [(1, 6.0)],
+              ['x[1]', 'x[2]'])),
+            (m.p[3]*m.x[1]*m.z/2.0,
+             (0.0, [('x[1]', 4.5)], None, [])),
+            (m.q*m.x[1]*m.x[2] + m.x[3],
+             (0, [('x[3]', 1.0)], None, [])),
+            (m.x[1]*m.q*sin(m.x[2]),
+             (0, [], None, [])),
+            (m.x[1]/m.x[2] + m.y/(m.x[3] + m.x[4]),
+             (0, [], [(1, 0.666667), (1, 0.055556)],
+              ['x[1]', 'x[2]', 'x[3]', 'x[4]', 'y'])),
+            (-(m.x[1] + m.y) + m.x[2]**2,
+             (0, [('x[1]', -1.0), ('y', -1.0)], [(1, 9.0)], ['x[2]'])),
+            (-(m.x[1]*m.y),
+             (0, [], 'exp', ['x[1]', 'y'])),
+            ((m.x[1] + 2*m.y)**2 + m.x[3]**m.y + 2**m.x[4],
+             (0, [], [(1, 9.0), (1, 2.0), (1, 32.0)],
+              ['x[1]', 'x[3]', 'x[4]', 'y'])),
+            (m.x[1]**1 + m.x[2]**0 + m.z**2,
+             (10.0, [('x[1]', 1.0)], None, [])),
+            (m.x[1]**m.q + m.x[2]**(m.q + 1),
+             (1.0, [('x[2]', 1.0)], None, [])),
+            (exp(m.x[1] + m.y) + log(m.x[2]) - sin(m.z),
+             (-0.1411200080598672, [], [(1, 12.182494), (1, 1.098612)],
+              ['x[1]', 'x[2]', 'y'])),
+            (abs(m.x[1] - m.y) + sqrt(m.x[2]*m.x[3]),
+             (0, [], [(1, 1.5), (1, 3.464102)],
+              ['x[1]', 'x[2]', 'x[3]', 'y'])),
+            (EXPR.Expr_if(IF=m.x[1] >= 1, THEN=m.x[2]**2, ELSE=m.y),
+             (0, [], 'exp', ['x[1]', 'x[2]', 'y'])),
+            (EXPR.Expr_if(IF=m.z >= 1, THEN=m.x[2]**2, ELSE=m.y),
+             (0, [], 9.0, ['x[2]'])),
+            (EXPR.Expr_if(IF=m.z <= 1, THEN=m.x[2]**2, ELSE=2*m.y),
+             (0.0, [('y', 2.0)], None, [])),
+            (m.e + m.x[3]**2,
+             (0, [('y', 1.0)], [(1, [(1, 6.0)]), (1, 16.0)],
+              ['x[1]', 'x[2]', 'x[3]'])),
+            ((m.x[1]*m.x[2])*(m.x[3] + m.y) + m.p[1]*(m.x[4] - m.p[2]*m.y),
+             (0.0, [('x[4]', 1.0), ('y', -2.0)], [(1, 27.0)],
+              ['x[1]', 'x[2]', 'x[3]', 'y'])),
+            ((m.x[1] + m.x[2])*(m.x[3] - 1)*m.p[4],
+             (0, [], 'exp', ['x[1]', 'x[2]', 'x[3]'])),
+            (sum(m.p[i]*m.x[i]**2 for i in m.s) + sum(m.x[i] for i in m.s),
+             (0, [('x[1]', 1.0), ('x[2]', 1.0), ('x[3]', 1.0),
+                  ('x[4]', 1.0), ('x[5]', 1.0)],
+              [(1, 4.0), (1, 18.0), (1, 48.0), (1, 100.0), (1, 180.0)],
+              ['x[1]', 'x[2]', 'x[3]', 'x[4]', 'x[5]'])),
+        ]
+
+    def test_expressions(self):
+        for exp, expected in self._cases():
+            repn = _generate_ampl_repn(exp)
+            self.assertEqual(_repn_data(repn, exp), expected)
+
+    def test_division_by_zero(self):
+        m = self.model
+        m.q = 0
+        self.assertRaises(ZeroDivisionError,
+                          _generate_ampl_repn,
+                          m.x[1]/m.q + m.y)
+
+    def test_deep_expression(self):
+        # The expression is deeper than the Python recursion limit
+        m = self.model
+        e = m.x[1]
+        for i in range(5000):
+            e = EXPR.generate_expression_bypassCloneCheck(
+                expr_common._add, e, m.y)
+            e = EXPR.generate_expression_bypassCloneCheck(
+                expr_common._pow, e, 2)
+        repn = _generate_ampl_repn(e)
+        self.assertIs(repn._nonlinear_expr, e)
+        self.assertEqual(sorted(repn._nonlinear_vars),
+                         sorted([id(m.x[1]), id(m.y)]))
+
+class TestAmplRepn_pyomo4(TestAmplRepn_coopr3):
+
+    mode = expr_common.Mode.pyomo4_trees
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Benchmark the AMPL repn generator
+#
+# Run this file as a script to benchmark larger models, e.g.,
+#
+#     python test_ampl_repn_perf.py --rows 100000
+#
+
+import time
+
+import pyutilib.th as unittest
+
+import pyomo.environ
+from pyomo.core import (ConcreteModel,
+                        RangeSet,
+                        Param,
+                        Var,
+                        Constraint,
+                        sin,
+                        exp)
+from pyomo.repn.ampl_repn import generate_ampl_repn
+
+def create_model(nrows, terms_per_row=10):
+    model = ConcreteModel()
+    model.rows = RangeSet(nrows)
+    model.cols = RangeSet(nrows + terms_per_row)
+    model.p = Param(model.cols, initialize=lambda m, j: 1.0 + j % 7,
+                    mutable=True)
+    model.x = Var(model.cols, initialize=1.0)
+    def c_rule(m, i):
+        cols = range(i, i + terms_per_row)
+        return sum(m.p[j]*m.x[j]**2 for j in cols) + \
+            sum(3*m.x[j]*m.x[j+1] for j in cols) + \
+            sin(m.x[i]) + exp(m.x[i+1] - m.x[i]) + \
+            sum(m.x[j] for j in cols) <= 10
+    model.c = Constraint(model.rows, rule=c_rule)
+    return model
+
+def run_benchmark(nrows):
+    """
+    Generate the AMPL repns of the constraint bodies of a nonlinear
+    model and return a dictionary with the total time and the time per
+    constraint (seconds).
+    """
+    model = create_model(nrows)
+    bodies = [con.body for con in model.c.values()]
+    start = time.time()
+    for body in bodies:
+        generate_ampl_repn(body)
+    total = time.time() - start
+    return {'total': total, 'per_row': total / nrows}
+
+@unittest.category('performance')
+class TestAmplRepnPerformance(unittest.TestCase):
+
+    def test_generate_ampl_repn(self):
+        results = run_benchmark(5000)
+        self.recordTestData('total (s)', results['total'])
+        self.recordTestData('per row (s)', results['per_row'])
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark the AMPL repn generator")
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args(argv)
+    results = run_benchmark(args.rows)
+    print("total: %8.3f s  per row: %.3g s"
+          % (results['total'], results['per_row']))
+
+if __name__ == "__main__":
+    main()
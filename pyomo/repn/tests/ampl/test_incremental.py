@@ -0,0 +1,183 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Test the incremental mode of the NL writer
+#
+
+import os
+from os.path import abspath, dirname, join
+currdir = dirname(abspath(__file__))
+
+import pyutilib.th as unittest
+from six import StringIO
+
+from pyomo.opt import ProblemFormat
+from pyomo.core import *
+
+class TestIncrementalNLWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import pyomo.environ
+
+    def tearDown(self):
+        for ext in ('.nl', '.row', '.col'):
+            for name in ('incremental.test', 'full.test'):
+                if os.path.exists(join(currdir, name+ext)):
+                    os.remove(join(currdir, name+ext))
+
+    def _create_model(self):
+        model = ConcreteModel()
+        model.s = RangeSet(4)
+        model.p = Param(model.s, initialize=lambda m,i: i, mutable=True)
+        model.q = Param(initialize=2.0, mutable=True)
+        model.x = Var(model.s, bounds=(0, 10), initialize=1.0)
+        model.y = Var(within=Binary)
+        model.obj = Objective(
+            expr=summation(model.p, model.x) + model.q*model.x[1]**2)
+        model.nl = Constraint(
+            model.s, rule=lambda m,i: m.x[i]**m.q + m.p[i]*m.y <= 20)
+        model.lin = Constraint(
+            model.s, rule=lambda m,i: m.p[i]*m.x[i] - m.y >= m.q)
+        model.rng = Constraint(expr=(0, model.x[2] + model.x[3], model.q))
+        return model
+
+    def _compare(self, model, symbolic_solver_labels=False):
+        # Write the model incrementally and (from scratch) with the
+        # default writer; the files must be identical.
+        io_options = {'symbolic_solver_labels': symbolic_solver_labels}
+        model.write(filename=join(currdir, 'full.test.nl'),
+                    format=ProblemFormat.nl,
+                    io_options=io_options)
+        io_options['incremental'] = True
+        model.write(filename=join(currdir, 'incremental.test.nl'),
+                    format=ProblemFormat.nl,
+                    io_options=io_options)
+        exts = ['.nl']
+        if symbolic_solver_labels:
+            exts.extend(['.row', '.col'])
+        for ext in exts:
+            with open(join(currdir, 'full.test'+ext)) as f:
+                full = f.read()
+            with open(join(currdir, 'incremental.test'+ext)) as f:
+                incremental = f.read()
+            self.assertEqual(full, incremental)
+
+    def _write_incremental(self, model, **io_options):
+        io_options['incremental'] = True
+        model.write(filename=join(currdir, 'incremental.test.nl'),
+                    format=ProblemFormat.nl,
+                    io_options=io_options)
+
+    def test_first_write(self):
+        model = self._create_model()
+        self.assertFalse(hasattr(model, '_nl_writer_cache'))
+        self._compare(model)
+        self.assertTrue(model._nl_writer_cache.valid)
+
+    def test_param_change(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        model.p[2] = 7.5
+        model.q = 3.0
+        self._compare(model)
+
+    def test_unchanged_repns_are_reused(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        repns = dict((id(c), model._ampl_repn[c])
+                     for c in model.component_data_objects(Constraint))
+        model.p[2] = 7.5
+        self._write_incremental(model)
+        self.assertIs(model._ampl_repn[model.nl[1]], repns[id(model.nl[1])])
+        self.assertIs(model._ampl_repn[model.lin[4]], repns[id(model.lin[4])])
+        self.assertIsNot(model._ampl_repn[model.nl[2]],
+                         repns[id(model.nl[2])])
+        self.assertIsNot(model._ampl_repn[model.lin[2]],
+                         repns[id(model.lin[2])])
+
+    def test_bounds_and_values_change(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        model.x[1].setub(5)
+        model.x[3].setlb(None)
+        model.x[4].value = 2.5
+        model.y.value = 1
+        self._compare(model)
+
+    def test_objective_sense_change(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        model.obj.sense = maximize
+        self._compare(model)
+
+    def test_symbolic_labels(self):
+        model = self._create_model()
+        self._write_incremental(model, symbolic_solver_labels=True)
+        model.p[1] = -1
+        self._compare(model, symbolic_solver_labels=True)
+
+    def test_fixed_variable(self):
+        # Fixing a variable changes the structure of the NL file,
+        # which forces a full write
+        model = self._create_model()
+        self._write_incremental(model)
+        model.y.fix(1)
+        self._compare(model)
+        model.y.unfix()
+        self._compare(model)
+
+    def test_structural_change(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        model.extra = Constraint(expr=model.x[1] + model.x[4] == model.q)
+        self._compare(model)
+        model.nl[3].deactivate()
+        self._compare(model)
+
+    def test_expression_replaced(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        model.lin[1].set_value(model.x[1] - 4*model.y >= model.q)
+        self._compare(model)
+
+    def test_clone_drops_cache(self):
+        model = self._create_model()
+        self._write_incremental(model)
+        instance = model.clone()
+        self.assertFalse(instance._nl_writer_cache.valid)
+        instance.p[3] = 0.5
+        self._compare(instance)
+
+    def test_write_to_stream(self):
+        # The NL file can be written into a file-like object
+        from pyomo.repn.plugins.ampl.ampl_ import ProblemWriter_nl
+        model = self._create_model()
+        self._write_incremental(model)
+        model.q = 3.0
+        ostream = StringIO()
+        writer = ProblemWriter_nl()
+        filename, symbol_map = writer(model,
+                                      ostream,
+                                      lambda x: True,
+                                      {'incremental': True})
+        self.assertIs(filename, ostream)
+        model.write(filename=join(currdir, 'full.test.nl'),
+                    format=ProblemFormat.nl)
+        with open(join(currdir, 'full.test.nl')) as f:
+            self.assertEqual(f.read(), ostream.getvalue())
+        self.assertRaises(ValueError,
+                          writer,
+                          model,
+                          StringIO(),
+                          lambda x: True,
+                          {'symbolic_solver_labels': True})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,12 +11,18 @@
 #
 
 import os
+import gzip
 import random
 
 import pyutilib.th as unittest
 
 from pyomo.environ import *
 import pyomo.opt
+from pyomo.repn.plugins.cpxlp import ProblemWriter_cpxlp
+from pyomo.opt import (ProblemFormat,
+                       guess_format,
+                       guess_compression,
+                       compression_available)
 
 thisdir = os.path.dirname(os.path.abspath(__file__))
 
@@ -168,5 +174,210 @@ class TestCPXLPOrdering(unittest.TestCase):
         row_order[model.con4[2]] = -1
         self._check_baseline(model, row_order=row_order)
 
+class TestCPXLPOrderingStreaming(TestCPXLPOrdering):
+
+    def _check_baseline(self, model, **kwds):
+        kwds['streaming'] = True
+        super(TestCPXLPOrderingStreaming, self)._check_baseline(model, **kwds)
+
+class TestCPXLPStreaming(unittest.TestCase):
+
+    def _write(self, model, fname, **io_options):
+        fname = os.path.join(thisdir, fname)
+        _, smap_id = model.write(fname,
+                                 format="lp",
+                                 io_options=io_options)
+        with open(fname) as f:
+            output = f.read()
+        os.remove(fname)
+        return output, model.solutions.symbol_map[smap_id]
+
+    def test_streaming_matches_default(self):
+        model = ConcreteModel()
+        model.s = RangeSet(50)
+        model.x = Var(model.s, bounds=(-1, 1))
+        model.y = Var(model.s, within=Binary)
+        model.z = Var(within=Integers)
+        model.unused = Var()
+        model.obj = Objective(expr=summation(model.x) + model.z**2)
+        model.c = Constraint(
+            model.s,
+            rule=lambda m, i: (-i, i*m.x[i] - m.y[i] + m.z + 2, i))
+        model.e = Constraint(model.s,
+                             rule=lambda m, i: m.x[i] == m.y[i])
+        model.q = Constraint(expr=model.x[1]*model.x[2] >= -1)
+        model.trivial = Constraint(expr=model.x[3] <= 5)
+        model.sos = SOSConstraint(var=model.y, sos=1)
+        model.x[3].fix(0.5)
+        rows_per_write = ProblemWriter_cpxlp._streaming_rows_per_write
+        for rows in (1, 7, 1000):
+            ProblemWriter_cpxlp._streaming_rows_per_write = rows
+            try:
+                for symbolic in (True, False):
+                    default, default_map = self._write(
+                        model, "default.lp",
+                        symbolic_solver_labels=symbolic)
+                    streaming, streaming_map = self._write(
+                        model, "streaming.lp",
+                        symbolic_solver_labels=symbolic,
+                        streaming=True)
+                    self.assertEqual(default, streaming)
+                    self.assertEqual(sorted(default_map.bySymbol),
+                                     sorted(streaming_map.bySymbol))
+                    self.assertEqual(sorted(default_map.aliases),
+                                     sorted(streaming_map.aliases))
+            finally:
+                ProblemWriter_cpxlp._streaming_rows_per_write = rows_per_write
+        default, _ = self._write(model, "default.lp",
+                                 skip_trivial_constraints=True)
+        streaming, _ = self._write(model, "streaming.lp",
+                                   skip_trivial_constraints=True,
+                                   streaming=True)
+        self.assertEqual(default, streaming)
+
+    def test_streaming_does_not_cache_repns(self):
+        model = ConcreteModel()
+        model.x = Var()
+        model.obj = Objective(expr=model.x)
+        model.c = Constraint(expr=model.x >= 1)
+        self._write(model, "streaming.lp", streaming=True)
+        self.assertFalse(model.c in getattr(model, '_canonical_repn', {}))
+        self._write(model, "default.lp")
+        self.assertTrue(model.c in model._canonical_repn)
+
+class TestCPXLPCompression(unittest.TestCase):
+
+    def _create_model(self):
+        model = ConcreteModel()
+        model.s = RangeSet(20)
+        model.x = Var(model.s, bounds=(0, 1))
+        model.y = Var(within=Integers)
+        model.obj = Objective(expr=summation(model.x) + model.y)
+        model.c = Constraint(model.s,
+                             rule=lambda m, i: i*m.x[i] - m.y <= i)
+        return model
+
+    def _read(self, fname, compression=None):
+        if compression == 'gzip':
+            f = gzip.open(fname, "rb")
+        else:
+            f = open(fname, "rb")
+        try:
+            output = f.read()
+        finally:
+            f.close()
+        os.remove(fname)
+        return output
+
+    def _write(self, model, fname, **io_options):
+        fname = os.path.join(thisdir, fname)
+        model.write(fname, format="lp", io_options=io_options)
+        return fname
+
+    def test_gzip_extension(self):
+        model = self._create_model()
+        for io_options in ({}, {'streaming': True}):
+            plain = self._read(self._write(model, "plain.lp", **io_options))
+            fname = self._write(model, "compressed.lp.gz", **io_options)
+            self.assertEqual(guess_compression(fname), 'gzip')
+            self.assertEqual(self._read(fname, 'gzip'), plain)
+
+    def test_gzip_io_option(self):
+        model = self._create_model()
+        plain = self._read(self._write(model, "plain.lp"))
+        fname = self._write(model, "compressed.lp", compression='gzip')
+        self.assertEqual(self._read(fname, 'gzip'), plain)
+
+    def test_default_filename(self):
+        model = self._create_model()
+        fname, _ = model.write(format="lp",
+                               io_options={'compression': 'gzip'})
+        self.assertTrue(fname.endswith('.lp.gz'))
+        self.assertEqual(guess_format(fname), ProblemFormat.cpxlp)
+        self.assertTrue(len(self._read(fname, 'gzip')) > 0)
+
+    @unittest.skipIf(not compression_available('zstd'),
+                     "zstd compression is not available")
+    def test_zstd(self):
+        model = self._create_model()
+        fname = self._write(model, "compressed.lp.zst")
+        self.assertEqual(guess_compression(fname), 'zstd')
+        self.assertTrue(len(self._read(fname)) > 0)
+
+    def test_unknown_compression(self):
+        model = self._create_model()
+        self.assertRaises(ValueError, self._write, model, "plain.lp",
+                          compression='bzip2')
+
+@unittest.skipIf(not hasattr(os, 'fork'), "os.fork is not available")
+class TestCPXLPParallel(TestCPXLPStreaming):
+
+    def _create_model(self):
+        model = ConcreteModel()
+        model.T = RangeSet(10)
+        model.x = Var(model.T, bounds=(0, None))
+        model.y = Var(within=Integers)
+        model.obj = Objective(expr=summation(model.x) + model.y)
+        def b_rule(b, t):
+            b.u = Var(RangeSet(3), within=Binary)
+            b.c = Constraint(expr=summation(b.u) <= model.x[t])
+            b.e = Constraint(expr=b.u[1] - 2*b.u[2] == t)
+            b.r = Constraint(expr=(-t, b.u[3] + model.y, t))
+            b.trivial = Constraint(expr=model.x[1] >= 0)
+        model.b = Block(model.T, rule=b_rule)
+        model.q = Constraint(expr=model.x[1]*model.x[2] <= 1)
+        model.x[1].fix(2)
+        return model
+
+    def test_parallel_matches_default(self):
+        model = self._create_model()
+        for io_options in ({},
+                           {'symbolic_solver_labels': True},
+                           {'skip_trivial_constraints': True},
+                           {'file_determinism': 2}):
+            default, default_map = self._write(model, "default.lp",
+                                               **io_options)
+            for processes in (2, 3):
+                parallel, parallel_map = self._write(model, "parallel.lp",
+                                                     processes=processes,
+                                                     **io_options)
+                self.assertEqual(default, parallel)
+                self.assertEqual(sorted(default_map.bySymbol),
+                                 sorted(parallel_map.bySymbol))
+                self.assertEqual(sorted(default_map.aliases),
+                                 sorted(parallel_map.aliases))
+
+    def test_parallel_row_order(self):
+        model = self._create_model()
+        row_order = ComponentMap()
+        for i, constraint_data in enumerate(reversed(list(
+                model.component_data_objects(Constraint, active=True)))):
+            row_order[constraint_data] = i
+        default, _ = self._write(model, "default.lp", row_order=row_order)
+        parallel, _ = self._write(model, "parallel.lp",
+                                  row_order=row_order,
+                                  processes=2)
+        self.assertEqual(default, parallel)
+
+    def test_parallel_nonlinear_error(self):
+        model = self._create_model()
+        model.b[4].nl = Constraint(expr=model.b[4].u[1]**3 <= 1)
+        self.assertRaises(ValueError, self._write, model, "parallel.lp",
+                          processes=2)
+        self._cleanup(os.path.join(thisdir, "parallel.lp"))
+
+    def _cleanup(self, fname):
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+
+    def _write(self, model, fname, **io_options):
+        if 'streaming' in io_options:
+            io_options['processes'] = 2
+        return super(TestCPXLPParallel, self)._write(model,
+                                                     fname,
+                                                     **io_options)
+
 if __name__ == "__main__":
     unittest.main()
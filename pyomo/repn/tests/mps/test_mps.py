@@ -11,6 +11,7 @@
 #
 
 import os
+import gzip
 import random
 
 import pyutilib.th as unittest
@@ -168,5 +169,37 @@ class TestMPSOrdering(unittest.TestCase):
         row_order[model.con4[2]] = -1
         self._check_baseline(model, row_order=row_order)
 
+class TestMPSCompression(unittest.TestCase):
+
+    def _write(self, model, fname, **io_options):
+        fname = os.path.join(thisdir, fname)
+        model.write(fname, format="mps", io_options=io_options)
+        if fname.endswith('.gz'):
+            f = gzip.open(fname, "rb")
+        else:
+            f = open(fname, "rb")
+        try:
+            output = f.read()
+        finally:
+            f.close()
+        os.remove(fname)
+        return output
+
+    def test_gzip(self):
+        model = ConcreteModel()
+        model.s = RangeSet(20)
+        model.x = Var(model.s, bounds=(0, 1))
+        model.y = Var(within=Integers)
+        model.obj = Objective(expr=summation(model.x) + model.y)
+        model.c = Constraint(model.s,
+                             rule=lambda m, i: i*m.x[i] - m.y <= i)
+        plain = self._write(model, "plain.mps")
+        self.assertEqual(self._write(model, "compressed.mps.gz"), plain)
+        self.assertEqual(self._write(model, "compressed.mps.gz",
+                                     compression='gzip'),
+                         plain)
+        self.assertRaises(ValueError, self._write, model, "plain.mps",
+                          compression='bzip2')
+
 if __name__ == "__main__":
     unittest.main()
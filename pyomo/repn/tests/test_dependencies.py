@@ -0,0 +1,112 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Test the repn dependency map
+#
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+from pyomo.repn.dependencies import RepnDependencyMap
+import pyomo.repn.compute_canonical_repn
+import pyomo.repn.compute_ampl_repn
+
+def _create_model():
+    model = ConcreteModel()
+    model.s = RangeSet(3)
+    model.p = Param(model.s, initialize={1: 1.0, 2: 2.0, 3: 3.0},
+                    mutable=True)
+    model.x = Var(model.s)
+    model.y = Var()
+    model.e = Expression(expr=model.y**2)
+    model.obj = Objective(expr=summation(model.x))
+    model.c = Constraint(model.s,
+                         rule=lambda m, i: m.p[i]*m.x[i] >= 1)
+    model.d = Constraint(expr=model.x[1] + model.e <= 4)
+    return model
+
+class TestRepnDependencyMap(unittest.TestCase):
+
+    def test_add_remove(self):
+        model = _create_model()
+        deps = RepnDependencyMap()
+        self.assertEqual(len(deps), 0)
+        deps.add(model.c[1], model.c[1].body)
+        deps.add(model.d, model.d.body)
+        self.assertEqual(len(deps), 2)
+        self.assertTrue(model.d in deps)
+        self.assertEqual(sorted(id(_) for _ in deps.get_dependencies(model.d)),
+                         sorted([id(model.x[1]), id(model.e), id(model.y)]))
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.x[1]])],
+            ['c[1]', 'd'])
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.y, model.x[1]])],
+            ['d', 'c[1]'])
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.p[1]])],
+            ['c[1]'])
+        self.assertEqual(deps.get_dependents([model.x[2]]), [])
+
+        deps.remove(model.d)
+        self.assertFalse(model.d in deps)
+        self.assertEqual(deps.get_dependents([model.y]), [])
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.x[1]])],
+            ['c[1]'])
+        deps.clear()
+        self.assertEqual(len(deps), 0)
+        self.assertEqual(deps.get_dependents([model.x[1]]), [])
+
+    def test_readd(self):
+        model = _create_model()
+        deps = RepnDependencyMap()
+        deps.add(model.d, model.d.body)
+        model.d.set_value(model.x[2] <= 4)
+        deps.add(model.d, model.d.body)
+        self.assertEqual(deps.get_dependents([model.x[1], model.y]), [])
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.x[2]])],
+            ['d'])
+
+    def test_fixed_variables(self):
+        # fixed variables are folded into the repn, but remain
+        # dependencies so that unfixing them can be tracked
+        model = _create_model()
+        model.x[3].fix(2)
+        deps = RepnDependencyMap()
+        deps.add(model.c[3], model.c[3].body)
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.x[3]])],
+            ['c[3]'])
+
+    def _test_preprocess(self, module):
+        model = _create_model()
+        deps = RepnDependencyMap()
+        module.preprocess_block_constraints(model, dependency_map=deps)
+        module.preprocess_block_objectives(model, dependency_map=deps)
+        self.assertEqual(len(deps), 5)
+        self.assertEqual(
+            [c.name for c in deps.get_dependents([model.x[1]])],
+            ['c[1]', 'd', 'obj'])
+        model.x[1].fix(1)
+        for con in deps.get_dependents([model.x[1]]):
+            if con.parent_component().type() is Constraint:
+                module.preprocess_constraint_data(model, con,
+                                                  dependency_map=deps)
+        self.assertEqual(len(deps), 5)
+
+    def test_preprocess_canonical(self):
+        self._test_preprocess(pyomo.repn.compute_canonical_repn)
+
+    def test_preprocess_ampl(self):
+        self._test_preprocess(pyomo.repn.compute_ampl_repn)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Test the block-level sparse linear matrix extraction
+#
+
+import pyutilib.th as unittest
+import pyutilib.services
+
+from pyomo.environ import *
+from pyomo.repn.beta.matrix import (generate_block_linear_matrix,
+                                    compile_block_linear_constraints,
+                                    MatrixConstraint,
+                                    numpy_available)
+
+inf = float('inf')
+
+def _create_model():
+    model = ConcreteModel()
+    model.s = RangeSet(3)
+    model.p = Param(model.s, initialize={1: 2.0, 2: 3.0, 3: 4.0},
+                    mutable=True)
+    model.z = Var(bounds=(None, 5))
+    model.x = Var(model.s, bounds=(0, 10))
+    model.y = Var(within=Binary)
+    model.n = Var(within=Integers)
+    model.unused = Var()
+    model.obj = Objective(expr=model.x[1] + 2*model.y - 3, sense=maximize)
+    model.c1 = Constraint(expr=model.x[1] + model.p[2]*model.x[2] + 1 <= 7)
+    model.c2 = Constraint(model.s,
+                          rule=lambda m, i: m.p[i]*m.x[i] - m.y == 1)
+    model.c3 = Constraint(expr=(-1, model.z - model.n, 1))
+    model.b = Block()
+    model.b.c = Constraint(expr=model.z + model.x[3] >= 2)
+    return model
+
+def _dense(m):
+    rows = []
+    for i in range(m.nrows):
+        row = [0.0] * m.ncols
+        for p in range(m.indptr[i], m.indptr[i+1]):
+            row[m.indices[p]] += m.data[p]
+        rows.append(row)
+    return rows
+
+def _write(model, format):
+    filename = pyutilib.services.TempfileManager.create_tempfile(
+        suffix='.'+format)
+    model.write(filename)
+    with open(filename) as f:
+        return f.read()
+
+class TestBlockLinearMatrix(unittest.TestCase):
+
+    def tearDown(self):
+        pyutilib.services.TempfileManager.clear_tempfiles()
+
+    def _check_model(self, use_numpy):
+        model = _create_model()
+        m = generate_block_linear_matrix(model, use_numpy=use_numpy)
+
+        self.assertEqual([v.name for v in m.variables],
+                         ['z', 'x[1]', 'x[2]', 'x[3]', 'y', 'n'])
+        self.assertEqual([c.name for c in m.constraints],
+                         ['c1', 'c2[1]', 'c2[2]', 'c2[3]', 'c3', 'b.c'])
+        self.assertEqual((m.nrows, m.ncols, m.nnz), (6, 6, 12))
+        self.assertEqual(m.var_index[model.y], 4)
+        self.assertEqual(m.con_index[model.b.c], 5)
+        self.assertEqual(
+            _dense(m),
+            [[0, 1, 3, 0, 0, 0],
+             [0, 2, 0, 0, -1, 0],
+             [0, 0, 3, 0, -1, 0],
+             [0, 0, 0, 4, -1, 0],
+             [1, 0, 0, 0, 0, -1],
+             [1, 0, 0, 1, 0, 0]])
+        self.assertEqual(list(m.row_lower), [-inf, 1, 1, 1, -1, 2])
+        self.assertEqual(list(m.row_upper), [6, 1, 1, 1, 1, inf])
+        self.assertEqual(list(m.col_lower), [-inf, 0, 0, 0, 0, -inf])
+        self.assertEqual(list(m.col_upper), [5, 10, 10, 10, 1, inf])
+        self.assertEqual(m.col_type, ['C', 'C', 'C', 'C', 'B', 'I'])
+        self.assertIs(m.objective, model.obj)
+        self.assertEqual(m.sense, maximize)
+        self.assertEqual(list(m.c), [0, 1, 0, 0, 2, 0])
+        self.assertEqual(m.c0, -3)
+
+        row, col, data = m.coo()
+        self.assertEqual(list(row),
+                         [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+        self.assertEqual(list(col), list(m.indices))
+        self.assertEqual(list(data), list(m.data))
+        # the block is not modified
+        self.assertEqual(len(list(model.component_data_objects(Constraint))),
+                         6)
+
+    def test_array_storage(self):
+        self._check_model(False)
+
+    @unittest.skipIf(not numpy_available, "NumPy is not available")
+    def test_numpy_storage(self):
+        self._check_model(True)
+        import numpy
+        m = generate_block_linear_matrix(_create_model())
+        self.assertTrue(isinstance(m.data, numpy.ndarray))
+
+    def test_fixed_variables(self):
+        model = _create_model()
+        model.x[2].fix(1)
+        m = generate_block_linear_matrix(model, use_numpy=False)
+        self.assertEqual([v.name for v in m.variables],
+                         ['z', 'x[1]', 'x[3]', 'y', 'n'])
+        self.assertEqual(m.row_upper[0], 3)
+        self.assertEqual(m.row_lower[2], -2)
+
+    def test_nonlinear(self):
+        model = _create_model()
+        model.nl = Constraint(expr=model.x[1]*model.x[2] <= 1)
+        self.assertRaises(ValueError, generate_block_linear_matrix, model)
+        m = generate_block_linear_matrix(model,
+                                         skip_nonlinear_constraints=True,
+                                         use_numpy=False)
+        self.assertEqual(m.nrows, 6)
+        self.assertEqual([c.name for c in m.nonlinear_constraints], ['nl'])
+
+        model.nl.deactivate()
+        model.obj.set_value(model.x[1]**2)
+        self.assertRaises(ValueError, generate_block_linear_matrix, model)
+        m = generate_block_linear_matrix(model,
+                                         include_objective=False,
+                                         use_numpy=False)
+        self.assertIs(m.objective, None)
+        self.assertEqual(list(m.c), [0]*m.ncols)
+
+    def test_trivial_constraints(self):
+        model = _create_model()
+        model.x[1].fix(0)
+        model.trivial = Constraint(expr=model.x[1] <= 1)
+        m = generate_block_linear_matrix(model,
+                                         skip_trivial_constraints=True,
+                                         use_numpy=False)
+        self.assertEqual(m.nrows, 6)
+        self.assertEqual([c.name for c in m.trivial_constraints],
+                         ['trivial'])
+        m = generate_block_linear_matrix(model, use_numpy=False)
+        self.assertEqual(m.nrows, 7)
+        row = m.con_index[model.trivial]
+        self.assertEqual(m.indptr[row], m.indptr[row+1])
+        self.assertEqual(m.row_upper[row], 1)
+
+    def test_multiple_objectives(self):
+        model = _create_model()
+        model.obj2 = Objective(expr=model.z)
+        self.assertRaises(ValueError, generate_block_linear_matrix, model)
+
+    def test_compiled_block(self):
+        model = _create_model()
+        model.obj.deactivate()
+        ref = generate_block_linear_matrix(model, use_numpy=False)
+        compile_block_linear_constraints(model, 'Amatrix')
+        m = generate_block_linear_matrix(model, use_numpy=False)
+        self.assertEqual([c.name for c in m.constraints],
+                         ['Amatrix[%s]' % i for i in range(6)])
+        self.assertEqual(_dense(m), _dense(ref))
+        self.assertEqual(list(m.row_lower), list(ref.row_lower))
+        self.assertEqual(list(m.row_upper), list(ref.row_upper))
+
+    def test_compile_block(self):
+        model = _create_model()
+        model.obj.deactivate()
+        model.nl = Constraint(expr=model.x[1]*model.x[2] <= 1)
+        model.empty = Constraint(Any)
+        compile_block_linear_constraints(model, 'Amatrix')
+        A = model.Amatrix
+        self.assertEqual(list(A._prows), [0, 2, 4, 6, 8, 10, 12])
+        self.assertEqual(list(A._jcols),
+                         [1, 2, 1, 4, 2, 4, 3, 4, 5, 0, 5, 3])
+        self.assertEqual(list(A._vals),
+                         [1, 3, 2, -1, 3, -1, 4, -1, 1, -1, 1, 1])
+        self.assertEqual(list(A._ranges),
+                         [0, 6, 1, 1, 1, 1, 1, 1, -1, 1, 2, 0])
+        self.assertEqual(list(A._range_types),
+                         [MatrixConstraint.UpperBound] +
+                         [MatrixConstraint.Equality]*3 +
+                         [MatrixConstraint.LowerBound |
+                          MatrixConstraint.UpperBound,
+                          MatrixConstraint.LowerBound])
+        self.assertEqual([v.name for v in A._varmap],
+                         ['n', 'x[1]', 'x[2]', 'x[3]', 'y', 'z'])
+        # the nonlinear constraint is kept, the compiled constraints
+        # and the empty containers are removed
+        self.assertEqual(
+            sorted(c.name for c in model.component_objects(Constraint)),
+            ['Amatrix', 'nl'])
+
+    def test_compile_block_trivial_constraints(self):
+        model = _create_model()
+        model.x[1].fix(0)
+        model.trivial = Constraint([1, 2],
+                                   rule=lambda m, i: m.x[1] >= -i)
+        compile_block_linear_constraints(model, 'Amatrix',
+                                         skip_trivial_constraints=True)
+        self.assertEqual(len(model.Amatrix), 6)
+        self.assertEqual([v.name for v in model.Amatrix._varmap],
+                         ['n', 'x[2]', 'x[3]', 'y', 'z'])
+        self.assertEqual(
+            sorted(c.name for c in model.component_objects(Constraint)),
+            ['Amatrix'])
+
+    def test_compiled_block_writers(self):
+        # the LP and MPS files of the compiled block are unchanged
+        for format in ('lp', 'mps'):
+            model = _create_model()
+            ref = _write(model, format)
+            compile_block_linear_constraints(model, 'Amatrix')
+            self.assertEqual(_write(model, format), ref)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -74,9 +74,14 @@ class PyomoMIPConverter(SingletonPlugin):
         else:
             instance = args[2]
 
+        # compressed LP and MPS files are given the extension of the
+        # compressor (e.g., '.lp.gz') so that solvers recognize them
+        compression_ext = compression_extensions.get(
+            io_options.get('compression', None), '')
+
         if args[1] == ProblemFormat.cpxlp:
             problem_filename = pyutilib.services.TempfileManager.\
-                               create_tempfile(suffix = '.pyomo.lp')
+                               create_tempfile(suffix = '.pyomo.lp' + compression_ext)
             if instance is not None:
                 (problem_filename, symbol_map) = \
                     instance.write(filename=problem_filename,
@@ -154,7 +159,7 @@ class PyomoMIPConverter(SingletonPlugin):
             else:
                 assert args[1] == ProblemFormat.mps
                 problem_filename = pyutilib.services.TempfileManager.\
-                                   create_tempfile(suffix = '.pyomo.mps')
+                                   create_tempfile(suffix = '.pyomo.mps' + compression_ext)
             if instance is not None:
                 (problem_filename, symbol_map) = \
                     instance.write(filename=problem_filename,
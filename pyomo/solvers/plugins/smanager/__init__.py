@@ -9,3 +9,5 @@
 
 import pyomo.solvers.plugins.smanager.pyro
 import pyomo.solvers.plugins.smanager.phpyro
+import pyomo.solvers.plugins.smanager.pool
+import pyomo.solvers.plugins.smanager.asl_workers
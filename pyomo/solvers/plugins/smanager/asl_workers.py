@@ -0,0 +1,348 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+
+__all__ = []
+
+import os
+import atexit
+import shutil
+import tempfile
+import traceback
+import collections
+import multiprocessing
+
+import pyutilib.misc
+import pyomo.util.plugin
+from pyutilib.subprocess import run
+from pyomo.opt.base import SolverFactory, ProblemFormat
+from pyomo.opt.base.problem import WriterFactory
+from pyomo.opt.parallel.manager import (ActionManagerError,
+                                        ActionStatus,
+                                        ActionHandle)
+from pyomo.opt.parallel.async_solver import AsynchronousSolverManager
+from pyomo.opt.parallel.local import prepare_queued_solve
+from pyomo.opt.plugins.sol import read_sol, ResultsReader_sol
+from pyomo.opt.results import SolverResults, SolverStatus
+from pyomo.core.base import Block
+from pyomo.solvers.plugins.solvers.ASL import ASL
+
+import six
+from six import StringIO
+
+#
+# The keywords of the solves that are passed to the NL writer
+#
+_io_keywords = ('skip_trivial_constraints', 'file_determinism',
+                'output_fixed_variable_bounds',
+                'include_all_variable_bounds', 'incremental')
+
+#
+# The (in-memory) directory for the files of the workers
+#
+_shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+#
+# The directories of the workers that have not been shut down, which
+# are removed when the interpreter exits
+#
+_workdirs = set()
+
+
+@atexit.register
+def _remove_workdirs():
+    for workdir in list(_workdirs):
+        shutil.rmtree(workdir, ignore_errors=True)
+    _workdirs.clear()
+
+
+def _asl_worker(connection, workdir):
+    """
+    The loop of a resident worker process.  The worker receives the
+    NL files (as strings) through the connection, executes the ASL
+    solvers and sends back the task ids, error messages (or None),
+    the solutions (AmplSolution objects) and the solver logs.  The
+    loop ends when None is received.
+    """
+    solvers = {}
+    nl_file = os.path.join(workdir, 'model.nl')
+    sol_file = os.path.join(workdir, 'model.sol')
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        log = None
+        try:
+            #
+            # The ASL plugins are reused, but their options are reset
+            # for every task
+            #
+            opt = solvers.get(task.solver, None)
+            if opt is None:
+                opt = solvers[task.solver] = SolverFactory('asl')
+            opt.options = pyutilib.misc.Options(solver=task.solver)
+            for key, value in six.iteritems(task.options):
+                setattr(opt.options, key, value)
+            opt._log_file = os.path.join(workdir, 'model.log')
+            opt._soln_file = None
+            command = opt.create_command_line(task.executable, [nl_file])
+
+            with open(nl_file, 'w') as f:
+                f.write(task.nl)
+            rc, log = run(command.cmd,
+                          env=command.env,
+                          timelimit=task.timelimit)
+            if not os.path.exists(sol_file):
+                raise RuntimeError(
+                    "Solver '%s' (executable=%s) did not write a solution "
+                    "file (return code=%s)\nSolver log:\n%s"
+                    % (task.solver, task.executable, rc, log))
+            sol = read_sol(sol_file, task.suffixes)
+            connection.send((task.id, None, sol, log))
+        except:
+            connection.send((task.id, traceback.format_exc(), None, log))
+        finally:
+            for filename in (nl_file, sol_file):
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+
+def _status_results(sol):
+    """
+    Return a SolverResults object with the solver status of a solution
+    (and without the solution)
+    """
+    results = SolverResults()
+    (results.solver.termination_condition,
+     results.solver.status, _, _) = sol.status()
+    results.solver.message = \
+        pyutilib.misc.yaml_fix(sol.message.strip().replace("\n", "; "))
+    results.solver.id = sol.solve_result_num
+    return results
+
+
+class _Worker(object):
+
+    def __init__(self):
+        self.workdir = tempfile.mkdtemp(prefix='tmp_asl_worker',
+                                        dir=_shm_dir)
+        _workdirs.add(self.workdir)
+        try:
+            self.connection, child_connection = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(target=_asl_worker,
+                                                   args=(child_connection,
+                                                         self.workdir))
+            self.process.daemon = True
+            self.process.start()
+        except:
+            _workdirs.discard(self.workdir)
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            raise
+        child_connection.close()
+        self.task_id = None
+
+    def shutdown(self):
+        try:
+            self.connection.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join()
+        self.connection.close()
+        _workdirs.discard(self.workdir)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class SolverManager_ASLWorkers(AsynchronousSolverManager):
+    """
+    A solver manager that executes ASL solvers (e.g., ipopt) in a pool
+    of resident local worker processes.
+
+    The NL files are written into memory when the solves are queued,
+    and they are sent to the workers (which are started once and are
+    reused for all the solves) with the solver options.  The workers
+    execute the solvers in an in-memory directory (when /dev/shm
+    exists) and they return the solutions of the .sol files as arrays
+    (AmplSolution objects), which are loaded into the models without
+    building the solutions of the SolverResults objects.  The size of
+    the pool is set with the 'max_workers' keyword (by default, the
+    number of CPUs).
+
+    The results of the solves are SolverResults objects with the solver
+    status (and the solver log in the _log attribute).  As with the
+    other solver managers, the solutions are only stored in the results
+    if they are not loaded into the models ('load_solutions' is False),
+    and they can be loaded later with model.solutions.load_from().
+    """
+
+    pyomo.util.plugin.alias('asl_workers', doc="Execute ASL solvers in a "
+                            "pool of resident local worker processes")
+
+    def __init__(self, **kwds):
+        self.max_workers = kwds.pop('max_workers', None)
+        if self.max_workers is None:
+            self.max_workers = multiprocessing.cpu_count()
+        if self.max_workers < 1:
+            raise ValueError(
+                "The 'asl_workers' solver manager requires at least one "
+                "worker process (max_workers=%s)" % (self.max_workers,))
+        self._workers = []
+        super(SolverManager_ASLWorkers, self).__init__(**kwds)
+
+    def clear(self):
+        """Clear manager state"""
+        super(SolverManager_ASLWorkers, self).clear()
+        self._pending = collections.deque()
+        self._tasks = {}
+
+    def shutdown_workers(self):
+        """Terminate the worker processes (after their current solves)"""
+        for worker in self._workers:
+            worker.shutdown()
+        self._workers = []
+
+    def solve_all(self, solver, instances, **kwds):
+        """
+        Apply a solver to a list of problem instances.  The solutions
+        are loaded into the instances (unless the 'load_solutions'
+        keyword is False).
+        """
+        kwds['opt'] = solver
+        action_handles = [self.queue(instance, **kwds)
+                          for instance in instances]
+        self.wait_all(action_handles)
+
+    def _perform_queue(self, ah, *args, **kwds):
+        """
+        Perform the queue operation.  This method returns the ActionHandle,
+        and the ActionHandle status indicates whether the queue was successful.
+        """
+        if (len(args) != 1) or (not isinstance(args[0], Block)):
+            raise ActionManagerError(
+                "The %s can only solve a single Pyomo model"
+                % (type(self).__name__))
+        model = args[0]
+        opt, _, options = prepare_queued_solve(self, ASL, args, kwds)
+        opt.available(exception_flag=True)
+        suffixes = kwds.pop('suffixes', [])
+        # (the name of the ASL solver is sent with the task)
+        options.pop('solver', None)
+
+        #
+        # Write the NL file into memory
+        #
+        io_options = dict((key, kwds.pop(key)) for key in _io_keywords
+                          if key in kwds)
+        with WriterFactory(ProblemFormat.nl) as writer:
+            ostream = StringIO()
+            _, symbol_map = writer(model,
+                                   ostream,
+                                   opt.has_capability,
+                                   io_options)
+        model.solutions.add_symbol_map(symbol_map)
+        smap_id = id(symbol_map)
+
+        task = pyutilib.misc.Bunch(id=ah.id,
+                                   solver=opt.options.solver,
+                                   executable=opt.executable(),
+                                   options=options,
+                                   nl=ostream.getvalue(),
+                                   suffixes=suffixes,
+                                   timelimit=kwds.pop('timelimit', None))
+        self._tasks[ah.id] = (model,
+                              smap_id,
+                              suffixes,
+                              kwds.pop('load_solutions', True))
+        self._pending.append(task)
+        self._dispatch()
+        return ah
+
+    def _dispatch(self):
+        """Send the pending tasks to the idle workers"""
+        while len(self._pending):
+            for worker in self._workers:
+                if worker.task_id is None:
+                    break
+            else:
+                if len(self._workers) >= self.max_workers:
+                    return
+                worker = _Worker()
+                self._workers.append(worker)
+            task = self._pending.popleft()
+            worker.connection.send(task)
+            worker.task_id = task.id
+
+    def _perform_wait_any(self):
+        """
+        Perform the wait_any operation.  This method returns an
+        ActionHandle with the results of waiting.  If None is returned
+        then the ActionManager assumes that it can call this method again.
+        Note that an ActionHandle can be returned with a dummy value,
+        to indicate an error.
+        """
+        if len(self._tasks) == 0:
+            return ActionHandle(error=True,
+                                explanation=("No queued evaluations available "
+                                             "in the 'asl_workers' solver "
+                                             "manager"))
+        self._dispatch()
+        busy = [worker for worker in self._workers
+                if worker.task_id is not None]
+        if len(busy) == 0:
+            return ActionHandle(error=True,
+                                explanation=("No running evaluations in the "
+                                             "'asl_workers' solver manager"))
+        # (a timeout keeps the wait interruptible)
+        timeout = 0.1 / len(busy)
+        for worker in busy:
+            if worker.connection.poll(timeout):
+                break
+        else:
+            return None
+
+        try:
+            task_id, error, sol, log = worker.connection.recv()
+        except EOFError:
+            # the worker process died (and it is replaced)
+            task_id, error, sol, log = \
+                worker.task_id, "The worker process terminated", None, None
+            self._workers.remove(worker)
+            worker.shutdown()
+        worker.task_id = None
+        self._dispatch()
+
+        ah = self.event_handle[task_id]
+        model, smap_id, suffixes, load_solutions = self._tasks.pop(task_id)
+        if error is not None:
+            self.queued_action_counter -= 1
+            ah.status = ActionStatus.error
+            model.solutions.delete_symbol_map(smap_id)
+            raise RuntimeError(
+                "Worker process reported an error for task with id=%s. "
+                "Reason: \n%s" % (task_id, error))
+
+        if load_solutions:
+            results = _status_results(sol)
+            if results.solver.status in (SolverStatus.ok,
+                                         SolverStatus.warning):
+                model.solutions.load_from_sol(sol, smap_id)
+            else:
+                model.solutions.delete_symbol_map(smap_id)
+        else:
+            results = ResultsReader_sol()._load(sol, None, None, suffixes)
+            results._smap = model.solutions.symbol_map[smap_id]
+            model.solutions.delete_symbol_map(smap_id)
+        results._smap_id = None
+        results._log = log
+
+        self.results[ah.id] = results
+        ah.status = ActionStatus.done
+        return ah
@@ -0,0 +1,222 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+
+__all__ = []
+
+import os
+import time
+import shutil
+import tempfile
+import traceback
+import multiprocessing
+
+import pyutilib.misc
+import pyutilib.services
+import pyomo.util.plugin
+from pyomo.opt.base import SolverFactory
+from pyomo.opt.solver import SystemCallSolver
+from pyomo.opt.parallel.manager import ActionStatus, ActionHandle
+from pyomo.opt.parallel.async_solver import AsynchronousSolverManager
+from pyomo.opt.parallel.local import prepare_queued_solve
+from pyomo.core.base import Block
+
+import six
+from six.moves import queue
+
+#
+# The keywords of OptSolver.solve() that apply to the execution of
+# the solver (rather than to the problem writers)
+#
+_solver_keywords = ('logfile', 'solnfile', 'timelimit', 'tee',
+                    'keepfiles', 'suffixes')
+
+
+def _solve_problem_file(task_id, data):
+    """
+    Apply a solver to a problem file in a worker process, returning
+    the task id, an error message (or None) and the results.
+    """
+    import pyomo.environ
+    try:
+        time_start = time.time()
+        with pyutilib.services.TempfileManager.push():
+            with SolverFactory(data.opt) as opt:
+                if data.executable is not None:
+                    opt.set_executable(data.executable, validate=False)
+                for key, value in six.iteritems(data.solver_options):
+                    setattr(opt.options, key, value)
+                results = opt.solve(data.filename, **data.kwds)
+        results.pyomo_solve_time = time.time()-time_start
+        return task_id, None, results
+    except:
+        return task_id, traceback.format_exc(), None
+
+
+class SolverManager_ProcessPool(AsynchronousSolverManager):
+    """
+    A solver manager that executes solvers concurrently in a pool of
+    local worker processes.
+
+    The problem files are written when the solves are queued, and the
+    workers apply the (shell) solvers to these files.  The results are
+    loaded into the models when the solves complete.  The size of the
+    pool is set with the 'max_workers' keyword (by default, the
+    number of CPUs).
+    """
+
+    pyomo.util.plugin.alias('pool', doc="Execute solvers concurrently "
+                            "in a pool of local worker processes")
+
+    def __init__(self, **kwds):
+        self.max_workers = kwds.pop('max_workers', None)
+        if self.max_workers is None:
+            self.max_workers = multiprocessing.cpu_count()
+        if self.max_workers < 1:
+            raise ValueError(
+                "The 'pool' solver manager requires at least one worker "
+                "process (max_workers=%s)" % (self.max_workers,))
+        self._pool = None
+        super(SolverManager_ProcessPool, self).__init__(**kwds)
+
+    def clear(self):
+        """Clear manager state"""
+        super(SolverManager_ProcessPool, self).clear()
+        self._completed = queue.Queue()
+        self._opt_data = {}
+        self._args = {}
+        self._files = {}
+
+    def shutdown_workers(self):
+        """Wait for the queued solves and terminate the worker processes"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _perform_queue(self, ah, *args, **kwds):
+        """
+        Perform the queue operation.  This method returns the ActionHandle,
+        and the ActionHandle status indicates whether the queue was successful.
+        """
+        opt, deactivate_opt, solver_options = \
+            prepare_queued_solve(self, SystemCallSolver, args, kwds)
+
+        #
+        # Write the problem file (and the warm-start file, if any).
+        # The availability of the solver is checked by the workers.
+        #
+        kwds.setdefault('available', True)
+        keepfiles = kwds.get('keepfiles', False)
+        opt._presolve(*args, **kwds)
+        worker_kwds = dict((key, kwds[key]) for key in _solver_keywords
+                           if key in kwds)
+        #
+        # The files written for the worker are moved to a directory
+        # that is removed when the solve completes; the other
+        # temporary files of the presolve are removed now.
+        #
+        taskdir = tempfile.mkdtemp(prefix='tmp_pool',
+                                   dir=pyutilib.services.TempfileManager.tempdir)
+        def _move(filename):
+            newname = os.path.join(taskdir, os.path.basename(filename))
+            shutil.move(filename, newname)
+            return newname
+        if len(args) and isinstance(args[0], Block):
+            filename = _move(opt._problem_files[0])
+        else:
+            filename = opt._problem_files[0]
+        if getattr(opt, '_warm_start_solve', False) and \
+           (opt._warm_start_file_name is not None):
+            worker_kwds['warmstart'] = True
+            if 'warmstart_file' in kwds:
+                worker_kwds['warmstart_file'] = kwds['warmstart_file']
+            else:
+                worker_kwds['warmstart_file'] = \
+                    _move(opt._warm_start_file_name)
+        pyutilib.services.TempfileManager.pop(remove=not keepfiles)
+
+        data = pyutilib.misc.Bunch(opt=opt.type,
+                                   executable=getattr(opt, '_user_executable',
+                                                      None),
+                                   filename=filename,
+                                   kwds=worker_kwds,
+                                   solver_options=solver_options)
+
+        self._args[ah.id] = args
+        self._files[ah.id] = (taskdir, keepfiles)
+        self._opt_data[ah.id] = (opt._smap_id,
+                                 opt._load_solutions,
+                                 opt._select_index,
+                                 opt._default_variable_value)
+        if deactivate_opt:
+            opt.deactivate()
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(processes=self.max_workers)
+        self._pool.apply_async(_solve_problem_file, (ah.id, data),
+                               callback=self._completed.put)
+        return ah
+
+    def _perform_wait_any(self):
+        """
+        Perform the wait_any operation.  This method returns an
+        ActionHandle with the results of waiting.  If None is returned
+        then the ActionManager assumes that it can call this method again.
+        Note that an ActionHandle can be returned with a dummy value,
+        to indicate an error.
+        """
+        if len(self._opt_data) == 0:
+            return ActionHandle(error=True,
+                                explanation=("No queued evaluations available "
+                                             "in the 'pool' solver manager"))
+        try:
+            # (a timeout keeps the wait interruptible)
+            task_id, error, results = self._completed.get(True, 0.1)
+        except queue.Empty:
+            return None
+
+        ah = self.event_handle[task_id]
+        (smap_id,
+         load_solutions,
+         select_index,
+         default_variable_value) = self._opt_data.pop(task_id)
+        args = self._args.pop(task_id)
+        taskdir, keepfiles = self._files.pop(task_id)
+        if not keepfiles:
+            shutil.rmtree(taskdir, ignore_errors=True)
+
+        if error is not None:
+            self.queued_action_counter -= 1
+            ah.status = ActionStatus.error
+            if len(args) and isinstance(args[0], Block):
+                args[0].solutions.delete_symbol_map(smap_id)
+            raise RuntimeError(
+                "Worker process reported an error for task with id=%s. "
+                "Reason: \n%s" % (task_id, error))
+
+        # Tag the results object with the symbol map id.
+        results._smap_id = smap_id
+
+        if len(args) and isinstance(args[0], Block):
+            _model = args[0]
+            if load_solutions:
+                _model.solutions.load_from(
+                    results,
+                    select=select_index,
+                    default_variable_value=default_variable_value)
+                results._smap_id = None
+                results.solution.clear()
+            else:
+                results._smap = _model.solutions.symbol_map[smap_id]
+                _model.solutions.delete_symbol_map(smap_id)
+
+        self.results[ah.id] = results
+        ah.status = ActionStatus.done
+        return ah
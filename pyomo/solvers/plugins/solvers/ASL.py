@@ -50,6 +50,8 @@ class ASL(SystemCallSolver):
         self._valid_result_formats = {}
         self._valid_result_formats[ProblemFormat.nl] = [ResultsFormat.sol]
         self.set_problem_format(ProblemFormat.nl)
+        # NL files are read sequentially (and can be streamed)
+        self._pipe_problem_formats.add(ProblemFormat.nl)
         #
         # Note: Undefined capabilities default to 'None'
         #
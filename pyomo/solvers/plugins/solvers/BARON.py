@@ -15,6 +15,7 @@ import re
 import tempfile
 
 import pyutilib.services
+import pyutilib.misc
 from pyutilib.misc import Options
 
 import pyomo.util.plugin as plugin
@@ -82,40 +83,45 @@ class BARONSHELL(SystemCallSolver):
         given executable (default is 'baron'). All output is
         hidden. If the test fails for any reason (including
         the executable being invalid), then this function
-        will return False.
+        will return False. Valid licenses are cached (in
+        memory) for each executable.
         """
-        with tempfile.NamedTemporaryFile(mode='w',
-                                         delete=False) as f:
+        def _check_license():
             with tempfile.NamedTemporaryFile(mode='w',
-                                             delete=False) as fr:
-                pass
-            f.write("//This is a dummy .bar file created to "
-                    "return the baron version//\n"
-                    "OPTIONS {\n"
-                    "ResName: \""+fr.name+"\";\n"
-                    "Summary: 0;\n"
-                    "}\n"
-                    "POSITIVE_VARIABLES x1;\n"
-                    "OBJ: minimize x1;")
-        try:
-            rc = subprocess.call([executable, f.name],
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-        except OSError:
-            rc = 1
-        finally:
-            try:
-                os.remove(fr.name)
-            except OSError:
-                pass
+                                             delete=False) as f:
+                with tempfile.NamedTemporaryFile(mode='w',
+                                                 delete=False) as fr:
+                    pass
+                f.write("//This is a dummy .bar file created to "
+                        "return the baron version//\n"
+                        "OPTIONS {\n"
+                        "ResName: \""+fr.name+"\";\n"
+                        "Summary: 0;\n"
+                        "}\n"
+                        "POSITIVE_VARIABLES x1;\n"
+                        "OBJ: minimize x1;")
             try:
-                os.remove(f.name)
+                rc = subprocess.call([executable, f.name],
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT)
             except OSError:
-                pass
-        if rc:
-            return False
-        else:
-            return True
+                rc = 1
+            finally:
+                try:
+                    os.remove(fr.name)
+                except OSError:
+                    pass
+                try:
+                    os.remove(f.name)
+                except OSError:
+                    pass
+            # (invalid licenses are not cached)
+            return None if rc else True
+        return bool(solver_capability_cache.probe(
+            pyutilib.misc.search_file(executable, executable=True),
+            'license',
+            _check_license,
+            persistent=False))
 
     def _default_executable(self):
         executable = pyutilib.services.registered_executable("baron")
@@ -11,6 +11,7 @@ __all__ = ['CBC', 'MockCBC']
 
 import os
 import re
+import time
 import logging
 
 from six import iteritems
@@ -26,9 +27,15 @@ from pyomo.opt.base.solvers import _extract_version
 from pyomo.opt.results import *
 from pyomo.opt.solver import *
 from pyomo.solvers.mockmip import MockMIP
+from pyomo.solvers.plugins.solvers.warmstart import write_warm_start
 
 logger = logging.getLogger('pyomo.solvers')
 
+try:
+    unicode
+except:
+    basestring = unicode = str
+
 def _version_to_string(version):
     if version is None:
         return "<unknown>"
@@ -37,6 +44,12 @@ def _version_to_string(version):
 _cbc_compiled_with_asl = None
 _cbc_version = None
 _cbc_old_version = None
+#
+# Interrogate the CBC executable to see if it recognizes the -AMPL
+# flag.  This is done when the CBC plugins are first used (rather
+# than when they are imported), since the probes are saved in the
+# solver capability cache.
+#
 def configure_cbc():
     global _cbc_compiled_with_asl
     global _cbc_version
@@ -48,11 +61,22 @@ def configure_cbc():
     if pyutilib.services.registered_executable("cbc") is None:
         return
     cbc_exec = pyutilib.services.registered_executable("cbc").get_path()
-    results = pyutilib.subprocess.run( [cbc_exec,"-stop"], timelimit=1 )
-    _cbc_version = _extract_version(results[1])
-    results = pyutilib.subprocess.run( 
-        [cbc_exec,"dummy","-AMPL","-stop"], timelimit=1 )
-    _cbc_compiled_with_asl = not ('No match for AMPL' in results[1])
+    # the probes of the executable are cached across processes
+    def _probe_version():
+        results = pyutilib.subprocess.run( [cbc_exec,"-stop"], timelimit=1 )
+        return _extract_version(results[1])
+    def _probe_asl():
+        results = pyutilib.subprocess.run(
+            [cbc_exec,"dummy","-AMPL","-stop"], timelimit=1 )
+        return not ('No match for AMPL' in results[1])
+    _cbc_version = solver_capability_cache.probe(cbc_exec,
+                                                 'version',
+                                                 _probe_version)
+    if _cbc_version is not None:
+        _cbc_version = tuple(_cbc_version)
+    _cbc_compiled_with_asl = solver_capability_cache.probe(cbc_exec,
+                                                           'asl',
+                                                           _probe_asl)
     if _cbc_version is not None:
         _cbc_old_version = _cbc_version < (2,7,0,0)
 
@@ -63,6 +87,7 @@ class CBC(OptSolver):
     pyomo.util.plugin.alias('cbc', doc='The CBC LP/MIP solver')
 
     def __new__(cls, *args, **kwds):
+        configure_cbc()
         try:
             mode = kwds['solver_io']
             if mode is None:
@@ -124,12 +149,24 @@ class CBCSHELL(SystemCallSolver):
     pyomo.util.plugin.alias('_cbc_shell',  doc='Shell interface to the CBC LP/MIP solver')
 
     def __init__(self, **kwds):
+        configure_cbc()
         #
         # Call base constructor
         #
         kwds['type'] = 'cbc'
         SystemCallSolver.__init__(self, **kwds)
 
+        # NOTE: eventually both of the following attributes should be migrated to a common base class.
+        # is the current solve warm-started? a transient data member to communicate state information
+        # across the _presolve, _apply_solver, and _postsolve methods.
+        self._warm_start_solve = False
+        # related to the above, the temporary name of the mipstart warm-start file (if any).
+        self._warm_start_file_name = None
+        self._warm_start_skip_zeros = False
+        # is the warm-start file written by this plugin (from the
+        # symbol map of the problem file)?
+        self._write_warm_start_file = False
+
         #
         # Set up valid problem formats and valid results for each problem format
         #
@@ -143,6 +180,12 @@ class CBCSHELL(SystemCallSolver):
            (_cbc_old_version is not True):
             self._valid_result_formats[ProblemFormat.nl] = [ResultsFormat.sol]
         self._valid_result_formats[ProblemFormat.mps] = [ResultsFormat.soln]
+        # gzip-compressed LP and MPS files are read directly
+        self._compressed_problem_formats[ProblemFormat.cpxlp] = ('gzip',)
+        self._compressed_problem_formats[ProblemFormat.mps] = ('gzip',)
+        # LP and MPS files are read sequentially (and can be streamed)
+        self._pipe_problem_formats.update((ProblemFormat.cpxlp,
+                                           ProblemFormat.mps))
 
         # Note: Undefined capabilities default to 'None'
         self._capabilities = pyutilib.misc.Options()
@@ -176,10 +219,84 @@ class CBCSHELL(SystemCallSolver):
             return ResultsFormat.sol
         return ResultsFormat.soln
         
-    # Nothing needs to be done here
-    #def _presolve(self, *args, **kwds):
-    #    # let the base class handle any remaining keywords/actions.
-    #    SystemCallSolver._presolve(self, *args, **kwds)
+    def warm_start_capable(self):
+        # CBC reads mipstart files (-mipstart) since version 2.8, and
+        # the ASL interface does not support them
+        if self._problem_format not in (ProblemFormat.cpxlp,
+                                        ProblemFormat.mps):
+            return False
+        return (_cbc_version is not None) and (_cbc_version >= (2,8,0,0))
+
+    #
+    # write a warm-start file in the CBC mipstart format.
+    #
+    def _warm_start(self, instance):
+
+        write_warm_start(self._warm_start_file_name,
+                         instance.solutions.symbol_map[self._smap_id],
+                         'cbc',
+                         skip_zeros=self._warm_start_skip_zeros)
+
+    # the warm-start file is written from the symbol map, so the
+    # problem file cannot be streamed through a named pipe.
+    def _uses_symbol_map_in_presolve(self):
+        return self._write_warm_start_file
+
+    # over-ride presolve to extract the warm-start keyword, if specified.
+    def _presolve(self, *args, **kwds):
+
+        # create a context in the temporary file manager for
+        # this plugin - is "pop"ed in the _postsolve method.
+        pyutilib.services.TempfileManager.push()
+
+        self._warm_start_solve = kwds.pop('warmstart', False)
+        self._warm_start_file_name = kwds.pop('warmstart_file', None)
+        self._warm_start_skip_zeros = kwds.pop('warmstart_skip_zeros', False)
+        user_warmstart = self._warm_start_file_name is not None
+
+        # if a filename is provided and a warm-start is indicated, we
+        # assume that the user has already created the warm start file.
+        # otherwise, the name of the warm start file is assigned *before*
+        # calling the base class presolve, which creates the command line.
+        self._write_warm_start_file = \
+            self._warm_start_solve and \
+            (len(args) > 0) and \
+            (not isinstance(args[0], basestring)) and \
+            (not user_warmstart)
+        if self._write_warm_start_file:
+            self._warm_start_file_name = pyutilib.services.TempfileManager.\
+                                         create_tempfile(suffix='.cbc.mst')
+
+        try:
+            # let the base class handle any remaining keywords/actions.
+            SystemCallSolver._presolve(self, *args, **kwds)
+
+            # NB: we must let the base class presolve run first so that the
+            # symbol_map is actually constructed!
+
+            if (len(args) > 0) and (not isinstance(args[0], basestring)):
+
+                if len(args) != 1:
+                    raise ValueError(
+                        "CBC _presolve method can only handle a "
+                        "single problem instance - %s were supplied"
+                        % (len(args),))
+
+                if self._write_warm_start_file:
+
+                    start_time = time.time()
+                    self._warm_start(args[0])
+                    end_time = time.time()
+                    if self._report_timing:
+                        print("Warm start write time= %.2f seconds"
+                              % (end_time-start_time))
+        except:
+            # _postsolve() is not called if the presolve fails, so the
+            # temporary file contexts of this plugin and of the base
+            # class are popped here.
+            pyutilib.services.TempfileManager.pop(remove=True)
+            pyutilib.services.TempfileManager.pop(remove=True)
+            raise
 
     def _default_executable(self):
         executable = pyutilib.services.registered_executable("cbc")
@@ -287,8 +404,11 @@ class CBCSHELL(SystemCallSolver):
             cmd.extend(["-printingOptions", "all",
                         "-import", problem_files[0],
                         "-import",
-                        "-stat=1",
-                        "-solve", 
+                        "-stat=1"])
+            if self._warm_start_solve and \
+               (self._warm_start_file_name is not None):
+                cmd.extend(["-mipstart", self._warm_start_file_name])
+            cmd.extend(["-solve", 
                         "-solu", self._soln_file])
             cmd.extend(action_options)
         return pyutilib.misc.Bunch(cmd=cmd, log_file=self._log_file, env=None)
@@ -570,6 +690,18 @@ class CBCSHELL(SystemCallSolver):
             else:
                 soln_constraints['r_l_'+key] = {"Dual" : ud}        # Use the same key
 
+    def _postsolve(self):
+
+        # let the base class deal with returning results.
+        results = SystemCallSolver._postsolve(self)
+
+        # finally, clean any temporary files registered with the temp file
+        # manager, created populated *directly* by this plugin (e.g., the
+        # warm-start file).
+        pyutilib.services.TempfileManager.pop(remove=not self._keepfiles)
+
+        return results
+
 
 class MockCBC(CBCSHELL,MockMIP):
     """A Mock CBC solver used for testing
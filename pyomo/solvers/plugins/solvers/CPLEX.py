@@ -12,6 +12,7 @@ import os
 import re
 import time
 import logging
+from xml.sax.saxutils import unescape
 
 import pyutilib.services
 import pyutilib.common
@@ -23,17 +24,41 @@ from pyomo.opt.base.solvers import _extract_version
 from pyomo.opt.results import *
 from pyomo.opt.solver import *
 from pyomo.solvers.mockmip import MockMIP
+from pyomo.solvers.plugins.solvers.warmstart import write_warm_start
 
 logger = logging.getLogger('pyomo.solvers')
 
 from six import iteritems
-from six.moves import xrange
 
 try:
     unicode
 except:
     basestring = unicode = str
 
+#
+# The variable and constraint elements of a CPLEX solution file
+#
+_variable_re = re.compile(
+    r'\s*<variable name="([^"]*)" index="[^"]*"'
+    r'(?: status="([^"]*)")? value="([^"]*)"'
+    r'(?: reducedCost="([^"]*)")?\s*/>')
+_constraint_re = re.compile(
+    r'\s*<constraint name="([^"]*)" index="[^"]*"'
+    r'(?: status="[^"]*")? slack="([^"]*)"'
+    r'(?: dual="([^"]*)")?\s*/>')
+_attribute_re = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+_entities = {'&quot;': '"', '&apos;': "'"}
+
+def _unescape(value):
+    return unescape(value, _entities)
+
+def _attributes(element):
+    """
+    Return a dictionary with the attributes of an XML element
+    """
+    return dict((key, _unescape(val))
+                for key, val in _attribute_re.findall(element))
+
 class CPLEX(OptSolver):
     """The CPLEX LP/MIP solver
     """
@@ -61,6 +86,12 @@ class CPLEX(OptSolver):
                 logging.getLogger('pyomo.solvers').error('Python API for CPLEX is not installed')
                 return
             return opt
+        if mode == 'persistent':
+            opt = SolverFactory('_cplex_persistent', **kwds)
+            if opt is None:
+                logging.getLogger('pyomo.solvers').error('Python API for CPLEX is not installed')
+                return
+            return opt
         #
         if mode == 'os':
             opt = SolverFactory('_ossolver', **kwds)
@@ -92,6 +123,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         self._warm_start_solve = False
         # related to the above, the temporary name of the MST warm-start file (if any).
         self._warm_start_file_name = None
+        self._warm_start_skip_zeros = False
 
         #
         # Define valid problem formats and associated results formats
@@ -100,6 +132,9 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         self._valid_result_formats={}
         self._valid_result_formats[ProblemFormat.cpxlp] = [ResultsFormat.soln]
         self._valid_result_formats[ProblemFormat.mps] = [ResultsFormat.soln]
+        # gzip-compressed LP and MPS files are read directly
+        self._compressed_problem_formats[ProblemFormat.cpxlp] = ('gzip',)
+        self._compressed_problem_formats[ProblemFormat.mps] = ('gzip',)
         self.set_problem_format(ProblemFormat.cpxlp)
 
         # Note: Undefined capabilities default to 'None'
@@ -125,38 +160,10 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
     #
     def _warm_start(self, instance):
 
-        from pyomo.core.base import Var
-
-        # in principle, one could use a Python XML writer library like
-        # xml.dom.minidom.  it works, but it is slow. hence, the
-        # explicit direct-write of XML below.
-
-        mst_file = open(self._warm_start_file_name, "w")
-
-        mst_file.write("<?xml version=\"1.0\" ?>\n")
-        mst_file.write("<CPLEXSolution version=\"1.0\">\n")
-        mst_file.write("<header/>\n")
-        mst_file.write("<quality/>\n")
-        mst_file.write("<variables>\n")
-
-        # for each variable in the symbol_map, add a child to the
-        # variables element.  Both continuous and discrete are accepted
-        # (and required, depending on other options), according to the
-        # CPLEX manual.
-        # **Note**: This assumes that the symbol_map is "clean", i.e.,
-        # contains only references to the variables encountered in constraints
-        output_index = 0
-        smap = instance.solutions.symbol_map[self._smap_id]
-        byObject = smap.byObject
-        for var in instance.component_data_objects(Var, active=True):
-            if (var.value is not None) and (id(var) in byObject):
-                name = byObject[id(var)]
-                mst_file.write("<variable index=\"%d\" name=\"%s\" value=\"%f\" />\n" % (output_index, name, var.value))
-                output_index = output_index + 1
-
-        mst_file.write("</variables>\n")
-        mst_file.write("</CPLEXSolution>\n")
-        mst_file.close()
+        write_warm_start(self._warm_start_file_name,
+                         instance.solutions.symbol_map[self._smap_id],
+                         'cplex',
+                         skip_zeros=self._warm_start_skip_zeros)
 
     # over-ride presolve to extract the warm-start keyword, if specified.
     def _presolve(self, *args, **kwds):
@@ -170,6 +177,7 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         # to a file.
         self._warm_start_solve = kwds.pop('warmstart', False)
         self._warm_start_file_name = kwds.pop('warmstart_file', None)
+        self._warm_start_skip_zeros = kwds.pop('warmstart_skip_zeros', False)
         user_warmstart = False
         if self._warm_start_file_name is not None:
             user_warmstart = True
@@ -440,6 +448,85 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
             pass
         return results
 
+    def _process_soln_header(self, results, soln, header):
+        """
+        Process the attributes of the header element of a CPLEX
+        solution file
+        """
+        time_limit_exceeded = False
+        mip_problem=False
+        if "problemName" in header:
+            filename = header["problemName"].strip()
+            results.problem.name = os.path.basename(filename)
+            if '.' in results.problem.name:
+                results.problem.name = results.problem.name.split('.')[0]
+            tINPUT=open(filename,"r")
+            for tline in tINPUT:
+                tline = tline.strip()
+                if tline == "":
+                    continue
+                tokens = re.split('[\t ]+',tline)
+                if tokens[0][0] in ['\\', '*']:
+                    continue
+                elif tokens[0] == "NAME":
+                    results.problem.name = tokens[1]
+                else:
+                    sense = tokens[0].lower()
+                    if sense in ['max','maximize']:
+                        results.problem.sense = ProblemSense.maximize
+                    if sense in ['min','minimize']:
+                        results.problem.sense = ProblemSense.minimize
+                break
+            tINPUT.close()
+
+        if "objectiveValue" in header:
+            soln.objective['__default_objective__']['Value'] = float(header["objectiveValue"])
+        if "solutionStatusValue" in header:
+            solution_status = int(header["solutionStatusValue"])
+            # solution status = 1 => optimal
+            # solution status = 3 => infeasible
+            if soln.status == SolutionStatus.unknown:
+                if solution_status == 1:
+                    soln.status = SolutionStatus.optimal
+                elif solution_status == 3:
+                    soln.status = SolutionStatus.infeasible
+                    soln.gap = None
+                else:
+                    # we are flagging anything with a solution status >= 4 as an error, to possibly
+                    # be over-ridden as we learn more about the status (e.g., due to time limit exceeded).
+                    soln.status = SolutionStatus.error
+                    soln.gap = None
+        if "solutionStatusString" in header:
+            solution_status = header["solutionStatusString"].strip()
+            if solution_status in ["optimal", "integer optimal solution", "integer optimal, tolerance"]:
+                soln.status = SolutionStatus.optimal
+                soln.gap = 0.0
+                results.problem.lower_bound = soln.objective['__default_objective__']['Value']
+                results.problem.upper_bound = soln.objective['__default_objective__']['Value']
+                if "integer" in solution_status:
+                    mip_problem=True
+            elif solution_status in ["infeasible"]:
+                soln.status = SolutionStatus.infeasible
+                soln.gap = None
+            elif solution_status in ["time limit exceeded"]:
+                # we need to know if the solution is primal feasible, and if it is, set the solution status accordingly.
+                # for now, just set the flag so we can trigger the logic when we see the primalFeasible keyword.
+                time_limit_exceeded = True
+        if ("MIPNodes" in header) and mip_problem:
+            n = int(header["MIPNodes"])
+            results.solver.statistics.branch_and_bound.number_of_created_subproblems=n
+            results.solver.statistics.branch_and_bound.number_of_bounded_subproblems=n
+        if ("primalFeasible" in header) and (time_limit_exceeded is True):
+            primal_feasible = int(header["primalFeasible"])
+            if primal_feasible == 1:
+                soln.status = SolutionStatus.feasible
+                if (results.problem.sense == ProblemSense.minimize):
+                    results.problem.upper_bound = soln.objective['__default_objective__']['Value']
+                else:
+                    results.problem.lower_bound = soln.objective['__default_objective__']['Value']
+            else:
+                soln.status = SolutionStatus.infeasible
+
     def process_soln_file(self,results):
 
         # the only suffixes that we extract from CPLEX are
@@ -491,64 +578,52 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
         soln_variables = soln.variable
         soln_constraints = soln.constraint
 
-        INPUT = open(self._soln_file, "r")
         results.problem.number_of_objectives=1
-        time_limit_exceeded = False
-        mip_problem=False
+        #
+        # The solution file is streamed one element at a time.  CPLEX
+        # writes each variable and constraint element on a line, with
+        # a fixed order of attributes, so these lines are matched with
+        # a single regular expression (other lines fall back to a
+        # generic attribute parser).  Only the attributes of the
+        # requested suffixes are converted.
+        #
+        variable_match = _variable_re.match
+        constraint_match = _constraint_re.match
+        header = None
+        INPUT = open(self._soln_file, "r")
         for line in INPUT:
-            line = line.strip()
-            line = line.lstrip('<?/')
-            line = line.rstrip('/>?')
-            tokens=line.split(' ')
-
-            if tokens[0] == "variable":
-                variable_name = None
-                variable_value = None
-                variable_reduced_cost = None
-                variable_status = None
-                for i in xrange(1,len(tokens)):
-                    field_name =  tokens[i].split('=')[0]
-                    field_value = tokens[i].split('=')[1].lstrip("\"").rstrip("\"")
-                    if field_name == "name":
-                        variable_name = field_value
-                    elif field_name == "value":
-                        variable_value = field_value
-                    elif (extract_reduced_costs is True) and (field_name == "reducedCost"):
-                        variable_reduced_cost = field_value
-                    elif (extract_reduced_costs is True) and (field_name == "status"):
-                        variable_status = field_value
-
-                # skip the "constant-one" variable, used to capture/retain objective offsets in the CPLEX LP format.
-                if variable_name != "ONE_VAR_CONSTANT":
-                    variable = soln_variables[variable_name] = {"Value" : float(variable_value)}
-                    if (variable_reduced_cost is not None) and (extract_reduced_costs is True):
-                        try:
-                            if extract_rc is True:
-                                variable["Rc"] = float(variable_reduced_cost)
-                            if variable_status is not None:
-                                if extract_lrc is True:
-                                    if variable_status == "LL":
-                                        variable["Lrc"] = float(variable_reduced_cost)
-                                    else:
-                                        variable["Lrc"] = 0.0
-                                if extract_urc is True:
-                                    if variable_status == "UL":
-                                        variable["Urc"] = float(variable_reduced_cost)
-                                    else:
-                                        variable["Urc"] = 0.0
-                        except:
-                            raise ValueError("Unexpected reduced-cost value="+str(variable_reduced_cost)+" encountered for variable="+variable_name)
-            elif (tokens[0] == "constraint") and ((extract_duals is True) or (extract_slacks is True)):
-                is_range = False
-                rlabel = None
-                rkey = None
-                for i in xrange(1,len(tokens)):
-                    field_name =  tokens[i].split('=')[0]
-                    field_value = tokens[i].split('=')[1].lstrip("\"").rstrip("\"")
-                    if field_name == "name":
-                        if field_value.startswith('c_'):
-                            constraint = soln_constraints[field_value] = {}
-                        elif field_value.startswith('r_l_'):
+            m = variable_match(line)
+            if m is not None:
+                (variable_name,
+                 variable_status,
+                 variable_value,
+                 variable_reduced_cost) = m.groups()
+                if '&' in variable_name:
+                    variable_name = _unescape(variable_name)
+            elif line.lstrip().startswith('<variable '):
+                attrib = _attributes(line)
+                variable_name = attrib.get('name')
+                variable_status = attrib.get('status')
+                variable_value = attrib.get('value')
+                variable_reduced_cost = attrib.get('reducedCost')
+            else:
+                if (extract_duals is True) or (extract_slacks is True):
+                    is_constraint = True
+                    m = constraint_match(line)
+                    if m is not None:
+                        field_value, slack, dual = m.groups()
+                        if '&' in field_value:
+                            field_value = _unescape(field_value)
+                    elif line.lstrip().startswith('<constraint '):
+                        attrib = _attributes(line)
+                        field_value = attrib.get('name', '')
+                        slack = attrib.get('slack')
+                        dual = attrib.get('dual')
+                    else:
+                        is_constraint = False
+                    if is_constraint:
+                        is_range = False
+                        if field_value.startswith('r_l_'):
                             is_range = True
                             rlabel = field_value[4:]
                             rkey = 0
@@ -556,91 +631,55 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
                             is_range = True
                             rlabel = field_value[4:]
                             rkey = 1
-                    elif (extract_duals is True) and (field_name == "dual"): # for LPs
-                        if is_range is False:
-                            constraint["Dual"] = float(field_value)
                         else:
-                            range_duals.setdefault(rlabel,[0,0])[rkey] = float(field_value)
-                    elif (extract_slacks is True) and (field_name == "slack"): # for MIPs
-                        if is_range is False:
-                            constraint["Slack"] = float(field_value)
-                        else:
-                            range_slacks.setdefault(rlabel,[0,0])[rkey] = float(field_value)
-            elif tokens[0].startswith("problemName"):
-                filename = (tokens[0].split('=')[1].strip()).lstrip("\"").rstrip("\"")
-                results.problem.name = os.path.basename(filename)
-                if '.' in results.problem.name:
-                    results.problem.name = results.problem.name.split('.')[0]
-                tINPUT=open(filename,"r")
-                for tline in tINPUT:
-                    tline = tline.strip()
-                    if tline == "":
-                        continue
-                    tokens = re.split('[\t ]+',tline)
-                    if tokens[0][0] in ['\\', '*']:
+                            constraint = soln_constraints[field_value] = {}
+                        if (extract_duals is True) and (dual is not None): # for LPs
+                            if is_range is False:
+                                constraint["Dual"] = float(dual)
+                            else:
+                                range_duals.setdefault(rlabel,[0,0])[rkey] = float(dual)
+                        if (extract_slacks is True) and (slack is not None): # for MIPs
+                            if is_range is False:
+                                constraint["Slack"] = float(slack)
+                            else:
+                                range_slacks.setdefault(rlabel,[0,0])[rkey] = float(slack)
                         continue
-                    elif tokens[0] == "NAME":
-                        results.problem.name = tokens[1]
-                    else:
-                        sense = tokens[0].lower()
-                        if sense in ['max','maximize']:
-                            results.problem.sense = ProblemSense.maximize
-                        if sense in ['min','minimize']:
-                            results.problem.sense = ProblemSense.minimize
-                    break
-                tINPUT.close()
-
-            elif tokens[0].startswith("objectiveValue"):
-                objective_value = (tokens[0].split('=')[1].strip()).lstrip("\"").rstrip("\"")
-                soln.objective['__default_objective__']['Value'] = float(objective_value)
-            elif tokens[0].startswith("solutionStatusValue"):
-               pieces = tokens[0].split("=")
-               solution_status = eval(pieces[1])
-               # solution status = 1 => optimal
-               # solution status = 3 => infeasible
-               if soln.status == SolutionStatus.unknown:
-                  if solution_status == 1:
-                    soln.status = SolutionStatus.optimal
-                  elif solution_status == 3:
-                    soln.status = SolutionStatus.infeasible
-                    soln.gap = None
-                  else:
-                      # we are flagging anything with a solution status >= 4 as an error, to possibly
-                      # be over-ridden as we learn more about the status (e.g., due to time limit exceeded).
-                      soln.status = SolutionStatus.error
-                      soln.gap = None
-            elif tokens[0].startswith("solutionStatusString"):
-                solution_status = ((" ".join(tokens).split('=')[1]).strip()).lstrip("\"").rstrip("\"")
-                if solution_status in ["optimal", "integer optimal solution", "integer optimal, tolerance"]:
-                    soln.status = SolutionStatus.optimal
-                    soln.gap = 0.0
-                    results.problem.lower_bound = soln.objective['__default_objective__']['Value']
-                    results.problem.upper_bound = soln.objective['__default_objective__']['Value']
-                    if "integer" in solution_status:
-                        mip_problem=True
-                elif solution_status in ["infeasible"]:
-                    soln.status = SolutionStatus.infeasible
-                    soln.gap = None
-                elif solution_status in ["time limit exceeded"]:
-                    # we need to know if the solution is primal feasible, and if it is, set the solution status accordingly.
-                    # for now, just set the flag so we can trigger the logic when we see the primalFeasible keyword.
-                    time_limit_exceeded = True
-            elif tokens[0].startswith("MIPNodes"):
-                if mip_problem:
-                    n = eval(eval((" ".join(tokens).split('=')[1]).strip()).lstrip("\"").rstrip("\""))
-                    results.solver.statistics.branch_and_bound.number_of_created_subproblems=n
-                    results.solver.statistics.branch_and_bound.number_of_bounded_subproblems=n
-            elif tokens[0].startswith("primalFeasible") and (time_limit_exceeded is True):
-                primal_feasible = int(((" ".join(tokens).split('=')[1]).strip()).lstrip("\"").rstrip("\""))
-                if primal_feasible == 1:
-                    soln.status = SolutionStatus.feasible
-                    if (results.problem.sense == ProblemSense.minimize):
-                        results.problem.upper_bound = soln.objective['__default_objective__']['Value']
-                    else:
-                        results.problem.lower_bound = soln.objective['__default_objective__']['Value']
+                #
+                # The header element spans several lines
+                #
+                if header is None:
+                    if line.lstrip().startswith('<header'):
+                        header = line
                 else:
-                    soln.status = SolutionStatus.infeasible
+                    header += line
+                if (header is not None) and ('>' in line):
+                    self._process_soln_header(results,
+                                              soln,
+                                              _attributes(header))
+                    header = None
+                continue
 
+            # skip the "constant-one" variable, used to capture/retain objective offsets in the CPLEX LP format.
+            if variable_name != "ONE_VAR_CONSTANT":
+                variable = soln_variables[variable_name] = {"Value" : float(variable_value)}
+                if (variable_reduced_cost is not None) and (extract_reduced_costs is True):
+                    try:
+                        if extract_rc is True:
+                            variable["Rc"] = float(variable_reduced_cost)
+                        if variable_status is not None:
+                            if extract_lrc is True:
+                                if variable_status == "LL":
+                                    variable["Lrc"] = float(variable_reduced_cost)
+                                else:
+                                    variable["Lrc"] = 0.0
+                            if extract_urc is True:
+                                if variable_status == "UL":
+                                    variable["Urc"] = float(variable_reduced_cost)
+                                else:
+                                    variable["Urc"] = 0.0
+                    except:
+                        raise ValueError("Unexpected reduced-cost value="+str(variable_reduced_cost)+" encountered for variable="+variable_name)
+        INPUT.close()
 
         if self._best_bound is not None:
             if results.problem.sense == ProblemSense.minimize:
@@ -680,8 +719,6 @@ class CPLEXSHELL(ILMLicensedSystemCallSolver):
                   (soln.status is not SolutionStatus.infeasible):
                 results.solution.insert(soln)
 
-        INPUT.close()
-
     def _postsolve(self):
 
         # take care of the annoying (and empty) CPLEX temporary files in the current directory.
@@ -854,23 +854,9 @@ class CPLEXDirect(OptSolver):
         # TBD-document.
         self._populate_cplex_instance(model)
 
-        # Clean up the symbol map to only contain variables referenced
-        # in the constraints **NOTE**: The warmstart method (if called
-        # below), relies on a "clean" symbol map
-        vars_to_delete = set(self._variable_symbol_map.byObject.keys()) - \
-                         self._referenced_variable_ids
-        sm_byObject = model.solutions.symbol_map[self._smap_id].byObject
-        sm_bySymbol = model.solutions.symbol_map[self._smap_id].bySymbol
-        #sm_bySymbol = self._symbol_map.bySymbol
-        assert(len(model.solutions.symbol_map[self._smap_id].aliases) == 0)
-        var_sm_byObject = self._variable_symbol_map.byObject
-        var_sm_bySymbol = self._variable_symbol_map.bySymbol
-        for varid in vars_to_delete:
-            symbol = var_sm_byObject[varid]
-            del sm_byObject[varid]
-            del sm_bySymbol[symbol]
-            del var_sm_byObject[varid]
-            del var_sm_bySymbol[symbol]
+        # **NOTE**: The warmstart method (if called below), relies on
+        # a "clean" symbol map
+        self._remove_unreferenced_variables(model)
 
         if 'write' in self.options:
             fname = self.options.write
@@ -910,6 +896,26 @@ class CPLEXDirect(OptSolver):
     #
     # TBD
     #
+    def _remove_unreferenced_variables(self, model):
+        """
+        Clean up the symbol map to only contain variables referenced
+        in the constraints
+        """
+        vars_to_delete = set(self._variable_symbol_map.byObject.keys()) - \
+                         self._referenced_variable_ids
+        sm_byObject = model.solutions.symbol_map[self._smap_id].byObject
+        sm_bySymbol = model.solutions.symbol_map[self._smap_id].bySymbol
+        #sm_bySymbol = self._symbol_map.bySymbol
+        assert(len(model.solutions.symbol_map[self._smap_id].aliases) == 0)
+        var_sm_byObject = self._variable_symbol_map.byObject
+        var_sm_bySymbol = self._variable_symbol_map.bySymbol
+        for varid in vars_to_delete:
+            symbol = var_sm_byObject[varid]
+            del sm_byObject[varid]
+            del sm_bySymbol[symbol]
+            del var_sm_byObject[varid]
+            del var_sm_bySymbol[symbol]
+
     def _apply_solver(self):
 
         # set up all user-specified parameters.
@@ -84,6 +84,11 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
         # maps pyomo var data labels to the corresponding CPLEX variable id.
         self._cplex_variable_ids = {}
         self._cplex_variable_names = None
+        # the labels of the quadratic constraints in the compiled model.
+        self._cplex_quadratic_constraint_names = set()
+        # the CPLEX variable ids are shifted when variables are removed,
+        # and they are recomputed by the _update method.
+        self._cplex_variable_ids_stale = False
 
     #
     # updates all variable bounds in the compiled model - handles
@@ -111,26 +116,10 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
         # operates through side effects on the above lists!
         def update_bounds_lists(var_name):
 
-            var_lb = None
-            var_ub = None
-
-            if var_data.fixed and self._output_fixed_variable_bounds:
-                var_lb = var_ub = var_data.value
-            elif var_data.fixed:
-                # if we've been directed to not deal with fixed
-                # variables, then skip - they should have been
-                # compiled out of any description of the constraints
+            bounds = self._cplex_variable_bounds(var_data)
+            if bounds is None:
                 return
-            else:
-                if var_data.lb is None:
-                    var_lb = -cplex.infinity
-                else:
-                    var_lb = value(var_data.lb)
-
-                if var_data.ub is None:
-                    var_ub = cplex.infinity
-                else:
-                    var_ub= value(var_data.ub)
+            var_lb, var_ub = bounds
 
             var_cplex_id = self._cplex_variable_ids[var_name]
 
@@ -152,6 +141,135 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
         self._active_cplex_instance.variables.set_lower_bounds(new_lower_bounds)
         self._active_cplex_instance.variables.set_upper_bounds(new_upper_bounds)
 
+    #
+    # the bounds of a variable in the compiled model, or None if the
+    # variable is fixed and we've been directed to not deal with
+    # fixed variables.
+    #
+    def _cplex_variable_bounds(self, var_data):
+
+        if var_data.fixed and self._output_fixed_variable_bounds:
+            return var_data.value, var_data.value
+        elif var_data.fixed:
+            # if we've been directed to not deal with fixed
+            # variables, then skip - they should have been
+            # compiled out of any description of the constraints
+            return None
+
+        if var_data.lb is None:
+            var_lb = -cplex.infinity
+        else:
+            var_lb = value(var_data.lb)
+
+        if var_data.ub is None:
+            var_ub = cplex.infinity
+        else:
+            var_ub= value(var_data.ub)
+
+        return var_lb, var_ub
+
+    #
+    # the CPLEX type of a variable.
+    #
+    def _cplex_variable_type(self, var_data):
+
+        variable_types = self._active_cplex_instance.variables.type
+        if var_data.is_integer():
+            return variable_types.integer
+        elif var_data.is_binary():
+            return variable_types.binary
+        elif var_data.is_continuous():
+            return variable_types.continuous
+        raise TypeError("Invalid domain type for variable with name '%s'. "
+                        "Variable is not continuous, integer, or binary."
+                        % (var_data.name,))
+
+    #
+    # the sense, right-hand-side and range value of a constraint in
+    # the compiled model, given the constant term of its body.
+    #
+    def _cplex_constraint_bounds(self, con, offset):
+
+        if con.equality:
+            # equality constraint.
+            return 'E', self._get_bound(con.lower) - offset, 0.0
+
+        elif (con.lower is not None) and (con.upper is not None):
+            # ranged constraint.
+            lower_bound = self._get_bound(con.lower) - offset
+            upper_bound = self._get_bound(con.upper) - offset
+            return 'R', lower_bound, upper_bound - lower_bound
+
+        elif con.lower is not None:
+            return 'G', self._get_bound(con.lower) - offset, 0.0
+
+        else:
+            return 'L', self._get_bound(con.upper) - offset, 0.0
+
+    #
+    # encode a constraint of the compiled model. returns None if the
+    # constraint is trivial and we've been directed to skip trivial
+    # constraints, and otherwise a tuple with the constraint label,
+    # the linear and quadratic (None for linear constraints) parts of
+    # the constraint body, and the constraint bounds.
+    #
+    def _encode_cplex_constraint(self, con, con_repn, labeler):
+
+        from pyomo.repn import canonical_is_constant, LinearCanonicalRepn, canonical_degree
+
+        # There are conditions, e.g., when fixing variables, under which
+        # a constraint block might be empty.  Ignore these, for both
+        # practical reasons and the fact that the CPLEX LP format
+        # requires a variable in the constraint body.  It is also
+        # possible that the body of the constraint consists of only a
+        # constant, in which case the "variable" of
+        if isinstance(con_repn, LinearCanonicalRepn):
+            if (con_repn.linear is None) and \
+               self._skip_trivial_constraints:
+               return None
+        else:
+            # we shouldn't come across a constant canonical repn
+            # that is not LinearCanonicalRepn
+            assert not canonical_is_constant(con_repn)
+
+        name = self._symbol_map.getSymbol(con, labeler)
+        expr = None
+        qexpr = None
+        quadratic = False
+        if isinstance(con_repn, LinearCanonicalRepn):
+            expr, offset = \
+                self._encode_constraint_body_linear_specialized(con_repn,
+                                                                labeler,
+                                                                use_variable_names=False,
+                                                                cplex_variable_name_index_map=self._cplex_variable_ids)
+        else:
+            degree = canonical_degree(con_repn)
+            if degree == 2:
+                quadratic = True
+            elif (degree != 0) or (degree != 1):
+                raise ValueError(
+                    "CPLEXPersistent plugin does not support general nonlinear "
+                    "constraint expression (only linear or quadratic).\n"
+                    "Constraint: %s" % (con.name))
+            expr, offset = self._encode_constraint_body_linear(con_repn,
+                                                               labeler)
+
+        sense, rhs, range_value = self._cplex_constraint_bounds(con, offset)
+
+        if quadratic:
+            if expr is None:
+                expr = cplex.SparsePair(ind=[0],val=[0.0])
+            self._has_quadratic_constraints = True
+
+            qexpr = self._encode_constraint_body_quadratic(con_repn,labeler)
+
+            if sense == 'R':
+                raise RuntimeError(
+                    "The CPLEXDirect plugin can not translate range "
+                    "constraints containing quadratic expressions.")
+
+        return name, expr, qexpr, sense, rhs, range_value
+
     #
     # method to compile objective of the input pyomo instance.
     # TBD:
@@ -274,7 +392,7 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
                          skip_trivial_constraints=False):
 
         from pyomo.core.base import Var, Constraint, SOSConstraint
-        from pyomo.repn import canonical_is_constant, LinearCanonicalRepn, canonical_degree
+        from pyomo.repn import LinearCanonicalRepn
 
         self._symbolic_solver_labels = symbolic_solver_labels
         self._output_fixed_variable_bounds = output_fixed_variable_bounds
@@ -350,18 +468,14 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
             else:
                 var_ubs.append(value(var_data.ub))
 
-            if var_data.is_integer():
-                var_types.append(self._active_cplex_instance.variables.type.integer)
+            var_type = self._cplex_variable_type(var_data)
+            var_types.append(var_type)
+            if var_type == self._active_cplex_instance.variables.type.integer:
                 num_integer_variables += 1
-            elif var_data.is_binary():
-                var_types.append(self._active_cplex_instance.variables.type.binary)
+            elif var_type == self._active_cplex_instance.variables.type.binary:
                 num_binary_variables += 1
-            elif var_data.is_continuous():
-                var_types.append(self._active_cplex_instance.variables.type.continuous)
-                num_continuous_variables += 1
             else:
-                raise TypeError("Invalid domain type for variable with name '%s'. "
-                                "Variable is not continuous, integer, or binary.")
+                num_continuous_variables += 1
 
         self._active_cplex_instance.variables.add(names=var_names,
                                                   lb=var_lbs,
@@ -420,100 +534,26 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
                     else:
                         con_repn = block_canonical_repn[con]
 
-                # There are conditions, e.g., when fixing variables, under which
-                # a constraint block might be empty.  Ignore these, for both
-                # practical reasons and the fact that the CPLEX LP format
-                # requires a variable in the constraint body.  It is also
-                # possible that the body of the constraint consists of only a
-                # constant, in which case the "variable" of
-                if isinstance(con_repn, LinearCanonicalRepn):
-                    if (con_repn.linear is None) and \
-                       self._skip_trivial_constraints:
-                       continue
-                else:
-                    # we shouldn't come across a constant canonical repn
-                    # that is not LinearCanonicalRepn
-                    assert not canonical_is_constant(con_repn)
-
-                name = self._symbol_map.getSymbol(con, labeler)
-                expr = None
-                qexpr = None
-                quadratic = False
-                if isinstance(con_repn, LinearCanonicalRepn):
-                    expr, offset = \
-                        self._encode_constraint_body_linear_specialized(con_repn,
-                                                                        labeler,
-                                                                        use_variable_names=False,
-                                                                        cplex_variable_name_index_map=self._cplex_variable_ids)
-                else:
-                    degree = canonical_degree(con_repn)
-                    if degree == 2:
-                        quadratic = True
-                    elif (degree != 0) or (degree != 1):
-                        raise ValueError(
-                            "CPLEXPersistent plugin does not support general nonlinear "
-                            "constraint expression (only linear or quadratic).\n"
-                            "Constraint: %s" % (con.name))
-                    expr, offset = self._encode_constraint_body_linear(con_repn,
-                                                                       labeler)
-
-                if quadratic:
-                    if expr is None:
-                        expr = cplex.SparsePair(ind=[0],val=[0.0])
-                    self._has_quadratic_constraints = True
-
-                    qexpr = self._encode_constraint_body_quadratic(con_repn,labeler)
-                    qnames.append(name)
-
-                    if con.equality:
-                        # equality constraint.
-                        qsenses.append('E')
-                        qrhss.append(self._get_bound(con.lower) - offset)
-
-                    elif (con.lower is not None) and (con.upper is not None):
-                        raise RuntimeError(
-                            "The CPLEXDirect plugin can not translate range "
-                            "constraints containing quadratic expressions.")
-
-                    elif con.lower is not None:
-                        assert con.upper is None
-                        qsenses.append('G')
-                        qrhss.append(self._get_bound(con.lower) - offset)
-
-                    else:
-                        qsenses.append('L')
-                        qrhss.append(self._get_bound(con.upper) - offset)
+                encoded_con = self._encode_cplex_constraint(con,
+                                                            con_repn,
+                                                            labeler)
+                if encoded_con is None:
+                    continue
+                name, expr, qexpr, sense, rhs, range_value = encoded_con
 
+                if qexpr is not None:
+                    qnames.append(name)
+                    qsenses.append(sense)
+                    qrhss.append(rhs)
                     qlinears.append(expr)
                     qexpressions.append(qexpr)
 
                 else:
                     names.append(name)
                     expressions.append(expr)
-
-                    if con.equality:
-                        # equality constraint.
-                        senses.append('E')
-                        rhss.append(self._get_bound(con.lower) - offset)
-                        range_values.append(0.0)
-
-                    elif (con.lower is not None) and (con.upper is not None):
-                        # ranged constraint.
-                        senses.append('R')
-                        lower_bound = self._get_bound(con.lower) - offset
-                        upper_bound = self._get_bound(con.upper) - offset
-                        rhss.append(lower_bound)
-                        range_values.append(upper_bound - lower_bound)
-
-                    elif con.lower is not None:
-                        senses.append('G')
-                        rhss.append(self._get_bound(con.lower) - offset)
-                        range_values.append(0.0)
-
-                    else:
-                        senses.append('L')
-                        rhss.append(self._get_bound(con.upper) - offset)
-                        range_values.append(0.0)
+                    senses.append(sense)
+                    rhss.append(rhs)
+                    range_values.append(range_value)
 
         ###################################################
         # populate the SOS constraints in the cplex model #
@@ -563,6 +603,7 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
                 sense=qsenses[index],
                 rhs=qrhss[index],
                 name=qnames[index])
+        self._cplex_quadratic_constraint_names = set(qnames)
 
         #############################################
         # populate the objective in the cplex model #
@@ -621,6 +662,150 @@ class CPLEXPersistent(CPLEXDirect, PersistentSolver):
 
         return self._active_cplex_instance is not None
 
+    #
+    # The incremental updates of the compiled model (see the
+    # PersistentSolver class). The CPLEX variables and constraints
+    # are referenced by name, since their indices are shifted when
+    # variables or constraints are removed.
+    #
+
+    def _add_variable(self, vardata):
+
+        if vardata.fixed and not self._output_fixed_variable_bounds:
+            # fixed variables are compiled out of the constraints
+            return
+
+        var_lb, var_ub = self._cplex_variable_bounds(vardata)
+        var_name = self._symbol_map.createSymbol(vardata, self._labeler)
+        self._variable_symbol_map.addSymbol(vardata, var_name)
+
+        variables = self._active_cplex_instance.variables
+        self._cplex_variable_ids[var_name] = variables.get_num()
+        variables.add(names=[var_name],
+                      lb=[var_lb],
+                      ub=[var_ub],
+                      types=[self._cplex_variable_type(vardata)])
+        self._cplex_variable_names.append(var_name)
+
+    def _remove_variable(self, vardata):
+
+        # the coefficients of the variable are removed by CPLEX
+        var_name = self._remove_symbol(vardata)
+        del self._variable_symbol_map.byObject[id(vardata)]
+        del self._variable_symbol_map.bySymbol[var_name]
+        self._referenced_variable_ids.discard(id(vardata))
+        self._active_cplex_instance.variables.delete(var_name)
+        self._cplex_variable_ids_stale = True
+
+    def _add_constraint(self, condata):
+
+        if (condata.lower is None) and (condata.upper is None):
+            return  # not binding at all, don't bother
+
+        block = condata.parent_block()
+        if not hasattr(block, '_canonical_repn'):
+            block._canonical_repn = ComponentMap()
+        if getattr(block, "_gen_con_canonical_repn", True):
+            con_repn = generate_canonical_repn(condata.body)
+            block._canonical_repn[condata] = con_repn
+        else:
+            con_repn = block._canonical_repn[condata]
+
+        encoded_con = self._encode_cplex_constraint(condata,
+                                                    con_repn,
+                                                    self._labeler)
+        if encoded_con is None:
+            return
+        name, expr, qexpr, sense, rhs, range_value = encoded_con
+
+        if qexpr is not None:
+            self._active_cplex_instance.quadratic_constraints.add(
+                lin_expr=expr,
+                quad_expr=qexpr,
+                sense=sense,
+                rhs=rhs,
+                name=name)
+            self._cplex_quadratic_constraint_names.add(name)
+        else:
+            self._active_cplex_instance.linear_constraints.add(
+                lin_expr=[expr],
+                senses=[sense],
+                rhs=[rhs],
+                range_values=[range_value],
+                names=[name])
+
+    def _remove_constraint(self, condata):
+
+        name = self._remove_symbol(condata)
+        if name in self._cplex_quadratic_constraint_names:
+            self._cplex_quadratic_constraint_names.remove(name)
+            self._active_cplex_instance.quadratic_constraints.delete(name)
+        else:
+            self._active_cplex_instance.linear_constraints.delete(name)
+
+    def _update_variable_bounds(self, vardata):
+
+        bounds = self._cplex_variable_bounds(vardata)
+        if bounds is None:
+            return
+        var_name = self._symbol_map.byObject[id(vardata)]
+        variables = self._active_cplex_instance.variables
+        variables.set_lower_bounds(var_name, bounds[0])
+        variables.set_upper_bounds(var_name, bounds[1])
+
+    def _update_constraint_rhs(self, condata):
+
+        from pyomo.repn import LinearCanonicalRepn
+
+        name = self._symbol_map.byObject[id(condata)]
+        if (name in self._cplex_quadratic_constraint_names) or \
+           ((condata.lower is None) and (condata.upper is None)):
+            # the bounds of quadratic constraints cannot be modified
+            self._remove_constraint(condata)
+            self._add_constraint(condata)
+            return
+
+        con_repn = condata.parent_block()._canonical_repn[condata]
+        offset = 0.0
+        if isinstance(con_repn, LinearCanonicalRepn):
+            if con_repn.constant is not None:
+                offset = con_repn.constant
+        elif 0 in con_repn:
+            offset = con_repn[0][None]
+
+        sense, rhs, range_value = self._cplex_constraint_bounds(condata,
+                                                                offset)
+        linear_constraints = self._active_cplex_instance.linear_constraints
+        linear_constraints.set_senses(name, sense)
+        linear_constraints.set_rhs(name, rhs)
+        linear_constraints.set_range_values(name, range_value)
+
+    def _set_objective_coefficient(self, vardata, coef):
+
+        var_name = self._symbol_map.byObject[id(vardata)]
+        self._referenced_variable_ids.add(id(vardata))
+        self._active_cplex_instance.objective.set_linear(var_name, coef)
+
+    def _update(self):
+
+        if self._cplex_variable_ids_stale:
+            self._cplex_variable_names = \
+                self._active_cplex_instance.variables.get_names()
+            self._cplex_variable_ids.clear()
+            self._cplex_variable_ids.update(
+                (var_name, i)
+                for i, var_name in enumerate(self._cplex_variable_names))
+            self._cplex_variable_ids_stale = False
+
+    #
+    # all variables are kept in the symbol maps (and the CPLEX
+    # model), since they can be referenced by constraints that are
+    # added later. the values of the unreferenced variables are
+    # removed from the solution by the _postsolve method.
+    #
+    def _remove_unreferenced_variables(self, model):
+        pass
+
     #
     # Override base class method to check for compiled instance
     #
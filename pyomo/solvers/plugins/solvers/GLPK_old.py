@@ -74,6 +74,12 @@ class GLPKSHELL_4_42(SystemCallSolver):
           ProblemFormat.cpxlp: ResultsFormat.soln,
           ProblemFormat.mps:   ResultsFormat.soln,
         }
+        # gzip-compressed LP and MPS files are read directly
+        self._compressed_problem_formats[ProblemFormat.cpxlp] = ('gzip',)
+        self._compressed_problem_formats[ProblemFormat.mps] = ('gzip',)
+        # LP and MPS files are read sequentially (and can be streamed)
+        self._pipe_problem_formats.update((ProblemFormat.cpxlp,
+                                           ProblemFormat.mps))
         self.set_problem_format(ProblemFormat.cpxlp)
 
         # Note: Undefined capabilities default to 'None'
@@ -428,6 +434,12 @@ class GLPKSHELL_old(SystemCallSolver):
             ProblemFormat.cpxlp: ResultsFormat.soln,
             ProblemFormat.mps: ResultsFormat.soln,
         }
+        # gzip-compressed LP and MPS files are read directly
+        self._compressed_problem_formats[ProblemFormat.cpxlp] = ('gzip',)
+        self._compressed_problem_formats[ProblemFormat.mps] = ('gzip',)
+        # LP and MPS files are read sequentially (and can be streamed)
+        self._pipe_problem_formats.update((ProblemFormat.cpxlp,
+                                           ProblemFormat.mps))
         self.set_problem_format(ProblemFormat.cpxlp)
 
         # Note: Undefined capabilities default to 'None'
@@ -22,6 +22,7 @@ from pyomo.opt.base import *
 from pyomo.opt.base.solvers import _extract_version
 from pyomo.opt.results import *
 from pyomo.opt.solver import *
+from pyomo.solvers.plugins.solvers.warmstart import write_warm_start
 
 logger = logging.getLogger('pyomo.solvers')
 
@@ -59,6 +60,12 @@ class GUROBI(OptSolver):
                 logger.error('Python API for GUROBI is not installed')
                 return
             return opt
+        if mode == 'persistent':
+            opt = SolverFactory('_gurobi_persistent', **kwds)
+            if opt is None:
+                logger.error('Python API for GUROBI is not installed')
+                return
+            return opt
         #
         if mode == 'os':
             opt = SolverFactory('_ossolver', **kwds)
@@ -90,6 +97,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         self._warm_start_solve = False
         # related to the above, the temporary name of the MST warm-start file (if any).
         self._warm_start_file_name = None
+        self._warm_start_skip_zeros = False
 
         #
         # Define valid problem formats and associated results formats
@@ -116,18 +124,23 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         given executable (default is 'gurobi_cl'). All
         output is hidden. If the test fails for any reason
         (including the executable being invalid), then this
-        function will return False.
+        function will return False. Valid licenses are
+        cached (in memory) for each executable.
         """
-        try:
-            rc = subprocess.call([executable, "--license"],
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-        except OSError:
-            rc = 1
-        if rc:
-            return False
-        else:
-            return True
+        def _check_license():
+            try:
+                rc = subprocess.call([executable, "--license"],
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT)
+            except OSError:
+                rc = 1
+            # (invalid licenses are not cached)
+            return None if rc else True
+        return bool(solver_capability_cache.probe(
+            pyutilib.misc.search_file(executable, executable=True),
+            'license',
+            _check_license,
+            persistent=False))
 
     def _default_results_format(self, prob_format):
         return ResultsFormat.soln
@@ -146,25 +159,10 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
     #
     def _warm_start(self, instance):
 
-        from pyomo.core.base import Var
-
-        mst_file = open(self._warm_start_file_name, 'w')
-
-        # for each variable in the symbol_map, add a child to the
-        # variables element.  Both continuous and discrete are accepted
-        # (and required, depending on other options), according to the
-        # CPLEX manual.
-        # **Note**: This assumes that the symbol_map is "clean", i.e.,
-        # contains only references to the variables encountered in constraints
-        output_index = 0
-        smap = instance.solutions.symbol_map[self._smap_id]
-        byObject = smap.byObject
-        for vdata in instance.component_data_objects(Var, active=True):
-            if (vdata.value is not None) and (id(vdata) in byObject):
-                name = byObject[id(vdata)]
-                mst_file.write("%s %s\n" % (name, str(vdata.value)))
-
-        mst_file.close()
+        write_warm_start(self._warm_start_file_name,
+                         instance.solutions.symbol_map[self._smap_id],
+                         'gurobi',
+                         skip_zeros=self._warm_start_skip_zeros)
 
     # over-ride presolve to extract the warm-start keyword, if specified.
     def _presolve(self, *args, **kwds):
@@ -178,6 +176,7 @@ class GUROBISHELL(ILMLicensedSystemCallSolver):
         # to a file.
         self._warm_start_solve = kwds.pop('warmstart', False)
         self._warm_start_file_name = kwds.pop('warmstart_file', None)
+        self._warm_start_skip_zeros = kwds.pop('warmstart_skip_zeros', False)
         user_warmstart = False
         if self._warm_start_file_name is not None:
             user_warmstart = True
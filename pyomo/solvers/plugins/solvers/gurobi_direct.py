@@ -9,7 +9,6 @@
 
 import logging
 import re
-import itertools
 import math
 import sys
 
@@ -142,7 +141,9 @@ class gurobi_direct ( OptSolver ):
         #
         # Call base class constructor
         #
-        kwds['type'] = 'gurobi_direct'
+        # This gets overridden by gurobi_persistent
+        if 'type' not in kwds:
+            kwds['type'] = 'gurobi_direct'
         OptSolver.__init__(self, **kwds)
 
         self._model = None
@@ -197,10 +198,190 @@ class gurobi_direct ( OptSolver ):
             return value(exp)
         raise ValueError("non-fixed bound: " + str(exp))
 
+    def _add_gurobi_variable(self, grbmodel, var_value, var_value_label):
+        """Add a variable to the Gurobi model"""
+
+        grb_infinity = GRB.INFINITY
+        lb = -grb_infinity
+        ub = grb_infinity
+
+        if (var_value.lb is not None) and (var_value.lb != -infinity):
+            lb = value(var_value.lb)
+        if (var_value.ub is not None) and (var_value.ub != infinity):
+            ub = value(var_value.ub)
+
+        # be sure to impart the integer and binary nature of any variables
+        if var_value.is_integer():
+            var_type = GRB.INTEGER
+        elif var_value.is_binary():
+            var_type = GRB.BINARY
+        elif var_value.is_continuous():
+            var_type = GRB.CONTINUOUS
+        else:
+            raise TypeError("Invalid domain type for variable with name '%s'. "
+                            "Variable is not continuous, integer, or binary.")
+
+        return grbmodel.addVar(lb=lb, \
+                               ub=ub, \
+                               vtype=var_type, \
+                               name=var_value_label)
+
+    def _encode_gurobi_expression(self, repn, component_data, kind):
+        """
+        Return the Gurobi expression for the canonical representation
+        of an objective or a constraint body, and a flag that indicates
+        whether the (linear) expression has no variables.
+        """
+
+        from pyomo.repn import LinearCanonicalRepn, canonical_degree
+
+        self_variable_symbol_map = self._variable_symbol_map
+        pyomo_gurobi_variable_map = self._pyomo_gurobi_variable_map
+
+        trivial = False
+        if isinstance(repn, LinearCanonicalRepn):
+
+            #
+            # optimization (these might be generated on the fly)
+            #
+            constant = repn.constant
+            coefficients = repn.linear
+            variables = repn.variables
+
+            offset = 0.0
+            if constant is not None:
+                offset = constant
+            expr = LinExpr() + offset
+
+            if coefficients is not None:
+
+                linear_coefs = list()
+                linear_vars = list()
+
+                for i in xrange(len(coefficients)):
+
+                    var_coefficient = coefficients[i]
+                    var_value = variables[i]
+                    self._referenced_variable_ids.add(id(var_value))
+                    label = self_variable_symbol_map.getSymbol(var_value)
+                    linear_coefs.append(var_coefficient)
+                    linear_vars.append(pyomo_gurobi_variable_map[label])
+
+                expr += LinExpr(linear_coefs, linear_vars)
+
+            else:
+
+                trivial = True
+
+        else:
+
+            offset = 0.0
+            if 0 in repn:
+                offset = repn[0][None]
+            expr = LinExpr() + offset
+
+            if 1 in repn: # first-order terms
+
+                linear_coefs = list()
+                linear_vars = list()
+
+                hash_to_variable_map = repn[-1]
+                for var_hash, var_coefficient in iteritems(repn[1]):
+                    var = hash_to_variable_map[var_hash]
+                    self._referenced_variable_ids.add(id(var))
+                    label = self_variable_symbol_map.getSymbol(var)
+                    linear_coefs.append( var_coefficient )
+                    linear_vars.append( pyomo_gurobi_variable_map[label] )
+
+                expr += LinExpr(linear_coefs, linear_vars)
+
+            if 2 in repn: # quadratic terms
+                if (kind == 'constraint') and (_GUROBI_VERSION_MAJOR < 5):
+                    raise ValueError(
+                        "The gurobi_direct plugin does not handle quadratic "
+                        "constraint expressions for Gurobi major versions "
+                        "< 5. Current version: Gurobi %s.%s%s"
+                        % (gurobi.version()))
+
+                expr = QuadExpr(expr)
+                hash_to_variable_map = repn[-1]
+                for quad_repn, coef in iteritems(repn[2]):
+                    gurobi_expr = QuadExpr(coef)
+                    for var_hash, exponent in iteritems(quad_repn):
+                        vardata = hash_to_variable_map[var_hash]
+                        self._referenced_variable_ids.add(id(vardata))
+                        gurobi_var = pyomo_gurobi_variable_map\
+                                     [self_variable_symbol_map.\
+                                      getSymbol(vardata)]
+                        gurobi_expr *= gurobi_var
+                        if exponent == 2:
+                            gurobi_expr *= gurobi_var
+                    expr += gurobi_expr
+
+            degree = canonical_degree(repn)
+            if (degree is None) or (degree > 2):
+                raise ValueError(
+                    "gurobi_direct plugin does not support general nonlinear "
+                    "%s expressions (only linear or quadratic).\n"
+                    "%s: %s" % (kind, kind.capitalize(), component_data.name))
+
+        return expr, trivial
+
+    def _add_gurobi_constraint(self,
+                               grbmodel,
+                               constraint_data,
+                               expr,
+                               constraint_label):
+        """
+        Add a constraint to the Gurobi model.  Returns the Gurobi
+        constraint (or None if the constraint has an infinite bound),
+        and a flag that indicates whether it is a range constraint
+        (for which Gurobi adds a variable).
+        """
+
+        if constraint_data.equality:
+            sense = GRB.EQUAL
+            bound = self._get_bound(constraint_data.lower)
+            return grbmodel.addConstr(lhs=expr,
+                                      sense=sense,
+                                      rhs=bound,
+                                      name=constraint_label), False
+        else:
+            # L <= body <= U
+            if (constraint_data.upper is not None) and \
+               (constraint_data.lower is not None):
+                grb_con = grbmodel.addRange(
+                    expr,
+                    self._get_bound(constraint_data.lower),
+                    self._get_bound(constraint_data.upper),
+                    constraint_label)
+                return grb_con, True
+            # body <= U
+            elif constraint_data.upper is not None:
+                bound = self._get_bound(constraint_data.upper)
+                if bound < float('inf'):
+                    return grbmodel.addConstr(
+                        lhs=expr,
+                        sense=GRB.LESS_EQUAL,
+                        rhs=bound,
+                        name=constraint_label
+                        ), False
+            # L <= body
+            else:
+                bound = self._get_bound(constraint_data.lower)
+                if bound > -float('inf'):
+                    return grbmodel.addConstr(
+                        lhs=expr,
+                        sense=GRB.GREATER_EQUAL,
+                        rhs=bound,
+                        name=constraint_label
+                        ), False
+        return None, False
+
     def _populate_gurobi_instance (self, pyomo_instance):
 
         from pyomo.core.base import Var, Objective, Constraint, SOSConstraint
-        from pyomo.repn import LinearCanonicalRepn, canonical_degree
+        from pyomo.repn import LinearCanonicalRepn
 
         try:
             grbmodel = Model(name=pyomo_instance.name)
@@ -211,9 +392,9 @@ class gurobi_direct ( OptSolver ):
             raise Exception(msg % e)
 
         if self._symbolic_solver_labels:
-            labeler = TextLabeler()
+            labeler = self._labeler = TextLabeler()
         else:
-            labeler = NumericLabeler('x')
+            labeler = self._labeler = NumericLabeler('x')
         # cache to avoid dictionary getitem calls in the loops below.
         self_symbol_map = self._symbol_map = SymbolMap()
         pyomo_instance.solutions.add_symbol_map(self_symbol_map)
@@ -227,44 +408,22 @@ class gurobi_direct ( OptSolver ):
         var_symbol_pairs = []
 
         # maps _VarData labels to the corresponding Gurobi variable object
-        pyomo_gurobi_variable_map = {}
+        pyomo_gurobi_variable_map = self._pyomo_gurobi_variable_map = {}
+        # maps _ConstraintData labels to the corresponding Gurobi
+        # constraint object
+        pyomo_gurobi_constraint_map = self._pyomo_gurobi_constraint_map = {}
 
         self._referenced_variable_ids.clear()
 
-        # cache to avoid dictionary getitem calls in the loop below.
-        grb_infinity = GRB.INFINITY
-
         for var_value in pyomo_instance.component_data_objects(Var, active=True):
 
-            lb = -grb_infinity
-            ub = grb_infinity
-
-            if (var_value.lb is not None) and (var_value.lb != -infinity):
-                lb = value(var_value.lb)
-            if (var_value.ub is not None) and (var_value.ub != infinity):
-                ub = value(var_value.ub)
-
             # _VarValue objects will not be in the symbol map yet, so
             # avoid some checks.
             var_value_label = self_symbol_map.createSymbol(var_value, labeler)
             var_symbol_pairs.append((var_value, var_value_label))
 
-            # be sure to impart the integer and binary nature of any variables
-            if var_value.is_integer():
-                var_type = GRB.INTEGER
-            elif var_value.is_binary():
-                var_type = GRB.BINARY
-            elif var_value.is_continuous():
-                var_type = GRB.CONTINUOUS
-            else:
-                raise TypeError("Invalid domain type for variable with name '%s'. "
-                                "Variable is not continuous, integer, or binary.")
-
             pyomo_gurobi_variable_map[var_value_label] = \
-                grbmodel.addVar(lb=lb, \
-                                ub=ub, \
-                                vtype=var_type, \
-                                name=var_value_label)
+                self._add_gurobi_variable(grbmodel, var_value, var_value_label)
 
         self_variable_symbol_map.addSymbols(var_symbol_pairs)
 
@@ -278,10 +437,10 @@ class gurobi_direct ( OptSolver ):
         sos2 = self._capabilities.sos2
         modelSOS = ModelSOS()
         objective_cntr = 0
-        # Track the range constraints and their associated variables added by gurobi
-        self._last_native_var_idx = grbmodel.NumVars-1
-        range_var_idx = grbmodel.NumVars
-        _self_range_con_var_pairs = self._range_con_var_pairs = []
+        # Track the range constraints (their associated variables,
+        # which are added by gurobi, are collected below)
+        num_native_vars = grbmodel.NumVars
+        range_cons = []
         for block in pyomo_instance.block_data_objects(active=True):
 
             gen_obj_canonical_repn = \
@@ -322,7 +481,6 @@ class gurobi_direct ( OptSolver ):
 
                 sense = GRB_MIN if (obj_data.is_minimizing()) else GRB_MAX
                 grbmodel.ModelSense = sense
-                obj_expr = LinExpr()
 
                 if gen_obj_canonical_repn:
                     obj_repn = generate_canonical_repn(obj_data.expr)
@@ -330,56 +488,9 @@ class gurobi_direct ( OptSolver ):
                 else:
                     obj_repn = block_canonical_repn[obj_data]
 
-                if isinstance(obj_repn, LinearCanonicalRepn):
-
-                    if obj_repn.constant != None:
-                        obj_expr.addConstant(obj_repn.constant)
-
-                    if obj_repn.linear != None:
-
-                        for i in xrange(len(obj_repn.linear)):
-                            var_coefficient = obj_repn.linear[i]
-                            var_value = obj_repn.variables[i]
-                            self._referenced_variable_ids.add(id(var_value))
-                            label = self_variable_symbol_map.getSymbol(var_value)
-                            obj_expr.addTerms(var_coefficient,
-                                              pyomo_gurobi_variable_map[label])
-                else:
-
-                    if 0 in obj_repn: # constant term
-                        obj_expr.addConstant(obj_repn[0][None])
-
-                    if 1 in obj_repn: # first-order terms
-                        hash_to_variable_map = obj_repn[-1]
-                        for var_hash, var_coefficient in iteritems(obj_repn[1]):
-                            vardata = hash_to_variable_map[var_hash]
-                            self._referenced_variable_ids.add(id(vardata))
-                            label = self_variable_symbol_map.getSymbol(vardata)
-                            obj_expr.addTerms(var_coefficient,
-                                              pyomo_gurobi_variable_map[label])
-
-                    if 2 in obj_repn:
-                        obj_expr = QuadExpr(obj_expr)
-                        hash_to_variable_map = obj_repn[-1]
-                        for quad_repn, coef in iteritems(obj_repn[2]):
-                            gurobi_expr = QuadExpr(coef)
-                            for var_hash, exponent in iteritems(quad_repn):
-                                vardata = hash_to_variable_map[var_hash]
-                                self._referenced_variable_ids.add(id(vardata))
-                                gurobi_var = pyomo_gurobi_variable_map\
-                                             [self_variable_symbol_map.\
-                                              getSymbol(vardata)]
-                                gurobi_expr *= gurobi_var
-                                if exponent == 2:
-                                    gurobi_expr *= gurobi_var
-                            obj_expr += gurobi_expr
-
-                    degree = canonical_degree(obj_repn)
-                    if (degree is None) or (degree > 2):
-                        raise ValueError(
-                            "gurobi_direct plugin does not support general nonlinear "
-                            "objective expressions (only linear or quadratic).\n"
-                            "Objective: %s" % (obj_data.name))
+                obj_expr, _ = self._encode_gurobi_expression(obj_repn,
+                                                             obj_data,
+                                                             'objective')
 
                 # need to cache the objective label, because the
                 # GUROBI python interface doesn't track this.
@@ -409,137 +520,25 @@ class gurobi_direct ( OptSolver ):
                     else:
                         con_repn = block_canonical_repn[constraint_data]
 
-                offset = 0.0
                 # _ConstraintData objects will not be in the symbol
                 # map yet, so avoid some checks.
                 constraint_label = \
                     self_symbol_map.createSymbol(constraint_data, labeler)
 
-                trivial = False
-                if isinstance(con_repn, LinearCanonicalRepn):
-
-                    #
-                    # optimization (these might be generated on the fly)
-                    #
-                    constant = con_repn.constant
-                    coefficients = con_repn.linear
-                    variables = con_repn.variables
-
-                    if constant is not None:
-                        offset = constant
-                    expr = LinExpr() + offset
-
-                    if coefficients is not None:
-
-                        linear_coefs = list()
-                        linear_vars = list()
-
-                        for i in xrange(len(coefficients)):
-
-                            var_coefficient = coefficients[i]
-                            var_value = variables[i]
-                            self._referenced_variable_ids.add(id(var_value))
-                            label = self_variable_symbol_map.getSymbol(var_value)
-                            linear_coefs.append(var_coefficient)
-                            linear_vars.append(pyomo_gurobi_variable_map[label])
-
-                        expr += LinExpr(linear_coefs, linear_vars)
-
-                    else:
-
-                        trivial = True
-
-                else:
-
-                    if 0 in con_repn:
-                        offset = con_repn[0][None]
-                    expr = LinExpr() + offset
-
-                    if 1 in con_repn: # first-order terms
-
-                        linear_coefs = list()
-                        linear_vars = list()
-
-                        hash_to_variable_map = con_repn[-1]
-                        for var_hash, var_coefficient in iteritems(con_repn[1]):
-                            var = hash_to_variable_map[var_hash]
-                            self._referenced_variable_ids.add(id(var))
-                            label = self_variable_symbol_map.getSymbol(var)
-                            linear_coefs.append( var_coefficient )
-                            linear_vars.append( pyomo_gurobi_variable_map[label] )
-
-                        expr += LinExpr(linear_coefs, linear_vars)
-
-                    if 2 in con_repn: # quadratic constraint
-                        if _GUROBI_VERSION_MAJOR < 5:
-                            raise ValueError(
-                                "The gurobi_direct plugin does not handle quadratic "
-                                "constraint expressions for Gurobi major versions "
-                                "< 5. Current version: Gurobi %s.%s%s"
-                                % (gurobi.version()))
-
-                        expr = QuadExpr(expr)
-                        hash_to_variable_map = con_repn[-1]
-                        for quad_repn, coef in iteritems(con_repn[2]):
-                            gurobi_expr = QuadExpr(coef)
-                            for var_hash, exponent in iteritems(quad_repn):
-                                vardata = hash_to_variable_map[var_hash]
-                                self._referenced_variable_ids.add(id(vardata))
-                                gurobi_var = pyomo_gurobi_variable_map\
-                                             [self_variable_symbol_map.\
-                                              getSymbol(vardata)]
-                                gurobi_expr *= gurobi_var
-                                if exponent == 2:
-                                    gurobi_expr *= gurobi_var
-                            expr += gurobi_expr
-
-                    degree = canonical_degree(con_repn)
-                    if (degree is None) or (degree > 2):
-                        raise ValueError(
-                            "gurobi_direct plugin does not support general nonlinear "
-                            "constraint expressions (only linear or quadratic).\n"
-                            "Constraint: %s" % (constraint_data.name))
+                expr, trivial = self._encode_gurobi_expression(con_repn,
+                                                               constraint_data,
+                                                               'constraint')
 
                 if (not trivial) or (not self._skip_trivial_constraints):
 
-                    if constraint_data.equality:
-                        sense = GRB.EQUAL
-                        bound = self._get_bound(constraint_data.lower)
-                        grbmodel.addConstr(lhs=expr,
-                                           sense=sense,
-                                           rhs=bound,
-                                           name=constraint_label)
-                    else:
-                        # L <= body <= U
-                        if (constraint_data.upper is not None) and \
-                           (constraint_data.lower is not None):
-                            grb_con = grbmodel.addRange(
-                                expr,
-                                self._get_bound(constraint_data.lower),
-                                self._get_bound(constraint_data.upper),
-                                constraint_label)
-                            _self_range_con_var_pairs.append((grb_con,range_var_idx))
-                            range_var_idx += 1
-                        # body <= U
-                        elif constraint_data.upper is not None:
-                            bound = self._get_bound(constraint_data.upper)
-                            if bound < float('inf'):
-                                grbmodel.addConstr(
-                                    lhs=expr,
-                                    sense=GRB.LESS_EQUAL,
-                                    rhs=bound,
-                                    name=constraint_label
-                                    )
-                        # L <= body
-                        else:
-                            bound = self._get_bound(constraint_data.lower)
-                            if bound > -float('inf'):
-                                grbmodel.addConstr(
-                                    lhs=expr,
-                                    sense=GRB.GREATER_EQUAL,
-                                    rhs=bound,
-                                    name=constraint_label
-                                    )
+                    grb_con, is_range = \
+                        self._add_gurobi_constraint(grbmodel,
+                                                    constraint_data,
+                                                    expr,
+                                                    constraint_label)
+                    pyomo_gurobi_constraint_map[constraint_label] = grb_con
+                    if is_range:
+                        range_cons.append(grb_con)
 
         if modelSOS.sosType:
             for key in modelSOS.sosType:
@@ -566,8 +565,12 @@ class gurobi_direct ( OptSolver ):
 
         grbmodel.update()
 
+        # the variables added by gurobi for the range constraints
+        # follow the variables of the model
+        self._range_con_var_pairs = \
+            list(zip(range_cons, grbmodel.getVars()[num_native_vars:]))
+
         self._gurobi_instance = grbmodel
-        self._pyomo_gurobi_variable_map = pyomo_gurobi_variable_map
 
     def warm_start_capable(self):
 
@@ -638,23 +641,9 @@ class gurobi_direct ( OptSolver ):
         self._populate_gurobi_instance(model)
         grbmodel = self._gurobi_instance
 
-        # Clean up the symbol map to only contain variables referenced
-        # in the constraints
         # **NOTE**: The warmstart method (if called below),
         #           relies on a "clean" symbol map
-        vars_to_delete = set(self._variable_symbol_map.byObject.keys()) - \
-                         self._referenced_variable_ids
-        sm_byObject = self._symbol_map.byObject
-        sm_bySymbol = self._symbol_map.bySymbol
-        assert(len(self._symbol_map.aliases) == 0)
-        var_sm_byObject = self._variable_symbol_map.byObject
-        var_sm_bySymbol = self._variable_symbol_map.bySymbol
-        for varid in vars_to_delete:
-            symbol = var_sm_byObject[varid]
-            del sm_byObject[varid]
-            del sm_bySymbol[symbol]
-            del var_sm_byObject[varid]
-            del var_sm_bySymbol[symbol]
+        self._remove_unreferenced_variables()
 
         if 'write' in self.options:
             fname = self.options.write
@@ -673,6 +662,25 @@ class gurobi_direct ( OptSolver ):
         # references to external model variables
         del self._variable_symbol_map
 
+    def _remove_unreferenced_variables(self):
+        """
+        Clean up the symbol map to only contain variables referenced
+        in the constraints
+        """
+        vars_to_delete = set(self._variable_symbol_map.byObject.keys()) - \
+                         self._referenced_variable_ids
+        sm_byObject = self._symbol_map.byObject
+        sm_bySymbol = self._symbol_map.bySymbol
+        assert(len(self._symbol_map.aliases) == 0)
+        var_sm_byObject = self._variable_symbol_map.byObject
+        var_sm_bySymbol = self._variable_symbol_map.bySymbol
+        for varid in vars_to_delete:
+            symbol = var_sm_byObject[varid]
+            del sm_byObject[varid]
+            del sm_bySymbol[symbol]
+            del var_sm_byObject[varid]
+            del var_sm_bySymbol[symbol]
+
 
     def _apply_solver(self):
         # TODO apply appropriate user-specified parameters
@@ -776,7 +784,6 @@ class gurobi_direct ( OptSolver ):
             extract_reduced_costs = False
             extract_duals = False
 
-        pvars = gprob.getVars()
         cons = gprob.getConstrs()
         qcons = []
         if _GUROBI_VERSION_MAJOR >= 5:
@@ -912,12 +919,13 @@ class gurobi_direct ( OptSolver ):
                 soln.gap = math.fabs(obj_val - obj_bound)
 
             # Those variables not added by gurobi due to range constraints
-            for var in itertools.islice(pvars, self._last_native_var_idx + 1):
-                soln_variables[ var.VarName ] = {"Value" : var.X}
+            pyomo_gurobi_variable_map = self._pyomo_gurobi_variable_map
+            for label, var in iteritems(pyomo_gurobi_variable_map):
+                soln_variables[ label ] = {"Value" : var.X}
 
             if extract_reduced_costs:
-                for var in itertools.islice(pvars, self._last_native_var_idx + 1):
-                    soln_variables[ var.VarName ]["Rc"] = var.Rc
+                for label, var in iteritems(pyomo_gurobi_variable_map):
+                    soln_variables[ label ]["Rc"] = var.Rc
 
             if extract_duals or extract_slacks:
                 for con in cons:
@@ -953,8 +961,7 @@ class gurobi_direct ( OptSolver ):
                 # with the other problem writers we return the slack
                 # value that is largest in magnitude (L-f(x) or
                 # U-f(x))
-                for con,var_idx in self._range_con_var_pairs:
-                    var = pvars[var_idx]
+                for con,var in self._range_con_var_pairs:
                     # U-f(x)
                     Us_ = var.X
                     # f(x)-L
@@ -977,7 +984,6 @@ class gurobi_direct ( OptSolver ):
 
         self.results = results
         # Done with the model object; free up some memory.
-        self._last_native_var_idx = -1
         self._range_con_var_pairs = []
 
         # finally, clean any temporary files registered with the temp file
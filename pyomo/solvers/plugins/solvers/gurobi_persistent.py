@@ -0,0 +1,315 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+from pyomo.util.plugin import alias
+from pyomo.opt.base import *
+from pyomo.core.base import ComponentMap, value
+from pyomo.repn import generate_canonical_repn
+from pyomo.solvers.plugins.solvers.gurobi_direct import (gurobi_direct,
+                                                         GRB_MIN,
+                                                         GRB_MAX,
+                                                         gurobi_python_api_exists)
+
+if gurobi_python_api_exists:
+    from gurobipy import GRB
+
+
+class gurobi_persistent(gurobi_direct, PersistentSolver):
+    """The Gurobi optimization solver (persistent API plugin)
+
+ The gurobi_persistent plugin keeps a Gurobi model across solves.  A
+ Pyomo model is compiled with the compile_instance() method, and the
+ changes to the Pyomo model are applied to the Gurobi model with the
+ incremental methods of the PersistentSolver class (e.g., add_constraint
+ or update_variable_bounds).  The model is not rebuilt when it is
+ solved.
+    """
+
+    alias('_gurobi_persistent',
+          doc='Persistent Python interface to the Gurobi optimization solver.')
+
+    def __init__(self, **kwds):
+        #
+        # Call base class constructor
+        #
+        kwds['type'] = 'gurobi_persistent'
+        gurobi_direct.__init__(self, **kwds)
+
+        self._instance = None
+        self._gurobi_instance = None
+
+    def compile_instance(self,
+                         pyomo_instance,
+                         symbolic_solver_labels=False,
+                         output_fixed_variable_bounds=False,
+                         skip_trivial_constraints=False):
+
+        self._symbolic_solver_labels = symbolic_solver_labels
+        self._output_fixed_variable_bounds = output_fixed_variable_bounds
+        self._skip_trivial_constraints = skip_trivial_constraints
+
+        self._instance = pyomo_instance
+        gurobi_direct._populate_gurobi_instance(self, pyomo_instance)
+
+    def instance_compiled(self):
+
+        return self._gurobi_instance is not None
+
+    def compile_objective(self, pyomo_instance):
+
+        from pyomo.core.base import Objective
+
+        self._check_compiled("compile objective")
+
+        objectives = list(pyomo_instance.component_data_objects(Objective,
+                                                                active=True))
+        if len(objectives) != 1:
+            raise ValueError(
+                "Solver '%s' requires a single active objective on Pyomo "
+                "instance '%s' - %s were found"
+                % (self.type, pyomo_instance.name, len(objectives)))
+        obj_data = objectives[0]
+
+        obj_repn = self._canonical_repn(obj_data, obj_data.expr, 'obj')
+        obj_expr, _ = self._encode_gurobi_expression(obj_repn,
+                                                     obj_data,
+                                                     'objective')
+
+        self._objective_label = \
+            self._symbol_map.getSymbol(obj_data, self._labeler)
+        sense = GRB_MIN if (obj_data.is_minimizing()) else GRB_MAX
+        self._gurobi_instance.setObjective(obj_expr, sense=sense)
+        self._update()
+
+    def _canonical_repn(self, component_data, expr, kind):
+        """
+        Generate (or get) the canonical representation of an objective
+        or a constraint body
+        """
+        block = component_data.parent_block()
+        if not hasattr(block, '_canonical_repn'):
+            block._canonical_repn = ComponentMap()
+        if getattr(block, "_gen_%s_canonical_repn" % (kind,), True):
+            repn = generate_canonical_repn(expr)
+            block._canonical_repn[component_data] = repn
+        else:
+            repn = block._canonical_repn[component_data]
+        return repn
+
+    #
+    # The incremental updates of the Gurobi model
+    #
+
+    def _add_variable(self, vardata):
+
+        label = self._symbol_map.createSymbol(vardata, self._labeler)
+        self._variable_symbol_map.addSymbol(vardata, label)
+        self._pyomo_gurobi_variable_map[label] = \
+            self._add_gurobi_variable(self._gurobi_instance, vardata, label)
+        if vardata.fixed:
+            self._update()
+            self._update_variable_bounds(vardata)
+
+    def _remove_variable(self, vardata):
+
+        # the coefficients of the variable are removed by Gurobi
+        label = self._remove_symbol(vardata)
+        del self._variable_symbol_map.byObject[id(vardata)]
+        del self._variable_symbol_map.bySymbol[label]
+        self._referenced_variable_ids.discard(id(vardata))
+        self._gurobi_instance.remove(
+            self._pyomo_gurobi_variable_map.pop(label))
+
+    def _add_constraint(self, condata):
+
+        if (condata.lower is None) and (condata.upper is None):
+            return  # not binding at all, don't bother
+
+        con_repn = self._canonical_repn(condata, condata.body, 'con')
+        label = self._symbol_map.createSymbol(condata, self._labeler)
+        expr, trivial = self._encode_gurobi_expression(con_repn,
+                                                       condata,
+                                                       'constraint')
+
+        if (not trivial) or (not self._skip_trivial_constraints):
+
+            grbmodel = self._gurobi_instance
+            grb_con, is_range = self._add_gurobi_constraint(grbmodel,
+                                                            condata,
+                                                            expr,
+                                                            label)
+            self._pyomo_gurobi_constraint_map[label] = grb_con
+            if is_range:
+                # the variable added by gurobi for the range
+                # constraint is the last variable
+                grbmodel.update()
+                self._range_con_var_pairs.append(
+                    (grb_con, grbmodel.getVars()[-1]))
+
+    def _remove_constraint(self, condata):
+
+        label = self._remove_symbol(condata)
+        grb_con = self._pyomo_gurobi_constraint_map.pop(label, None)
+        if grb_con is None:
+            return
+        grbmodel = self._gurobi_instance
+        for i, (con, var) in enumerate(self._range_con_var_pairs):
+            if con is grb_con:
+                del self._range_con_var_pairs[i]
+                grbmodel.remove(var)
+                break
+        grbmodel.remove(grb_con)
+
+    def _update_variable_bounds(self, vardata):
+
+        if vardata.fixed:
+            if not self._output_fixed_variable_bounds:
+                # if we've been directed to not deal with fixed
+                # variables, then skip - they should have been
+                # compiled out of any description of the constraints
+                return
+            lb = ub = vardata.value
+        else:
+            lb = -GRB.INFINITY
+            ub = GRB.INFINITY
+            if vardata.lb is not None:
+                lb = value(vardata.lb)
+            if vardata.ub is not None:
+                ub = value(vardata.ub)
+
+        label = self._symbol_map.byObject[id(vardata)]
+        grbvar = self._pyomo_gurobi_variable_map[label]
+        grbvar.setAttr(GRB.Attr.LB, lb)
+        grbvar.setAttr(GRB.Attr.UB, ub)
+
+    def _update_constraint_rhs(self, condata):
+
+        from pyomo.repn import LinearCanonicalRepn
+
+        label = self._symbol_map.byObject[id(condata)]
+        grb_con = self._pyomo_gurobi_constraint_map.get(label, None)
+
+        range_var = None
+        for con, var in self._range_con_var_pairs:
+            if con is grb_con:
+                range_var = var
+                break
+
+        if condata.equality:
+            sense = GRB.EQUAL
+        elif (condata.lower is not None) and (condata.upper is not None):
+            sense = None
+        elif condata.upper is not None:
+            sense = GRB.LESS_EQUAL
+        else:
+            sense = GRB.GREATER_EQUAL
+
+        if (grb_con is None) or \
+           ((sense is None) != (range_var is not None)) or \
+           ((sense is not None) and (grb_con.Sense != sense)):
+            # the type of the constraint has changed
+            self._remove_constraint(condata)
+            self._update()
+            self._add_constraint(condata)
+            return
+
+        con_repn = condata.parent_block()._canonical_repn[condata]
+        offset = 0.0
+        if isinstance(con_repn, LinearCanonicalRepn):
+            if con_repn.constant is not None:
+                offset = con_repn.constant
+        elif 0 in con_repn:
+            offset = con_repn[0][None]
+
+        if sense is None:
+            # gurobi transforms L <= f(x) <= U into
+            # U-f(x) == s, 0 <= s <= U-L
+            lower = self._get_bound(condata.lower)
+            upper = self._get_bound(condata.upper)
+            grb_con.setAttr(GRB.Attr.RHS, upper - offset)
+            range_var.setAttr(GRB.Attr.UB, upper - lower)
+        elif sense == GRB.LESS_EQUAL:
+            grb_con.setAttr(GRB.Attr.RHS,
+                            self._get_bound(condata.upper) - offset)
+        else:
+            grb_con.setAttr(GRB.Attr.RHS,
+                            self._get_bound(condata.lower) - offset)
+
+    def _set_objective_coefficient(self, vardata, coef):
+
+        label = self._symbol_map.byObject[id(vardata)]
+        self._referenced_variable_ids.add(id(vardata))
+        self._pyomo_gurobi_variable_map[label].setAttr(GRB.Attr.Obj, coef)
+
+    def _update(self):
+
+        self._gurobi_instance.update()
+
+    #
+    # Override base class methods to use the compiled instance
+    #
+
+    def _populate_gurobi_instance(self, pyomo_instance):
+
+        if pyomo_instance is not self._instance:
+            raise ValueError("The gurobi_persistent plugin can only solve "
+                             "the compiled instance")
+
+    def _remove_unreferenced_variables(self):
+
+        # all variables are kept in the symbol maps (and the Gurobi
+        # model), since they can be referenced by constraints that are
+        # added later.  the values of the unreferenced variables are
+        # removed from the solution by the _postsolve method.
+        pass
+
+    def _presolve(self, *args, **kwds):
+
+        self._check_compiled("presolve")
+
+        # These must be passed in to the compile_instance method,
+        # but assert that any values here match those already supplied
+        for key, val in (('symbolic_solver_labels',
+                          self._symbolic_solver_labels),
+                         ('output_fixed_variable_bounds',
+                          self._output_fixed_variable_bounds),
+                         ('skip_trivial_constraints',
+                          self._skip_trivial_constraints)):
+            if key in kwds:
+                assert kwds[key] == val
+            kwds[key] = val
+
+        # Re-add the symbol map if it was cleared after a previous
+        # solution load
+        if self._smap_id not in self._instance.solutions.symbol_map:
+            self._instance.solutions.add_symbol_map(self._symbol_map)
+
+        variable_symbol_map = self._variable_symbol_map
+        gurobi_direct._presolve(self, *args, **kwds)
+        #
+        # This gets deleted by the base class method
+        #
+        self._variable_symbol_map = variable_symbol_map
+
+    def _postsolve(self):
+
+        range_con_var_pairs = self._range_con_var_pairs
+
+        ret = gurobi_direct._postsolve(self)
+
+        #
+        # This gets reset by the base class method
+        #
+        self._range_con_var_pairs = range_con_var_pairs
+
+        return ret
+
+
+if not gurobi_python_api_exists:
+    SolverFactory().deactivate('_gurobi_persistent')
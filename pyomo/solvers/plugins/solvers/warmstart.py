@@ -0,0 +1,94 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+
+#
+# Writers for the warm-start (initial solution) files of the shell
+# solver plugins.
+#
+# The variables are collected with a single pass over the symbol map
+# of the problem file, which only contains the variables that were
+# written to that file (the writers remove the unreferenced variables
+# from their symbol maps).  The values are written with full
+# precision (repr), and the files are written in bulk.
+#
+
+__all__ = ['warm_start_values', 'write_warm_start']
+
+from six import iteritems
+
+from pyomo.core.base.var import _VarData
+
+
+def warm_start_values(symbol_map, skip_zeros=False):
+    """
+    Return a list of the (symbol, value) tuples of the variables in a
+    symbol map that have a value.  If skip_zeros is True, then the
+    variables whose value is zero are omitted.
+    """
+    ans = []
+    for symbol, obj_ref in iteritems(symbol_map.bySymbol):
+        obj = obj_ref()
+        if not isinstance(obj, _VarData):
+            continue
+        val = obj.value
+        if (val is None) or (skip_zeros and (val == 0)):
+            continue
+        ans.append((symbol, repr(float(val))))
+    return ans
+
+
+def _write_cplex_mst(ostream, values):
+    # in principle, one could use a Python XML writer library like
+    # xml.dom.minidom.  it works, but it is slow. hence, the
+    # explicit direct-write of XML below.
+    ostream.write("<?xml version=\"1.0\" ?>\n"
+                  "<CPLEXSolution version=\"1.0\">\n"
+                  "<header/>\n"
+                  "<quality/>\n"
+                  "<variables>\n")
+    ostream.writelines(
+        "<variable index=\"%d\" name=\"%s\" value=\"%s\" />\n"
+        % (i, symbol, val) for i, (symbol, val) in enumerate(values))
+    ostream.write("</variables>\n"
+                  "</CPLEXSolution>\n")
+
+
+def _write_gurobi_mst(ostream, values):
+    # (the Gurobi MST and SOL formats both list one
+    # variable name and value per line)
+    ostream.writelines("%s %s\n" % item for item in values)
+
+
+def _write_cbc_mipstart(ostream, values):
+    # CBC reads the lines that start with a column index (the
+    # format of its solution files); the other lines are ignored
+    ostream.write("Pyomo warm start\n")
+    ostream.writelines("%d %s %s\n" % (i, symbol, val)
+                       for i, (symbol, val) in enumerate(values))
+
+_writers = {'cplex': _write_cplex_mst,
+            'gurobi': _write_gurobi_mst,
+            'cbc': _write_cbc_mipstart}
+
+
+def write_warm_start(filename, symbol_map, solver, skip_zeros=False):
+    """
+    Write the values of the variables in a symbol map into a
+    warm-start file for a solver ('cplex' for a CPLEX MST file,
+    'gurobi' for a Gurobi MST (or SOL) file, or 'cbc' for a CBC
+    mipstart file), and return the number of variables that were
+    written.
+    """
+    if solver not in _writers:
+        raise ValueError("Unknown warm-start file format for solver '%s'"
+                         % (solver,))
+    values = warm_start_values(symbol_map, skip_zeros=skip_zeros)
+    with open(filename, "w") as ostream:
+        _writers[solver](ostream, values)
+    return len(values)
@@ -0,0 +1,292 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the incremental updates of the CPLEXPersistent plugin
+# (with a stub of the CPLEX python bindings)
+#
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+import pyomo.solvers.plugins.solvers.CPLEXDirect as CPLEXDirect
+import pyomo.solvers.plugins.solvers.CPLEXPersistent as CPLEXPersistent
+
+
+class _SparsePair(object):
+
+    def __init__(self, ind=None, val=None):
+        self.ind = list(ind)
+        self.val = list(val)
+
+
+class _Variables(object):
+
+    class type(object):
+        continuous = 'C'
+        integer = 'I'
+        binary = 'B'
+
+    def __init__(self, model):
+        self._model = model
+        self.names = []
+        self.lb = {}
+        self.ub = {}
+        self.types = {}
+
+    def add(self, names, lb, ub, types=None):
+        for i, name in enumerate(names):
+            self.names.append(name)
+            self.lb[name] = lb[i]
+            self.ub[name] = ub[i]
+            self.types[name] = 'C' if types is None else types[i]
+
+    def delete(self, name):
+        self.names.remove(name)
+        del self.lb[name]
+        del self.ub[name]
+        del self.types[name]
+        for con in self._model.linear_constraints.rows.values():
+            con['expr'].pop(name, None)
+        self._model.objective.linear.pop(name, None)
+
+    def get_num(self):
+        return len(self.names)
+
+    def get_names(self):
+        return list(self.names)
+
+    def _set(self, bounds, args):
+        if len(args) == 1:
+            for var, val in args[0]:
+                bounds[self._model.variable_name(var)] = val
+        else:
+            bounds[self._model.variable_name(args[0])] = args[1]
+
+    def set_lower_bounds(self, *args):
+        self._set(self.lb, args)
+
+    def set_upper_bounds(self, *args):
+        self._set(self.ub, args)
+
+
+class _LinearConstraints(object):
+
+    def __init__(self, model):
+        self._model = model
+        self.rows = {}
+
+    def add(self, lin_expr, senses, rhs, range_values, names):
+        for i, name in enumerate(names):
+            self.rows[name] = {'expr': self._model.expression(lin_expr[i]),
+                               'sense': senses[i],
+                               'rhs': rhs[i],
+                               'range': range_values[i]}
+
+    def delete(self, name):
+        del self.rows[name]
+
+    def set_senses(self, name, sense):
+        self.rows[name]['sense'] = sense
+
+    def set_rhs(self, name, rhs):
+        self.rows[name]['rhs'] = rhs
+
+    def set_range_values(self, name, range_value):
+        self.rows[name]['range'] = range_value
+
+
+class _QuadraticConstraints(object):
+
+    def __init__(self, model):
+        self.rows = {}
+
+    def add(self, lin_expr, quad_expr, sense, rhs, name):
+        self.rows[name] = {'sense': sense, 'rhs': rhs}
+
+    def delete(self, name):
+        del self.rows[name]
+
+
+class _Objective(object):
+
+    class sense(object):
+        minimize = 1
+        maximize = -1
+
+    def __init__(self, model):
+        self._model = model
+        self.linear = {}
+
+    def set_sense(self, sense):
+        pass
+
+    def set_name(self, name):
+        pass
+
+    def set_linear(self, *args):
+        if len(args) == 1:
+            for var, coef in args[0]:
+                self.linear[self._model.variable_name(var)] = coef
+        else:
+            self.linear[self._model.variable_name(args[0])] = args[1]
+
+
+class _Cplex(object):
+    """An in-memory stand-in for a CPLEX model"""
+
+    class problem_type(object):
+        LP = 'LP'
+        MILP = 'MILP'
+        QP = 'QP'
+        MIQP = 'MIQP'
+        QCP = 'QCP'
+        MIQCP = 'MIQCP'
+
+    def __init__(self):
+        self.variables = _Variables(self)
+        self.linear_constraints = _LinearConstraints(self)
+        self.quadratic_constraints = _QuadraticConstraints(self)
+        self.objective = _Objective(self)
+
+    def variable_name(self, var):
+        if isinstance(var, int):
+            return self.variables.names[var]
+        return var
+
+    def expression(self, pair):
+        return dict((self.variable_name(var), coef)
+                    for var, coef in zip(pair.ind, pair.val))
+
+    def set_problem_type(self, problem_type):
+        pass
+
+    def set_warning_stream(self, *args, **kwds):
+        pass
+
+
+class _cplex(object):
+    """A stub of the CPLEX python bindings"""
+
+    Cplex = _Cplex
+    SparsePair = _SparsePair
+    infinity = 1e20
+
+
+class TestCPLEXPersistentUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self._cplex = {}
+        for module in (CPLEXDirect, CPLEXPersistent):
+            self._cplex[module] = module.__dict__.get('cplex', None)
+            module.cplex = _cplex
+        m = self.model = ConcreteModel()
+        m.x = Var([1,2], bounds=(0,1))
+        m.y = Var(within=Integers)
+        m.c = Constraint(expr=m.x[1] + m.x[2] + m.y <= 1)
+        m.o = Objective(expr=m.x[1] + 2*m.x[2])
+        self.opt = CPLEXPersistent.CPLEXPersistent()
+        self.opt.compile_instance(m, symbolic_solver_labels=True)
+        self.cpx = self.opt._active_cplex_instance
+
+    def tearDown(self):
+        for module, cplex in self._cplex.items():
+            if cplex is None:
+                del module.cplex
+            else:
+                module.cplex = cplex
+
+    def _check_variable_ids(self):
+        self.assertEqual(self.opt._cplex_variable_ids,
+                         dict((name, i) for i, name
+                              in enumerate(self.cpx.variables.names)))
+
+    def test_compile(self):
+        self.assertEqual(self.cpx.variables.names,
+                         ['x(1)', 'x(2)', 'y', 'ONE_VAR_CONSTANT'])
+        self.assertEqual(self.cpx.variables.types['y'], 'I')
+        self.assertEqual(self.cpx.linear_constraints.rows,
+                         {'c': {'expr': {'x(1)': 1, 'x(2)': 1, 'y': 1},
+                                'sense': 'L', 'rhs': 1, 'range': 0.0}})
+        self.assertEqual(self.cpx.objective.linear, {'x(1)': 1, 'x(2)': 2})
+        self._check_variable_ids()
+
+    def test_variables(self):
+        m = self.model
+        m.z = Var(bounds=(-1, None))
+        self.opt.add_variable(m.z)
+        self.assertEqual(self.cpx.variables.names[-1], 'z')
+        self.assertEqual(self.cpx.variables.lb['z'], -1)
+        self.assertEqual(self.cpx.variables.ub['z'], _cplex.infinity)
+        self._check_variable_ids()
+        self.assertRaises(ValueError, self.opt.add_variable, m.z)
+
+        self.opt.remove_variable(m.y)
+        self.assertEqual(self.cpx.variables.names,
+                         ['x(1)', 'x(2)', 'ONE_VAR_CONSTANT', 'z'])
+        self.assertEqual(self.cpx.linear_constraints.rows['c']['expr'],
+                         {'x(1)': 1, 'x(2)': 1})
+        self.assertFalse(id(m.y) in self.opt._symbol_map.byObject)
+        self.assertFalse(id(m.y) in self.opt._variable_symbol_map.byObject)
+        # the ids are shifted by the removal
+        self._check_variable_ids()
+        self.assertRaises(ValueError, self.opt.remove_variable, m.y)
+
+        m.x[2].setub(5)
+        m.z.setlb(None)
+        self.opt.update_variable_bounds([m.x, m.z])
+        self.assertEqual(self.cpx.variables.ub['x(2)'], 5)
+        self.assertEqual(self.cpx.variables.lb['z'], -_cplex.infinity)
+        m.x[1].setlb(-2)
+        self.opt.compile_variable_bounds(m, [('x', 1)])
+        self.assertEqual(self.cpx.variables.lb['x(1)'], -2)
+
+    def test_constraints(self):
+        m = self.model
+        m.z = Var()
+        self.opt.add_variable(m.z)
+        self.opt.remove_variable(m.y)
+        # the constraints added after the removal use the shifted ids
+        m.d = Constraint(expr=m.x[2] + 3*m.z >= 1)
+        self.opt.add_constraint(m.d)
+        self.assertEqual(self.cpx.linear_constraints.rows['d'],
+                         {'expr': {'x(2)': 1, 'z': 3},
+                          'sense': 'G', 'rhs': 1, 'range': 0.0})
+        self.assertRaises(ValueError, self.opt.add_constraint, m.d)
+
+        m.d.set_value((2, m.x[2] + 3*m.z + 1, 4))
+        self.opt.update_constraint_rhs(m.d)
+        self.assertEqual(self.cpx.linear_constraints.rows['d'],
+                         {'expr': {'x(2)': 1, 'z': 3},
+                          'sense': 'R', 'rhs': 2, 'range': 2})
+
+        self.opt.remove_constraint(m.c)
+        self.assertEqual(sorted(self.cpx.linear_constraints.rows), ['d'])
+        self.assertFalse(id(m.c) in self.opt._symbol_map.byObject)
+        self.assertRaises(ValueError, self.opt.remove_constraint, m.c)
+
+    def test_objective_coefficients(self):
+        m = self.model
+        self.opt.update_objective_coefficients([(m.x[2], 3), (m.y, -1)])
+        self.assertEqual(self.cpx.objective.linear,
+                         {'x(1)': 1, 'x(2)': 3, 'y': -1})
+        self.assertTrue(id(m.y) in self.opt._referenced_variable_ids)
+
+    def test_unreferenced_variables(self):
+        # the variables that are not referenced by the constraints are
+        # kept in the symbol maps (constraints added later can use them)
+        m = self.model
+        m.z = Var()
+        self.opt.add_variable(m.z)
+        self.opt._remove_unreferenced_variables(m)
+        self.assertTrue(id(m.z) in self.opt._symbol_map.byObject)
+        self.assertTrue(id(m.z) in self.opt._variable_symbol_map.byObject)
+
+
+if __name__ == "__main__":
+    unittest.main()
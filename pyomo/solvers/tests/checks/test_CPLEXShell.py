@@ -0,0 +1,141 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for reading CPLEX (XML) solution files
+#
+
+import os
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__))+os.sep
+
+import pyutilib.th as unittest
+
+from pyomo.opt import (SolverFactory,
+                       SolverResults,
+                       SolutionStatus,
+                       ProblemSense)
+import pyomo.environ
+
+_header = """<?xml version = "1.0" standalone="yes"?>
+<?xml-stylesheet href="http://www.ilog.com/products/cplex/xmlv1.1/solution.xsl" type="text/xsl"?>
+<CPLEXSolution version="1.2">
+ <header
+   problemName="%s"
+   objectiveValue="3.5"
+   solutionTypeValue="%s"
+   solutionStatusValue="%s"
+   solutionStatusString="%s"
+   MIPNodes="12"
+   primalFeasible="1"/>
+ <quality
+   epRHS="1e-06"/>
+"""
+
+_lp_soln = """ <linearConstraints>
+  <constraint name="c_u_c1_" index="0" status="LL" slack="0" dual="1.5"/>
+  <constraint name="r_l_r_" index="1" status="LL" slack="0" dual="-2"/>
+  <constraint name="r_u_r_" index="2" status="BS" slack="4" dual="0"/>
+  <constraint name="c_e_ONE_VAR_CONSTANT" index="3" status="LL" slack="0" dual="0"/>
+ </linearConstraints>
+ <variables>
+  <variable name="x" index="0" status="BS" value="1" reducedCost="0"/>
+  <variable name="y" index="1" status="LL" value="0" reducedCost="2.5"/>
+  <variable name="z" index="2" status="UL" value="2" reducedCost="-1"/>
+  <variable name="ONE_VAR_CONSTANT" index="3" status="BS" value="1" reducedCost="0"/>
+ </variables>
+</CPLEXSolution>
+"""
+
+_mip_soln = """ <linearConstraints>
+  <constraint name="c_u_c1_" index="0" slack="0.5"/>
+ </linearConstraints>
+ <variables>
+  <variable name="x" index="0" value="1"/>
+  <variable index="1" value="-0" name="y[&quot;a&amp;b&quot;]"/>
+ </variables>
+</CPLEXSolution>
+"""
+
+
+class TestCPLEXSolutionFile(unittest.TestCase):
+
+    def setUp(self):
+        self.lp_file = currdir+"test_soln.lp"
+        self.soln_file = currdir+"test_soln.xml"
+        with open(self.lp_file, "w") as f:
+            f.write("\\* Source Pyomo model name=unknown *\\\n\nmax \n")
+
+    def tearDown(self):
+        for fname in (self.lp_file, self.soln_file):
+            if os.path.exists(fname):
+                os.remove(fname)
+
+    def _read(self, data, suffixes, mip=False):
+        with open(self.soln_file, "w") as f:
+            if mip:
+                f.write(_header % (self.lp_file, 3, 101,
+                                   "integer optimal solution"))
+            else:
+                f.write(_header % (self.lp_file, 1, 1, "optimal"))
+            f.write(data)
+        opt = SolverFactory('_cplex_shell')
+        opt._soln_file = self.soln_file
+        opt._suffixes = suffixes
+        opt._best_bound = None
+        opt._gap = None
+        results = SolverResults()
+        opt.process_soln_file(results)
+        return results
+
+    def test_lp(self):
+        results = self._read(_lp_soln, ['dual', 'slack', 'rc', 'lrc', 'urc'])
+        self.assertEqual(results.problem.name, "test_soln")
+        self.assertEqual(results.problem.sense, ProblemSense.maximize)
+        self.assertEqual(results.problem.upper_bound, 3.5)
+        soln = results.solution(0)
+        self.assertEqual(soln.status, SolutionStatus.optimal)
+        self.assertEqual(soln.objective['__default_objective__']['Value'],
+                         3.5)
+        self.assertEqual(soln.variable,
+                         {'x': {'Value': 1, 'Rc': 0, 'Lrc': 0, 'Urc': 0},
+                          'y': {'Value': 0, 'Rc': 2.5, 'Lrc': 2.5, 'Urc': 0},
+                          'z': {'Value': 2, 'Rc': -1, 'Lrc': 0, 'Urc': -1}})
+        self.assertEqual(soln.constraint,
+                         {'c_u_c1_': {'Dual': 1.5, 'Slack': 0},
+                          'c_e_ONE_VAR_CONSTANT': {'Dual': 0, 'Slack': 0},
+                          'r_l_r_': {'Dual': -2, 'Slack': 4}})
+
+    def test_no_suffixes(self):
+        results = self._read(_lp_soln, [])
+        soln = results.solution(0)
+        self.assertEqual(soln.variable,
+                         {'x': {'Value': 1},
+                          'y': {'Value': 0},
+                          'z': {'Value': 2}})
+        self.assertEqual(soln.constraint, {})
+
+    def test_mip(self):
+        results = self._read(_mip_soln, ['slack'], mip=True)
+        self.assertEqual(results.solver.statistics.branch_and_bound.\
+                         number_of_created_subproblems, 12)
+        soln = results.solution(0)
+        self.assertEqual(soln.gap, 0)
+        # the attributes may appear in any order (and names are
+        # unescaped)
+        self.assertEqual(soln.variable,
+                         {'x': {'Value': 1},
+                          'y["a&b"]': {'Value': 0}})
+        self.assertEqual(soln.constraint, {'c_u_c1_': {'Slack': 0.5}})
+
+    def test_bad_suffix(self):
+        self.assertRaises(RuntimeError, self._read, _lp_soln, ['foo'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the resident ASL worker solver manager
+#
+
+import os
+import sys
+import shutil
+import tempfile
+
+import pyutilib.th as unittest
+
+from pyomo.opt import (SolverFactory,
+                       SolverManagerFactory,
+                       SolverResults,
+                       TerminationCondition)
+from pyomo.opt.parallel.manager import (ActionManagerError,
+                                        ActionStatus,
+                                        FailedActionHandle)
+from pyomo.environ import *
+import pyomo.solvers.plugins.smanager.asl_workers as asl_workers
+from pyomo.solvers.plugins.smanager.asl_workers import SolverManager_ASLWorkers
+
+#
+# A fake ASL solver, which sets all the variables of the NL file to
+# the 'value' option and all the duals to the 'dual' option
+#
+_fake_solver = """#!%s
+import sys
+nl_file = sys.argv[2]
+options = dict(arg.split('=') for arg in sys.argv[3:])
+if 'fail' in options:
+    sys.exit(1)
+with open(nl_file) as f:
+    f.readline()
+    n_var, n_con = [int(i) for i in f.readline().split()[:2]]
+print("fake solver: n_var=%%s n_con=%%s" %% (n_var, n_con))
+with open(nl_file[:-3]+'.sol', 'w') as f:
+    f.write("fake solver: done\\n\\nOptions\\n3\\n1\\n1\\n0\\n")
+    f.write("%%s\\n%%s\\n%%s\\n%%s\\n" %% (n_con, n_con, n_var, n_var))
+    for i in range(n_con):
+        f.write("%%s\\n" %% options.get('dual', 0))
+    for i in range(n_var):
+        f.write("%%s\\n" %% options.get('value', 1))
+    f.write("objno 0 %%s\\n" %% options.get('status', 0))
+""" % (sys.executable,)
+
+
+def _create_model(ub):
+    model = ConcreteModel()
+    model.x = Var([1,2], bounds=(0,ub))
+    model.o = Objective(expr=model.x[1]**2 + model.x[2]**2)
+    model.c = Constraint(expr=model.x[1] + model.x[2] >= 1)
+    return model
+
+
+class TestASLWorkers(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.executable = os.path.join(cls.tmpdir, 'fake_asl')
+        with open(cls.executable, 'w') as f:
+            f.write(_fake_solver)
+        os.chmod(cls.executable, 0o755)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.manager = SolverManagerFactory('asl_workers', max_workers=2)
+        self.opt = SolverFactory('asl:fake_asl')
+        self.opt.set_executable(self.executable)
+
+    def tearDown(self):
+        self.manager.shutdown_workers()
+
+    def test_factory(self):
+        self.assertIs(type(self.manager), SolverManager_ASLWorkers)
+        self.assertEqual(self.manager.max_workers, 2)
+        self.assertRaises(ValueError,
+                          SolverManagerFactory, 'asl_workers', max_workers=0)
+
+    def test_bad_solver(self):
+        model = _create_model(1)
+        self.assertRaises(ActionManagerError, self.manager.queue, model)
+        self.assertRaises(ActionManagerError,
+                          self.manager.queue, model, opt='glpk')
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+        # the executable is executed by the worker process
+        opt = SolverFactory('asl:fake_asl')
+        opt.set_executable(os.path.join(self.tmpdir, 'missing'),
+                           validate=False)
+        self.manager.queue(model, opt=opt)
+        self.assertRaises(RuntimeError, self.manager.wait_all)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+
+    def test_solve_all(self):
+        models = [_create_model(ub) for ub in range(1,6)]
+        self.manager.solve_all(self.opt, models, options={'value': 0.5})
+        for model in models:
+            self.assertEqual(model.x[1].value, 0.5)
+            self.assertEqual(model.x[2].value, 0.5)
+            self.assertEqual(len(model.solutions.symbol_map), 0)
+        # the workers are reused
+        self.assertEqual(len(self.manager._workers), 2)
+        self.assertEqual(self.manager.num_queued(), 0)
+
+    def test_results(self):
+        model = _create_model(1)
+        model.dual = Suffix(direction=Suffix.IMPORT)
+        self.opt.options.value = 0.25
+        results = self.manager.solve(model, opt=self.opt,
+                                     options_string="dual=2")
+        self.assertIsInstance(results, SolverResults)
+        self.assertEqual(results.solver.termination_condition,
+                         TerminationCondition.optimal)
+        self.assertTrue(results.solver.message.startswith("fake solver"))
+        # the solution is loaded (and it is not stored in the results)
+        self.assertEqual(len(results.solution), 0)
+        self.assertIn("n_var=2 n_con=1", results._log)
+        self.assertEqual(model.x[1].value, 0.25)
+        self.assertEqual(model.dual[model.c], 2)
+
+    def test_load_solutions_false(self):
+        model = _create_model(1)
+        model.dual = Suffix(direction=Suffix.IMPORT)
+        results = self.manager.solve(model, opt=self.opt,
+                                     load_solutions=False,
+                                     options={'dual': 3})
+        self.assertIs(model.x[1].value, None)
+        self.assertEqual(len(results.solution), 1)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+        model.solutions.load_from(results)
+        self.assertEqual(model.x[1].value, 1)
+        self.assertEqual(model.dual[model.c], 3)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+
+    def test_bad_status(self):
+        model = _create_model(1)
+        results = self.manager.solve(model, opt=self.opt,
+                                     options={'status': 500})
+        self.assertEqual(results.solver.termination_condition,
+                         TerminationCondition.internalSolverError)
+        self.assertIs(model.x[1].value, None)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+
+    def test_worker_error(self):
+        model = _create_model(1)
+        ah = self.manager.queue(model, opt=self.opt, options={'fail': 1})
+        self.assertRaises(RuntimeError, self.manager.wait_all)
+        self.assertEqual(ah.status, ActionStatus.error)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+        # the worker is still available
+        self.manager.solve(model, opt=self.opt)
+        self.assertEqual(model.x[1].value, 1)
+        self.assertEqual(len(self.manager._workers), 1)
+
+    def test_no_running_tasks(self):
+        # the tasks that are not sent to a worker are reported as an
+        # error (instead of waiting for them forever)
+        model = _create_model(1)
+        self.manager.queue(model, opt=self.opt)
+        self.manager.wait_all()
+        self.manager._tasks[-1] = (model, None, [], True)
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+
+    def test_workdirs(self):
+        self.manager.solve(_create_model(1), opt=self.opt)
+        workdir = self.manager._workers[0].workdir
+        self.assertTrue(os.path.isdir(workdir))
+        self.assertIn(workdir, asl_workers._workdirs)
+        # the directories are removed at exit (if the workers are not
+        # shut down)
+        asl_workers._remove_workdirs()
+        self.assertFalse(os.path.exists(workdir))
+        self.assertEqual(len(asl_workers._workdirs), 0)
+        self.manager.shutdown_workers()
+        self.assertEqual(len(asl_workers._workdirs), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the process pool solver manager
+#
+
+import os
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__))+os.sep
+
+import pyutilib.th as unittest
+import pyutilib.services
+
+import pyomo.opt
+from pyomo.opt import SolverFactory, SolverManagerFactory, TerminationCondition
+from pyomo.opt.parallel.manager import (ActionManagerError,
+                                        ActionStatus,
+                                        FailedActionHandle)
+from pyomo.environ import *
+from pyomo.solvers.plugins.smanager.pool import SolverManager_ProcessPool
+
+solvers = pyomo.opt.check_available_solvers('glpk')
+
+old_tempdir = pyutilib.services.TempfileManager.tempdir
+
+
+def _create_model(ub):
+    model = ConcreteModel()
+    model.x = Var([1,2], bounds=(0,ub))
+    model.o = Objective(expr=model.x[1] + 2*model.x[2], sense=maximize)
+    model.c = Constraint(expr=model.x[1] + model.x[2] <= ub)
+    return model
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def setUp(self):
+        pyutilib.services.TempfileManager.tempdir = currdir
+        self.manager = SolverManagerFactory('pool', max_workers=2)
+
+    def tearDown(self):
+        self.manager.shutdown_workers()
+        pyutilib.services.TempfileManager.clear_tempfiles()
+        pyutilib.services.TempfileManager.tempdir = old_tempdir
+
+    def test_factory(self):
+        self.assertIs(type(self.manager), SolverManager_ProcessPool)
+        self.assertEqual(self.manager.max_workers, 2)
+        self.assertRaises(ValueError,
+                          SolverManagerFactory, 'pool', max_workers=0)
+
+    def test_no_solver(self):
+        self.assertRaises(ActionManagerError,
+                          self.manager.queue, _create_model(1))
+
+    def test_no_queued_solves(self):
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+
+    def test_worker_error(self):
+        # The executable is located by the worker process
+        opt = SolverFactory('glpk')
+        opt.set_executable(currdir+'missing_glpsol', validate=False)
+        model = _create_model(1)
+        ah = self.manager.queue(model, opt=opt)
+        self.assertEqual(self.manager.num_queued(), 1)
+        self.assertRaises(RuntimeError, self.manager.wait_all)
+        self.assertEqual(ah.status, ActionStatus.error)
+        self.assertEqual(self.manager.num_queued(), 0)
+        self.assertEqual(len(model.solutions.symbol_map), 0)
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_solve_all(self):
+        models = [_create_model(ub) for ub in range(1,5)]
+        self.manager.solve_all('glpk', models)
+        for ub, model in enumerate(models, 1):
+            self.assertAlmostEqual(model.x[2].value, ub)
+            self.assertAlmostEqual(model.o(), 2*ub)
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_wait_any(self):
+        opt = SolverFactory('glpk')
+        models = [_create_model(ub) for ub in range(1,5)]
+        ahs = dict((self.manager.queue(model, opt=opt), model)
+                   for model in models)
+        while len(ahs):
+            ah = self.manager.wait_any()
+            self.assertEqual(ah.status, ActionStatus.done)
+            model = ahs.pop(ah)
+            results = self.manager.get_results(ah)
+            self.assertEqual(results.solver.termination_condition,
+                             TerminationCondition.optimal)
+            self.assertAlmostEqual(model.o(), 2*model.x[2].ub)
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_load_solutions_false(self):
+        model = _create_model(3)
+        results = self.manager.solve(model, opt='glpk', load_solutions=False)
+        self.assertEqual(len(model.solutions), 0)
+        self.assertEqual(len(results.solution), 1)
+        model.solutions.load_from(results)
+        self.assertAlmostEqual(model.x[2].value, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the asynchronous subprocess solver manager
+#
+
+import os
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__))+os.sep
+
+import pyutilib.th as unittest
+import pyutilib.services
+from pyutilib.common import ApplicationError
+
+import pyomo.opt
+from pyomo.opt import SolverFactory, SolverManagerFactory, TerminationCondition
+from pyomo.opt.parallel.manager import (ActionManagerError,
+                                        ActionStatus,
+                                        FailedActionHandle)
+from pyomo.opt.parallel.local import (SolverManager_Subprocess,
+                                      prepare_queued_solve)
+from pyomo.opt.solver import SystemCallSolver
+from pyomo.environ import *
+
+solvers = pyomo.opt.check_available_solvers('glpk')
+
+old_tempdir = pyutilib.services.TempfileManager.tempdir
+
+
+def _create_model(ub):
+    model = ConcreteModel()
+    model.x = Var([1,2], bounds=(0,ub))
+    model.o = Objective(expr=model.x[1] + 2*model.x[2], sense=maximize)
+    model.c = Constraint(expr=model.x[1] + model.x[2] <= ub)
+    return model
+
+
+class TestSubprocess(unittest.TestCase):
+
+    def setUp(self):
+        pyutilib.services.TempfileManager.tempdir = currdir
+        self.manager = SolverManagerFactory('subprocess')
+
+    def tearDown(self):
+        pyutilib.services.TempfileManager.clear_tempfiles()
+        pyutilib.services.TempfileManager.tempdir = old_tempdir
+
+    def _tempdirs(self):
+        return [f for f in os.listdir(currdir) if f.startswith('tmp_solve')]
+
+    def test_factory(self):
+        self.assertIs(type(self.manager), SolverManager_Subprocess)
+        self.assertIs(self.manager.max_processes, None)
+        manager = SolverManagerFactory('subprocess', max_processes=2)
+        self.assertEqual(manager.max_processes, 2)
+        self.assertRaises(ValueError,
+                          SolverManagerFactory, 'subprocess', max_processes=0)
+
+    def test_no_solver(self):
+        model = _create_model(1)
+        self.assertRaises(ActionManagerError, self.manager.queue, model)
+        self.assertRaises(ActionManagerError,
+                          self.manager.queue, model, opt='ps')
+
+    def test_prepare_queued_solve(self):
+        model = _create_model(1)
+        model.dual = Suffix(direction=Suffix.IMPORT)
+        opt = SolverFactory('glpk')
+        opt.options.mipgap = 0.1
+        kwds = {'opt': opt, 'pipe': True, 'suffixes': ['rc'],
+                'options': {'tmlim': 5}, 'options_string': 'tmlim=10 memlim=2'}
+        ans = prepare_queued_solve(self.manager, SystemCallSolver,
+                                   (model,), kwds)
+        self.assertEqual(ans, (opt, False, {'mipgap': 0.1, 'tmlim': 10,
+                                            'memlim': 2}))
+        self.assertEqual(kwds, {'suffixes': ['rc', 'dual']})
+        opt, created, options = prepare_queued_solve(
+            self.manager, SystemCallSolver, (model,), {'opt': 'glpk'})
+        self.assertIsInstance(opt, SystemCallSolver)
+        self.assertTrue(created)
+        model = ConcreteModel()
+        model.x = Var()
+        model._constructed = False
+        self.assertRaises(RuntimeError, prepare_queued_solve,
+                          self.manager, SystemCallSolver, (model,),
+                          {'opt': 'glpk'})
+
+    def test_no_queued_solves(self):
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+
+    def test_missing_executable(self):
+        opt = SolverFactory('glpk')
+        opt.set_executable(currdir+'missing_glpsol', validate=False)
+        model = _create_model(1)
+        self.assertRaises(ApplicationError,
+                          self.manager.queue, model, opt=opt)
+        self.assertEqual(self.manager.wait_any(), FailedActionHandle)
+        self.assertEqual(self._tempdirs(), [])
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_solve_all(self):
+        models = [_create_model(ub) for ub in range(1,11)]
+        self.manager.solve_all('glpk', models)
+        for ub, model in enumerate(models, 1):
+            self.assertAlmostEqual(model.x[2].value, ub)
+            self.assertAlmostEqual(model.o(), 2*ub)
+        self.assertEqual(self._tempdirs(), [])
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_wait_any(self):
+        self.manager = SolverManagerFactory('subprocess', max_processes=2)
+        opt = SolverFactory('glpk')
+        models = [_create_model(ub) for ub in range(1,6)]
+        ahs = dict((self.manager.queue(model, opt=opt), model)
+                   for model in models)
+        self.assertEqual(self.manager.num_queued(), 5)
+        while len(ahs):
+            ah = self.manager.wait_any()
+            self.assertEqual(ah.status, ActionStatus.done)
+            model = ahs.pop(ah)
+            results = self.manager.get_results(ah)
+            self.assertEqual(results.solver.termination_condition,
+                             TerminationCondition.optimal)
+            self.assertAlmostEqual(model.o(), 2*model.x[2].ub)
+        self.assertEqual(self.manager.num_queued(), 0)
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_load_solutions_false(self):
+        model = _create_model(3)
+        results = self.manager.solve(model, opt='glpk', load_solutions=False)
+        self.assertEqual(len(model.solutions), 0)
+        self.assertEqual(len(results.solution), 1)
+        model.solutions.load_from(results)
+        self.assertAlmostEqual(model.x[2].value, 3)
+
+    @unittest.skipIf(not 'glpk' in solvers, "glpk solver is not available")
+    def test_cancel(self):
+        self.manager = SolverManagerFactory('subprocess', max_processes=1)
+        models = [_create_model(ub) for ub in range(1,4)]
+        ahs = [self.manager.queue(model, opt='glpk') for model in models]
+        # cancel a running and a pending solve
+        self.manager.cancel(ahs[0])
+        self.manager.cancel(ahs[2])
+        self.assertRaises(ActionManagerError, self.manager.cancel, ahs[2])
+        self.assertEqual(self.manager.num_queued(), 1)
+        self.manager.wait_all()
+        self.assertEqual([ah.status for ah in ahs],
+                         [ActionStatus.error, ActionStatus.done,
+                          ActionStatus.error])
+        self.assertIs(models[0].x[2].value, None)
+        self.assertAlmostEqual(models[1].x[2].value, 2)
+        self.assertEqual(len(models[0].solutions.symbol_map), 0)
+        self.assertEqual(self._tempdirs(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Unit Tests for the warm-start file writers
+#
+
+import os
+import shutil
+import tempfile
+
+import pyutilib.th as unittest
+
+from pyomo.environ import *
+from pyomo.opt import ProblemFormat
+from pyomo.solvers.plugins.solvers.warmstart import (warm_start_values,
+                                                     write_warm_start)
+
+
+def _create_model():
+    model = ConcreteModel()
+    model.x = Var([1,2,3], within=NonNegativeIntegers)
+    model.y = Var()
+    model.unused = Var(initialize=5)
+    model.o = Objective(expr=model.x[1] + model.x[2] + model.x[3] + model.y)
+    model.c = Constraint(expr=model.x[1] + model.x[2] + model.y >= 1)
+    model.d = Constraint(expr=model.x[3] - model.y >= 0)
+    model.x[1].value = 1
+    model.x[2].value = 0
+    model.y.value = 1.0/3
+    return model
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.model = _create_model()
+        _, smap_id = self.model.write(os.path.join(self.tmpdir, 'model.lp'),
+                                      format=ProblemFormat.cpxlp,
+                                      io_options={'symbolic_solver_labels':
+                                                  True})
+        self.symbol_map = self.model.solutions.symbol_map[smap_id]
+        self.filename = os.path.join(self.tmpdir, 'model.mst')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self):
+        with open(self.filename) as f:
+            return f.read()
+
+    def test_values(self):
+        values = dict(warm_start_values(self.symbol_map))
+        # only the variables of the problem file with a value are
+        # included, and the values are written with full precision
+        self.assertEqual(values, {'x(1)': '1.0',
+                                  'x(2)': '0.0',
+                                  'y': repr(1.0/3)})
+        values = dict(warm_start_values(self.symbol_map, skip_zeros=True))
+        self.assertEqual(values, {'x(1)': '1.0', 'y': repr(1.0/3)})
+
+    def test_cplex(self):
+        self.assertEqual(write_warm_start(self.filename,
+                                          self.symbol_map,
+                                          'cplex'), 3)
+        lines = self._read().splitlines()
+        self.assertEqual(lines[:5], ['<?xml version="1.0" ?>',
+                                     '<CPLEXSolution version="1.0">',
+                                     '<header/>',
+                                     '<quality/>',
+                                     '<variables>'])
+        self.assertEqual(lines[-2:], ['</variables>', '</CPLEXSolution>'])
+        self.assertEqual(len(lines), 10)
+        for i, line in enumerate(lines[5:8]):
+            self.assertTrue(line.startswith('<variable index="%d" ' % (i,)))
+        self.assertEqual(sorted(line.split(' ', 2)[2] for line in lines[5:8]),
+                         sorted(['name="x(1)" value="1.0" />',
+                                 'name="x(2)" value="0.0" />',
+                                 'name="y" value="%r" />' % (1.0/3)]))
+
+    def test_gurobi(self):
+        self.assertEqual(write_warm_start(self.filename,
+                                          self.symbol_map,
+                                          'gurobi',
+                                          skip_zeros=True), 2)
+        self.assertEqual(sorted(self._read().splitlines()),
+                         sorted(['x(1) 1.0', 'y %r' % (1.0/3)]))
+
+    def test_cbc(self):
+        self.assertEqual(write_warm_start(self.filename,
+                                          self.symbol_map,
+                                          'cbc'), 3)
+        lines = self._read().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual([line.split()[0] for line in lines[1:]],
+                         ['0', '1', '2'])
+        self.assertEqual(sorted(line.split(' ', 1)[1] for line in lines[1:]),
+                         sorted(['x(1) 1.0', 'x(2) 0.0', 'y %r' % (1.0/3)]))
+
+    def test_unknown_solver(self):
+        self.assertRaises(ValueError, write_warm_start,
+                          self.filename, self.symbol_map, 'unknown')
+        self.assertFalse(os.path.exists(self.filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
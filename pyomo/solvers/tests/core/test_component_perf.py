@@ -1,5 +1,6 @@
 import gc
 import os
+import time
 thisdir = os.path.dirname(os.path.abspath(__file__))
 
 import pyutilib.th as unittest
@@ -13,6 +14,7 @@ from pyomo.core import (ConcreteModel,
                         Constraint,
                         Objective,
                         Reals)
+from pyomo.core.base.component import ComponentData
 
 class ComponentPerformanceBase(object):
     @classmethod
@@ -55,6 +57,29 @@ class ComponentPerformanceBase(object):
             self.assertEqual(cnt,
                              len(self.model.test_component))
 
+    def test_naming(self):
+        # name (and index) every element without a name buffer
+        component = self.model.test_component
+        start_time = time.time()
+        cnt = 0
+        for idx, cdata in component.iteritems():
+            if not isinstance(cdata, ComponentData):
+                continue
+            self.assertEqual(cdata.index(), idx)
+            cdata.name
+            cnt += 1
+        self.recordTestData('naming time', time.time() - start_time)
+        if cnt:
+            self.assertEqual(cnt, len(component))
+            self.assertEqual(cdata.name, 'test_component[%s]' % (idx,))
+
+    def test_clone(self):
+        start_time = time.time()
+        model = self.model.clone()
+        self.recordTestData('clone time', time.time() - start_time)
+        self.assertEqual(len(model.test_component),
+                         len(self.model.test_component))
+
 @unittest.category('performance')
 class TestMutableParamPerformance(ComponentPerformanceBase, unittest.TestCase):
     @classmethod
@@ -0,0 +1,106 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Benchmark the (non-recursive) expression tree walkers on deep
+# expressions
+#
+# Run this file as a script to benchmark deeper expressions, e.g.,
+#
+#     python test_expr_perf.py --depth 10000 100000 1000000
+#
+
+import os
+import time
+thisdir = os.path.dirname(os.path.abspath(__file__))
+
+import pyutilib.th as unittest
+
+import pyomo.environ
+from pyomo.core import (ConcreteModel,
+                        Param,
+                        Var,
+                        Constraint,
+                        Objective,
+                        value)
+from pyomo.core.base import expr as EXPR
+from pyomo.core.base import expr_common
+
+def create_model(depth):
+    """
+    Create a model with a constraint whose body is the expression
+    x*(... x*(y*(x*(x + y) + x) + y) ... + y) of the given depth.
+    """
+    model = ConcreteModel()
+    model.x = Var(initialize=1.0)
+    model.y = Var(initialize=1.0)
+    model.p = Param(initialize=0.5, mutable=True)
+    # The expression is built without the reference count checks
+    # (which clone the expressions recursively)
+    generate = EXPR.generate_expression_bypassCloneCheck
+    e = model.x
+    for i in range(1, depth):
+        v = model.x if i % 2 else model.y
+        e = generate(expr_common._mul, v,
+                     generate(expr_common._add, e, v))
+    model.c = Constraint(expr=(None, e, 1))
+    model.o = Objective(expr=model.x)
+    return model
+
+def run_benchmark(depth, filename=None):
+    """
+    Walk the body of the constraint created by create_model(depth) and
+    return a dictionary with the time (seconds) of each walker.
+    """
+    if filename is None:
+        filename = os.path.join(thisdir, 'expr_perf.nl')
+    model = create_model(depth)
+    e = model.c.body
+    results = {}
+    for name, walker in (
+            ('value', lambda: value(e)),
+            ('polynomial_degree', e.polynomial_degree),
+            ('is_fixed', e.is_fixed),
+            ('identify_variables',
+             lambda: list(EXPR.identify_variables(e))),
+            ('to_string', lambda: str(e)),
+            ('write_nl', lambda: model.write(filename, format='nl'))):
+        start = time.time()
+        walker()
+        results[name] = time.time() - start
+    os.remove(filename)
+    return results
+
+def _format_results(depth, results):
+    return "depth=%-8d " % (depth,) + \
+        "  ".join("%s: %.3f s" % (name, results[name])
+                  for name in ('value', 'polynomial_degree', 'is_fixed',
+                               'identify_variables', 'to_string',
+                               'write_nl'))
+
+@unittest.category('performance')
+class TestDeepExpressionPerformance(unittest.TestCase):
+
+    def test_deep_expression(self):
+        results = run_benchmark(10000)
+        for name in sorted(results):
+            self.recordTestData('%s (s)' % (name,), results[name])
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark the expression tree walkers on deep "
+                    "expressions")
+    parser.add_argument('--depth', type=int, nargs='+',
+                        default=[10000, 100000, 1000000])
+    args = parser.parse_args(argv)
+    for depth in args.depth:
+        print(_format_results(depth, run_benchmark(depth)))
+
+if __name__ == "__main__":
+    main()
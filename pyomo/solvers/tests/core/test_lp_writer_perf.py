@@ -0,0 +1,137 @@
+#  _________________________________________________________________________
+#
+#  Pyomo: Python Optimization Modeling Objects
+#  Copyright (c) 2014 Sandia Corporation.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  This software is distributed under the BSD License.
+#  _________________________________________________________________________
+#
+# Benchmark the LP writer (default and streaming modes)
+#
+# Run this file as a script to benchmark larger models, e.g.,
+#
+#     python test_lp_writer_perf.py --rows 1000000 --nnz-per-row 10
+#
+# Each mode is benchmarked in a separate process so that the reported
+# peak resident set sizes are independent.
+#
+
+import os
+import sys
+import time
+import random
+import subprocess
+thisdir = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    import resource
+    resource_available = True
+except ImportError:
+    resource_available = False
+
+import pyutilib.th as unittest
+
+import pyomo.environ
+from pyomo.core import (ConcreteModel,
+                        RangeSet,
+                        Var,
+                        Constraint,
+                        Objective,
+                        summation)
+
+def _peak_rss_mb():
+    if not resource_available:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on OS X and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / 1.0e6
+    return peak / 1.0e3
+
+def create_model(nrows, nnz_per_row, seed=0):
+    rng = random.Random(seed)
+    ncols = max(nrows, nnz_per_row)
+    model = ConcreteModel()
+    model.rows = RangeSet(nrows)
+    model.cols = RangeSet(ncols)
+    model.x = Var(model.cols, bounds=(0, 1))
+    model.obj = Objective(expr=summation(model.x))
+    def c_rule(m, i):
+        cols = set()
+        while len(cols) < nnz_per_row:
+            cols.add(rng.randint(1, ncols))
+        return sum(rng.uniform(-10, 10)*m.x[j] for j in cols) <= i
+    model.c = Constraint(model.rows, rule=c_rule)
+    return model
+
+def run_benchmark(nrows, nnz_per_row, streaming, filename=None):
+    """
+    Write a random sparse LP and return a dictionary with the size of
+    the file (MB), the write time (seconds), the throughput (MB/s) and
+    the peak resident set size of this process (MB).
+    """
+    if filename is None:
+        filename = os.path.join(thisdir, 'lp_writer_perf.lp')
+    model = create_model(nrows, nnz_per_row)
+    io_options = {}
+    if streaming:
+        io_options['streaming'] = True
+    start = time.time()
+    model.write(filename, format='lp', io_options=io_options)
+    seconds = time.time() - start
+    size = os.path.getsize(filename) / 1.0e6
+    os.remove(filename)
+    return {'nnz': nrows * nnz_per_row,
+            'size': size,
+            'seconds': seconds,
+            'rate': size / seconds if seconds > 0 else float('inf'),
+            'peak_rss': _peak_rss_mb()}
+
+def _format_results(mode, results):
+    peak_rss = results['peak_rss']
+    return ("%-9s  nnz=%-10d  %8.2f MB  %8.2f s  %8.2f MB/s  peak RSS: %s"
+            % (mode, results['nnz'], results['size'], results['seconds'],
+               results['rate'],
+               "%.1f MB" % peak_rss if peak_rss is not None else "n/a"))
+
+@unittest.category('performance')
+class TestLPWriterPerformance(unittest.TestCase):
+
+    def _run(self, streaming):
+        results = run_benchmark(20000, 10, streaming)
+        self.recordTestData('MB/s', results['rate'])
+        if results['peak_rss'] is not None:
+            self.recordTestData('peak RSS (MB)', results['peak_rss'])
+
+    def test_default(self):
+        self._run(False)
+
+    def test_streaming(self):
+        self._run(True)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark the default and streaming LP writers")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--nnz-per-row', type=int, default=10)
+    parser.add_argument('--mode', choices=('default', 'streaming'),
+                        default=None,
+                        help="Benchmark a single mode in this process")
+    args = parser.parse_args(argv)
+
+    if args.mode is not None:
+        results = run_benchmark(args.rows,
+                                args.nnz_per_row,
+                                args.mode == 'streaming')
+        print(_format_results(args.mode, results))
+        return
+    for mode in ('default', 'streaming'):
+        subprocess.check_call([sys.executable, os.path.abspath(__file__),
+                               '--rows', str(args.rows),
+                               '--nnz-per-row', str(args.nnz_per_row),
+                               '--mode', mode])
+
+if __name__ == "__main__":
+    main()
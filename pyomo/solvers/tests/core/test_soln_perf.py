@@ -0,0 +1,85 @@
+#
+# Performance tests for reading solver solution files
+#
+
+import os
+import time
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__))+os.sep
+
+import pyutilib.th as unittest
+
+from pyomo.opt import SolverFactory, SolverResults
+import pyomo.environ
+
+
+def _write_cplex_soln_file(filename, problem_file, nvars):
+    """
+    Write a synthetic CPLEX solution file for an LP with nvars
+    variables and nvars/2 constraints
+    """
+    with open(filename, "w") as f:
+        f.write('<?xml version = "1.0" standalone="yes"?>\n'
+                '<CPLEXSolution version="1.2">\n'
+                ' <header\n'
+                '   problemName="%s"\n'
+                '   objectiveValue="1"\n'
+                '   solutionStatusValue="1"\n'
+                '   solutionStatusString="optimal"/>\n'
+                ' <linearConstraints>\n' % (problem_file,))
+        for i in range(nvars//2):
+            f.write('  <constraint name="c_u_c%d_" index="%d" status="LL" '
+                    'slack="0" dual="%r"/>\n' % (i, i, i*0.25))
+        f.write(' </linearConstraints>\n'
+                ' <variables>\n')
+        for i in range(nvars):
+            f.write('  <variable name="x%d" index="%d" status="%s" '
+                    'value="%r" reducedCost="%r"/>\n'
+                    % (i, i, ("BS","LL","UL")[i%3], i*0.5, (i%7)-3.0))
+        f.write(' </variables>\n'
+                '</CPLEXSolution>\n')
+
+
+@unittest.category('performance')
+class TestCPLEXSolutionFile(unittest.TestCase):
+
+    nvars = 1000000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lp_file = currdir+"soln_perf.lp"
+        cls.soln_file = currdir+"soln_perf.xml"
+        with open(cls.lp_file, "w") as f:
+            f.write("min \n")
+        _write_cplex_soln_file(cls.soln_file, cls.lp_file, cls.nvars)
+
+    @classmethod
+    def tearDownClass(cls):
+        for fname in (cls.lp_file, cls.soln_file):
+            if os.path.exists(fname):
+                os.remove(fname)
+
+    def _read(self, suffixes):
+        opt = SolverFactory('_cplex_shell')
+        opt._soln_file = self.soln_file
+        opt._suffixes = suffixes
+        opt._best_bound = None
+        opt._gap = None
+        results = SolverResults()
+        start_time = time.time()
+        opt.process_soln_file(results)
+        self.recordTestData('solution file read time',
+                            time.time() - start_time)
+        self.assertEqual(len(results.solution(0).variable), self.nvars)
+        return results
+
+    def test_values(self):
+        self._read([])
+
+    def test_suffixes(self):
+        results = self._read(['dual', 'rc'])
+        self.assertEqual(len(results.solution(0).constraint), self.nvars//2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,7 @@
 import re
 import sys
 import os
+import stat
 from os.path import abspath, dirname
 pyomodir = dirname(abspath(__file__))+os.sep+".."+os.sep+".."+os.sep
 currdir = dirname(abspath(__file__))+os.sep
@@ -353,5 +354,124 @@ class Test(unittest.TestCase):
         except pyomo.opt.ConverterError:
             pass
 
+class CompressedConvertTests(unittest.TestCase):
+
+    def _create_model(self):
+        from pyomo.environ import ConcreteModel, Var, Objective, Constraint
+        model = ConcreteModel()
+        model.x = Var(bounds=(0, 1))
+        model.obj = Objective(expr=model.x)
+        model.c = Constraint(expr=model.x >= 0.5)
+        return model
+
+    def _problem_file(self, solver, model, **kwds):
+        solver._presolve(model, **kwds)
+        problem_file = solver._problem_files[0]
+        self.assertTrue(os.path.exists(problem_file))
+        os.remove(problem_file)
+        return problem_file
+
+    def test_compressed_problem_file(self):
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('_mock_cplex')
+        model = self._create_model()
+        self.assertTrue(self._problem_file(solver, model,
+                                           compression='gzip')\
+                        .endswith('.pyomo.lp.gz'))
+        solver.set_problem_format(pyomo.opt.ProblemFormat.mps)
+        self.assertTrue(self._problem_file(solver, model,
+                                           compression='gzip')\
+                        .endswith('.pyomo.mps.gz'))
+        # zstd-compressed files are not read by CPLEX, so an
+        # uncompressed problem file is written
+        solver.set_problem_format(pyomo.opt.ProblemFormat.cpxlp)
+        self.assertTrue(self._problem_file(solver, model,
+                                           compression='zstd')\
+                        .endswith('.pyomo.lp'))
+
+
+@unittest.skipIf(not hasattr(os, 'mkfifo'), "Named pipes are not supported")
+class PipedConvertTests(unittest.TestCase):
+
+    def _create_model(self):
+        from pyomo.environ import ConcreteModel, Var, Objective, Constraint
+        model = ConcreteModel()
+        model.x = Var(bounds=(0, 1))
+        model.obj = Objective(expr=model.x)
+        model.c = Constraint(expr=model.x >= 0.5)
+        return model
+
+    def tearDown(self):
+        pyutilib.services.TempfileManager.clear_tempfiles()
+
+    def test_piped_problem_file(self):
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('glpk')
+        solver.set_executable(sys.executable, validate=False)
+        solver._presolve(self._create_model(), pipe=True)
+        problem_file = solver._problem_files[0]
+        self.assertTrue(problem_file.endswith('.pyomo.lp'))
+        self.assertTrue(stat.S_ISFIFO(os.stat(problem_file).st_mode))
+        self.assertIsNot(solver._pipe_writer, None)
+        pyutilib.services.TempfileManager.pop()
+        self.assertFalse(os.path.exists(problem_file))
+
+    def test_problem_formats(self):
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('glpk')
+        solver.set_executable(sys.executable, validate=False)
+        solver.set_problem_format(pyomo.opt.ProblemFormat.mps)
+        solver._presolve(self._create_model(), pipe=True)
+        self.assertTrue(stat.S_ISFIFO(
+            os.stat(solver._problem_files[0]).st_mode))
+        pyutilib.services.TempfileManager.pop()
+        # The mock solvers do not execute a command, so a regular
+        # problem file is written
+        solver = pyomo.opt.SolverFactory('_mock_cplex')
+        solver._presolve(self._create_model(), pipe=True)
+        self.assertTrue(os.path.isfile(solver._problem_files[0]))
+        self.assertIs(solver._pipe_writer, None)
+        pyutilib.services.TempfileManager.pop()
+
+    def test_warm_start(self):
+        # The warm-start file is written from the symbol map of the
+        # problem in _presolve(), so a regular problem file is written
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('cbc')
+        solver.set_executable(sys.executable, validate=False)
+        model = self._create_model()
+        model.x.value = 1
+        solver._presolve(model, pipe=True, warmstart=True)
+        self.assertTrue(os.path.isfile(solver._problem_files[0]))
+        self.assertIs(solver._pipe_writer, None)
+        self.assertIn(solver._smap_id, model.solutions.symbol_map)
+        with open(solver._warm_start_file_name) as f:
+            self.assertEqual(f.read().splitlines()[1:], ['0 x1 1.0'])
+        pyutilib.services.TempfileManager.pop()
+        pyutilib.services.TempfileManager.pop()
+
+    def test_warm_start_error(self):
+        # The temporary files are removed if the presolve fails
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('cbc')
+        solver.set_executable(sys.executable, validate=False)
+        model = self._create_model()
+        def _warm_start(instance):
+            raise RuntimeError("Failed to write the warm-start file")
+        solver._warm_start = _warm_start
+        self.assertRaises(RuntimeError, solver._presolve, model,
+                          pipe=True, warmstart=True)
+        self.assertFalse(os.path.exists(solver._problem_files[0]))
+        self.assertFalse(os.path.exists(solver._warm_start_file_name))
+        self.assertEqual(pyutilib.services.TempfileManager._tempfiles, [[]])
+
+    def test_solver_error(self):
+        # The solver exits (with an error) before reading the pipe
+        import pyomo.environ
+        solver = pyomo.opt.SolverFactory('glpk')
+        solver.set_executable(sys.executable, validate=False)
+        self.assertRaises(pyutilib.common.ApplicationError,
+                          solver.solve, self._create_model(), pipe=True)
+
 if __name__ == "__main__":
     unittest.main()